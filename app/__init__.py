@@ -151,6 +151,10 @@ def _register_teardown(app):
 
     @app.teardown_request
     def shutdown_session(exception=None):
+        # g は app context に載るため、テストのように app context を使い回す
+        # 場合でも Principal をリクエストをまたいで持ち越さない
+        from app.middleware.auth_middleware import clear_principal
+        clear_principal()
         if app.config.get('TESTING'):
             return  # Tests manage their own session lifecycle
         try:
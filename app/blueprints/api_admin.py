@@ -7,26 +7,34 @@ from datetime import datetime, timedelta
 logger = logging.getLogger(__name__)
 
 from app.extensions import db, limiter
-from app.middleware.auth_middleware import require_role, get_current_user
+from app.middleware.auth_middleware import (
+    require_role, get_current_user, current_principal, invalidate_principal_cache,
+)
 from app.models.organization import Organization
 from app.models.opening_hours import OpeningHours, OpeningHoursException, SyncOperationLog
+from app.models.approval import ApprovalHistory
 from app.models.shift import ShiftPeriod, ShiftSchedule, ShiftScheduleEntry
 from app.models.user import User
 from app.services.shift_service import (
     get_submissions_for_period, save_schedule, get_worker_hours_summary,
     get_opening_hours_for_period, delete_period_with_cleanup,
-    get_period_impact_summary,
+    get_period_impact_summary, apply_schedule_changes, ScheduleVersionConflict,
 )
+from app.services.auto_schedule_service import propose_schedule, generate_draft_schedule
 from app.services.approval_service import submit_for_approval, confirm_schedule, confirm_schedule_direct
 from app.services.auth_service import get_credentials_for_user, CredentialsExpiredError
-from app.services.calendar_service import create_event, classify_calendar_error
-from app.services.notification_service import notify_period_open
+from app.services.notification_service import notify_period_open_many
+from app.services.schedule_sync_service import sync_schedule_to_calendar, get_sync_progress
+from app.services.task_runner import (
+    enqueue_schedule_sync, find_schedule_sync_task, drain_after_response,
+)
 from app.services.opening_hours_sync_service import (
     export_opening_hours_to_calendar,
     import_opening_hours_from_calendar,
 )
 from app.utils.validators import validate_time_str, validate_text_length
 from app.utils.errors import error_response
+from app.utils.serialization import eager
 from app.models.membership import OrganizationMember, InvitationToken
 from app.services.audit_service import log_audit
 from app.services import organization_settings as org_settings
@@ -38,6 +46,9 @@ api_admin_bp = Blueprint('api_admin', __name__, url_prefix='/api/admin')
 def _get_or_create_org(user):
     """Get user's organization or create a new one for the user."""
     if user.organization_id:
+        principal = current_principal()
+        if principal is not None and principal.user is user:
+            return principal.organization
         return db.session.get(Organization, user.organization_id)
     # Create a new org for this user instead of assigning to an arbitrary existing one
     org = Organization(name=f'{user.display_name or user.email} の組織', admin_email=user.email, owner_email=user.email)
@@ -51,6 +62,7 @@ def _get_or_create_org(user):
     except Exception:
         db.session.rollback()
         raise
+    invalidate_principal_cache(user.id)
     return org
 
 
@@ -491,7 +503,7 @@ def update_period(period_id):
 def _notify_period_opened(period, org, admin_user):
     """期間が公開されたとき、組織のアクティブな Worker 全員に通知を発火する。
 
-    部分失敗（一部 Worker への enqueue 失敗）は許容し、成功件数のみ返す。
+    enqueue に失敗しても例外は握りつぶし、通知できた件数のみ返す（0 件もあり得る）。
     Period status の変更自体は既にコミット済なので、通知の失敗で巻き戻さない。
     """
 
@@ -507,27 +519,24 @@ def _notify_period_opened(period, org, admin_user):
     deadline_str = (period.submission_deadline.strftime('%Y/%m/%d %H:%M')
                     if period.submission_deadline else None)
 
-    sent = 0
-    for worker in workers:
-        try:
-            notify_period_open(
-                worker.email,
-                worker.display_name or worker.email,
-                org.name,
-                period.name,
-                period.start_date.isoformat(),
-                period.end_date.isoformat(),
-                deadline_str,
-                submit_url,
-                announcement_text=period.announcement_text,
-                organization_id=org.id,
-                created_by=admin_user.id,
-            )
-            sent += 1
-        except Exception:
-            logger.warning("Failed to enqueue period_open notification for worker_id=%s",
-                           worker.id, exc_info=True)
-    return sent
+    # テンプレートは 1 回だけ描画し、AsyncTask は 1 文で一括 INSERT + 1 コミット
+    try:
+        return notify_period_open_many(
+            [{'to_email': w.email, 'worker_name': w.display_name or w.email} for w in workers],
+            org.name,
+            period.name,
+            period.start_date.isoformat(),
+            period.end_date.isoformat(),
+            deadline_str,
+            submit_url,
+            announcement_text=period.announcement_text,
+            organization_id=org.id,
+            created_by=admin_user.id,
+        )
+    except Exception:
+        logger.warning("Failed to enqueue period_open notifications for period_id=%s",
+                       period.id, exc_info=True)
+        return 0
 
 
 @api_admin_bp.route('/periods/<int:period_id>/archive', methods=['POST'])
@@ -704,12 +713,12 @@ def get_schedule(period_id):
         return jsonify(None)
 
     data = schedule.to_dict()
-    entries = schedule.entries.all()
+    entries = schedule.entries.options(*eager(ShiftScheduleEntry.user)).all()
     data['entries'] = [e.to_dict() for e in entries]
     data['hours_summary'] = get_worker_hours_summary(schedule.id)
-    data['history'] = [h.to_dict() for h in schedule.history.order_by(
-        db.text('performed_at desc')
-    ).all()]
+    data['history'] = [h.to_dict() for h in schedule.history.options(
+        *eager(ApprovalHistory.performer)
+    ).order_by(db.text('performed_at desc')).all()]
     data['schedule_version'] = schedule.updated_at.isoformat() if schedule.updated_at else None
 
     # Sync summary for confirmed schedules
@@ -726,6 +735,14 @@ def get_schedule(period_id):
     return jsonify(data)
 
 
+def _version_mismatch_response(current_version):
+    return jsonify({
+        'error': '他の管理者がこのシフトを編集しました。最新の状態を再読込してください。',
+        'code': 'SCHEDULE_VERSION_MISMATCH',
+        'current_version': current_version,
+    }), 409
+
+
 @api_admin_bp.route('/periods/<int:period_id>/schedule', methods=['POST'])
 @require_role('admin')
 @limiter.limit("30 per minute")
@@ -749,11 +766,7 @@ def save_period_schedule(period_id):
         if current_schedule:
             current_version = current_schedule.updated_at.isoformat() if current_schedule.updated_at else None
             if current_version != expected_version:
-                return jsonify({
-                    'error': '他の管理者がこのシフトを編集しました。最新の状態を再読込してください。',
-                    'code': 'SCHEDULE_VERSION_MISMATCH',
-                    'current_version': current_version,
-                }), 409
+                return _version_mismatch_response(current_version)
 
     try:
         schedule = save_schedule(period_id, user.id, entries, organization_id=org.id)
@@ -770,8 +783,114 @@ def save_period_schedule(period_id):
         )
         return error_response("スケジュールの保存に失敗しました", 500, code="INTERNAL_ERROR")
     result = schedule.to_dict()
-    result['entries'] = [e.to_dict() for e in schedule.entries.all()]
+    result['entries'] = [e.to_dict() for e in schedule.entries.options(
+        *eager(ShiftScheduleEntry.user)
+    ).all()]
+    result['schedule_version'] = schedule.updated_at.isoformat() if schedule.updated_at else None
+    return jsonify(result)
+
+
+@api_admin_bp.route('/periods/<int:period_id>/schedule/changes', methods=['POST'])
+@require_role('admin')
+@limiter.limit("60 per minute")
+def save_period_schedule_changes(period_id):
+    """下書きシフトへの差分保存。
+
+    body: {expected_version, added: [entry], changed: [entry], removed: [{user_id, shift_date}]}
+    触れたエントリだけを検証・書込みするため、未変更行の id やカレンダー同期状態は保持される。
+    """
+    user = get_current_user()
+    org = _get_or_create_org(user)
+    period = db.session.get(ShiftPeriod, period_id)
+    if not period or period.organization_id != org.id:
+        return error_response("Not found", 404, code="NOT_FOUND")
+    data = request.get_json(silent=True)
+    if not data:
+        return error_response("Request body is required", 400, code="BAD_REQUEST")
+
+    try:
+        schedule = apply_schedule_changes(
+            period_id, data, organization_id=org.id,
+            expected_version=data.get('expected_version'),
+        )
+    except ScheduleVersionConflict as e:
+        return _version_mismatch_response(e.current_version)
+    except ValueError as e:
+        current_app.logger.info(
+            "Schedule diff save validation error: period_id=%s user_id=%s error=%s",
+            period_id, user.id, str(e),
+        )
+        return error_response(str(e), 400, code="VALIDATION_ERROR")
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception(
+            "Schedule diff save unexpected error: period_id=%s user_id=%s", period_id, user.id,
+        )
+        return error_response("スケジュールの保存に失敗しました", 500, code="INTERNAL_ERROR")
+    # 全エントリは返さない（応答コストもスケジュール規模に依存させない）
+    result = schedule.to_dict()
+    result['applied'] = {kind: len(data.get(kind) or []) for kind in ('added', 'changed', 'removed')}
+    result['schedule_version'] = schedule.updated_at.isoformat() if schedule.updated_at else None
+    return jsonify(result)
+
+
+@api_admin_bp.route('/periods/<int:period_id>/coverage', methods=['GET'])
+@require_role('admin')
+def get_period_coverage(period_id):
+    """必要人数に対する割当の過不足（日 × 時間帯）。最新のスケジュールを対象にする。
+
+    Query: resolution=15|30|60（時間帯行列の刻み、既定 30 分）
+    """
+    user = get_current_user()
+    org = _get_or_create_org(user)
+    period = db.session.get(ShiftPeriod, period_id)
+    if not period or period.organization_id != org.id:
+        return error_response("Not found", 404, code="NOT_FOUND")
+    schedule = ShiftSchedule.query.filter_by(shift_period_id=period_id).order_by(
+        ShiftSchedule.created_at.desc()
+    ).first()
+    try:
+        resolution = int(request.args.get('resolution', 30))
+        return jsonify(staffing_service.get_period_coverage(org, period, schedule, resolution))
+    except ValueError as e:
+        return error_response(str(e), 400, code="VALIDATION_ERROR")
+
+
+@api_admin_bp.route('/periods/<int:period_id>/schedule/auto', methods=['POST'])
+@require_role('admin')
+@limiter.limit("10 per minute")
+def auto_schedule(period_id):
+    """Build a draft schedule from submissions and staffing requirements.
+
+    Body (optional): {"dry_run": true} returns the proposal without saving.
+    Otherwise the draft's entries are replaced, as with a manual save.
+    """
+    user = get_current_user()
+    org = _get_or_create_org(user)
+    period = db.session.get(ShiftPeriod, period_id)
+    if not period or period.organization_id != org.id:
+        return error_response("Not found", 404, code="NOT_FOUND")
+    data = request.get_json(silent=True) or {}
+
+    if data.get('dry_run'):
+        return jsonify(propose_schedule(period, org))
+
+    try:
+        schedule, metrics = generate_draft_schedule(period, org, user.id)
+    except ValueError as e:
+        return error_response(str(e), 400, code="VALIDATION_ERROR")
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception(
+            "Auto schedule unexpected error: period_id=%s user_id=%s", period_id, user.id,
+        )
+        return error_response("自動作成に失敗しました", 500, code="INTERNAL_ERROR")
+    result = schedule.to_dict()
+    result['entries'] = [e.to_dict() for e in schedule.entries.options(
+        *eager(ShiftScheduleEntry.user)
+    ).all()]
     result['schedule_version'] = schedule.updated_at.isoformat() if schedule.updated_at else None
+    result['metrics'] = metrics
     return jsonify(result)
 
 
@@ -832,114 +951,66 @@ def confirm_period_schedule(period_id):
     if error:
         return error_response(error, 400)
 
-    # Sync to Google Calendar
-    sync_results = _sync_schedule_to_calendar(result, user)
-
     data = result.to_dict()
-    data['sync_results'] = sync_results
-    data['sync_summary'] = {
-        'total': len(sync_results),
-        'synced': sum(1 for r in sync_results if r.get('success')),
-        'needs_worker_action': sum(1 for r in sync_results if r.get('needs_worker_action')),
-        'failed': sum(1 for r in sync_results if r.get('error') and not r.get('needs_worker_action')),
-    }
     # アーカイブ確認ダイアログ用に period 情報を含める
     data['period'] = {
         'id': period.id,
         'name': period.name,
         'is_archived': period.is_archived,
     }
-    return jsonify(data)
-
 
-def _sync_schedule_to_calendar(schedule, admin_user):
-    """Sync confirmed schedule entries to workers' Google Calendars.
-
-    Uses each worker's own OAuth credentials to write to their primary calendar.
-    If worker credentials are unavailable, records the failure as needs_worker_action.
-    """
-    results = []
-    entries = schedule.entries.all()
-
-    # Cache credentials per user to avoid repeated DB lookups
-    credentials_cache = {}
-
-    for entry in entries:
-        # 冪等性 guard: 既に同期済みの entry はスキップ
-        if entry.calendar_event_id:
-            results.append({"user_id": entry.user_id, "event_id": entry.calendar_event_id, "success": True, "skipped": True})
-            continue
-
-        worker = db.session.get(User, entry.user_id)
-        if not worker:
-            results.append({"user_id": entry.user_id, "error": "User not found", "errorCode": "USER_NOT_FOUND"})
-            continue
+    # {"async": true}: カレンダー同期はバックグラウンドタスクに任せて即時応答する。
+    # 応答後に同じプロセスで時間制限付きの drain を走らせ、残りは cron が拾う。
+    # 進捗は GET .../schedule/sync-progress でポーリングする。
+    if (request.get_json(silent=True) or {}).get('async'):
+        task = enqueue_schedule_sync(result.id, organization_id=org.id, created_by=user.id)
+        db.session.commit()
+        data['sync_task'] = task.to_dict()
+        data['sync_progress'] = get_sync_progress(result.id)
+        response = jsonify(data)
+        response.status_code = 202
+        return drain_after_response(response)
 
-        summary = f"シフト: {worker.display_name or worker.email}"
-        start_dt = f"{entry.shift_date.isoformat()}T{entry.start_time}:00"
-        end_dt = f"{entry.shift_date.isoformat()}T{entry.end_time}:00"
+    # Sync to Google Calendar
+    sync_results = sync_schedule_to_calendar(result.id)
+    data['sync_results'] = sync_results
+    data['sync_summary'] = {
+        'total': len(sync_results),
+        'synced': sum(1 for r in sync_results if r.get('success')),
+        'needs_worker_action': sum(1 for r in sync_results if r.get('needs_worker_action')),
+        'failed': sum(1 for r in sync_results if r.get('error') and not r.get('needs_worker_action')),
+    }
+    return jsonify(data)
 
-        try:
-            entry.last_sync_attempt_at = datetime.utcnow()
-
-            # Worker credentials の取得
-            if worker.id not in credentials_cache:
-                try:
-                    credentials_cache[worker.id] = get_credentials_for_user(worker)
-                except CredentialsExpiredError:
-                    credentials_cache[worker.id] = ('error', 'CREDENTIALS_EXPIRED', 'Google認証の有効期限切れ。再ログインが必要です')
-                except Exception as e:
-                    credentials_cache[worker.id] = ('error', 'CREDENTIALS_UNAVAILABLE', str(e))
-
-            cached = credentials_cache[worker.id]
-
-            # credentials 取得失敗
-            if cached is None:
-                entry.sync_error = 'NO_CREDENTIALS'
-                results.append({
-                    "user_id": entry.user_id,
-                    "error": "Google連携未設定。本人によるカレンダー追加が必要です",
-                    "errorCode": "NO_CREDENTIALS",
-                    "needs_worker_action": True,
-                })
-                continue
-            if isinstance(cached, tuple):
-                _, code, msg = cached
-                entry.sync_error = code
-                results.append({
-                    "user_id": entry.user_id,
-                    "error": msg,
-                    "errorCode": code,
-                    "needs_worker_action": True,
-                })
-                continue
-
-            # Worker 本人の credentials で同期
-            event_id = create_event(
-                cached, 'primary', summary, start_dt, end_dt,
-                description="シフリーにより自動作成"
-            )
-            entry.calendar_event_id = event_id
-            entry.synced_at = datetime.utcnow()
-            entry.sync_error = None
-            results.append({"user_id": entry.user_id, "event_id": event_id, "success": True})
 
-        except Exception as e:
-            current_app.logger.error("Calendar sync failed for user %s: %s", entry.user_id, e)
-            error_code = classify_calendar_error(e)
-            entry.sync_error = error_code
-            results.append({
-                "user_id": entry.user_id,
-                "error": str(e),
-                "errorCode": error_code,
-                "needs_worker_action": error_code != "CALENDAR_TEMPORARY_FAILURE",
-            })
+@api_admin_bp.route('/periods/<int:period_id>/schedule/sync-progress', methods=['GET'])
+@require_role('admin')
+def get_schedule_sync_progress(period_id):
+    """Calendar sync progress of the period's latest schedule (for polling)."""
+    user = get_current_user()
+    org = _get_or_create_org(user)
+    period = db.session.get(ShiftPeriod, period_id)
+    if not period or period.organization_id != org.id:
+        return error_response("Not found", 404, code="NOT_FOUND")
+    schedule = ShiftSchedule.query.filter_by(shift_period_id=period_id).order_by(
+        ShiftSchedule.created_at.desc()
+    ).first()
+    if not schedule:
+        return error_response("No schedule found", 404, code="NOT_FOUND")
 
-    try:
-        db.session.commit()
-    except Exception:
-        db.session.rollback()
-    return results
+    task = find_schedule_sync_task(schedule.id)
+    progress = get_sync_progress(schedule.id)
+    if task is not None:
+        done = task.status not in ('pending', 'running')
+    else:
+        done = progress['pending'] == 0
+    return jsonify({
+        'schedule_id': schedule.id,
+        'status': schedule.status,
+        'progress': progress,
+        'task': task.to_dict() if task else None,
+        'done': done,
+    })
 
 
 # --- Worker History ---
@@ -978,7 +1049,7 @@ def get_worker_history(worker_id):
 def get_members():
     user = get_current_user()
     org = _get_or_create_org(user)
-    members = OrganizationMember.query.filter_by(
+    members = OrganizationMember.query.options(*eager(OrganizationMember.user)).filter_by(
         organization_id=org.id, is_active=True
     ).all()
     return jsonify([m.to_dict() for m in members])
@@ -1045,6 +1116,7 @@ def update_member_role(member_id):
     except Exception:
         db.session.rollback()
         return error_response("Database error", 500, code="INTERNAL_ERROR")
+    invalidate_principal_cache(member.user_id)
     return jsonify(member.to_dict())
 
 
@@ -1095,6 +1167,7 @@ def remove_member(member_id):
     except Exception:
         db.session.rollback()
         return error_response("Database error", 500, code="INTERNAL_ERROR")
+    invalidate_principal_cache(member.user_id)
     return '', 204
 
 
@@ -1364,7 +1437,9 @@ def get_vacancies():
     user = get_current_user()
     org = _get_or_create_org(user)
     from app.models.vacancy import VacancyRequest
-    vacancies = VacancyRequest.query.join(
+    vacancies = VacancyRequest.query.options(*eager(
+        VacancyRequest.original_user, VacancyRequest.acceptor, VacancyRequest.schedule_entry,
+    )).join(
         ShiftScheduleEntry, VacancyRequest.schedule_entry_id == ShiftScheduleEntry.id
     ).join(
         ShiftSchedule, ShiftScheduleEntry.schedule_id == ShiftSchedule.id
@@ -1383,7 +1458,10 @@ def get_change_log():
     user = get_current_user()
     org = _get_or_create_org(user)
     from app.models.vacancy import ShiftChangeLog
-    logs = ShiftChangeLog.query.join(
+    logs = ShiftChangeLog.query.options(*eager(
+        ShiftChangeLog.original_user, ShiftChangeLog.new_user,
+        ShiftChangeLog.performer, ShiftChangeLog.schedule_entry,
+    )).join(
         ShiftScheduleEntry, ShiftChangeLog.schedule_entry_id == ShiftScheduleEntry.id
     ).join(
         ShiftSchedule, ShiftScheduleEntry.schedule_id == ShiftSchedule.id
@@ -1403,10 +1481,7 @@ def get_sync_settings():
     """Get calendar sync settings for the organization."""
     user = get_current_user()
     org = _get_or_create_org(user)
-    return jsonify({
-        'calendar_sync_keyword': org.get_setting('calendar_sync_keyword', '営業時間'),
-        'calendar_setup_dismissed': org.get_setting('calendar_setup_dismissed', False),
-    })
+    return jsonify(org_settings.settings_for(org).calendar_sync)
 
 
 @api_admin_bp.route('/sync-settings', methods=['PUT'])
@@ -1436,10 +1511,7 @@ def update_sync_settings():
         db.session.rollback()
         return error_response("Database error", 500, code="INTERNAL_ERROR")
 
-    return jsonify({
-        'calendar_sync_keyword': org.get_setting('calendar_sync_keyword', '営業時間'),
-        'calendar_setup_dismissed': org.get_setting('calendar_setup_dismissed', False),
-    })
+    return jsonify(org_settings.settings_for(org).calendar_sync)
 
 
 @api_admin_bp.route('/calendars', methods=['GET'])
@@ -1476,12 +1548,7 @@ def get_reminder_settings():
     """Get reminder settings for the organization."""
     user = get_current_user()
     org = _get_or_create_org(user)
-    return jsonify({
-        'reminder_days_before_deadline': org.get_setting('reminder_days_before_deadline', 1),
-        'reminder_time_deadline': org.get_setting('reminder_time_deadline', '09:00'),
-        'reminder_days_before_shift': org.get_setting('reminder_days_before_shift', 1),
-        'reminder_time_shift': org.get_setting('reminder_time_shift', '21:00'),
-    })
+    return jsonify(org_settings.settings_for(org).reminders)
 
 
 @api_admin_bp.route('/reminder-settings', methods=['PUT'])
@@ -1494,11 +1561,7 @@ def update_reminder_settings():
     if not data:
         return error_response("Request body is required", 400, code="BAD_REQUEST")
 
-    allowed_keys = {
-        'reminder_days_before_deadline', 'reminder_time_deadline',
-        'reminder_days_before_shift', 'reminder_time_shift',
-    }
-    for key in allowed_keys:
+    for key in org_settings.DEFAULT_REMINDERS:
         if key in data:
             org.set_setting(key, data[key])
 
@@ -1508,12 +1571,7 @@ def update_reminder_settings():
         db.session.rollback()
         return error_response("Database error", 500, code="INTERNAL_ERROR")
 
-    return jsonify({
-        'reminder_days_before_deadline': org.get_setting('reminder_days_before_deadline', 1),
-        'reminder_time_deadline': org.get_setting('reminder_time_deadline', '09:00'),
-        'reminder_days_before_shift': org.get_setting('reminder_days_before_shift', 1),
-        'reminder_time_shift': org.get_setting('reminder_time_shift', '21:00'),
-    })
+    return jsonify(org_settings.settings_for(org).reminders)
 
 
 @api_admin_bp.route('/reminders/send/<int:period_id>', methods=['POST'])
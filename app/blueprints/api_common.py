@@ -3,7 +3,9 @@ import logging
 from flask import Blueprint, jsonify, session, current_app, redirect, request, make_response
 
 from app.extensions import db, limiter
-from app.middleware.auth_middleware import get_current_user, _check_active_membership
+from app.middleware.auth_middleware import (
+    get_current_user, _check_active_membership, invalidate_principal_cache,
+)
 from app.utils.errors import error_response
 from app.utils.useragent import webview_redirect_if_needed
 
@@ -133,12 +135,14 @@ def create_organization():
         # Capture values before commit (commit expires ORM objects)
         org_id = org.id
         org_name = org.name
+        user_id = user.id
 
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         logger.exception("Failed to create organization for user %s: %s", user.email, e)
         return error_response("Failed to create organization", 500, code="INTERNAL_ERROR")
+    invalidate_principal_cache(user_id)
 
     return jsonify({
         'id': org_id,
@@ -8,8 +8,10 @@ hits this endpoint periodically.
 import hmac
 import os
 import logging
+import time
 
 from flask import Blueprint, jsonify, request
+from app.extensions import db
 from app.utils.errors import error_response
 
 api_cron_bp = Blueprint('api_cron', __name__)
@@ -31,14 +33,27 @@ def _verify_cron_secret():
 
 @api_cron_bp.route('/api/cron/process-tasks', methods=['POST'])
 def process_tasks():
-    """Process pending async tasks.  Protected by CRON_SECRET."""
+    """Send due reminders, then drain the async task queue; both share one time budget.
+
+    Protected by CRON_SECRET.  Idempotent: reminders are de-duplicated and
+    tasks are claimed with leases, so any scheduler may call this as often
+    as it likes.  ?budget=<seconds> lowers TASK_DRAIN_BUDGET_SECONDS.
+    """
     if not _verify_cron_secret():
         return error_response('Unauthorized', 401, code="AUTH_REQUIRED")
 
-    from app.services.task_runner import process_pending_tasks
-    stats = process_pending_tasks(batch_size=20)
+    from flask import current_app
+    from app.services.task_runner import drain_pending_tasks
+
+    budget = current_app.config.get('TASK_DRAIN_BUDGET_SECONDS', 50)
+    requested = request.args.get('budget', type=float)
+    if requested is not None and requested > 0:
+        budget = min(budget, requested)
+    # The budget covers the whole run, reminders included
+    deadline = time.perf_counter() + budget
 
-    # Process reminders (integrated into same cron for Vercel Hobby 1/day limit)
+    # Process reminders (integrated into same cron for Vercel Hobby 1/day limit).
+    # Run first so the notification emails they enqueue go out in this drain.
     reminder_stats = {}
     try:
         from app.services.reminder_service import (
@@ -48,9 +63,11 @@ def process_tasks():
         reminder_stats['submission'] = check_and_send_submission_reminders()
         reminder_stats['preshift'] = check_and_send_preshift_reminders()
     except Exception as e:
+        db.session.rollback()
         logger.error("Reminder processing failed: %s", e)
         reminder_stats['error'] = str(e)
 
+    stats = drain_pending_tasks(budget_seconds=budget, deadline=deadline)
     stats['reminders'] = reminder_stats
     logger.info("Cron run: %s", stats)
     return jsonify(stats), 200
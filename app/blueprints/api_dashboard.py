@@ -12,6 +12,7 @@ from app.models.approval import ApprovalHistory
 from app.models.shift import ShiftSchedule
 from app.models.opening_hours import SyncOperationLog
 from app.models.audit_log import AuditLog
+from app.utils.serialization import eager
 
 api_dashboard_bp = Blueprint('api_dashboard', __name__)
 
@@ -155,6 +156,7 @@ def audit_logs():
 
     query = (
         AuditLog.query
+        .options(*eager(AuditLog.actor))
         .filter_by(organization_id=org_id)
         .order_by(AuditLog.created_at.desc())
     )
@@ -19,6 +19,7 @@ from app.models.shift import (
 from app.models.async_task import AsyncTask
 from app.models.audit_log import AuditLog
 from app.models.approval import ApprovalHistory
+from app.middleware.auth_middleware import invalidate_principal_cache
 from app.utils.errors import error_response
 
 logger = logging.getLogger(__name__)
@@ -177,6 +178,7 @@ def update_user(user_id):
     if 'is_active' in data:
         user.is_active = bool(data['is_active'])
     db.session.commit()
+    invalidate_principal_cache(user_id)
     return jsonify({'ok': True})
 
 
@@ -192,6 +194,7 @@ def deactivate_user(user_id):
     for m in memberships:
         m.is_active = False
     db.session.commit()
+    invalidate_principal_cache(user_id)
     return jsonify({'ok': True})
 
 
@@ -280,6 +283,7 @@ def update_member(member_id):
         member.is_active = bool(data['is_active'])
     member.sync_to_user()
     db.session.commit()
+    invalidate_principal_cache(member.user_id)
     return jsonify({'ok': True})
 
 
@@ -365,10 +369,10 @@ def retry_task(task_id):
 @api_master_bp.route('/api/master/tasks/process-now', methods=['POST'])
 @require_master
 def process_tasks_now():
-    """Manually trigger async task processing (same as cron)."""
-    from app.services.task_runner import process_pending_tasks
+    """Manually trigger async task processing (same drain as cron)."""
+    from app.services.task_runner import drain_pending_tasks
     try:
-        stats = process_pending_tasks(batch_size=20)
+        stats = drain_pending_tasks()
         _log_master_action('MASTER_CRON_TRIGGER', new_values=stats)
         db.session.commit()
         return jsonify(stats)
@@ -897,6 +901,7 @@ def health_fix():
 
     _log_master_action('MASTER_HEALTH_FIX', new_values={'fix_type': fix_type, 'fixed': fixed})
     db.session.commit()
+    invalidate_principal_cache()
     return jsonify({'ok': True, 'fix_type': fix_type, 'fixed': fixed})
 
 
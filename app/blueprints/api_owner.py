@@ -3,8 +3,11 @@ from flask import Blueprint, request, jsonify
 from app.extensions import db, limiter
 from app.middleware.auth_middleware import require_role, get_current_user
 from app.utils.errors import error_response
+from app.utils.serialization import eager
+from app.models.approval import ApprovalHistory
 from app.models.shift import ShiftSchedule, ShiftScheduleEntry, ShiftPeriod
 from app.services.shift_service import get_worker_hours_summary
+from app.services.staffing_service import get_period_coverage
 from app.services.approval_service import approve_schedule, reject_schedule
 
 api_owner_bp = Blueprint('api_owner', __name__, url_prefix='/api/owner')
@@ -14,7 +17,9 @@ api_owner_bp = Blueprint('api_owner', __name__, url_prefix='/api/owner')
 @require_role('owner')
 def get_pending_approvals():
     user = get_current_user()
-    schedules = ShiftSchedule.query.filter_by(status='pending_approval').join(
+    schedules = ShiftSchedule.query.options(*eager(
+        ShiftSchedule.period, ShiftSchedule.creator,
+    )).filter_by(status='pending_approval').join(
         ShiftPeriod
     ).filter(
         ShiftPeriod.organization_id == user.organization_id
@@ -40,14 +45,33 @@ def get_schedule_detail(schedule_id):
 
     data = schedule.to_dict()
     data['period'] = schedule.period.to_dict() if schedule.period else None
-    data['entries'] = [e.to_dict() for e in schedule.entries.all()]
-    data['hours_summary'] = get_worker_hours_summary(schedule.id)
-    data['history'] = [h.to_dict() for h in schedule.history.order_by(
-        db.text('performed_at desc')
+    data['entries'] = [e.to_dict() for e in schedule.entries.options(
+        *eager(ShiftScheduleEntry.user)
     ).all()]
+    data['hours_summary'] = get_worker_hours_summary(schedule.id)
+    data['history'] = [h.to_dict() for h in schedule.history.options(
+        *eager(ApprovalHistory.performer)
+    ).order_by(db.text('performed_at desc')).all()]
     return jsonify(data)
 
 
+@api_owner_bp.route('/schedules/<int:schedule_id>/coverage', methods=['GET'])
+@require_role('owner')
+def get_schedule_coverage(schedule_id):
+    """承認画面用: 必要人数に対する割当の過不足（日 × 時間帯）。"""
+    user = get_current_user()
+    schedule = db.session.get(ShiftSchedule, schedule_id)
+    if not schedule or not schedule.period or schedule.period.organization_id != user.organization_id:
+        return error_response("Not found", 404, code="NOT_FOUND")
+    try:
+        resolution = int(request.args.get('resolution', 30))
+        return jsonify(get_period_coverage(
+            schedule.period.organization, schedule.period, schedule, resolution,
+        ))
+    except ValueError as e:
+        return error_response(str(e), 400, code="VALIDATION_ERROR")
+
+
 @api_owner_bp.route('/schedules/<int:schedule_id>/approve', methods=['POST'])
 @require_role('owner')
 @limiter.limit("10 per minute")
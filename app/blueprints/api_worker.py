@@ -11,7 +11,9 @@ from app.services.shift_service import (
     get_opening_hours_for_period, create_or_update_submission,
 )
 from app.services.auth_service import get_credentials_for_user, get_credentials_for_linked_account, CredentialsExpiredError
-from app.services.calendar_service import fetch_events, list_calendars, create_event, classify_calendar_error
+from app.services.calendar_service import (
+    fetch_events, fetch_events_incremental, list_calendars, create_event, classify_calendar_error,
+)
 from app.models.user import LinkedCalendarAccount
 
 api_worker_bp = Blueprint('api_worker', __name__, url_prefix='/api/worker')
@@ -127,7 +129,10 @@ def get_worker_calendar_events():
         return error_response("startDate and endDate are required", 400, code="VALIDATION_ERROR")
 
     try:
-        events = fetch_events(credentials, start_date, end_date, calendar_id)
+        if current_app.config.get('CALENDAR_INCREMENTAL_SYNC'):
+            events = fetch_events_incremental(user.id, credentials, start_date, end_date, calendar_id)
+        else:
+            events = fetch_events(credentials, start_date, end_date, calendar_id)
         return jsonify(events)
     except Exception as e:
         current_app.logger.error(f"Calendar event fetch error: {e}")
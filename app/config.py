@@ -44,6 +44,21 @@ class BaseConfig:
         # 公開URL基準（メール内リンク等で使用）。本番は Vercel env、未設定時は新ドメインへフォールバック
         self.BASE_URL = os.environ.get('BASE_URL', 'https://shifree.com')
 
+        # Worker calendar view: download only changed events via Google syncToken
+        self.CALENDAR_INCREMENTAL_SYNC = os.environ.get('CALENDAR_INCREMENTAL_SYNC', 'false').lower() == 'true'
+
+        # Async task runner: thread-pool width per cron run (1 = sequential)
+        self.TASK_RUNNER_CONCURRENCY = int(os.environ.get('TASK_RUNNER_CONCURRENCY', '1'))
+        # Wall-clock budget of one cron drain; keep below the function timeout (60s)
+        self.TASK_DRAIN_BUDGET_SECONDS = float(os.environ.get('TASK_DRAIN_BUDGET_SECONDS', '50'))
+        # Drain run after an async schedule confirm has responded (0 = leave it to cron)
+        self.TASK_DRAIN_AFTER_RESPONSE_SECONDS = float(os.environ.get('TASK_DRAIN_AFTER_RESPONSE_SECONDS', '40'))
+
+        # Process-local cache of the session user's role/membership checked by
+        # require_auth/require_role. 0 disables it; revocations made on another
+        # instance take effect within this many seconds
+        self.PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', '0'))
+
         # CORS: allowed origins (comma-separated)
         cors_origins = os.environ.get('CORS_ALLOWED_ORIGINS', '')
         self.CORS_ALLOWED_ORIGINS = [o.strip() for o in cors_origins.split(',') if o.strip()] if cors_origins else None
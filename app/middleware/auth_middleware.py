@@ -1,12 +1,179 @@
+import threading
+import time
+from collections import namedtuple
 from functools import wraps
-from flask import session, jsonify, current_app
+from flask import g, session, jsonify, current_app
+from sqlalchemy import and_
+from sqlalchemy.orm import make_transient_to_detached
 from app.extensions import db
 from app.models.user import User
 from app.utils.errors import error_response
 
 
+PrincipalClaims = namedtuple('PrincipalClaims', 'role organization_id is_active membership_active')
+
+_UNLOADED = object()
+
+
+class Principal:
+    """The signed-in user with their active membership and organization.
+
+    Resolved once per request by current_principal() and kept on ``flask.g``,
+    so the auth decorators, get_current_user() and the views share one
+    joined query instead of each looking the user up again.  When built from
+    the cross-request cache, membership and organization load on first use.
+    """
+
+    def __init__(self, user, membership=_UNLOADED, organization=_UNLOADED,
+                 *, membership_active=None):
+        self.user = user
+        self._membership = membership
+        self._membership_active = (membership is not None if membership is not _UNLOADED
+                                   else membership_active)
+        self._organization = organization
+        self._organization_id = (organization.id if organization else None) \
+            if organization is not _UNLOADED else _UNLOADED
+
+    @property
+    def membership(self):
+        """The user's active OrganizationMember, or None."""
+        if self._membership is _UNLOADED:
+            from app.models.membership import OrganizationMember
+            self._membership = OrganizationMember.query.filter_by(
+                user_id=self.user.id, is_active=True
+            ).order_by(OrganizationMember.id).first()
+        return self._membership
+
+    @property
+    def organization(self):
+        """The user's organization (follows user.organization_id if a view changes it)."""
+        org_id = self.user.organization_id
+        if org_id != self._organization_id:
+            from app.models.organization import Organization
+            self._organization = db.session.get(Organization, org_id) if org_id else None
+            self._organization_id = org_id
+        return self._organization
+
+    @property
+    def claims(self):
+        """What require_auth/require_role check, without touching the DB again."""
+        return PrincipalClaims(
+            role=self.user.role,
+            organization_id=self.user.organization_id,
+            is_active=self.user.is_active,
+            membership_active=self._membership_active,
+        )
+
+
+def _load_principal(user_id):
+    """User + active membership + organization in one query, or None."""
+    from app.models.membership import OrganizationMember
+    from app.models.organization import Organization
+    row = db.session.query(User, OrganizationMember, Organization).outerjoin(
+        OrganizationMember,
+        and_(OrganizationMember.user_id == User.id, OrganizationMember.is_active == True),
+    ).outerjoin(
+        Organization, Organization.id == User.organization_id
+    ).filter(User.id == user_id).order_by(OrganizationMember.id).first()
+    return Principal(*row) if row else None
+
+
+def current_principal():
+    """The request's Principal, resolved on first use; None when signed out.
+
+    The cache is keyed on the session's user_id, so logging in or out within
+    a request resolves again.  It is dropped at request teardown.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return None
+    cached = g.get('principal')
+    if cached is None or cached[0] != user_id:
+        cached = (user_id, _resolve_principal(user_id))
+        g.principal = cached
+    return cached[1]
+
+
+def clear_principal():
+    """Forget the request's Principal (called at request teardown)."""
+    g.pop('principal', None)
+
+
+# ---------------------------------------------------------------------------
+# Cross-request cache (PRINCIPAL_CACHE_TTL_SECONDS)
+#
+# Keeps, per user, the claims the decorators check plus a snapshot of the
+# User columns, so a request by a recently seen user needs no identity query
+# at all.  Entries carry the version stamp current when they were read;
+# invalidate_principal_cache() bumps it after role / membership changes.
+# ---------------------------------------------------------------------------
+
+_clock = time.monotonic
+_cache_lock = threading.Lock()
+_principal_cache = {}     # user_id -> (expires_at, version, claims, user columns)
+_principal_versions = {}  # user_id -> version stamp
+_cache_epoch = 0          # bumped by invalidate_principal_cache() without ids
+_MAX_CACHED_PRINCIPALS = 10000
+
+
+def _cache_version(user_id):
+    return (_cache_epoch, _principal_versions.get(user_id, 0))
+
+
+def invalidate_principal_cache(*user_ids):
+    """Bump the version stamp of *user_ids* (all users when called without ids).
+
+    Call after committing a change to a user's role, activity or membership.
+    Only this process's cache is affected; other instances pick the change
+    up when their entries expire.
+    """
+    global _cache_epoch
+    with _cache_lock:
+        if not user_ids:
+            _cache_epoch += 1
+            _principal_cache.clear()
+            return
+        for user_id in user_ids:
+            _principal_versions[user_id] = _principal_versions.get(user_id, 0) + 1
+            _principal_cache.pop(user_id, None)
+
+
+def _attach_user(columns):
+    """A persistent User built from cached column values, without a query."""
+    user = User(**columns)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def _resolve_principal(user_id):
+    ttl = current_app.config.get('PRINCIPAL_CACHE_TTL_SECONDS') or 0
+    if ttl <= 0:
+        return _load_principal(user_id)
+
+    with _cache_lock:
+        version = _cache_version(user_id)
+        entry = _principal_cache.get(user_id)
+    if entry and entry[0] > _clock() and entry[1] == version:
+        _, _, claims, columns = entry
+        return Principal(_attach_user(columns), membership_active=claims.membership_active)
+
+    principal = _load_principal(user_id)
+    if principal is not None:
+        columns = {attr.key: getattr(principal.user, attr.key)
+                   for attr in User.__mapper__.column_attrs}
+        with _cache_lock:
+            # version は読込前の値。読込中に invalidate された結果は次回読み直される
+            if len(_principal_cache) >= _MAX_CACHED_PRINCIPALS:
+                _principal_cache.clear()
+            _principal_cache[user_id] = (_clock() + ttl, version, principal.claims, columns)
+    return principal
+
+
 def _check_active_membership(user):
     """Return active OrganizationMember for user, or None."""
+    principal = current_principal()
+    if principal is not None and principal.user is user:
+        return principal.membership
     from app.models.membership import OrganizationMember
     return OrganizationMember.query.filter_by(
         user_id=user.id, is_active=True
@@ -20,10 +187,11 @@ def require_auth(f):
         user_id = session.get('user_id')
         if not user_id:
             return error_response("Authentication required", 401, code="AUTH_REQUIRED")
-        user = db.session.get(User, user_id)
-        if not user or not user.is_active:
+        principal = current_principal()
+        claims = principal.claims if principal else None
+        if not claims or not claims.is_active:
             return error_response("User not found or inactive", 401, code="AUTH_REQUIRED")
-        if not _check_active_membership(user):
+        if not claims.membership_active:
             return error_response(
                 "Organization membership required", 403,
                 code="ORG_MEMBERSHIP_REQUIRED",
@@ -40,12 +208,13 @@ def require_role(*roles):
             user_id = session.get('user_id')
             if not user_id:
                 return error_response("Authentication required", 401, code="AUTH_REQUIRED")
-            user = db.session.get(User, user_id)
-            if not user or not user.is_active:
+            principal = current_principal()
+            claims = principal.claims if principal else None
+            if not claims or not claims.is_active:
                 return error_response("User not found or inactive", 401, code="AUTH_REQUIRED")
-            if user.role not in roles:
+            if claims.role not in roles:
                 return error_response("Insufficient permissions", 403, code="FORBIDDEN")
-            if not _check_active_membership(user):
+            if not claims.membership_active:
                 return error_response(
                     "Organization membership required", 403,
                     code="ORG_MEMBERSHIP_REQUIRED",
@@ -57,7 +226,5 @@ def require_role(*roles):
 
 def get_current_user():
     """Get the current authenticated user from session."""
-    user_id = session.get('user_id')
-    if not user_id:
-        return None
-    return db.session.get(User, user_id)
+    principal = current_principal()
+    return principal.user if principal else None
@@ -29,7 +29,7 @@ logger = logging.getLogger(__name__)
 # Phase 1 (暫定): ハードコード定数。Phase 2 で env 注入、Phase 3 で alembic 自動取得。
 # 更新責任: migration の head が進んだら必ずこの値も更新する。
 # 値の確認: `flask db current` の出力末尾。
-EXPECTED_REVISION = 'd4310c2b47c0'
+EXPECTED_REVISION = 'a9b8c7d6e5f4'
 
 
 def _read_alembic_version():
@@ -1,4 +1,4 @@
-from app.models.user import User, UserToken
+from app.models.user import User, UserToken, CalendarSyncState
 from app.models.organization import Organization
 from app.models.opening_hours import OpeningHours, OpeningHoursException, OpeningHoursCalendarSync, SyncOperationLog
 from app.models.shift import (
@@ -24,6 +24,10 @@ class AsyncTask(db.Model):
     max_retries = db.Column(db.Integer, nullable=False, default=3)
     next_run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    # Lease: a claimed (running) task whose lease has expired is presumed
+    # abandoned (e.g. function timeout) and is returned to the queue.
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+
     # Tracking
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     started_at = db.Column(db.DateTime)
@@ -34,6 +38,10 @@ class AsyncTask(db.Model):
     organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id'), nullable=True)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
 
+    __table_args__ = (
+        db.Index('ix_async_tasks_status_lease', 'status', 'lease_expires_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -46,17 +54,22 @@ class AsyncTask(db.Model):
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
             'error_message': self.error_message,
+            'lease_expires_at': self.lease_expires_at.isoformat() if self.lease_expires_at else None,
         }
 
-    def mark_running(self):
+    def mark_running(self, lease_seconds=None):
         self.status = 'running'
         self.started_at = datetime.utcnow()
+        if lease_seconds is not None:
+            self.lease_expires_at = self.started_at + timedelta(seconds=lease_seconds)
 
     def mark_completed(self):
         self.status = 'completed'
         self.completed_at = datetime.utcnow()
+        self.lease_expires_at = None
 
     def mark_failed(self, error_message):
+        self.lease_expires_at = None
         self.retry_count += 1
         self.error_message = str(error_message)[:2000]
         if self.retry_count >= self.max_retries:
@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.extensions import db
+from app.utils.time_utils import HHMMMinutes
 
 
 class OpeningHours(db.Model):
@@ -10,6 +11,8 @@ class OpeningHours(db.Model):
     day_of_week = db.Column(db.Integer, nullable=False)  # 0=Sunday, 6=Saturday
     start_time = db.Column(db.String(5), nullable=False)  # HH:MM
     end_time = db.Column(db.String(5), nullable=False)    # HH:MM
+    start_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('start_time'), persisted=True))  # HH:MM → 分 (DB 生成列)
+    end_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('end_time'), persisted=True))      # HH:MM → 分 (DB 生成列)
     is_closed = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -52,6 +55,8 @@ class OpeningHoursException(db.Model):
     exception_date = db.Column(db.Date, nullable=False)
     start_time = db.Column(db.String(5), nullable=True)   # HH:MM, null if closed
     end_time = db.Column(db.String(5), nullable=True)     # HH:MM, null if closed
+    start_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('start_time'), persisted=True))  # HH:MM → 分 (DB 生成列)
+    end_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('end_time'), persisted=True))      # HH:MM → 分 (DB 生成列)
     is_closed = db.Column(db.Boolean, default=False, nullable=False)
     reason = db.Column(db.String(255))
     source = db.Column(db.String(20), default='manual')  # 'manual' or 'calendar'
@@ -86,6 +91,8 @@ class OpeningHoursCalendarSync(db.Model):
     calendar_event_id = db.Column(db.String(255), nullable=False)
     start_time = db.Column(db.String(5), nullable=False)  # HH:MM
     end_time = db.Column(db.String(5), nullable=False)     # HH:MM
+    start_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('start_time'), persisted=True))  # HH:MM → 分 (DB 生成列)
+    end_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('end_time'), persisted=True))      # HH:MM → 分 (DB 生成列)
     synced_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     __table_args__ = (
@@ -25,20 +25,33 @@ class Organization(db.Model):
     shift_periods = db.relationship('ShiftPeriod', backref='organization', lazy='dynamic',
                                     cascade='all, delete-orphan')
 
+    # (settings_json の文字列, パース済み dict)。settings_json が差し替わると作り直す
+    _settings_cache = None
+
+    @property
+    def settings(self):
+        """Parsed settings_json, cached until settings_json changes. Treat as read-only."""
+        raw = self.settings_json
+        cached = self._settings_cache
+        if cached is None or cached[0] is not raw:
+            try:
+                parsed = json.loads(raw or '{}')
+            except (json.JSONDecodeError, TypeError):
+                parsed = {}
+            if not isinstance(parsed, dict):
+                parsed = {}
+            cached = (raw, parsed)
+            self._settings_cache = cached
+        return cached[1]
+
     def get_setting(self, key, default=None):
-        try:
-            settings = json.loads(self.settings_json or '{}')
-            return settings.get(key, default)
-        except (json.JSONDecodeError, TypeError):
-            return default
+        return self.settings.get(key, default)
 
     def set_setting(self, key, value):
-        try:
-            settings = json.loads(self.settings_json or '{}')
-        except (json.JSONDecodeError, TypeError):
-            settings = {}
+        settings = dict(self.settings)
         settings[key] = value
         self.settings_json = json.dumps(settings)
+        self._settings_cache = (self.settings_json, settings)
 
     def __repr__(self):
         return f'<Organization {self.name}>'
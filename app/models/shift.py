@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.extensions import db
+from app.utils.time_utils import HHMMMinutes
 
 
 class ShiftPeriod(db.Model):
@@ -89,6 +90,8 @@ class ShiftSubmissionSlot(db.Model):
     is_available = db.Column(db.Boolean, nullable=False, default=False)
     start_time = db.Column(db.String(5), nullable=True)  # HH:MM
     end_time = db.Column(db.String(5), nullable=True)    # HH:MM
+    start_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('start_time'), persisted=True))  # HH:MM → 分 (DB 生成列)
+    end_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('end_time'), persisted=True))      # HH:MM → 分 (DB 生成列)
     is_custom_time = db.Column(db.Boolean, default=False)
     auto_calculated_start = db.Column(db.String(5), nullable=True)
     auto_calculated_end = db.Column(db.String(5), nullable=True)
@@ -161,6 +164,8 @@ class ShiftScheduleEntry(db.Model):
     shift_date = db.Column(db.Date, nullable=False)
     start_time = db.Column(db.String(5), nullable=False)  # HH:MM
     end_time = db.Column(db.String(5), nullable=False)    # HH:MM
+    start_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('start_time'), persisted=True))  # HH:MM → 分 (DB 生成列)
+    end_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('end_time'), persisted=True))      # HH:MM → 分 (DB 生成列)
     calendar_event_id = db.Column(db.String(255), nullable=True)
     synced_at = db.Column(db.DateTime, nullable=True)
     sync_error = db.Column(db.String(50), nullable=True)
@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.extensions import db
+from app.utils.time_utils import HHMMMinutes
 
 
 class StaffingRequirement(db.Model):
@@ -17,6 +18,8 @@ class StaffingRequirement(db.Model):
     day_of_week = db.Column(db.Integer, nullable=False)  # 0=Sunday, 6=Saturday (OpeningHours と同じ規則)
     start_time = db.Column(db.String(5), nullable=False)  # HH:MM
     end_time = db.Column(db.String(5), nullable=False)    # HH:MM
+    start_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('start_time'), persisted=True))  # HH:MM → 分 (DB 生成列)
+    end_minutes = db.Column(db.Integer, db.Computed(HHMMMinutes('end_time'), persisted=True))      # HH:MM → 分 (DB 生成列)
     required_count = db.Column(db.Integer, nullable=False, default=1)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
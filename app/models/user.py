@@ -67,3 +67,30 @@ class UserToken(db.Model):
 
     def __repr__(self):
         return f'<UserToken user_id={self.user_id}>'
+
+
+class CalendarSyncState(db.Model):
+    """Incremental-sync snapshot of one Google Calendar for one user.
+
+    Holds the events fetched by the last full listing of [time_min, time_max]
+    together with Google's nextSyncToken, so later reads only download the
+    events that changed since then.
+    """
+    __tablename__ = 'calendar_sync_states'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    calendar_id = db.Column(db.String(255), nullable=False)
+    sync_token = db.Column(db.Text, nullable=True)
+    time_min = db.Column(db.DateTime, nullable=False)  # JST naive, inclusive
+    time_max = db.Column(db.DateTime, nullable=False)  # JST naive, exclusive
+    events = db.Column(db.JSON, nullable=False, default=dict)  # event id -> formatted event
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'calendar_id', name='uq_calendar_sync_state_user_cal'),
+    )
+
+    def __repr__(self):
+        return f'<CalendarSyncState user_id={self.user_id} calendar={self.calendar_id}>'
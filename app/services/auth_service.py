@@ -7,10 +7,10 @@ from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 from google.auth.transport.requests import Request
 from google.auth.exceptions import RefreshError
-from googleapiclient.discovery import build
 
 from app.extensions import db
 from app.models.user import User, UserToken
+from app.services.google_client import build_service
 
 auth_svc_logger = logging.getLogger('auth')
 
@@ -66,7 +66,7 @@ def extract_user_info(credentials):
 
     # Fallback: use userinfo API
     try:
-        service = build('oauth2', 'v2', credentials=credentials)
+        service = build_service('oauth2', 'v2', credentials)
         user_info = service.userinfo().get().execute()
         current_app.logger.debug(f"userinfo API: id={user_info.get('id')}")
         return user_info.get('id'), user_info.get('email'), user_info.get('name')
@@ -180,6 +180,8 @@ def upsert_user(google_id, email, display_name, invitation_token=None, invite_co
     except Exception:
         db.session.rollback()
         raise
+    from app.middleware.auth_middleware import invalidate_principal_cache
+    invalidate_principal_cache(user.id)
     return user
 
 
@@ -0,0 +1,423 @@
+"""Auto-scheduler: build a draft ShiftSchedule from submitted availability.
+
+入力:
+- ShiftSubmissionSlot (is_available) — ワーカーごと・日ごとの勤務可能時間
+- StaffingRequirement — 曜日 × 時間帯ごとの必要人数。未設定の曜日は営業時間中 1 名
+- OrganizationMember.level_key / min_attendance_* と組織設定（レベル・重複チェック・最低出勤）
+
+モデル:
+1 日を 15 分のセル (96 個) に分け、日ごとに「あと何人必要か」の整数配列を持つ。
+候補シフトはワーカー × 日付ごとに 1 つで、提出された勤務可能時間を需要のある
+範囲に切り詰めたもの。候補を採用すると、その区間のセルの不足数が 1 ずつ減る。
+
+評価（辞書式。前の項目ほど優先）:
+1. 充足セル数 — 不足しているセルをいくつ埋めるか
+2. 最低出勤の未達解消 — 週あたり回数 / 時間の不足をどれだけ減らすか
+3. 同レベル重複 — overlap_check 有効時、同じ level_key と重なるセル数（少ないほど良い）
+4. 公平性 — 期間内の割当時間の二乗和の増分（少ないほど良い＝偏りを避ける）
+
+探索:
+1. 貪欲法: 候補の少ない日から順に、評価が最大の候補を不足がなくなるまで採用する
+2. 局所探索: 採用済みシフトを 1 つ外し、同じ日の別候補と比べて評価が厳密に良ければ
+   入れ替える。何も埋めていないシフトは外す。改善がなくなるか時間上限で終了
+
+DB に依存しない solve() と、期間から問題を組み立てる build_problem() に分かれている。
+"""
+
+import logging
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from app.extensions import db
+from app.models.membership import OrganizationMember
+from app.models.shift import ShiftSubmission, ShiftSubmissionSlot
+from app.models.staffing import StaffingRequirement
+from app.models.user import User
+from app.services import organization_settings as org_settings
+from app.services.shift_service import get_opening_hours_for_period, save_schedule, _to_schema_dow
+from app.utils.time_utils import time_to_minutes, minutes_to_time_str
+
+logger = logging.getLogger(__name__)
+
+CELL_MINUTES = 15
+CELLS_PER_DAY = 24 * 60 // CELL_MINUTES
+
+# 局所探索の打ち切り条件
+MAX_IMPROVEMENT_PASSES = 20
+IMPROVEMENT_TIME_LIMIT = 0.5  # seconds
+
+# Candidate: 1 ワーカーの 1 日分のシフト案。start / end は分、first_cell / last_cell は
+# 覆うセルの範囲 [first_cell, last_cell)。day は Problem.days の添字
+Candidate = namedtuple('Candidate', 'worker day start end first_cell last_cell')
+
+# WorkerRules: 週ごとの最低出勤（回数・分。0 なら条件なし）とレベル
+WorkerRules = namedtuple('WorkerRules', 'level_key min_count_per_week min_minutes_per_week')
+
+NO_RULES = WorkerRules(level_key=None, min_count_per_week=0, min_minutes_per_week=0)
+
+
+class Problem:
+    """Inputs of solve(), independent of the database.
+
+    days:       list of dates in the period
+    demand:     per day, a list of CELLS_PER_DAY required head counts
+    candidates: at most one Candidate per (worker, day)
+    rules:      worker id -> WorkerRules (workers without rules get NO_RULES)
+    overlap_same_tier: penalize assigning two workers of the same level at once
+    """
+
+    def __init__(self, days, demand, candidates, rules=None, overlap_same_tier=False):
+        self.days = days
+        self.demand = demand
+        self.candidates = candidates
+        self.rules = rules or {}
+        self.overlap_same_tier = overlap_same_tier
+
+
+def make_candidate(worker, day, start, end, demand_row):
+    """Clip the window [start, end) minutes to the cells with demand, or None.
+
+    The shift keeps the submitted boundaries where they fall inside a cell
+    with demand and otherwise starts / ends on the first / last such cell.
+    """
+    if end <= start:
+        return None
+    first = start // CELL_MINUTES
+    last = -(-end // CELL_MINUTES)
+    while first < last and demand_row[first] <= 0:
+        first += 1
+    while last > first and demand_row[last - 1] <= 0:
+        last -= 1
+    if first >= last:
+        return None
+    return Candidate(
+        worker=worker, day=day,
+        start=max(start, first * CELL_MINUTES), end=min(end, last * CELL_MINUTES),
+        first_cell=first, last_cell=last,
+    )
+
+
+class _State:
+    """Mutable assignment state with incremental scoring."""
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.need = [list(row) for row in problem.demand]
+        self.week_of = [day - timedelta(days=day.weekday()) for day in problem.days]
+        self.week_days = {}
+        for week in self.week_of:
+            self.week_days[week] = self.week_days.get(week, 0) + 1
+        self.assigned = {}       # (worker, day) -> Candidate
+        self.minutes = {}        # worker -> assigned minutes in the period
+        self.week_count = {}     # (worker, week) -> shifts
+        self.week_minutes = {}   # (worker, week) -> minutes
+        self.tier_cover = {}     # (day, level_key) -> per-cell head count
+
+    def _rules(self, worker):
+        return self.problem.rules.get(worker, NO_RULES)
+
+    def week_minimum(self, rules, week):
+        """(count, minutes) required in *week*, prorated when the period cuts the week."""
+        days = self.week_days[week]
+        if days >= 7:
+            return rules.min_count_per_week, rules.min_minutes_per_week
+        return (round(rules.min_count_per_week * days / 7),
+                rules.min_minutes_per_week * days // 7)
+
+    def key(self, cand):
+        """Lexicographic score of adding *cand* to the current state."""
+        need = self.need[cand.day][cand.first_cell:cand.last_cell]
+        covered = len(need) - sum(1 for n in need if n <= 0)
+
+        rules = self._rules(cand.worker)
+        attendance = 0
+        if rules.min_count_per_week or rules.min_minutes_per_week:
+            week = self.week_of[cand.day]
+            min_count, min_minutes = self.week_minimum(rules, week)
+            week = (cand.worker, week)
+            if self.week_count.get(week, 0) < min_count:
+                # 回数 1 回の不足解消を 1 時間分の不足解消と同じ重みで扱う
+                attendance += 60
+            missing = min_minutes - self.week_minutes.get(week, 0)
+            if missing > 0:
+                attendance += min(missing, cand.end - cand.start)
+
+        overlap = 0
+        if self.problem.overlap_same_tier and rules.level_key:
+            tier = self.tier_cover.get((cand.day, rules.level_key))
+            if tier:
+                overlap = sum(1 for n in tier[cand.first_cell:cand.last_cell] if n)
+
+        length = cand.end - cand.start
+        fairness = length * (2 * self.minutes.get(cand.worker, 0) + length)
+        return (covered, attendance, -overlap, -fairness)
+
+    def apply(self, cand, sign):
+        """Add (sign=1) or remove (sign=-1) *cand*."""
+        row = self.need[cand.day]
+        for i in range(cand.first_cell, cand.last_cell):
+            row[i] -= sign
+        length = (cand.end - cand.start) * sign
+        week = (cand.worker, self.week_of[cand.day])
+        self.minutes[cand.worker] = self.minutes.get(cand.worker, 0) + length
+        self.week_count[week] = self.week_count.get(week, 0) + sign
+        self.week_minutes[week] = self.week_minutes.get(week, 0) + length
+
+        level_key = self._rules(cand.worker).level_key
+        if self.problem.overlap_same_tier and level_key:
+            tier = self.tier_cover.setdefault((cand.day, level_key), [0] * CELLS_PER_DAY)
+            for i in range(cand.first_cell, cand.last_cell):
+                tier[i] += sign
+
+        if sign > 0:
+            self.assigned[(cand.worker, cand.day)] = cand
+        else:
+            del self.assigned[(cand.worker, cand.day)]
+
+
+def _greedy(state, by_day):
+    # 需要に対して候補が少ない日ほど選択肢がないので先に埋める
+    def scarcity(day):
+        demand = sum(n for n in state.problem.demand[day] if n > 0)
+        return len(by_day[day]) / demand if demand else float('inf')
+
+    for day in sorted(by_day, key=scarcity):
+        remaining = list(by_day[day])
+        while remaining:
+            best = max(remaining, key=lambda c: (state.key(c), -c.worker))
+            if state.key(best)[0] <= 0:
+                break
+            state.apply(best, 1)
+            remaining.remove(best)
+
+
+def _improve(state, by_day, deadline):
+    passes = 0
+    improved = True
+    while improved and passes < MAX_IMPROVEMENT_PASSES and time.perf_counter() < deadline:
+        improved = False
+        passes += 1
+        for current in sorted(state.assigned.values(), key=lambda c: (c.day, c.worker)):
+            state.apply(current, -1)
+            current_key = state.key(current)
+            if current_key[0] <= 0 and current_key[1] <= 0:
+                # 何も埋めておらず最低出勤にも寄与しない → 外したままにする
+                improved = True
+                continue
+            best, best_key = current, current_key
+            for alt in by_day[current.day]:
+                if (alt.worker, alt.day) in state.assigned or alt is current:
+                    continue
+                alt_key = state.key(alt)
+                if alt_key > best_key:
+                    best, best_key = alt, alt_key
+            state.apply(best, 1)
+            if best is not current:
+                improved = True
+        if time.perf_counter() >= deadline:
+            break
+    return passes
+
+
+def solve(problem, time_limit=IMPROVEMENT_TIME_LIMIT):
+    """Choose shifts for *problem*; returns (assignments, metrics).
+
+    assignments is a list of Candidate sorted by day and worker.  The
+    greedy pass always runs to completion; *time_limit* bounds only the
+    local search.
+    """
+    started = time.perf_counter()
+    by_day = {}
+    for cand in problem.candidates:
+        by_day.setdefault(cand.day, []).append(cand)
+
+    state = _State(problem)
+    _greedy(state, by_day)
+    passes = _improve(state, by_day, time.perf_counter() + time_limit)
+
+    assignments = sorted(state.assigned.values(), key=lambda c: (c.day, c.worker))
+    metrics = _metrics(state, assignments)
+    metrics['improvement_passes'] = passes
+    metrics['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return assignments, metrics
+
+
+def _metrics(state, assignments):
+    problem = state.problem
+    required = covered = 0
+    for demand_row, need_row in zip(problem.demand, state.need):
+        for demand, need in zip(demand_row, need_row):
+            if demand > 0:
+                required += demand
+                covered += demand - max(need, 0)
+
+    shortfall_workers = set()
+    for worker, rules in problem.rules.items():
+        if not (rules.min_count_per_week or rules.min_minutes_per_week):
+            continue
+        for week in state.week_days:
+            min_count, min_minutes = state.week_minimum(rules, week)
+            if (state.week_count.get((worker, week), 0) < min_count
+                    or state.week_minutes.get((worker, week), 0) < min_minutes):
+                shortfall_workers.add(worker)
+
+    overlap_cells = 0
+    for tier in state.tier_cover.values():
+        overlap_cells += sum(n - 1 for n in tier if n > 1)
+
+    hours = [m / 60 for m in state.minutes.values() if m > 0]
+    mean = sum(hours) / len(hours) if hours else 0
+    return {
+        'assigned_shifts': len(assignments),
+        'required_hours': round(required * CELL_MINUTES / 60, 2),
+        'covered_hours': round(covered * CELL_MINUTES / 60, 2),
+        'coverage_rate': round(covered / required, 4) if required else None,
+        'workers_assigned': len(hours),
+        'hours_stddev': round((sum((h - mean) ** 2 for h in hours) / len(hours)) ** 0.5, 2) if hours else 0,
+        'min_attendance_shortfall_workers': sorted(shortfall_workers),
+        'same_tier_overlap_hours': round(overlap_cells * CELL_MINUTES / 60, 2),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Loading a period
+# ---------------------------------------------------------------------------
+
+def _demand_rows(org, days, hours_by_date):
+    requirements = {}
+    for r in StaffingRequirement.query.filter_by(organization_id=org.id).all():
+        requirements.setdefault(r.day_of_week, []).append(r)
+    # 営業時間が 1 日も設定されていない組織では「休業日」を判定できないので無視する
+    closures_known = any(h is not None for h in hours_by_date.values())
+
+    rows = []
+    for day in days:
+        row = [0] * CELLS_PER_DAY
+        hours = hours_by_date.get(day.isoformat())
+        bands = requirements.get(_to_schema_dow(day))
+        if hours is None and closures_known:
+            pass
+        elif bands:
+            for band in bands:
+                first = band.start_minutes // CELL_MINUTES
+                last = -(-band.end_minutes // CELL_MINUTES)
+                for i in range(first, last):
+                    row[i] = max(row[i], band.required_count)
+        elif hours is not None:
+            first = time_to_minutes(hours['start_time']) // CELL_MINUTES
+            last = -(-time_to_minutes(hours['end_time']) // CELL_MINUTES)
+            for i in range(first, last):
+                row[i] = 1
+        rows.append(row)
+    return rows
+
+
+def _worker_rules(org, user_ids):
+    settings = org_settings.settings_for(org)
+    min_attendance = settings.min_attendance
+    level_enabled = settings.level_system['enabled']
+    mode = min_attendance['mode']
+    unit = min_attendance['unit']
+
+    rules = {}
+    members = OrganizationMember.query.filter(
+        OrganizationMember.organization_id == org.id,
+        OrganizationMember.is_active.is_(True),
+        OrganizationMember.user_id.in_(user_ids),
+    ).all() if user_ids else []
+    for m in members:
+        count = hours = None
+        if mode == 'org_wide':
+            count = min_attendance['org_wide_count_per_week']
+            hours = min_attendance['org_wide_hours_per_week']
+        elif mode == 'per_member':
+            # 個別値が null のときは組織共通の値を継承する
+            count = m.min_attendance_count_per_week
+            if count is None:
+                count = min_attendance['org_wide_count_per_week']
+            hours = m.min_attendance_hours_per_week
+            if hours is None:
+                hours = min_attendance['org_wide_hours_per_week']
+        rules[m.user_id] = WorkerRules(
+            level_key=m.level_key if level_enabled else None,
+            min_count_per_week=int(count or 0) if unit in ('count', 'both') else 0,
+            min_minutes_per_week=int(round((hours or 0) * 60)) if unit in ('hours', 'both') else 0,
+        )
+    overlap_same_tier = level_enabled and settings.overlap_check['enabled']
+    return rules, overlap_same_tier
+
+
+def build_problem(period, org):
+    """Read a period's submissions, demand and member settings into a Problem."""
+    days = [period.start_date + timedelta(days=i)
+            for i in range((period.end_date - period.start_date).days + 1)]
+    day_index = {day: i for i, day in enumerate(days)}
+    hours_by_date = get_opening_hours_for_period(org.id, period.start_date, period.end_date)
+    demand = _demand_rows(org, days, hours_by_date)
+
+    # save_schedule() が受け付けるワーカーだけを対象にする
+    slots = db.session.query(
+        ShiftSubmission.user_id, ShiftSubmissionSlot.slot_date,
+        ShiftSubmissionSlot.start_minutes, ShiftSubmissionSlot.end_minutes,
+    ).join(
+        ShiftSubmissionSlot, ShiftSubmissionSlot.submission_id == ShiftSubmission.id,
+    ).join(
+        User, User.id == ShiftSubmission.user_id,
+    ).filter(
+        ShiftSubmission.shift_period_id == period.id,
+        ShiftSubmission.status != 'draft',
+        ShiftSubmissionSlot.is_available.is_(True),
+        User.organization_id == org.id,
+        User.is_active.is_(True),
+        User.role == 'worker',
+    ).all()
+
+    candidates = []
+    seen = set()
+    for user_id, slot_date, start, end in slots:
+        day = day_index.get(slot_date)
+        if day is None or (user_id, day) in seen:
+            continue
+        if start is None or end is None:
+            hours = hours_by_date.get(slot_date.isoformat())
+            if hours is None:
+                continue
+            start, end = time_to_minutes(hours['start_time']), time_to_minutes(hours['end_time'])
+        cand = make_candidate(user_id, day, start, end, demand[day])
+        if cand:
+            candidates.append(cand)
+            seen.add((user_id, day))
+
+    rules, overlap_same_tier = _worker_rules(org, sorted({c.worker for c in candidates}))
+    return Problem(days, demand, candidates, rules, overlap_same_tier)
+
+
+def propose_schedule(period, org, time_limit=IMPROVEMENT_TIME_LIMIT):
+    """Solve a period; returns {'entries': [...], 'metrics': {...}} without saving."""
+    problem = build_problem(period, org)
+    assignments, metrics = solve(problem, time_limit=time_limit)
+    entries = [{
+        'user_id': c.worker,
+        'shift_date': problem.days[c.day].isoformat(),
+        'start_time': minutes_to_time_str(c.start),
+        'end_time': minutes_to_time_str(c.end),
+    } for c in assignments]
+    logger.info(
+        "Auto schedule period=%s candidates=%d shifts=%d coverage=%s elapsed_ms=%s",
+        period.id, len(problem.candidates), len(entries),
+        metrics['coverage_rate'], metrics['elapsed_ms'],
+    )
+    return {'entries': entries, 'metrics': metrics}
+
+
+def generate_draft_schedule(period, org, created_by):
+    """Solve a period and store the result as its draft schedule.
+
+    Replaces the entries of an existing draft.  Raises ValueError (from
+    save_schedule) when the period already has a submitted or confirmed
+    schedule.  Returns (schedule, metrics).
+    """
+    proposal = propose_schedule(period, org)
+    schedule = save_schedule(period.id, created_by, proposal['entries'], organization_id=org.id)
+    return schedule, proposal['metrics']
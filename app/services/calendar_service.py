@@ -1,11 +1,39 @@
 from datetime import datetime
-from googleapiclient.discovery import build
+from zoneinfo import ZoneInfo
+
 from googleapiclient.errors import HttpError
 
+from app.services.google_client import build_service
+
+JST = ZoneInfo("Asia/Tokyo")
+
+# events().list の 1 ページあたり最大件数（Google 側の上限は 2500、既定は 250）
+EVENTS_PAGE_SIZE = 250
+
+# Google Calendar API の batch エンドポイントは 1 リクエストあたり最大 50 件まで
+BATCH_MAX_REQUESTS = 50
+
+
+def _format_event(event):
+    start = event['start'].get('dateTime', event['start'].get('date'))
+    end = event['end'].get('dateTime', event['end'].get('date'))
+    return {
+        'id': event['id'],
+        'summary': event.get('summary', 'No Title'),
+        'start': start,
+        'end': end,
+        'location': event.get('location'),
+        'description': event.get('description'),
+    }
 
-def fetch_events(credentials, start_date, end_date, calendar_id='primary', query=None):
-    """Fetch Google Calendar events within a date range."""
-    service = build('calendar', 'v3', credentials=credentials)
+
+def iter_event_pages(credentials, start_date, end_date, calendar_id='primary', query=None):
+    """Yield Google Calendar events within a date range one page at a time.
+
+    Follows nextPageToken until the listing is exhausted, so busy calendars
+    are not truncated at a single page.
+    """
+    service = build_service('calendar', 'v3', credentials)
 
     # Use JST timezone to ensure correct date boundaries for Japan-based users
     start_time = datetime.fromisoformat(start_date).isoformat() + '+09:00'
@@ -17,32 +45,144 @@ def fetch_events(credentials, start_date, end_date, calendar_id='primary', query
         timeMax=end_time,
         singleEvents=True,
         orderBy='startTime',
+        maxResults=EVENTS_PAGE_SIZE,
     )
     if query:
         params['q'] = query
 
-    events_result = service.events().list(**params).execute()
-
-    events = events_result.get('items', [])
-    event_list = []
-    for event in events:
-        start = event['start'].get('dateTime', event['start'].get('date'))
-        end = event['end'].get('dateTime', event['end'].get('date'))
-        event_list.append({
-            'id': event['id'],
-            'summary': event.get('summary', 'No Title'),
-            'start': start,
-            'end': end,
-            'location': event.get('location'),
-            'description': event.get('description'),
-        })
+    while True:
+        events_result = service.events().list(**params).execute()
+        yield [_format_event(event) for event in events_result.get('items', [])]
+
+        page_token = events_result.get('nextPageToken')
+        if not page_token:
+            return
+        params['pageToken'] = page_token
+
+
+def fetch_events(credentials, start_date, end_date, calendar_id='primary', query=None):
+    """Fetch all Google Calendar events within a date range."""
+    return [
+        event
+        for page in iter_event_pages(credentials, start_date, end_date, calendar_id, query)
+        for event in page
+    ]
+
+
+def _list_event_changes(service, calendar_id, *, sync_token=None, time_min=None, time_max=None):
+    """List raw events for a full (time-bounded) or incremental (sync token) sync.
+
+    Returns ``(items, next_sync_token)``.  Incremental listings include
+    cancelled events so deletions can be applied to a stored snapshot.
+    """
+    params = dict(calendarId=calendar_id, singleEvents=True, maxResults=EVENTS_PAGE_SIZE)
+    if sync_token:
+        params['syncToken'] = sync_token
+    else:
+        params['timeMin'] = time_min.isoformat() + '+09:00'
+        params['timeMax'] = time_max.isoformat() + '+09:00'
+
+    items = []
+    while True:
+        result = service.events().list(**params).execute()
+        items.extend(result.get('items', []))
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            return items, result.get('nextSyncToken')
+        params['pageToken'] = page_token
+
+
+def _event_bounds(event):
+    """Return an event's (start, end) as naive JST datetimes."""
+    bounds = []
+    for value in (event['start'], event['end']):
+        if 'T' in value:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            if dt.tzinfo is not None:
+                dt = dt.astimezone(JST).replace(tzinfo=None)
+        else:
+            dt = datetime.fromisoformat(value)  # all-day: date only
+        bounds.append(dt)
+    return bounds[0], bounds[1]
+
+
+def _overlaps(event, time_min, time_max):
+    event_start, event_end = _event_bounds(event)
+    return event_end > time_min and event_start < time_max
+
+
+def fetch_events_incremental(user_id, credentials, start_date, end_date, calendar_id='primary'):
+    """Fetch events within a date range, downloading only what changed since the last call.
+
+    The first call for a user/calendar (or one whose window is not covered
+    by the stored snapshot) does a full listing and stores the events with
+    Google's nextSyncToken in CalendarSyncState.  Later calls send the token
+    and merge the changed and cancelled events into the snapshot; changes
+    outside the stored window are dropped so the snapshot does not grow
+    without bound.  An expired token (HTTP 410) falls back to a full listing.
+
+    Returns the same list shape as fetch_events, sorted by start.
+    """
+    from app.extensions import db
+    from app.models.user import CalendarSyncState
+
+    time_min = datetime.fromisoformat(start_date)
+    time_max = datetime.fromisoformat(end_date)
+    service = build_service('calendar', 'v3', credentials)
+
+    state = CalendarSyncState.query.filter_by(user_id=user_id, calendar_id=calendar_id).first()
+    covered = (
+        state is not None and state.sync_token
+        and state.time_min <= time_min and state.time_max >= time_max
+    )
 
-    return event_list
+    items = None
+    if covered:
+        try:
+            items, next_token = _list_event_changes(
+                service, calendar_id, sync_token=state.sync_token,
+            )
+            events = dict(state.events or {})
+        except HttpError as e:
+            if e.resp.status != 410:
+                raise
+            items = None  # sync token expired — fall back to a full listing
+
+    if items is None:
+        items, next_token = _list_event_changes(
+            service, calendar_id, time_min=time_min, time_max=time_max,
+        )
+        events = {}
+        if state is None:
+            state = CalendarSyncState(user_id=user_id, calendar_id=calendar_id)
+            db.session.add(state)
+        state.time_min = time_min
+        state.time_max = time_max
+
+    # The delta covers the whole calendar: keep only events in the stored window
+    for item in items:
+        event = _format_event(item) if item.get('status') != 'cancelled' else None
+        if event is not None and _overlaps(event, state.time_min, state.time_max):
+            events[item['id']] = event
+        else:
+            events.pop(item['id'], None)
+
+    state.events = events
+    state.sync_token = next_token
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    in_window = [event for event in events.values() if _overlaps(event, time_min, time_max)]
+    in_window.sort(key=lambda event: _event_bounds(event)[0])
+    return in_window
 
 
 def list_calendars(credentials):
     """List all calendars the user has access to."""
-    service = build('calendar', 'v3', credentials=credentials)
+    service = build_service('calendar', 'v3', credentials)
     result = service.calendarList().list().execute()
     calendars = []
     for cal in result.get('items', []):
@@ -58,10 +198,7 @@ def list_calendars(credentials):
     return calendars
 
 
-def create_event(credentials, calendar_id, summary, start_datetime, end_datetime, description=None):
-    """Create a Google Calendar event."""
-    service = build('calendar', 'v3', credentials=credentials)
-
+def _event_body(summary, start_datetime, end_datetime, description=None):
     event_body = {
         'summary': summary,
         'start': {'dateTime': start_datetime, 'timeZone': 'Asia/Tokyo'},
@@ -69,23 +206,23 @@ def create_event(credentials, calendar_id, summary, start_datetime, end_datetime
     }
     if description:
         event_body['description'] = description
+    return event_body
+
 
+def create_event(credentials, calendar_id, summary, start_datetime, end_datetime, description=None):
+    """Create a Google Calendar event."""
+    service = build_service('calendar', 'v3', credentials)
+
+    event_body = _event_body(summary, start_datetime, end_datetime, description)
     created = service.events().insert(calendarId=calendar_id, body=event_body).execute()
     return created.get('id')
 
 
 def update_event(credentials, calendar_id, event_id, summary, start_datetime, end_datetime, description=None):
     """Update an existing Google Calendar event."""
-    service = build('calendar', 'v3', credentials=credentials)
-
-    event_body = {
-        'summary': summary,
-        'start': {'dateTime': start_datetime, 'timeZone': 'Asia/Tokyo'},
-        'end': {'dateTime': end_datetime, 'timeZone': 'Asia/Tokyo'},
-    }
-    if description:
-        event_body['description'] = description
+    service = build_service('calendar', 'v3', credentials)
 
+    event_body = _event_body(summary, start_datetime, end_datetime, description)
     updated = service.events().update(
         calendarId=calendar_id, eventId=event_id, body=event_body
     ).execute()
@@ -94,10 +231,69 @@ def update_event(credentials, calendar_id, event_id, summary, start_datetime, en
 
 def delete_event(credentials, calendar_id, event_id):
     """Delete a Google Calendar event."""
-    service = build('calendar', 'v3', credentials=credentials)
+    service = build_service('calendar', 'v3', credentials)
     service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
 
 
+def batch_event_operations(credentials, calendar_id, operations):
+    """Run create / update / delete operations through the Calendar batch endpoint.
+
+    Each operation is a dict with a caller-chosen ``key``, an ``op`` of
+    'create', 'update' or 'delete', and the fields that op needs
+    (``event_id``, ``summary``, ``start_datetime``, ``end_datetime``,
+    ``description``).  Operations are sent BATCH_MAX_REQUESTS at a time, so
+    N operations cost ceil(N / 50) HTTP round trips.
+
+    Returns a dict mapping each key to ``(event_id, error)``.  ``error`` is
+    None on success; for deletes ``event_id`` echoes the deleted event.
+    """
+    results = {}
+    if not operations:
+        return results
+
+    service = build_service('calendar', 'v3', credentials)
+    events = service.events()
+
+    for offset in range(0, len(operations), BATCH_MAX_REQUESTS):
+        chunk = operations[offset:offset + BATCH_MAX_REQUESTS]
+        by_request_id = {str(i): op for i, op in enumerate(chunk)}
+
+        def _callback(request_id, response, exception, by_request_id=by_request_id):
+            op = by_request_id[request_id]
+            if exception is not None:
+                results[op['key']] = (None, exception)
+            elif op['op'] == 'delete':
+                results[op['key']] = (op['event_id'], None)
+            else:
+                results[op['key']] = ((response or {}).get('id'), None)
+
+        batch = service.new_batch_http_request(callback=_callback)
+        for request_id, op in by_request_id.items():
+            if op['op'] == 'delete':
+                request = events.delete(calendarId=calendar_id, eventId=op['event_id'])
+            else:
+                body = _event_body(
+                    op['summary'], op['start_datetime'], op['end_datetime'],
+                    op.get('description'),
+                )
+                if op['op'] == 'create':
+                    request = events.insert(calendarId=calendar_id, body=body)
+                else:
+                    request = events.update(
+                        calendarId=calendar_id, eventId=op['event_id'], body=body,
+                    )
+            batch.add(request, request_id=request_id)
+
+        try:
+            batch.execute()
+        except Exception as e:
+            # Transport-level failure: every operation without a response failed
+            for op in chunk:
+                results.setdefault(op['key'], (None, e))
+
+    return results
+
+
 def classify_calendar_error(e):
     """Google Calendar API エラーを分類コードに変換する。"""
     error_str = str(e)
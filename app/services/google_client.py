@@ -0,0 +1,101 @@
+"""Shared factory for Google API service objects.
+
+`googleapiclient.discovery.build()` re-parses the discovery document, opens a
+fresh HTTP transport, and every `service.events()` call re-generates all of
+the collection's methods (including their docstrings).  A confirm that writes
+hundreds of events paid that cost — plus a new TLS handshake — per event.
+
+Here the Resource tree is built once per process from the bundled static
+discovery document and shared read-only.  `build_service()` returns a thin
+proxy that stamps each outgoing request with a per-call AuthorizedHttp
+wrapping a pooled keep-alive transport (one per thread, since httplib2.Http
+is not thread-safe).  Call sites keep the usual
+``service.events().list(...).execute()`` shape.
+"""
+
+import threading
+from functools import lru_cache
+
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import Resource, build
+from googleapiclient.http import HttpRequest, build_http
+
+_local = threading.local()
+_lock = threading.Lock()
+_children = {}
+
+
+class _UnboundHttp:
+    """Transport of the shared Resources; requests must be bound before use."""
+
+    def request(self, *args, **kwargs):
+        raise RuntimeError('Google API request was not bound to credentials')
+
+
+@lru_cache(maxsize=None)
+def _shared_resource(service_name, version):
+    return build(service_name, version, http=_UnboundHttp(), static_discovery=True)
+
+
+def _child(resource, name):
+    """Nested collection (e.g. ``events()``) of a shared Resource, built once."""
+    key = (id(resource), name)
+    child = _children.get(key)
+    if child is None:
+        with _lock:
+            child = _children.get(key)
+            if child is None:
+                child = getattr(resource, name)()
+                _children[key] = child
+    return child
+
+
+def _pooled_http():
+    """Per-thread keep-alive transport reused across calls."""
+    http = getattr(_local, 'http', None)
+    if http is None:
+        http = build_http()
+        _local.http = http
+    return http
+
+
+class BoundService:
+    """A shared Resource whose requests are sent with one set of credentials."""
+
+    __slots__ = ('_resource', '_http')
+
+    def __init__(self, resource, http):
+        self._resource = resource
+        self._http = http
+
+    def __getattr__(self, name):
+        attr = getattr(self._resource, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            if not args and not kwargs and name in self._resource._resourceDesc.get('resources', {}):
+                return BoundService(_child(self._resource, name), self._http)
+            result = attr(*args, **kwargs)
+            if isinstance(result, HttpRequest):
+                result.http = self._http
+            elif isinstance(result, Resource):
+                return BoundService(result, self._http)
+            return result
+        return call
+
+
+def build_service(service_name, version, credentials):
+    """Return a Google API service bound to `credentials`.
+
+    Drop-in replacement for ``build(service_name, version, credentials=...)``.
+    """
+    return BoundService(
+        _shared_resource(service_name, version),
+        AuthorizedHttp(credentials, http=_pooled_http()),
+    )
+
+
+def reset_pool():
+    """Drop the current thread's pooled transport (e.g. after a fork)."""
+    _local.__dict__.pop('http', None)
@@ -0,0 +1,186 @@
+"""Pooled SMTP delivery.
+
+Opening ``smtplib.SMTP`` and doing STARTTLS + LOGIN for every message made
+draining 200 queued emails cost 200 TLS handshakes and authentications.
+SmtpPool keeps authenticated sessions and lends each one to a single
+sender at a time (smtplib is not thread-safe), so a pool never holds more
+sessions than it had concurrent senders, however many worker threads come
+and go.  It reconnects when the server drops a session and after
+MAX_MESSAGES_PER_SESSION messages (providers commonly cap messages per
+connection).
+
+The task runner opens a pool around each batch with ``pooled_delivery()``;
+outside of one, send_email() falls back to a one-shot session.
+"""
+
+import logging
+import os
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGES_PER_SESSION = 100
+
+# A session idle for longer than this is probed with NOOP before reuse
+IDLE_CHECK_SECONDS = 30
+
+# Errors after which the session is discarded and the message retried once
+_RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+_pool_lock = threading.Lock()
+_active_pool = None
+_pool_users = 0
+
+
+def smtp_settings():
+    """SMTP settings from the environment, or None when SMTP is not configured."""
+    host = os.environ.get('SMTP_HOST')
+    user = os.environ.get('SMTP_USER')
+    if not host or not user:
+        return None
+    return {
+        'host': host,
+        'port': int(os.environ.get('SMTP_PORT', 587)),
+        'user': user,
+        'password': os.environ.get('SMTP_PASS'),
+        'from_email': os.environ.get('SMTP_FROM', user),
+        'starttls': os.environ.get('SMTP_STARTTLS', 'true').lower() != 'false',
+    }
+
+
+class _Session:
+    """One authenticated SMTP connection."""
+
+    def __init__(self, settings, timeout):
+        self.smtp = smtplib.SMTP(settings['host'], settings['port'], timeout=timeout)
+        try:
+            if settings['starttls']:
+                self.smtp.starttls()
+            self.smtp.login(settings['user'], settings['password'])
+        except Exception:
+            self.close()
+            raise
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def alive(self):
+        if time.monotonic() - self.last_used < IDLE_CHECK_SECONDS:
+            return True
+        try:
+            return self.smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
+
+
+class SmtpPool:
+    """Reusable authenticated SMTP sessions, checked out by one sender at a time."""
+
+    def __init__(self, settings, *, max_messages=MAX_MESSAGES_PER_SESSION, timeout=30):
+        self.settings = settings
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self.connects = 0
+        self._sessions = []  # every open session
+        self._idle = []      # open sessions not lent to a sender
+        self._lock = threading.Lock()
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                break
+            if session.sent < self.max_messages and session.alive():
+                return session
+            self._discard(session)
+        session = _Session(self.settings, self.timeout)
+        with self._lock:
+            self._sessions.append(session)
+            self.connects += 1
+        return session
+
+    def _checkin(self, session):
+        with self._lock:
+            if session in self._sessions:
+                self._idle.append(session)
+
+    def _discard(self, session):
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        session.close()
+
+    def send(self, msg):
+        """Send an email.message.Message, reconnecting once if the session was dropped."""
+        for attempt in (1, 2):
+            session = self._checkout()
+            try:
+                session.smtp.send_message(msg)
+            except _RECONNECT_ERRORS:
+                self._discard(session)
+                if attempt == 2:
+                    raise
+                logger.info("SMTP session dropped; reconnecting")
+                continue
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code != 421:  # 421 = service closing the channel
+                    self._checkin(session)
+                    raise
+                self._discard(session)
+                if attempt == 2:
+                    raise
+                logger.info("SMTP server closed the session (421); reconnecting")
+                continue
+            except Exception:
+                self._checkin(session)
+                raise
+            session.sent += 1
+            session.last_used = time.monotonic()
+            self._checkin(session)
+            return
+
+    def close(self):
+        """Close every session opened through this pool."""
+        with self._lock:
+            sessions, self._sessions, self._idle = self._sessions, [], []
+        for session in sessions:
+            session.close()
+
+
+def current_pool():
+    """The pool opened by an enclosing pooled_delivery(), or None."""
+    return _active_pool
+
+
+@contextmanager
+def pooled_delivery():
+    """Share one SmtpPool across every send_email() in the block (all threads).
+
+    Nested / overlapping blocks reuse the same pool; it is closed when the
+    last one exits.  Yields None when SMTP is not configured.
+    """
+    global _active_pool, _pool_users
+    with _pool_lock:
+        if _active_pool is None:
+            settings = smtp_settings()
+            _active_pool = SmtpPool(settings) if settings else None
+        _pool_users += 1
+    try:
+        yield _active_pool
+    finally:
+        pool = None
+        with _pool_lock:
+            _pool_users -= 1
+            if _pool_users == 0:
+                pool, _active_pool = _active_pool, None
+        if pool is not None:
+            pool.close()
@@ -3,15 +3,22 @@
 Public functions (notify_*) enqueue tasks by default for background
 delivery.  The ``send_email`` function does synchronous SMTP and is
 called by the task runner when processing queued emails.
+
+Blasts to many recipients (period open, reminders, vacancy requests) go
+through ``fan_out()``: the template is rendered once and all AsyncTask rows
+are inserted with one statement and one commit.
 """
 
 import logging
-import smtplib
-import os
+import re
+import secrets
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 from flask import render_template
+from markupsafe import Markup, escape
+
+from app.services.mail_transport import SmtpPool, current_pool, smtp_settings
 
 logger = logging.getLogger(__name__)
 
@@ -28,28 +35,33 @@ def _sanitize_subject(subject):
 # ---------------------------------------------------------------------------
 
 def send_email(to_email, subject, body_html):
-    """Send an email notification synchronously. Returns True on success."""
-    smtp_host = os.environ.get('SMTP_HOST')
-    smtp_port = int(os.environ.get('SMTP_PORT', 587))
-    smtp_user = os.environ.get('SMTP_USER')
-    smtp_pass = os.environ.get('SMTP_PASS')
-    from_email = os.environ.get('SMTP_FROM', smtp_user)
-
-    if not smtp_host or not smtp_user:
+    """Send an email notification synchronously. Returns True on success.
+
+    Inside mail_transport.pooled_delivery() (the task runner wraps every
+    batch in one) the message goes over a shared authenticated session;
+    otherwise a one-shot connection is used.
+    """
+    pool = current_pool()
+    settings = pool.settings if pool else smtp_settings()
+    if not settings:
         logger.info("SMTP not configured. Skipping email to %s: %s", to_email, subject)
         return False
 
     try:
         msg = MIMEMultipart('alternative')
         msg['Subject'] = _sanitize_subject(subject)
-        msg['From'] = from_email
+        msg['From'] = settings['from_email']
         msg['To'] = to_email
         msg.attach(MIMEText(body_html, 'html'))
 
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_pass)
-            server.send_message(msg)
+        if pool:
+            pool.send(msg)
+        else:
+            one_shot = SmtpPool(settings)
+            try:
+                one_shot.send(msg)
+            finally:
+                one_shot.close()
 
         logger.info("Email sent to %s: %s", to_email, subject)
         return True
@@ -99,63 +111,46 @@ def notify_invitation_created(to_email, org_name, inviter_name, role, invite_url
                             organization_id=organization_id, created_by=created_by)
 
 
-def notify_period_open(to_email, worker_name, org_name, period_name,
-                       start_date, end_date, deadline_str, submit_url,
-                       announcement_text=None,
-                       *, organization_id=None, created_by=None):
-    """Notify a worker that a shift period has been opened for submission (async)."""
-    subject = f"[シフリー] シフト募集開始: {period_name}"
+def _announcement_html(announcement_text):
     # 改行を <br> に置換した Markup を渡す。一部メールクライアント
     # (Outlook 等) では CSS の white-space:pre-wrap が無視されるため、
     # HTML レベルで改行を表現する。escape を先に通すことで XSS 対策を維持。
-    announcement_html = None
-    if announcement_text:
-        from markupsafe import Markup, escape as _escape
-        announcement_html = Markup(str(_escape(announcement_text)).replace('\n', '<br>'))
-    body = render_template('emails/period_open.html',
-                           worker_name=worker_name, org_name=org_name,
-                           period_name=period_name,
-                           start_date=start_date, end_date=end_date,
-                           deadline_str=deadline_str, submit_url=submit_url,
-                           announcement_text=announcement_html)
-    return _enqueue_or_send(to_email, subject, body,
-                            organization_id=organization_id, created_by=created_by)
-
-
-def notify_submission_deadline(to_email, worker_name, period_name, deadline_str,
-                               submit_url, *, organization_id=None, created_by=None):
-    """Notify a worker that the submission deadline is approaching (async)."""
-    subject = f"[シフリー] 提出期限リマインド: {period_name}"
-    body = render_template('emails/submission_deadline.html',
-                           worker_name=worker_name, period_name=period_name,
-                           deadline_str=deadline_str, submit_url=submit_url)
-    return _enqueue_or_send(to_email, subject, body,
-                            organization_id=organization_id, created_by=created_by)
-
-
-def notify_preshift(to_email, worker_name, shift_date_str, start_time, end_time,
-                    *, organization_id=None, created_by=None):
-    """Notify a worker about an upcoming shift (async)."""
-    subject = f"[シフリー] シフトリマインド: {shift_date_str}"
-    body = render_template('emails/preshift.html',
-                           worker_name=worker_name, shift_date_str=shift_date_str,
-                           start_time=start_time, end_time=end_time)
-    return _enqueue_or_send(to_email, subject, body,
-                            organization_id=organization_id, created_by=created_by)
+    if not announcement_text:
+        return None
+    return Markup(str(escape(announcement_text)).replace('\n', '<br>'))
 
 
-def notify_vacancy_request(to_email, user_name, shift_date, start_time, end_time,
-                           reason, accept_url, decline_url,
-                           *, organization_id=None, created_by=None):
-    """Notify a candidate about a vacancy fill request (async)."""
-    subject = f"[シフリー] 欠員補充のお願い: {shift_date}"
-    body = render_template('emails/vacancy_request.html',
-                           user_name=user_name, shift_date=str(shift_date),
-                           start_time=start_time, end_time=end_time,
-                           reason=reason, accept_url=accept_url,
-                           decline_url=decline_url)
-    return _enqueue_or_send(to_email, subject, body,
-                            organization_id=organization_id, created_by=created_by)
+def notify_period_open_many(recipients, org_name, period_name,
+                            start_date, end_date, deadline_str, submit_url,
+                            announcement_text=None,
+                            *, organization_id=None, created_by=None):
+    """Notify workers that a shift period has been opened for submission (async, fan-out).
+
+    *recipients*: dicts with ``to_email`` and ``worker_name``.
+    """
+    return fan_out(
+        'emails/period_open.html', f"[シフリー] シフト募集開始: {period_name}", recipients,
+        context=dict(org_name=org_name, period_name=period_name,
+                     start_date=start_date, end_date=end_date,
+                     deadline_str=deadline_str, submit_url=submit_url,
+                     announcement_text=_announcement_html(announcement_text)),
+        organization_id=organization_id, created_by=created_by,
+    )
+
+
+def notify_vacancy_request_many(recipients, shift_date, start_time, end_time, reason,
+                                *, organization_id=None, created_by=None, commit=True):
+    """Notify candidates about a vacancy fill request (async, fan-out).
+
+    *recipients*: dicts with ``to_email``, ``user_name``, ``accept_url`` and
+    ``decline_url``.
+    """
+    return fan_out(
+        'emails/vacancy_request.html', f"[シフリー] 欠員補充のお願い: {shift_date}", recipients,
+        context=dict(shift_date=str(shift_date), start_time=start_time, end_time=end_time,
+                     reason=reason),
+        organization_id=organization_id, created_by=created_by, commit=commit,
+    )
 
 
 def notify_vacancy_accepted(admin_email, shift_date, start_time, end_time,
@@ -171,6 +166,75 @@ def notify_vacancy_accepted(admin_email, shift_date, start_time, end_time,
                             organization_id=organization_id, created_by=created_by)
 
 
+# ---------------------------------------------------------------------------
+# Fan-out — one template, many recipients
+# ---------------------------------------------------------------------------
+
+def _slot(token, name):
+    return f'@@{token}:{name}@@'
+
+
+def render_fan_out(template, subject, recipients, *, context=None):
+    """Render one email per recipient while rendering *template* only once.
+
+    *recipients* are dicts of ``to_email`` plus the template variables that
+    differ per recipient; variables shared by everyone go in *context*.
+    Per-recipient variables are rendered as placeholders and substituted
+    (HTML-escaped) afterwards, so templates may only print them, not branch
+    on them.  Placeholders carry a random per-render token and are replaced
+    in one pass over the rendered body, so a value that contains
+    placeholder-like text is never expanded.
+    *subject* is a string or a ``callable(recipient)``.
+    Returns ``{'to_email', 'subject', 'body_html'}`` dicts for enqueue_emails().
+    """
+    recipients = list(recipients)
+    if not recipients:
+        return []
+    fields = sorted({key for r in recipients for key in r} - {'to_email'})
+    token = secrets.token_hex(8)
+    body = render_template(template, **(context or {}), **{f: _slot(token, f) for f in fields})
+    placeholder = re.compile(rf'@@{token}:(\w+)@@')
+
+    messages = []
+    for recipient in recipients:
+        html = placeholder.sub(
+            lambda m, r=recipient: str(escape(r.get(m.group(1), ''))), body)
+        messages.append({
+            'to_email': recipient['to_email'],
+            'subject': subject(recipient) if callable(subject) else subject,
+            'body_html': html,
+        })
+    return messages
+
+
+def fan_out(template, subject, recipients, *, context=None,
+            organization_id=None, created_by=None, commit=True):
+    """Enqueue one email per recipient (see render_fan_out()).
+
+    All tasks are inserted with one statement.  With ``commit=False`` the
+    caller commits them together with its own rows (and handles errors);
+    otherwise a failed enqueue falls back to synchronous sends like
+    _enqueue_or_send().  Returns the number of recipients enqueued (or sent).
+    """
+    messages = render_fan_out(template, subject, recipients, context=context)
+    if not messages:
+        return 0
+
+    from app.extensions import db
+    from app.services.task_runner import enqueue_emails
+    if not commit:
+        return enqueue_emails(messages, organization_id=organization_id, created_by=created_by)
+    try:
+        enqueue_emails(messages, organization_id=organization_id, created_by=created_by)
+        db.session.commit()
+        return len(messages)
+    except Exception:
+        db.session.rollback()
+        logger.warning("Bulk enqueue of %d emails failed, falling back to sync send",
+                       len(messages), exc_info=True)
+        return sum(1 for m in messages if send_email(m['to_email'], m['subject'], m['body_html']))
+
+
 # ---------------------------------------------------------------------------
 # Internal — enqueue with sync fallback
 # ---------------------------------------------------------------------------
@@ -1,22 +1,25 @@
+import time
 from datetime import datetime, date, timedelta
 from zoneinfo import ZoneInfo
 from flask import current_app
+from sqlalchemy import insert, update
 
 JST = ZoneInfo("Asia/Tokyo")
 
 from app.extensions import db
 from app.models.opening_hours import OpeningHoursException, OpeningHoursCalendarSync, SyncOperationLog
 from app.models.organization import Organization
-from app.services.shift_service import get_opening_hours_for_date
-from app.services.calendar_service import create_event, update_event, delete_event, fetch_events
+from app.services.organization_settings import DEFAULT_CALENDAR_SYNC, settings_for
+from app.services.shift_service import get_opening_hours_for_period
+from app.services.calendar_service import batch_event_operations, fetch_events
 
 
 def _get_sync_keyword(org_id):
     """Get the calendar sync keyword for the organization."""
     org = db.session.get(Organization, org_id)
     if org:
-        return org.get_setting('calendar_sync_keyword', '営業時間')
-    return '営業時間'
+        return settings_for(org).calendar_sync['calendar_sync_keyword']
+    return DEFAULT_CALENDAR_SYNC['calendar_sync_keyword']
 
 
 def export_opening_hours_to_calendar(org_id, credentials, start_date, end_date):
@@ -26,8 +29,13 @@ def export_opening_hours_to_calendar(org_id, credentials, start_date, end_date):
       1. Weekly default (OpeningHours) — exported to calendar
       2. Calendar-imported exceptions (source='calendar') — skipped, calendar is source of truth
       3. Manual exceptions (source='manual') — exported to calendar
+
+    The whole range is resolved up front with a fixed number of queries and
+    diffed against OpeningHoursCalendarSync; only the resulting create /
+    update / delete operations are sent, through the Calendar batch endpoint.
     """
     stats = {'created': 0, 'updated': 0, 'deleted': 0, 'skipped': 0, 'errors': []}
+    summary = _get_sync_keyword(org_id)
 
     existing_syncs = {
         s.sync_date: s
@@ -49,65 +57,79 @@ def export_opening_hours_to_calendar(org_id, credentials, start_date, end_date):
         ).all()
     }
 
+    hours_by_date = get_opening_hours_for_period(org_id, start_date, end_date)
+
+    # Diff the desired state against what was previously synced
+    operations = []
     current = start_date
     while current <= end_date:
-        try:
+        sync_record = existing_syncs.get(current)
+        hours = hours_by_date[current.isoformat()]
+
+        if current in calendar_sourced_dates:
             # Skip calendar-imported dates — calendar has higher priority
-            if current in calendar_sourced_dates:
+            stats['skipped'] += 1
+        elif hours:
+            # Open day
+            st, et = hours['start_time'], hours['end_time']
+            if sync_record and sync_record.start_time == st and sync_record.end_time == et:
                 stats['skipped'] += 1
-                current += timedelta(days=1)
-                continue
-
-            hours = get_opening_hours_for_date(org_id, current)
-            sync_record = existing_syncs.get(current)
-
-            if hours:
-                # Open day
-                st, et = hours['start_time'], hours['end_time']
-                start_dt = f"{current.isoformat()}T{st}:00"
-                end_dt = f"{current.isoformat()}T{et}:00"
-                summary = _get_sync_keyword(org_id)
-                description = f'{st}〜{et}'
-
-                if not sync_record:
-                    event_id = create_event(
-                        credentials, 'primary', summary, start_dt, end_dt, description
-                    )
-                    db.session.add(OpeningHoursCalendarSync(
-                        organization_id=org_id,
-                        sync_date=current,
-                        calendar_event_id=event_id,
-                        start_time=st,
-                        end_time=et,
-                    ))
-                    stats['created'] += 1
-                elif sync_record.start_time != st or sync_record.end_time != et:
-                    update_event(
-                        credentials, 'primary', sync_record.calendar_event_id,
-                        summary, start_dt, end_dt, description
-                    )
-                    sync_record.start_time = st
-                    sync_record.end_time = et
-                    sync_record.synced_at = datetime.utcnow()
-                    stats['updated'] += 1
-                else:
-                    stats['skipped'] += 1
             else:
-                # Closed day — delete if previously synced
-                if sync_record:
-                    try:
-                        delete_event(credentials, 'primary', sync_record.calendar_event_id)
-                    except Exception:
-                        pass  # Event may already be deleted on calendar side
-                    db.session.delete(sync_record)
-                    stats['deleted'] += 1
-                else:
-                    stats['skipped'] += 1
-        except Exception as e:
-            current_app.logger.error(f"Sync export error for {current.isoformat()}: {e}")
+                operations.append({
+                    'key': current,
+                    'op': 'update' if sync_record else 'create',
+                    'event_id': sync_record.calendar_event_id if sync_record else None,
+                    'summary': summary,
+                    'start_datetime': f"{current.isoformat()}T{st}:00",
+                    'end_datetime': f"{current.isoformat()}T{et}:00",
+                    'description': f'{st}〜{et}',
+                    'start_time': st,
+                    'end_time': et,
+                })
+        elif sync_record:
+            # Closed day — delete if previously synced
+            operations.append({
+                'key': current,
+                'op': 'delete',
+                'event_id': sync_record.calendar_event_id,
+            })
+        else:
+            stats['skipped'] += 1
+        current += timedelta(days=1)
+
+    results = batch_event_operations(credentials, 'primary', operations)
+
+    now = datetime.utcnow()
+    for op in operations:
+        current = op['key']
+        event_id, error = results.get(current, (None, RuntimeError('No batch response')))
+
+        if op['op'] == 'delete':
+            # Delete errors are ignored: the event may already be deleted on calendar side
+            db.session.delete(existing_syncs[current])
+            stats['deleted'] += 1
+            continue
+
+        if error is not None:
+            current_app.logger.error(f"Sync export error for {current.isoformat()}: {error}")
             stats['errors'].append({'date': current.isoformat(), 'error': '同期エラー'})
+            continue
 
-        current += timedelta(days=1)
+        if op['op'] == 'create':
+            db.session.add(OpeningHoursCalendarSync(
+                organization_id=org_id,
+                sync_date=current,
+                calendar_event_id=event_id,
+                start_time=op['start_time'],
+                end_time=op['end_time'],
+            ))
+            stats['created'] += 1
+        else:
+            sync_record = existing_syncs[current]
+            sync_record.start_time = op['start_time']
+            sync_record.end_time = op['end_time']
+            sync_record.synced_at = now
+            stats['updated'] += 1
 
     log = SyncOperationLog(
         organization_id=org_id,
@@ -125,11 +147,52 @@ def export_opening_hours_to_calendar(org_id, credentials, start_date, end_date):
     return stats
 
 
+def _elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _parse_keyword_events(events, keyword, stats):
+    """Build the target state {date: (start_time, end_time)} from fetched events.
+
+    Only exact title matches with a time range (not all-day) count.  When a
+    date has several matching events the last one wins.
+    """
+    target = {}
+    for event in events:
+        try:
+            # Only exact title match & timed events (not all-day)
+            if event.get('summary') != keyword:
+                continue
+            start_str = event.get('start', '')
+            end_str = event.get('end', '')
+            if 'T' not in start_str or 'T' not in end_str:
+                continue  # Skip all-day events
+
+            event_dt = datetime.fromisoformat(start_str.replace('Z', '+00:00')).astimezone(JST)
+            event_end_dt = datetime.fromisoformat(end_str.replace('Z', '+00:00')).astimezone(JST)
+            target[event_dt.date()] = (event_dt.strftime('%H:%M'), event_end_dt.strftime('%H:%M'))
+        except Exception as e:
+            current_app.logger.error(f"Sync import error for event {event.get('id', '?')}: {e}")
+            stats['errors'].append({'event': event.get('id', '?'), 'error': '取込エラー'})
+    return target
+
+
 def import_opening_hours_from_calendar(org_id, credentials, start_date, end_date):
-    """Import events matching the org's sync keyword from Google Calendar as opening hour exceptions."""
+    """Import events matching the org's sync keyword from Google Calendar as opening hour exceptions.
+
+    Runs as a diff: the existing exceptions for the range are loaded in one
+    query, compared against the target state built from the events, and the
+    resulting inserts, updates and closures are applied as bulk statements.
+    Dates without a matching event are closed (calendar is source of truth);
+    manual exceptions are never overwritten.
+
+    The returned stats include ``timings_ms`` with the duration of each phase.
+    """
     stats = {'imported': 0, 'updated': 0, 'skipped': 0, 'errors': []}
+    timings = {}
     keyword = _get_sync_keyword(org_id)
 
+    started = time.perf_counter()
     try:
         events = fetch_events(
             credentials, start_date.isoformat(), end_date.isoformat(),
@@ -151,95 +214,104 @@ def import_opening_hours_from_calendar(org_id, credentials, start_date, end_date
         except Exception:
             db.session.rollback()
         return stats
+    timings['fetch'] = _elapsed_ms(started)
 
-    # Collect dates that have matching keyword events
-    dates_with_events = set()
+    # --- Diff: target state vs. existing exceptions ---
+    started = time.perf_counter()
+    target = _parse_keyword_events(events, keyword, stats)
 
-    for event in events:
-        try:
-            # Only exact title match & timed events (not all-day)
-            if event.get('summary') != keyword:
-                continue
-            start_str = event.get('start', '')
-            end_str = event.get('end', '')
-            if 'T' not in start_str or 'T' not in end_str:
-                continue  # Skip all-day events
+    all_dates = set(target)
+    current = start_date
+    while current <= end_date:
+        all_dates.add(current)
+        current += timedelta(days=1)
 
-            event_dt = datetime.fromisoformat(start_str.replace('Z', '+00:00')).astimezone(JST)
-            event_end_dt = datetime.fromisoformat(end_str.replace('Z', '+00:00')).astimezone(JST)
-            event_date = event_dt.date()
-            st = event_dt.strftime('%H:%M')
-            et = event_end_dt.strftime('%H:%M')
-
-            dates_with_events.add(event_date)
-
-            existing = OpeningHoursException.query.filter_by(
-                organization_id=org_id, exception_date=event_date
-            ).first()
-
-            if existing:
-                if existing.source == 'calendar':
-                    if existing.start_time != st or existing.end_time != et or existing.is_closed:
-                        existing.start_time = st
-                        existing.end_time = et
-                        existing.is_closed = False
-                        existing.updated_at = datetime.utcnow()
-                        stats['updated'] += 1
-                    else:
-                        stats['skipped'] += 1
-                else:
-                    # Manual entry — don't overwrite
-                    stats['skipped'] += 1
-            else:
-                exc = OpeningHoursException(
-                    organization_id=org_id,
-                    exception_date=event_date,
-                    start_time=st,
-                    end_time=et,
-                    is_closed=False,
-                    reason='Googleカレンダーから取込',
-                    source='calendar',
-                )
-                db.session.add(exc)
-                stats['imported'] += 1
-        except Exception as e:
-            current_app.logger.error(f"Sync import error for event {event.get('id', '?')}: {e}")
-            stats['errors'].append({'event': event.get('id', '?'), 'error': '取込エラー'})
+    existing = {
+        e.exception_date: e
+        for e in OpeningHoursException.query.filter(
+            OpeningHoursException.organization_id == org_id,
+            OpeningHoursException.exception_date >= min(all_dates),
+            OpeningHoursException.exception_date <= max(all_dates),
+        ).all()
+    }
 
-    # Mark dates without events as closed (calendar is source of truth)
+    now = datetime.utcnow()
+    inserts = []
+    updates = []
+    close_ids = []
     stats['closed'] = 0
-    current = start_date
-    while current <= end_date:
-        if current not in dates_with_events:
-            existing = OpeningHoursException.query.filter_by(
-                organization_id=org_id, exception_date=current
-            ).first()
-
-            if existing:
-                if existing.source == 'calendar':
-                    if not existing.is_closed:
-                        existing.is_closed = True
-                        existing.start_time = None
-                        existing.end_time = None
-                        existing.updated_at = datetime.utcnow()
-                        stats['closed'] += 1
-                    else:
-                        stats['skipped'] += 1
-                else:
-                    stats['skipped'] += 1  # Manual entry — don't overwrite
+    for current in sorted(all_dates):
+        exc = existing.get(current)
+        if exc and exc.source != 'calendar':
+            stats['skipped'] += 1  # Manual entry — don't overwrite
+            continue
+
+        if current in target:
+            st, et = target[current]
+            if not exc:
+                inserts.append({
+                    'organization_id': org_id,
+                    'exception_date': current,
+                    'start_time': st,
+                    'end_time': et,
+                    'is_closed': False,
+                    'reason': 'Googleカレンダーから取込',
+                    'source': 'calendar',
+                })
+                stats['imported'] += 1
+            elif exc.start_time != st or exc.end_time != et or exc.is_closed:
+                updates.append({
+                    'id': exc.id,
+                    'start_time': st,
+                    'end_time': et,
+                    'is_closed': False,
+                    'updated_at': now,
+                })
+                stats['updated'] += 1
             else:
-                exc = OpeningHoursException(
-                    organization_id=org_id,
-                    exception_date=current,
-                    start_time=None,
-                    end_time=None,
-                    is_closed=True,
-                    reason='Googleカレンダーに予定なし',
-                    source='calendar',
-                )
-                db.session.add(exc)
+                stats['skipped'] += 1
+        else:
+            # No event on this date — mark closed (calendar is source of truth)
+            if not exc:
+                inserts.append({
+                    'organization_id': org_id,
+                    'exception_date': current,
+                    'start_time': None,
+                    'end_time': None,
+                    'is_closed': True,
+                    'reason': 'Googleカレンダーに予定なし',
+                    'source': 'calendar',
+                })
                 stats['closed'] += 1
-        current += timedelta(days=1)
+            elif not exc.is_closed:
+                close_ids.append(exc.id)
+                stats['closed'] += 1
+            else:
+                stats['skipped'] += 1
+    timings['diff'] = _elapsed_ms(started)
+
+    # --- Apply as bulk statements ---
+    started = time.perf_counter()
+    try:
+        if inserts:
+            # render_nulls keeps open and closed rows in a single executemany batch
+            db.session.execute(
+                insert(OpeningHoursException).execution_options(render_nulls=True), inserts,
+            )
+        if updates:
+            db.session.execute(update(OpeningHoursException), updates)
+        if close_ids:
+            db.session.execute(
+                update(OpeningHoursException)
+                .where(OpeningHoursException.id.in_(close_ids))
+                .values(is_closed=True, start_time=None, end_time=None, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+    except Exception:
+        db.session.rollback()
+        raise
+    timings['apply'] = _elapsed_ms(started)
+    stats['timings_ms'] = timings
 
     log = SyncOperationLog(
         organization_id=org_id,
@@ -9,10 +9,13 @@ Design notes:
 - When a feature is disabled, consumers should treat the rest of the config as absent.
 - Tier keys are stable identifiers (English, snake_case); labels are display names.
 - Validation raises ValueError; callers are expected to catch and translate to HTTP 400.
+- settings_for(org) is the read accessor: an OrgSettings view parsed and merged
+  with defaults once, cached on the Organization instance until set_setting().
 """
 
 import logging
 import re
+from functools import cached_property
 
 from app.extensions import db
 from app.models.membership import OrganizationMember
@@ -52,6 +55,18 @@ DEFAULT_WORKFLOW = {
     'approval_required': False,
 }
 
+DEFAULT_REMINDERS = {
+    'reminder_days_before_deadline': 1,
+    'reminder_time_deadline': '09:00',
+    'reminder_days_before_shift': 1,
+    'reminder_time_shift': '21:00',
+}
+
+DEFAULT_CALENDAR_SYNC = {
+    'calendar_sync_keyword': '営業時間',
+    'calendar_setup_dismissed': False,
+}
+
 # Allowed values (for validation)
 _MIN_ATTENDANCE_MODES = {'disabled', 'org_wide', 'per_member'}
 _MIN_ATTENDANCE_UNITS = {'count', 'hours', 'both'}
@@ -61,12 +76,65 @@ _OVERLAP_SCOPES = {'same_tier'}
 _TIER_KEY_PATTERN = re.compile(r'^[a-z][a-z0-9_]{0,31}$')
 
 
+# ---------- Parsed settings view ----------
+
+class OrgSettings:
+    """One organization's settings, parsed and merged with defaults once.
+
+    Sections are computed on first access.  The returned dicts are shared by
+    every reader of the same view, so treat them as read-only (the get_*
+    helpers below hand out copies).
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def get(self, key, default=None):
+        return self.raw.get(key, default)
+
+    @cached_property
+    def level_system(self) -> dict:
+        return _merge_with_defaults(self.raw.get(KEY_LEVEL_SYSTEM) or {}, DEFAULT_LEVEL_SYSTEM)
+
+    @cached_property
+    def overlap_check(self) -> dict:
+        return _merge_with_defaults(self.raw.get(KEY_OVERLAP_CHECK) or {}, DEFAULT_OVERLAP_CHECK)
+
+    @cached_property
+    def min_attendance(self) -> dict:
+        return _merge_with_defaults(self.raw.get(KEY_MIN_ATTENDANCE) or {}, DEFAULT_MIN_ATTENDANCE)
+
+    @cached_property
+    def workflow(self):
+        """Workflow config, or None when never initialized (see get_workflow())."""
+        raw = self.raw.get(KEY_WORKFLOW)
+        return None if raw is None else _merge_with_defaults(raw, DEFAULT_WORKFLOW)
+
+    @cached_property
+    def reminders(self) -> dict:
+        """Reminder timing (flat top-level keys; explicit nulls are kept)."""
+        return {key: self.raw.get(key, default) for key, default in DEFAULT_REMINDERS.items()}
+
+    @cached_property
+    def calendar_sync(self) -> dict:
+        return {key: self.raw.get(key, default) for key, default in DEFAULT_CALENDAR_SYNC.items()}
+
+
+def settings_for(org) -> OrgSettings:
+    """The cached OrgSettings of *org*; rebuilt after set_setting() or a reload."""
+    raw = org.settings
+    view = org.__dict__.get('_settings_view')
+    if view is None or view.raw is not raw:
+        view = OrgSettings(raw)
+        org._settings_view = view
+    return view
+
+
 # ---------- Level system ----------
 
 def get_level_system(org) -> dict:
     """Return the level system config, merged with defaults."""
-    raw = org.get_setting(KEY_LEVEL_SYSTEM) or {}
-    return _merge_with_defaults(raw, DEFAULT_LEVEL_SYSTEM)
+    return dict(settings_for(org).level_system)
 
 
 def set_level_system(org, data: dict, removed_tier_keys=None) -> dict:
@@ -128,8 +196,7 @@ def clear_tier_from_members(org, tier_key) -> int:
 # ---------- Overlap check ----------
 
 def get_overlap_check(org) -> dict:
-    raw = org.get_setting(KEY_OVERLAP_CHECK) or {}
-    return _merge_with_defaults(raw, DEFAULT_OVERLAP_CHECK)
+    return dict(settings_for(org).overlap_check)
 
 
 def set_overlap_check(org, data: dict) -> dict:
@@ -141,8 +208,7 @@ def set_overlap_check(org, data: dict) -> dict:
 # ---------- Min attendance ----------
 
 def get_min_attendance(org) -> dict:
-    raw = org.get_setting(KEY_MIN_ATTENDANCE) or {}
-    return _merge_with_defaults(raw, DEFAULT_MIN_ATTENDANCE)
+    return dict(settings_for(org).min_attendance)
 
 
 def set_min_attendance(org, data: dict) -> dict:
@@ -159,15 +225,15 @@ def get_workflow(org) -> dict:
     For existing orgs without workflow settings, auto-determine approval_required
     based on whether any active owner exists.
     """
-    raw = org.get_setting(KEY_WORKFLOW)
-    if raw is None:
+    workflow = settings_for(org).workflow
+    if workflow is None:
         # First-time access: compute default from org state
         initial = {
             'approval_required': _has_active_owner(org),
         }
         org.set_setting(KEY_WORKFLOW, initial)
-        return initial
-    return _merge_with_defaults(raw, DEFAULT_WORKFLOW)
+        return dict(initial)
+    return dict(workflow)
 
 
 def set_workflow(org, data: dict) -> dict:
@@ -2,12 +2,19 @@
 
 Called by the cron endpoint to automatically send reminders, or
 manually triggered by admin via API.
+
+Both reminder kinds are set-based: what is due across all orgs is
+resolved in SQL, recipients are found with one anti-join against
+Reminder (and ShiftSubmission), and the Reminder rows (conflict-ignore on
+uq_reminder_type_ref_user) and emails are bulk-inserted in one commit.
 """
 
 from datetime import datetime, date, time, timedelta
 
 from flask import current_app
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.extensions import db
 from app.models.organization import Organization
@@ -16,13 +23,9 @@ from app.models.shift import (
 )
 from app.models.reminder import Reminder
 from app.models.user import User
-from app.services.notification_service import notify_submission_deadline, notify_preshift
-
-# Default settings
-DEFAULT_DAYS_BEFORE_DEADLINE = 1
-DEFAULT_TIME_DEADLINE = '09:00'
-DEFAULT_DAYS_BEFORE_SHIFT = 1
-DEFAULT_TIME_SHIFT = '21:00'
+from app.services.notification_service import render_fan_out
+from app.services.organization_settings import settings_for
+from app.services.task_runner import enqueue_emails
 
 
 def _parse_time_str(t):
@@ -45,42 +48,86 @@ def _get_reminder_trigger_dt(target_dt, days_before, time_str):
     return datetime.combine(trigger_date, t)
 
 
-def check_and_send_submission_reminders():
-    """Check all organizations and send submission deadline reminders.
+def _submission_cutoff(now, days_before, time_str):
+    """Deadlines before the returned datetime have their reminder due at *now*.
 
-    Called by the cron endpoint. For each org with open periods, checks
-    if "now" has passed the trigger time (X days before deadline at HH:MM)
-    and sends reminders to workers who haven't submitted.
+    Same rule as ``now >= _get_reminder_trigger_dt(deadline, days_before, time_str)``,
+    turned around so that it can be evaluated in SQL.
     """
-    orgs = Organization.query.filter_by(is_active=True).all()
-    total_sent = 0
-    total_skipped = 0
-    now = datetime.utcnow()
+    t = _parse_time_str(time_str) or time(9, 0)
+    last_due_date = now.date() + timedelta(days=days_before)
+    if now.time() < t:
+        last_due_date -= timedelta(days=1)
+    return datetime.combine(last_due_date + timedelta(days=1), time(0, 0))
+
 
-    for org in orgs:
-        days_before = org.get_setting('reminder_days_before_deadline', DEFAULT_DAYS_BEFORE_DEADLINE)
-        time_str = org.get_setting('reminder_time_deadline', DEFAULT_TIME_DEADLINE)
+def _due_submission_periods(now):
+    """SQL condition matching periods of active orgs whose deadline reminder is due.
 
+    Orgs with the same reminder settings share one cutoff, so the condition
+    grows with the number of distinct settings rather than with the number
+    of orgs.  Returns None when no org has reminders enabled.
+    """
+    cutoffs = {}
+    for org in Organization.query.filter_by(is_active=True):
+        reminders = settings_for(org).reminders
+        days_before = reminders['reminder_days_before_deadline']
+        time_str = reminders['reminder_time_deadline']
         if days_before is None or days_before < 0:
             continue
+        cutoffs.setdefault(_submission_cutoff(now, days_before, time_str), []).append(org.id)
+    if not cutoffs:
+        return None
+    return or_(*(
+        and_(ShiftPeriod.organization_id.in_(org_ids), ShiftPeriod.submission_deadline < cutoff)
+        for cutoff, org_ids in cutoffs.items()
+    ))
+
+
+def _insert_reminders(reminder_type, rows):
+    """Bulk-insert Reminder rows for ``(organization_id, reference_id, user_id)`` tuples.
+
+    Rows that already exist (uq_reminder_type_ref_user, e.g. a concurrent
+    cron run got there first) are skipped.  Returns the
+    ``(reference_id, user_id)`` pairs actually inserted.  Does not commit.
+    """
+    if not rows:
+        return set()
+    now = datetime.utcnow()
+    values = [
+        {'organization_id': org_id, 'reminder_type': reminder_type, 'reference_id': ref_id,
+         'user_id': user_id, 'sent_at': now, 'created_at': now}
+        for org_id, ref_id, user_id in rows
+    ]
+    if db.engine.dialect.name == 'postgresql':
+        stmt = pg_insert(Reminder).on_conflict_do_nothing(constraint='uq_reminder_type_ref_user')
+    else:
+        stmt = sqlite_insert(Reminder).on_conflict_do_nothing(
+            index_elements=['reminder_type', 'reference_id', 'user_id'])
+    result = db.session.execute(stmt.returning(Reminder.reference_id, Reminder.user_id), values)
+    return {(row.reference_id, row.user_id) for row in result}
 
-        periods = ShiftPeriod.query.filter(
-            ShiftPeriod.organization_id == org.id,
-            ShiftPeriod.status == 'open',
-            ShiftPeriod.submission_deadline.isnot(None),
-            ShiftPeriod.submission_deadline > now,
-        ).all()
 
-        for period in periods:
-            trigger_dt = _get_reminder_trigger_dt(
-                period.submission_deadline, days_before, time_str
-            )
-            if now >= trigger_dt:
-                sent, skipped = _send_submission_reminders_for_period(period, org)
-                total_sent += sent
-                total_skipped += skipped
+def check_and_send_submission_reminders():
+    """Check all organizations and send submission deadline reminders.
 
-    return {'sent': total_sent, 'skipped': total_skipped}
+    Called by the cron endpoint.  Finds, for every open period whose
+    trigger time ("X days before deadline at HH:MM") has passed, the
+    workers who have neither submitted nor been reminded, and reminds them
+    all at once — a constant number of queries however many orgs there are.
+    """
+    now = datetime.utcnow()
+    due = _due_submission_periods(now)
+    if due is None:
+        return {'sent': 0, 'skipped': 0}
+
+    sent, skipped = _send_submission_reminders(and_(
+        ShiftPeriod.status == 'open',
+        ShiftPeriod.submission_deadline.isnot(None),
+        ShiftPeriod.submission_deadline > now,
+        due,
+    ))
+    return {'sent': sent, 'skipped': skipped}
 
 
 def send_submission_reminder_for_period(period_id, admin_user):
@@ -96,146 +143,154 @@ def send_submission_reminder_for_period(period_id, admin_user):
     if not org:
         return None, 'Organization not found'
 
-    sent, skipped = _send_submission_reminders_for_period(period, org)
+    sent, skipped = _send_submission_reminders(ShiftPeriod.id == period.id)
     return {'sent': sent, 'skipped': skipped, 'period_id': period_id}, None
 
 
-def _send_submission_reminders_for_period(period, org):
-    """Internal: send reminders to workers who haven't submitted for a period."""
-    sent = 0
-    skipped = 0
+def _send_submission_reminders(period_filter):
+    """Internal: remind unsubmitted workers of every period matching *period_filter*.
 
-    workers = User.query.filter_by(
-        organization_id=org.id, role='worker', is_active=True
-    ).all()
+    One anti-join query finds the (period, worker) pairs that are neither
+    submitted nor reminded; their Reminder rows and emails are inserted in
+    bulk and committed together.  Returns (sent, skipped).
+    """
+    pairs = (
+        db.session.query(
+            ShiftPeriod.id.label('period_id'), ShiftPeriod.organization_id,
+            ShiftPeriod.name, ShiftPeriod.submission_deadline,
+            User.id.label('user_id'), User.email, User.display_name,
+        )
+        .join(User, and_(
+            User.organization_id == ShiftPeriod.organization_id,
+            User.role == 'worker',
+            User.is_active.is_(True),
+        ))
+        .filter(period_filter)
+    )
+    submitted = exists().where(
+        ShiftSubmission.shift_period_id == ShiftPeriod.id,
+        ShiftSubmission.user_id == User.id,
+        ShiftSubmission.status.in_(['submitted', 'revised']),
+    )
+    reminded = exists().where(
+        Reminder.reminder_type == 'submission_deadline',
+        Reminder.reference_id == ShiftPeriod.id,
+        Reminder.user_id == User.id,
+    )
+    total = pairs.count()
+    candidates = pairs.filter(~submitted, ~reminded).order_by(ShiftPeriod.id, User.id).all()
 
-    submitted_user_ids = set(
-        uid for (uid,) in db.session.query(ShiftSubmission.user_id).filter(
-            ShiftSubmission.shift_period_id == period.id,
-            ShiftSubmission.status.in_(['submitted', 'revised']),
-        ).all()
+    inserted = _insert_reminders(
+        'submission_deadline',
+        [(c.organization_id, c.period_id, c.user_id) for c in candidates],
     )
 
-    deadline_str = period.submission_deadline.strftime('%Y年%m月%d日 %H:%M') if period.submission_deadline else ''
     base_url = current_app.config.get('BASE_URL', 'https://shifree.com')
     submit_url = f'{base_url}/worker'
-
-    for worker in workers:
-        if worker.id in submitted_user_ids:
-            skipped += 1
-            continue
-
-        existing = Reminder.query.filter_by(
-            reminder_type='submission_deadline',
-            reference_id=period.id,
-            user_id=worker.id,
-        ).first()
-        if existing:
-            skipped += 1
+    by_period = {}
+    for c in candidates:
+        if (c.period_id, c.user_id) in inserted:
+            by_period.setdefault(c.period_id, []).append(c)
+
+    # テンプレート描画は期間ごとに 1 回、AsyncTask は全期間分を 1 文で INSERT
+    messages = []
+    for rows in by_period.values():
+        period = rows[0]
+        deadline_str = period.submission_deadline.strftime('%Y年%m月%d日 %H:%M')
+        for message in render_fan_out(
+            'emails/submission_deadline.html',
+            f"[シフリー] 提出期限リマインド: {period.name}",
+            [{'to_email': r.email, 'worker_name': r.display_name or r.email} for r in rows],
+            context=dict(period_name=period.name, deadline_str=deadline_str, submit_url=submit_url),
+        ):
+            message['organization_id'] = period.organization_id
+            messages.append(message)
+    enqueue_emails(messages)
+    db.session.commit()
+
+    return len(inserted), total - len(inserted)
+
+
+def _due_preshift_dates(now):
+    """SQL condition matching, per org, the shift date whose pre-shift reminder is due.
+
+    An org's target date is ``today + days_before``; it is due once today's
+    trigger time has passed.  Orgs sharing a target date share one branch.
+    Returns None when nothing is due.
+    """
+    targets = {}
+    for org in Organization.query.filter_by(is_active=True):
+        reminders = settings_for(org).reminders
+        days_before = reminders['reminder_days_before_shift']
+        time_str = reminders['reminder_time_shift']
+        if days_before is None or days_before < 0:
             continue
-
-        worker_name = worker.display_name or worker.email
-        notify_submission_deadline(
-            worker.email, worker_name, period.name, deadline_str, submit_url,
-            organization_id=org.id,
-        )
-
-        reminder = Reminder(
-            organization_id=org.id,
-            reminder_type='submission_deadline',
-            reference_id=period.id,
-            user_id=worker.id,
-        )
-        db.session.add(reminder)
-        try:
-            db.session.commit()
-        except IntegrityError:
-            db.session.rollback()
-            skipped += 1
+        target_date = now.date() + timedelta(days=days_before)
+        if now < _get_reminder_trigger_dt(target_date, days_before, time_str):
             continue
-        sent += 1
-
-    return sent, skipped
+        targets.setdefault(target_date, []).append(org.id)
+    if not targets:
+        return None
+    return or_(*(
+        and_(ShiftPeriod.organization_id.in_(org_ids), ShiftScheduleEntry.shift_date == target_date)
+        for target_date, org_ids in targets.items()
+    ))
 
 
 def check_and_send_preshift_reminders():
     """Check all organizations and send pre-shift reminders.
 
-    For each org, finds confirmed schedule entries whose shift_date is
-    X days from now, and the configured trigger time has passed.
+    Finds, across all orgs, confirmed schedule entries whose shift_date is
+    X days from now once the org's trigger time has passed, minus entries
+    already reminded (anti-join on Reminder).  Reminder rows and emails are
+    inserted in bulk and committed together.
     """
-    orgs = Organization.query.filter_by(is_active=True).all()
-    total_sent = 0
-    total_skipped = 0
     now = datetime.utcnow()
+    due = _due_preshift_dates(now)
+    if due is None:
+        return {'sent': 0, 'skipped': 0}
+
+    entries = (
+        db.session.query(
+            ShiftScheduleEntry.id, ShiftScheduleEntry.user_id, ShiftScheduleEntry.shift_date,
+            ShiftScheduleEntry.start_time, ShiftScheduleEntry.end_time,
+            ShiftPeriod.organization_id, User.email, User.display_name,
+        )
+        .join(ShiftSchedule, ShiftSchedule.id == ShiftScheduleEntry.schedule_id)
+        .join(ShiftPeriod, ShiftPeriod.id == ShiftSchedule.shift_period_id)
+        .join(User, User.id == ShiftScheduleEntry.user_id)
+        .filter(ShiftSchedule.status == 'confirmed', due)
+    )
+    reminded = exists().where(
+        Reminder.reminder_type == 'preshift',
+        Reminder.reference_id == ShiftScheduleEntry.id,
+        Reminder.user_id == ShiftScheduleEntry.user_id,
+    )
+    total = entries.count()
+    candidates = entries.filter(~reminded).order_by(ShiftScheduleEntry.id).all()
 
-    for org in orgs:
-        days_before = org.get_setting('reminder_days_before_shift', DEFAULT_DAYS_BEFORE_SHIFT)
-        time_str = org.get_setting('reminder_time_shift', DEFAULT_TIME_SHIFT)
-
-        if days_before is None or days_before < 0:
-            continue
-
-        confirmed_schedules = db.session.query(ShiftSchedule.id).join(
-            ShiftPeriod, ShiftSchedule.shift_period_id == ShiftPeriod.id
-        ).filter(
-            ShiftPeriod.organization_id == org.id,
-            ShiftSchedule.status == 'confirmed',
-        ).all()
-        schedule_ids = [s.id for s in confirmed_schedules]
-
-        if not schedule_ids:
-            continue
-
-        target_date = now.date() + timedelta(days=days_before)
-
-        entries = ShiftScheduleEntry.query.filter(
-            ShiftScheduleEntry.schedule_id.in_(schedule_ids),
-            ShiftScheduleEntry.shift_date == target_date,
-        ).all()
-
-        trigger_dt = _get_reminder_trigger_dt(target_date, days_before, time_str)
-        if now < trigger_dt:
-            continue
+    inserted = _insert_reminders(
+        'preshift', [(e.organization_id, e.id, e.user_id) for e in candidates],
+    )
+    candidates = [e for e in candidates if (e.id, e.user_id) in inserted]
+
+    messages = render_fan_out(
+        'emails/preshift.html',
+        lambda r: f"[シフリー] シフトリマインド: {r['shift_date_str']}",
+        [{
+            'to_email': e.email,
+            'worker_name': e.display_name or e.email,
+            'shift_date_str': e.shift_date.strftime('%Y年%m月%d日'),
+            'start_time': e.start_time,
+            'end_time': e.end_time,
+        } for e in candidates],
+    )
+    for message, entry in zip(messages, candidates):
+        message['organization_id'] = entry.organization_id
+    enqueue_emails(messages)
+    db.session.commit()
 
-        for entry in entries:
-            existing = Reminder.query.filter_by(
-                reminder_type='preshift',
-                reference_id=entry.id,
-                user_id=entry.user_id,
-            ).first()
-            if existing:
-                total_skipped += 1
-                continue
-
-            worker = db.session.get(User, entry.user_id)
-            if not worker:
-                continue
-
-            worker_name = worker.display_name or worker.email
-            shift_date_str = entry.shift_date.strftime('%Y年%m月%d日')
-            notify_preshift(
-                worker.email, worker_name, shift_date_str,
-                entry.start_time, entry.end_time,
-                organization_id=org.id,
-            )
-
-            reminder = Reminder(
-                organization_id=org.id,
-                reminder_type='preshift',
-                reference_id=entry.id,
-                user_id=entry.user_id,
-            )
-            db.session.add(reminder)
-            try:
-                db.session.commit()
-            except IntegrityError:
-                db.session.rollback()
-                total_skipped += 1
-                continue
-            total_sent += 1
-
-    return {'sent': total_sent, 'skipped': total_skipped}
+    return {'sent': len(inserted), 'skipped': total - len(inserted)}
 
 
 def get_reminder_stats(period_id):
@@ -0,0 +1,167 @@
+"""Confirmed-schedule → workers' Google Calendar sync.
+
+Entries are grouped by worker and each group is written with that worker's
+own OAuth credentials through the Calendar batch endpoint, so a month-long
+schedule costs one round trip per worker (per 50 shifts) instead of one per
+entry.  Per-item results are mapped back onto ShiftScheduleEntry
+(`calendar_event_id`, `sync_error`, `last_sync_attempt_at`) and committed
+after every batch, so progress is visible while a background sync runs.
+"""
+
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import case, func, update
+
+from app.extensions import db
+from app.models.shift import ShiftScheduleEntry
+from app.models.user import User
+from app.services.auth_service import get_credentials_for_user, CredentialsExpiredError
+from app.services.calendar_service import (
+    BATCH_MAX_REQUESTS, batch_event_operations, classify_calendar_error,
+)
+
+SHIFT_EVENT_DESCRIPTION = "シフリーにより自動作成"
+
+REAUTH_ERRORS = ('CREDENTIALS_EXPIRED', 'NO_CREDENTIALS')
+
+
+def _resolve_credentials(worker):
+    """Return (credentials, None) or (None, (errorCode, message))."""
+    try:
+        credentials = get_credentials_for_user(worker)
+    except CredentialsExpiredError:
+        return None, ('CREDENTIALS_EXPIRED', 'Google認証の有効期限切れ。再ログインが必要です')
+    except Exception as e:
+        return None, ('CREDENTIALS_UNAVAILABLE', str(e))
+    if credentials is None:
+        return None, ('NO_CREDENTIALS', 'Google連携未設定。本人によるカレンダー追加が必要です')
+    return credentials, None
+
+
+def _shift_operation(entry, summary):
+    date_str = entry.shift_date.isoformat()
+    return {
+        'key': entry.id,
+        'op': 'create',
+        'summary': summary,
+        'start_datetime': f"{date_str}T{entry.start_time}:00",
+        'end_datetime': f"{date_str}T{entry.end_time}:00",
+        'description': SHIFT_EVENT_DESCRIPTION,
+    }
+
+
+def _apply(updates):
+    """Write one chunk of per-entry results and commit it."""
+    try:
+        db.session.execute(update(ShiftScheduleEntry), updates)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Failed to persist calendar sync results")
+
+
+def sync_schedule_to_calendar(schedule_id):
+    """Sync confirmed schedule entries to workers' Google Calendars.
+
+    Uses each worker's own OAuth credentials to write to their primary calendar.
+    If worker credentials are unavailable, records the failure as needs_worker_action.
+    Returns one result dict per entry, in entry order.
+    """
+    entries = (
+        db.session.query(
+            ShiftScheduleEntry.id, ShiftScheduleEntry.user_id, ShiftScheduleEntry.shift_date,
+            ShiftScheduleEntry.start_time, ShiftScheduleEntry.end_time,
+            ShiftScheduleEntry.calendar_event_id,
+        )
+        .filter(ShiftScheduleEntry.schedule_id == schedule_id)
+        .order_by(ShiftScheduleEntry.id)
+        .all()
+    )
+    pending_user_ids = {e.user_id for e in entries if not e.calendar_event_id}
+    workers = {
+        u.id: u for u in User.query.filter(User.id.in_(pending_user_ids))
+    } if pending_user_ids else {}
+
+    results = {}
+    groups = {}  # user_id -> [entries]
+    for entry in entries:
+        # 冪等性 guard: 既に同期済みの entry はスキップ
+        if entry.calendar_event_id:
+            results[entry.id] = {"user_id": entry.user_id, "event_id": entry.calendar_event_id,
+                                 "success": True, "skipped": True}
+        elif entry.user_id not in workers:
+            results[entry.id] = {"user_id": entry.user_id, "error": "User not found",
+                                 "errorCode": "USER_NOT_FOUND"}
+        else:
+            groups.setdefault(entry.user_id, []).append(entry)
+
+    # 各 worker のコミット後は User が expire されるため、表示名は先に確定しておく
+    summaries = {uid: f"シフト: {u.display_name or u.email}" for uid, u in workers.items()}
+
+    for user_id, worker_entries in groups.items():
+        worker = workers[user_id]
+        summary = summaries[user_id]
+        attempted_at = datetime.utcnow()
+
+        credentials, failure = _resolve_credentials(worker)
+        if failure:
+            code, message = failure
+            for entry in worker_entries:
+                results[entry.id] = {"user_id": user_id, "error": message,
+                                     "errorCode": code, "needs_worker_action": True}
+            _apply([{'id': e.id, 'sync_error': code, 'last_sync_attempt_at': attempted_at}
+                    for e in worker_entries])
+            continue
+
+        for offset in range(0, len(worker_entries), BATCH_MAX_REQUESTS):
+            chunk = worker_entries[offset:offset + BATCH_MAX_REQUESTS]
+            # Worker 本人の credentials で一括同期
+            outcomes = batch_event_operations(
+                credentials, 'primary', [_shift_operation(e, summary) for e in chunk],
+            )
+            synced_at = datetime.utcnow()
+            updates = []
+            for entry in chunk:
+                event_id, error = outcomes.get(entry.id, (None, RuntimeError("No batch response")))
+                if error is None:
+                    updates.append({'id': entry.id, 'calendar_event_id': event_id,
+                                    'synced_at': synced_at, 'sync_error': None,
+                                    'last_sync_attempt_at': attempted_at})
+                    results[entry.id] = {"user_id": user_id, "event_id": event_id, "success": True}
+                    continue
+                current_app.logger.error("Calendar sync failed for user %s: %s", user_id, error)
+                error_code = classify_calendar_error(error)
+                updates.append({'id': entry.id, 'sync_error': error_code,
+                                'last_sync_attempt_at': attempted_at})
+                results[entry.id] = {
+                    "user_id": user_id,
+                    "error": str(error),
+                    "errorCode": error_code,
+                    "needs_worker_action": error_code != "CALENDAR_TEMPORARY_FAILURE",
+                }
+            _apply(updates)
+
+    return [results[entry.id] for entry in entries]
+
+
+def get_sync_progress(schedule_id):
+    """Count a schedule's entries by sync status with a single aggregate query.
+
+    Statuses follow ShiftScheduleEntry.get_sync_status().
+    """
+    status = case(
+        (ShiftScheduleEntry.calendar_event_id.isnot(None), 'synced'),
+        (ShiftScheduleEntry.sync_error.in_(REAUTH_ERRORS), 'reauth_required'),
+        (ShiftScheduleEntry.sync_error.isnot(None), 'failed'),
+        else_='pending',
+    )
+    counts = dict(
+        db.session.query(status, func.count(ShiftScheduleEntry.id))
+        .filter(ShiftScheduleEntry.schedule_id == schedule_id)
+        .group_by(status)
+        .all()
+    )
+    progress = {key: counts.get(key, 0) for key in ('synced', 'reauth_required', 'failed', 'pending')}
+    progress['total'] = sum(progress.values())
+    return progress
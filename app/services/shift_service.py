@@ -1,5 +1,6 @@
 import logging
 from datetime import datetime, date, timedelta
+from sqlalchemy import delete, func, insert, tuple_, update
 from app.extensions import db
 from app.models.shift import (
     ShiftPeriod, ShiftSubmission, ShiftSubmissionSlot,
@@ -7,48 +8,127 @@ from app.models.shift import (
 )
 from app.models.opening_hours import OpeningHours, OpeningHoursException
 from app.models.user import User
+from app.utils.serialization import eager
 from app.utils.validators import validate_time_str, validate_text_length
 
 logger = logging.getLogger(__name__)
 
 
-def get_opening_hours_for_date(org_id, target_date):
-    """Get effective opening hours for a specific date, considering exceptions."""
-    exc = OpeningHoursException.query.filter_by(
-        organization_id=org_id, exception_date=target_date
-    ).first()
+def _to_schema_dow(target_date):
+    """Convert Python weekday (Mon=0) to our schema (Sun=0)."""
+    return (target_date.weekday() + 1) % 7
+
+
+def _effective_hours(exc, weekly):
+    """Resolve one date's hours from its exception row and weekly default row.
 
+    Either argument may be None.  Returns None for closed days.
+    """
     if exc:
         if exc.is_closed:
             return None  # Closed
         return {'start_time': exc.start_time, 'end_time': exc.end_time}
+    if not weekly or weekly.is_closed:
+        return None
+    return {'start_time': weekly.start_time, 'end_time': weekly.end_time}
 
-    dow = target_date.weekday()
-    # Convert Python weekday (Mon=0) to our schema (Sun=0)
-    dow_schema = (dow + 1) % 7
 
-    oh = OpeningHours.query.filter_by(
-        organization_id=org_id, day_of_week=dow_schema
+def get_opening_hours_for_date(org_id, target_date):
+    """Get effective opening hours for a specific date, considering exceptions."""
+    exc = OpeningHoursException.query.filter_by(
+        organization_id=org_id, exception_date=target_date
     ).first()
+    if exc:
+        return _effective_hours(exc, None)
 
-    if not oh or oh.is_closed:
-        return None
-    return {'start_time': oh.start_time, 'end_time': oh.end_time}
+    oh = OpeningHours.query.filter_by(
+        organization_id=org_id, day_of_week=_to_schema_dow(target_date)
+    ).first()
+    return _effective_hours(None, oh)
 
 
 def get_opening_hours_for_period(org_id, start_date, end_date):
-    """Get opening hours for every date in a period."""
+    """Get opening hours for every date in a period.
+
+    Loads the weekly defaults and the exceptions in the range with two
+    queries and resolves each date in memory, so the cost does not grow
+    with the length of the period.
+    """
+    weekly = {
+        oh.day_of_week: oh
+        for oh in OpeningHours.query.filter_by(organization_id=org_id).all()
+    }
+    exceptions = {
+        e.exception_date: e
+        for e in OpeningHoursException.query.filter(
+            OpeningHoursException.organization_id == org_id,
+            OpeningHoursException.exception_date >= start_date,
+            OpeningHoursException.exception_date <= end_date,
+        ).all()
+    }
+
     result = {}
     current = start_date
     while current <= end_date:
-        hours = get_opening_hours_for_date(org_id, current)
-        result[current.isoformat()] = hours
+        result[current.isoformat()] = _effective_hours(
+            exceptions.get(current), weekly.get(_to_schema_dow(current)),
+        )
         current += timedelta(days=1)
     return result
 
 
+_SLOT_FIELDS = (
+    'is_available', 'start_time', 'end_time', 'is_custom_time',
+    'auto_calculated_start', 'auto_calculated_end', 'notes',
+)
+_SLOT_TIME_FIELDS = ('start_time', 'end_time', 'auto_calculated_start', 'auto_calculated_end')
+
+
+def _normalize_slots(slots_data, period):
+    """Validate a whole submission payload and return ``{slot_date: column values}``.
+
+    Runs before anything is written, so a bad slot rejects the request
+    without leaving half-applied changes in the session.  A day listed more
+    than once keeps its last entry, as the old insert-everything save did.
+    """
+    slots = {}
+    for slot in slots_data:
+        try:
+            slot_date = date.fromisoformat(slot['slot_date'])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError(f"Invalid slot_date: {slot.get('slot_date')}")
+
+        # Validate slot_date is within period range
+        if slot_date < period.start_date or slot_date > period.end_date:
+            raise ValueError(
+                f"slot_date {slot_date.isoformat()} is outside period range "
+                f"({period.start_date.isoformat()} - {period.end_date.isoformat()})"
+            )
+
+        # Validate time strings if provided
+        for field in _SLOT_TIME_FIELDS:
+            if slot.get(field):
+                validate_time_str(slot[field], field)
+
+        slots[slot_date] = {
+            'is_available': slot.get('is_available', False),
+            'start_time': slot.get('start_time'),
+            'end_time': slot.get('end_time'),
+            'is_custom_time': slot.get('is_custom_time', False),
+            'auto_calculated_start': slot.get('auto_calculated_start'),
+            'auto_calculated_end': slot.get('auto_calculated_end'),
+            'notes': slot.get('notes'),
+        }
+    return slots
+
+
 def create_or_update_submission(period_id, user_id, slots_data, notes=None):
-    """Create or update a shift submission with slots."""
+    """Create or update a shift submission with slots.
+
+    Slots are keyed by slot_date.  On resubmission only the days that
+    changed are written: removed days are deleted, new days inserted and
+    edited days updated, each as a single bulk statement.
+    """
     # Validate text lengths
     validate_text_length(notes, 'notes', 5000)
 
@@ -56,11 +136,13 @@ def create_or_update_submission(period_id, user_id, slots_data, notes=None):
     period = db.session.get(ShiftPeriod, period_id)
     if not period:
         raise ValueError(f"Period {period_id} not found")
+    slots = _normalize_slots(slots_data, period)
 
     submission = ShiftSubmission.query.filter_by(
         shift_period_id=period_id, user_id=user_id
     ).first()
 
+    existing, stale_ids = {}, []
     if not submission:
         submission = ShiftSubmission(
             shift_period_id=period_id,
@@ -75,51 +157,39 @@ def create_or_update_submission(period_id, user_id, slots_data, notes=None):
         submission.status = 'submitted'
         submission.submitted_at = datetime.utcnow()
         submission.notes = notes
-        # Delete existing slots
-        ShiftSubmissionSlot.query.filter_by(submission_id=submission.id).delete()
-
-    for slot in slots_data:
-        try:
-            slot_date = date.fromisoformat(slot['slot_date'])
-        except (ValueError, KeyError, TypeError):
-            raise ValueError(f"Invalid slot_date: {slot.get('slot_date')}")
-
-        # Validate slot_date is within period range
-        if slot_date < period.start_date or slot_date > period.end_date:
-            raise ValueError(
-                f"slot_date {slot_date.isoformat()} is outside period range "
-                f"({period.start_date.isoformat()} - {period.end_date.isoformat()})"
-            )
-
-        # Validate time strings if provided
-        start_time = slot.get('start_time')
-        end_time = slot.get('end_time')
-        if start_time:
-            validate_time_str(start_time, 'start_time')
-        if end_time:
-            validate_time_str(end_time, 'end_time')
-
-        auto_start = slot.get('auto_calculated_start')
-        auto_end = slot.get('auto_calculated_end')
-        if auto_start:
-            validate_time_str(auto_start, 'auto_calculated_start')
-        if auto_end:
-            validate_time_str(auto_end, 'auto_calculated_end')
-
-        s = ShiftSubmissionSlot(
-            submission_id=submission.id,
-            slot_date=slot_date,
-            is_available=slot.get('is_available', False),
-            start_time=start_time,
-            end_time=end_time,
-            is_custom_time=slot.get('is_custom_time', False),
-            auto_calculated_start=auto_start,
-            auto_calculated_end=auto_end,
-            notes=slot.get('notes'),
-        )
-        db.session.add(s)
+        rows = db.session.query(
+            ShiftSubmissionSlot.id, ShiftSubmissionSlot.slot_date,
+            *(getattr(ShiftSubmissionSlot, f) for f in _SLOT_FIELDS),
+        ).filter(ShiftSubmissionSlot.submission_id == submission.id)
+        for row in rows:
+            # 送信されなかった日と、旧実装が残した同日の重複行は削除する
+            if row.slot_date in existing or row.slot_date not in slots:
+                stale_ids.append(row.id)
+            else:
+                existing[row.slot_date] = row
+
+    now = datetime.utcnow()
+    inserts = [
+        {'submission_id': submission.id, 'slot_date': d, 'created_at': now, 'updated_at': now, **values}
+        for d, values in slots.items() if d not in existing
+    ]
+    updates = [
+        {'id': existing[d].id, 'updated_at': now, **values}
+        for d, values in slots.items()
+        if d in existing and values != {f: getattr(existing[d], f) for f in _SLOT_FIELDS}
+    ]
 
     try:
+        if stale_ids:
+            db.session.execute(
+                delete(ShiftSubmissionSlot).where(ShiftSubmissionSlot.id.in_(stale_ids))
+            )
+        if inserts:
+            # ORM の一括 INSERT は None を含む列の組合せごとに文を分けるため、
+            # 休み（時刻 NULL）の日が混ざっても 1 回で済むようテーブルに対して発行する
+            db.session.execute(insert(ShiftSubmissionSlot.__table__), inserts)
+        if updates:
+            db.session.execute(update(ShiftSubmissionSlot), updates)
         db.session.commit()
     except Exception:
         db.session.rollback()
@@ -129,11 +199,21 @@ def create_or_update_submission(period_id, user_id, slots_data, notes=None):
 
 def get_submissions_for_period(period_id):
     """Get all submissions for a shift period with their slots."""
-    submissions = ShiftSubmission.query.filter_by(shift_period_id=period_id).all()
+    submissions = ShiftSubmission.query.options(
+        *eager(ShiftSubmission.user)
+    ).filter_by(shift_period_id=period_id).all()
+    # slots は dynamic relationship のため、期間分をまとめて 1 クエリで取得して振り分ける
+    slots_by_submission = {sub.id: [] for sub in submissions}
+    if submissions:
+        slots = ShiftSubmissionSlot.query.filter(
+            ShiftSubmissionSlot.submission_id.in_(list(slots_by_submission))
+        ).order_by(ShiftSubmissionSlot.id).all()
+        for slot in slots:
+            slots_by_submission[slot.submission_id].append(slot)
     result = []
     for sub in submissions:
         data = sub.to_dict()
-        data['slots'] = [s.to_dict() for s in sub.slots.all()]
+        data['slots'] = [s.to_dict() for s in slots_by_submission[sub.id]]
         result.append(data)
     return result
 
@@ -187,6 +267,8 @@ def save_schedule(period_id, created_by, entries_data, organization_id=None):
         db.session.flush()
     else:
         ShiftScheduleEntry.query.filter_by(schedule_id=schedule.id).delete()
+        # entries だけの変更では schedule 行が更新されず楽観ロックの version が進まない
+        schedule.updated_at = datetime.utcnow()
 
     for entry in entries_data:
         try:
@@ -222,24 +304,188 @@ def save_schedule(period_id, created_by, entries_data, organization_id=None):
     return schedule
 
 
+class ScheduleVersionConflict(Exception):
+    """The draft schedule was modified since the client loaded *expected_version*."""
+
+    def __init__(self, current_version):
+        super().__init__("Schedule version mismatch")
+        self.current_version = current_version
+
+
+def _parse_entry_key(item, period):
+    """Validate one ``{user_id, shift_date}`` key and return ``(user_id, date)``."""
+    user_id = item.get('user_id') if isinstance(item, dict) else None
+    if not isinstance(user_id, int) or isinstance(user_id, bool):
+        raise ValueError(f"Invalid user_id: {user_id!r}")
+    try:
+        shift_date = date.fromisoformat(item['shift_date'])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"Invalid shift_date: {item.get('shift_date')}")
+    if shift_date < period.start_date or shift_date > period.end_date:
+        raise ValueError(
+            f"shift_date {shift_date.isoformat()} is outside period range "
+            f"({period.start_date.isoformat()} - {period.end_date.isoformat()})"
+        )
+    return user_id, shift_date
+
+
+def apply_schedule_changes(period_id, changes, organization_id=None, expected_version=None):
+    """Apply entry-level diffs to the period's draft schedule.
+
+    *changes* holds ``added`` / ``changed`` entries (``user_id``, ``shift_date``,
+    ``start_time``, ``end_time``) and ``removed`` keys (``user_id``,
+    ``shift_date``).  Entries are identified by (user_id, shift_date); only
+    the touched keys are validated and looked up, and writes go out as one
+    bulk DELETE / INSERT / UPDATE each, so the cost does not grow with the
+    size of the schedule.  Untouched rows keep their id and calendar sync
+    state.  The table does not enforce one row per key (the full save can
+    write several), so a touched key with extra rows is collapsed: removed
+    deletes them all, changed updates one (preferring a row with a calendar
+    event, then the oldest) and deletes the rest.
+
+    The schedule's ``updated_at`` is bumped with a compare-and-set against
+    *expected_version* (or the value read here), raising
+    ScheduleVersionConflict if another save got in first.
+    """
+    period = db.session.get(ShiftPeriod, period_id)
+    if not period:
+        raise ValueError(f"Period {period_id} not found")
+    schedule = ShiftSchedule.query.filter_by(
+        shift_period_id=period_id, status='draft'
+    ).first()
+    if not schedule:
+        raise ValueError("No draft schedule exists for this period")
+
+    if expected_version is not None:
+        try:
+            seen_version = datetime.fromisoformat(expected_version)
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid expected_version: {expected_version!r}")
+    else:
+        seen_version = schedule.updated_at
+
+    added, changed, removed = {}, {}, set()
+    seen_keys = set()
+    for kind in ('added', 'changed', 'removed'):
+        items = changes.get(kind) or []
+        if not isinstance(items, list):
+            raise ValueError(f"'{kind}' must be a list")
+        for item in items:
+            key = _parse_entry_key(item, period)
+            if key in seen_keys:
+                raise ValueError(f"Duplicate change for user_id={key[0]} shift_date={key[1].isoformat()}")
+            seen_keys.add(key)
+            if kind == 'removed':
+                removed.add(key)
+                continue
+            validate_time_str(item.get('start_time'), 'start_time')
+            validate_time_str(item.get('end_time'), 'end_time')
+            (added if kind == 'added' else changed)[key] = (item['start_time'], item['end_time'])
+
+    if organization_id and added:
+        user_ids = {uid for uid, _ in added}
+        valid_user_ids = {uid for (uid,) in db.session.query(User.id).filter(
+            User.id.in_(user_ids),
+            User.organization_id == organization_id,
+            User.is_active.is_(True),
+            User.role == 'worker',
+        )}
+        invalid_ids = user_ids - valid_user_ids
+        if invalid_ids:
+            raise ValueError(
+                f"Invalid user_ids: {sorted(invalid_ids)}. "
+                "Users must exist, belong to this organization, be active, and have worker role."
+            )
+
+    existing, extra_ids = {}, []
+    if seen_keys:
+        rows = db.session.query(
+            ShiftScheduleEntry.id, ShiftScheduleEntry.user_id, ShiftScheduleEntry.shift_date,
+        ).filter(
+            ShiftScheduleEntry.schedule_id == schedule.id,
+            tuple_(ShiftScheduleEntry.user_id, ShiftScheduleEntry.shift_date).in_(list(seen_keys)),
+        ).order_by(ShiftScheduleEntry.calendar_event_id.is_(None), ShiftScheduleEntry.id)
+        for entry_id, uid, d in rows:
+            if (uid, d) in existing:
+                extra_ids.append(entry_id)  # duplicate row for an already-seen key
+            else:
+                existing[(uid, d)] = entry_id
+    for key in added:
+        if key in existing:
+            raise ValueError(f"Entry already exists: user_id={key[0]} shift_date={key[1].isoformat()}")
+    for key in list(changed) + list(removed):
+        if key not in existing:
+            raise ValueError(f"Entry not found: user_id={key[0]} shift_date={key[1].isoformat()}")
+
+    now = datetime.utcnow()
+    try:
+        bumped = db.session.execute(
+            update(ShiftSchedule)
+            .where(
+                ShiftSchedule.id == schedule.id,
+                ShiftSchedule.status == 'draft',
+                ShiftSchedule.updated_at == seen_version,
+            )
+            .values(updated_at=now)
+        )
+        if bumped.rowcount != 1:
+            db.session.rollback()
+            current = db.session.get(ShiftSchedule, schedule.id)
+            raise ScheduleVersionConflict(
+                current.updated_at.isoformat() if current and current.updated_at else None
+            )
+
+        doomed = [existing[key] for key in removed] + extra_ids
+        if doomed:
+            db.session.execute(
+                delete(ShiftScheduleEntry).where(ShiftScheduleEntry.id.in_(doomed))
+            )
+        if added:
+            db.session.execute(insert(ShiftScheduleEntry), [
+                {
+                    'schedule_id': schedule.id, 'user_id': uid, 'shift_date': d,
+                    'start_time': start, 'end_time': end, 'created_at': now, 'updated_at': now,
+                }
+                for (uid, d), (start, end) in added.items()
+            ])
+        if changed:
+            db.session.execute(update(ShiftScheduleEntry), [
+                {'id': existing[key], 'start_time': start, 'end_time': end, 'updated_at': now}
+                for key, (start, end) in changed.items()
+            ])
+        db.session.commit()
+    except ScheduleVersionConflict:
+        raise
+    except Exception:
+        db.session.rollback()
+        raise
+    return schedule
+
+
 def get_worker_hours_summary(schedule_id):
-    """Calculate total hours per worker for a schedule."""
-    entries = ShiftScheduleEntry.query.filter_by(schedule_id=schedule_id).all()
-    summary = {}
-    for entry in entries:
-        uid = entry.user_id
-        if uid not in summary:
-            summary[uid] = {
-                'user_id': uid,
-                'user_name': entry.user.display_name if entry.user else None,
-                'total_hours': 0,
-                'shift_count': 0,
-            }
-        start_mins = int(entry.start_time.split(':')[0]) * 60 + int(entry.start_time.split(':')[1])
-        end_mins = int(entry.end_time.split(':')[0]) * 60 + int(entry.end_time.split(':')[1])
-        summary[uid]['total_hours'] += (end_mins - start_mins) / 60
-        summary[uid]['shift_count'] += 1
-    return list(summary.values())
+    """Calculate total hours per worker for a schedule.
+
+    Durations are summed in SQL from the generated *_minutes columns;
+    workers are listed in order of their first entry.
+    """
+    rows = db.session.query(
+        ShiftScheduleEntry.user_id,
+        User.display_name,
+        func.sum(ShiftScheduleEntry.end_minutes - ShiftScheduleEntry.start_minutes),
+        func.count(ShiftScheduleEntry.id),
+    ).outerjoin(
+        User, User.id == ShiftScheduleEntry.user_id
+    ).filter(
+        ShiftScheduleEntry.schedule_id == schedule_id
+    ).group_by(
+        ShiftScheduleEntry.user_id, User.display_name
+    ).order_by(func.min(ShiftScheduleEntry.id))
+    return [{
+        'user_id': uid,
+        'user_name': display_name,
+        'total_hours': (minutes or 0) / 60,
+        'shift_count': shift_count,
+    } for uid, display_name, minutes, shift_count in rows]
 
 
 def get_period_impact_summary(period):
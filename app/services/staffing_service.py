@@ -7,12 +7,24 @@
 
 シフト構築画面では、ここから取得した requirements と Admin が
 割り当てた entries を組み合わせて、時間帯ごとの過不足を可視化する。
+get_period_coverage() はその突き合わせをサーバー側で期間全体について行う。
 """
 
+from datetime import timedelta
+from itertools import accumulate
+
 from app.extensions import db
+from app.models.shift import ShiftScheduleEntry
 from app.models.staffing import StaffingRequirement
+from app.services.shift_service import get_opening_hours_for_period, _to_schema_dow
+from app.utils.time_utils import minutes_to_time_str
 from app.utils.validators import validate_time_str
 
+MINUTES_PER_DAY = 24 * 60
+
+# get_period_coverage() の時間帯行列の刻み（分）
+COVERAGE_RESOLUTIONS = (15, 30, 60)
+
 
 def get_requirements(org) -> list[dict]:
     """組織の必要人数設定を曜日順 + 時刻順で返す。"""
@@ -59,6 +71,134 @@ def get_demand_for_weekday(org, day_of_week: int) -> list[dict]:
     return [r.to_dict() for r in rows]
 
 
+def get_period_coverage(org, period, schedule=None, resolution=30) -> dict:
+    """期間の必要人数と割当人数を日 × 時間帯で突き合わせる。
+
+    日ごとに必要人数帯と ShiftScheduleEntry の区間を差分配列
+    （開始分に +n、終了分に -n）へ積み、累積和で分単位の人数配列にする。
+    コストは区間数 + 日数 × 1440 で、割当数が増えても走査は増えない。
+    schedule が None のときは割当 0 として扱う。
+
+    返り値:
+      slot_starts: 時間帯行列の列（resolution 分刻み、需要・割当のある範囲だけ）
+      days[]:      日ごとの required / assigned 行（各時間帯内の必要人数の最大値 /
+                   割当人数の最小値。時間帯の一部でも欠ければ不足として見える）と
+                   必要人数帯ごとの不足 (shortage) ・過剰 (overstaffed)
+      summary:     延べ必要 / 充足時間と充足率（必要 0 のときは null）
+    """
+    if resolution not in COVERAGE_RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {COVERAGE_RESOLUTIONS}")
+
+    bands_by_dow = {}
+    for dow, start, end, count in db.session.query(
+        StaffingRequirement.day_of_week, StaffingRequirement.start_minutes,
+        StaffingRequirement.end_minutes, StaffingRequirement.required_count,
+    ).filter(
+        StaffingRequirement.organization_id == org.id,
+    ).order_by(StaffingRequirement.start_minutes):
+        bands_by_dow.setdefault(dow, []).append((start, end, count))
+
+    entries_by_date = {}
+    if schedule is not None:
+        for shift_date, start, end in db.session.query(
+            ShiftScheduleEntry.shift_date, ShiftScheduleEntry.start_minutes, ShiftScheduleEntry.end_minutes,
+        ).filter(
+            ShiftScheduleEntry.schedule_id == schedule.id,
+            ShiftScheduleEntry.end_minutes > ShiftScheduleEntry.start_minutes,
+        ):
+            entries_by_date.setdefault(shift_date, []).append((start, end))
+
+    hours_by_date = get_opening_hours_for_period(org.id, period.start_date, period.end_date)
+    # 営業時間が 1 日も設定されていない組織では休業日を判定できないので、必要人数をそのまま使う
+    closures_known = any(h is not None for h in hours_by_date.values())
+
+    days = []
+    first_minute, last_minute = MINUTES_PER_DAY, 0
+    current = period.start_date
+    while current <= period.end_date:
+        dow = _to_schema_dow(current)
+        closed = closures_known and hours_by_date.get(current.isoformat()) is None
+        bands = [] if closed else bands_by_dow.get(dow, [])
+        intervals = entries_by_date.get(current, [])
+
+        required_diff = [0] * (MINUTES_PER_DAY + 1)
+        for start, end, count in bands:
+            required_diff[start] += count
+            required_diff[end] -= count
+        assigned_diff = [0] * (MINUTES_PER_DAY + 1)
+        for start, end in intervals:
+            assigned_diff[start] += 1
+            assigned_diff[end] -= 1
+        required = list(accumulate(required_diff))
+        assigned = list(accumulate(assigned_diff))
+
+        for start, end, *_ in bands + intervals:
+            first_minute = min(first_minute, start)
+            last_minute = max(last_minute, end)
+        days.append((current, dow, closed, bands, required, assigned, len(intervals)))
+        current += timedelta(days=1)
+
+    if first_minute >= last_minute:
+        slot_edges = []
+    else:
+        first_minute -= first_minute % resolution
+        slot_edges = list(range(first_minute, last_minute, resolution))
+
+    result_days = []
+    required_minutes = covered_minutes = 0
+    short_bands = overstaffed_bands = 0
+    for current, dow, closed, bands, required, assigned, shift_count in days:
+        day_required = sum(required[:MINUTES_PER_DAY])
+        day_covered = sum(map(min, required[:MINUTES_PER_DAY], assigned[:MINUTES_PER_DAY]))
+        required_minutes += day_required
+        covered_minutes += day_covered
+
+        band_stats = []
+        for start, end, count in bands:
+            window = assigned[start:end]
+            stat = {
+                'start_time': minutes_to_time_str(start),
+                'end_time': minutes_to_time_str(end),
+                'required_count': count,
+                'min_assigned': min(window),
+                'max_assigned': max(window),
+                'shortage': max(count - min(window), 0),
+                'overstaffed': max(max(window) - count, 0),
+                'short_minutes': sum(1 for n in window if n < count),
+                'over_minutes': sum(1 for n in window if n > count),
+            }
+            short_bands += stat['shortage'] > 0
+            overstaffed_bands += stat['overstaffed'] > 0
+            band_stats.append(stat)
+
+        result_days.append({
+            'date': current.isoformat(),
+            'day_of_week': dow,
+            'closed': closed,
+            'shift_count': shift_count,
+            'required': [max(required[m:min(m + resolution, MINUTES_PER_DAY)]) for m in slot_edges],
+            'assigned': [min(assigned[m:min(m + resolution, MINUTES_PER_DAY)]) for m in slot_edges],
+            'bands': band_stats,
+            'coverage_rate': round(day_covered / day_required, 4) if day_required else None,
+        })
+
+    return {
+        'period_id': period.id,
+        'schedule_id': schedule.id if schedule is not None else None,
+        'resolution': resolution,
+        'slot_starts': [minutes_to_time_str(m) for m in slot_edges],
+        'days': result_days,
+        'summary': {
+            'required_person_hours': round(required_minutes / 60, 2),
+            'covered_person_hours': round(covered_minutes / 60, 2),
+            'coverage_rate': round(covered_minutes / required_minutes, 4) if required_minutes else None,
+            'short_bands': short_bands,
+            'overstaffed_bands': overstaffed_bands,
+            'short_days': [d['date'] for d in result_days if any(b['shortage'] for b in d['bands'])],
+        },
+    }
+
+
 def _validate_items(items) -> list[dict]:
     """入力リストを正規化して返す。失敗時 ValueError。"""
     if not isinstance(items, list):
@@ -3,13 +3,37 @@
 Called by the cron endpoint to drain the queue.  Each task_type maps
 to a handler function.  Failed handlers trigger retry with exponential
 backoff.
+
+Tasks are claimed atomically with a lease (SELECT ... FOR UPDATE SKIP LOCKED
+on PostgreSQL, a compare-and-set UPDATE elsewhere), so overlapping runs —
+Vercel cron plus a manual /api/master/tasks/process-now — never execute the
+same task twice.  Leases left behind by a runner that died (function
+timeout) are returned to the queue by reap_expired_leases().
+
+With TASK_RUNNER_CONCURRENCY > 1 the claimed batch is executed on a bounded
+thread pool (each task in its own app context, hence its own scoped DB
+session).  Handlers may declare a concurrency key so that, for example, no
+more than two calls hit Google for the same user at once.  Each batch runs
+inside mail_transport.pooled_delivery(), so queued emails share
+authenticated SMTP sessions instead of connecting once per message.
+
+drain_pending_tasks() keeps claiming batches until the queue is empty or a
+wall-clock budget (TASK_DRAIN_BUDGET_SECONDS) runs out, so one cron run can
+deliver a whole period-open blast instead of 20 tasks a day.
 """
 
 import logging
-from datetime import datetime
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, case, func, insert, or_, update
 
 from app.extensions import db
 from app.models.async_task import AsyncTask
+from app.services.mail_transport import pooled_delivery
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +42,29 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 _HANDLERS = {}
+_CONCURRENCY_KEYS = {}
+
+# How long a claimed task may run before it is presumed abandoned.
+# Comfortably longer than any serverless function timeout.
+LEASE_SECONDS = 600
+
+# Max tasks running at once per concurrency-key namespace (concurrent mode only)
+CONCURRENCY_LIMITS = {
+    'google_user': 2,   # Google API calls made with one user's credentials
+    'schedule': 1,      # whole-schedule calendar sync
+}
 
 
-def register_handler(task_type):
-    """Decorator to register a handler for a task type."""
+def register_handler(task_type, *, concurrency_key=None):
+    """Decorator to register a handler for a task type.
+
+    `concurrency_key(payload)` may return a ``(namespace, value)`` tuple;
+    tasks sharing a key run at most CONCURRENCY_LIMITS[namespace] at a time.
+    """
     def decorator(fn):
         _HANDLERS[task_type] = fn
+        if concurrency_key is not None:
+            _CONCURRENCY_KEYS[task_type] = concurrency_key
         return fn
     return decorator
 
@@ -44,7 +85,8 @@ def _handle_send_email(payload):
         raise RuntimeError("Email send failed (SMTP error or not configured)")
 
 
-@register_handler('sync_calendar_event')
+@register_handler('sync_calendar_event',
+                  concurrency_key=lambda p: ('google_user', p.get('user_id')))
 def _handle_sync_calendar_event(payload):
     from app.services.calendar_service import create_event
     from app.services.auth_service import get_credentials_for_user
@@ -81,66 +123,382 @@ def _handle_sync_calendar_event(payload):
         db.session.commit()
 
 
+@register_handler('sync_schedule',
+                  concurrency_key=lambda p: ('schedule', p.get('schedule_id')))
+def _handle_sync_schedule(payload):
+    """Sync every unsynced entry of a confirmed schedule (batched per worker).
+
+    Results are committed per batch, so the admin UI can poll progress.
+    Temporary Google failures raise to get the task retried with backoff;
+    already-synced entries are skipped on the retry.
+    """
+    from app.services.schedule_sync_service import sync_schedule_to_calendar
+
+    results = sync_schedule_to_calendar(payload['schedule_id'])
+    temporary = sum(1 for r in results if r.get('errorCode') == 'CALENDAR_TEMPORARY_FAILURE')
+    if temporary:
+        raise RuntimeError(f"{temporary} calendar writes failed temporarily")
+
+
 # ---------------------------------------------------------------------------
 # Runner
 # ---------------------------------------------------------------------------
 
-def process_pending_tasks(batch_size=20):
-    """Process up to *batch_size* pending tasks.
+def _run_task(task, handler):
+    """Run a claimed (running) task and record the outcome.
+
+    Returns 'succeeded', 'failed' (will retry) or 'dead'.
+    """
+    # started_at marks the attempt as begun: from here an expired lease
+    # costs a retry.  The lease is renewed so it counts from the start.
+    task.mark_running(lease_seconds=LEASE_SECONDS)
+    db.session.commit()
+    try:
+        handler(task.payload)
+        task.mark_completed()
+        db.session.commit()
+        logger.info("Task %s (%s) completed", task.id, task.task_type)
+        return 'succeeded'
+    except Exception as exc:
+        db.session.rollback()
+        # Re-fetch after rollback
+        task = db.session.get(AsyncTask, task.id)
+        task.mark_failed(str(exc))
+        db.session.commit()
+        if task.status == 'dead':
+            logger.error("Task %s (%s) dead after %d retries: %s",
+                         task.id, task.task_type, task.max_retries, exc)
+            return 'dead'
+        logger.warning("Task %s (%s) failed (retry %d/%d): %s",
+                       task.id, task.task_type, task.retry_count,
+                       task.max_retries, exc)
+        return 'failed'
+
+
+def _run_task_in_context(app, task_id):
+    """Thread-pool entry point: own app context → own scoped session."""
+    with app.app_context():
+        task = db.session.get(AsyncTask, task_id)
+        return _run_task(task, _HANDLERS[task.task_type])
+
+
+def _concurrency_key(task):
+    key_fn = _CONCURRENCY_KEYS.get(task.task_type)
+    return key_fn(task.payload or {}) if key_fn else None
+
+
+def _run_concurrently(queue, width, stats, deadline=None):
+    """Execute claimed ``(task_id, key)`` items on *width* threads, honouring key limits.
 
-    Returns a summary dict with counts of processed/succeeded/failed tasks.
+    No new task is started once *deadline* has passed; the ids left in the
+    queue are returned so the caller can release them.
+    """
+    app = current_app._get_current_object()
+    active = Counter()
+    in_flight = {}
+    unstarted = []
+
+    with ThreadPoolExecutor(max_workers=width, thread_name_prefix='task-runner') as pool:
+        while queue or in_flight:
+            if queue and deadline is not None and time.perf_counter() >= deadline:
+                unstarted.extend(task_id for task_id, _ in queue)
+                queue.clear()
+            for item in list(queue):
+                if len(in_flight) >= width:
+                    break
+                task_id, key = item
+                if key is not None and active[key] >= CONCURRENCY_LIMITS.get(key[0], width):
+                    continue
+                queue.remove(item)
+                active[key] += 1
+                in_flight[pool.submit(_run_task_in_context, app, task_id)] = item
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                task_id, key = in_flight.pop(future)
+                active[key] -= 1
+                try:
+                    outcome = future.result()
+                except Exception:
+                    logger.exception("Task %s crashed outside its handler", task_id)
+                    outcome = 'failed'
+                stats[outcome] += 1
+    return unstarted
+
+
+def _release_unstarted(task_ids):
+    """Hand claimed tasks that never started back to the queue, without charging a retry."""
+    db.session.execute(
+        update(AsyncTask)
+        .where(AsyncTask.id.in_(task_ids), AsyncTask.status == 'running')
+        .values(status='pending', started_at=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def claim_tasks(batch_size=20, lease_seconds=LEASE_SECONDS):
+    """Atomically claim up to *batch_size* due tasks and lease them to the caller.
+
+    On PostgreSQL candidate rows are locked with FOR UPDATE SKIP LOCKED, so
+    concurrent runners pick disjoint batches without waiting on each other.
+    The status='pending' guard on the UPDATE makes the claim a
+    compare-and-set on every backend (SQLite in tests): a row another runner
+    claimed first is simply not returned.  started_at stays empty until the
+    task actually starts (see _run_task).  Commits the claim.
     """
     now = datetime.utcnow()
-    tasks = (
-        AsyncTask.query
+    candidates = (
+        db.session.query(AsyncTask.id)
         .filter(AsyncTask.status == 'pending', AsyncTask.next_run_at <= now)
         .order_by(AsyncTask.priority.desc(), AsyncTask.created_at.asc())
         .limit(batch_size)
+    )
+    if db.engine.dialect.name == 'postgresql':
+        candidates = candidates.with_for_update(skip_locked=True)
+    ids = [row.id for row in candidates]
+    if not ids:
+        db.session.commit()
+        return []
+
+    claimed = db.session.execute(
+        update(AsyncTask)
+        .where(AsyncTask.id.in_(ids), AsyncTask.status == 'pending')
+        .values(status='running', started_at=None,
+                lease_expires_at=now + timedelta(seconds=lease_seconds))
+        .returning(AsyncTask.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.session.commit()
+    if not claimed:
+        return []
+    return (
+        AsyncTask.query
+        .filter(AsyncTask.id.in_(claimed))
+        .order_by(AsyncTask.priority.desc(), AsyncTask.created_at.asc())
         .all()
     )
 
-    stats = {'processed': 0, 'succeeded': 0, 'failed': 0, 'dead': 0}
+
+def reap_expired_leases(lease_seconds=LEASE_SECONDS):
+    """Return running tasks whose lease has expired to the queue.
+
+    An expired lease on a task that started counts as a failed attempt
+    (retry_count + 1), so a task that keeps timing out eventually goes dead
+    instead of looping forever.  Tasks that were claimed but never started
+    (their runner died first) are requeued without a charge.  Rows claimed
+    before leases existed fall back to started_at.
+    Returns ``{'requeued': n, 'dead': m}``.
+    """
+    now = datetime.utcnow()
+    unstarted = db.session.execute(
+        update(AsyncTask)
+        .where(AsyncTask.status == 'running', AsyncTask.started_at.is_(None),
+               AsyncTask.lease_expires_at < now)
+        .values(status='pending', lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    expired = and_(
+        AsyncTask.status == 'running',
+        AsyncTask.started_at.isnot(None),
+        or_(
+            AsyncTask.lease_expires_at < now,
+            and_(AsyncTask.lease_expires_at.is_(None),
+                 AsyncTask.started_at < now - timedelta(seconds=lease_seconds)),
+        ),
+    )
+    common = {
+        'retry_count': AsyncTask.retry_count + 1,
+        'lease_expires_at': None,
+        'error_message': 'Lease expired before the task finished',
+    }
+    dead = db.session.execute(
+        update(AsyncTask)
+        .where(expired, AsyncTask.retry_count + 1 >= AsyncTask.max_retries)
+        .values(status='dead', completed_at=now, **common)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    requeued = db.session.execute(
+        update(AsyncTask)
+        .where(expired)
+        .values(status='pending', next_run_at=now, **common)
+        .execution_options(synchronize_session=False)
+    ).rowcount + unstarted
+    db.session.commit()
+    if dead or requeued:
+        logger.warning("Reaped expired task leases: %d requeued, %d dead", requeued, dead)
+    return {'requeued': requeued, 'dead': dead}
+
+
+def process_pending_tasks(batch_size=20, concurrency=None, deadline=None):
+    """Process up to *batch_size* pending tasks.
+
+    Expired leases are reaped first, then a batch is claimed atomically.
+    *concurrency* (default: TASK_RUNNER_CONCURRENCY config, 1 = sequential)
+    is the thread-pool width.  *deadline* is an absolute time.perf_counter()
+    value: claimed tasks not started by then are released back to the queue
+    (``deferred``) instead of running past the caller's time limit.
+    Returns a summary dict with counts of processed/succeeded/failed tasks
+    plus elapsed time and throughput.
+    """
+    if concurrency is None:
+        concurrency = current_app.config.get('TASK_RUNNER_CONCURRENCY', 1)
+    started = time.perf_counter()
+
+    reaped = reap_expired_leases()
+    tasks = claim_tasks(batch_size)
+
+    stats = {'processed': 0, 'succeeded': 0, 'failed': 0, 'dead': 0, 'deferred': 0,
+             'reaped': reaped['requeued'] + reaped['dead']}
+    runnable = []
 
     for task in tasks:
+        stats['processed'] += 1
         handler = _HANDLERS.get(task.task_type)
         if handler is None:
             logger.error("No handler for task type %r (task %s)", task.task_type, task.id)
             task.mark_failed(f"Unknown task type: {task.task_type}")
             task.status = 'dead'  # no point retrying
-            db.session.commit()
-            stats['processed'] += 1
             stats['dead'] += 1
             continue
+        runnable.append((task, task.id, _concurrency_key(task)))
+    db.session.commit()
 
-        task.mark_running()
-        db.session.commit()
-        stats['processed'] += 1
-
-        try:
-            handler(task.payload)
-            task.mark_completed()
-            db.session.commit()
-            stats['succeeded'] += 1
-            logger.info("Task %s (%s) completed", task.id, task.task_type)
-        except Exception as exc:
-            db.session.rollback()
-            # Re-fetch after rollback
-            task = db.session.get(AsyncTask, task.id)
-            task.mark_failed(str(exc))
-            db.session.commit()
-            if task.status == 'dead':
-                stats['dead'] += 1
-                logger.error("Task %s (%s) dead after %d retries: %s",
-                             task.id, task.task_type, task.max_retries, exc)
-            else:
-                stats['failed'] += 1
-                logger.warning("Task %s (%s) failed (retry %d/%d): %s",
-                               task.id, task.task_type, task.retry_count,
-                               task.max_retries, exc)
+    # send_email handlers share authenticated SMTP sessions for the batch
+    unstarted = []
+    with pooled_delivery():
+        if concurrency <= 1:
+            for i, (task, _, _) in enumerate(runnable):
+                if deadline is not None and time.perf_counter() >= deadline:
+                    unstarted = [task_id for _, task_id, _ in runnable[i:]]
+                    break
+                stats[_run_task(task, _HANDLERS[task.task_type])] += 1
+        elif runnable:
+            unstarted = _run_concurrently([(task_id, key) for _, task_id, key in runnable],
+                                          min(concurrency, len(runnable)), stats, deadline)
+    if unstarted:
+        _release_unstarted(unstarted)
+        stats['processed'] -= len(unstarted)
+        stats['deferred'] = len(unstarted)
 
+    elapsed = time.perf_counter() - started
+    stats['concurrency'] = max(1, concurrency)
+    stats['elapsed_ms'] = round(elapsed * 1000, 1)
+    stats['tasks_per_sec'] = round(stats['processed'] / elapsed, 2) if elapsed > 0 else 0.0
     return stats
 
 
+def queue_backlog():
+    """Snapshot of the pending queue with one aggregate query.
+
+    ``pending`` counts every pending task, ``due`` only those runnable now;
+    ``oldest_pending_age_seconds`` is the age of the oldest due task
+    (None when nothing is due).
+    """
+    now = datetime.utcnow()
+    is_due = AsyncTask.next_run_at <= now
+    pending, due, oldest = (
+        db.session.query(
+            func.count(AsyncTask.id),
+            func.count(case((is_due, AsyncTask.id))),
+            func.min(case((is_due, AsyncTask.created_at))),
+        )
+        .filter(AsyncTask.status == 'pending')
+        .one()
+    )
+    return {
+        'pending': pending,
+        'due': due,
+        'oldest_pending_age_seconds': round((now - oldest).total_seconds(), 1) if oldest else None,
+    }
+
+
+_DRAIN_COUNTERS = ('processed', 'succeeded', 'failed', 'dead', 'deferred', 'reaped')
+
+
+def drain_pending_tasks(budget_seconds=None, batch_size=20, concurrency=None, deadline=None):
+    """Process batches until no task is due or the time budget runs out.
+
+    *deadline* is an absolute time.perf_counter() value; callers that do
+    other work first (the cron endpoint sends reminders) pass the deadline
+    of their whole run.  Without it the budget is *budget_seconds* from now
+    (default TASK_DRAIN_BUDGET_SECONDS).  A new batch is only claimed when
+    the time left exceeds the slowest batch seen so far, and each task is
+    checked against the deadline before it starts, so the run ends inside
+    the caller's function timeout.  Returns the summed batch stats plus
+    throughput and the remaining backlog (see queue_backlog()).
+    """
+    if budget_seconds is None:
+        budget_seconds = current_app.config.get('TASK_DRAIN_BUDGET_SECONDS', 50)
+    started = time.perf_counter()
+    if deadline is None:
+        deadline = started + budget_seconds
+    totals = Counter()
+    batches = 0
+    slowest = 0.0
+    budget_exhausted = False
+
+    with pooled_delivery():  # keep SMTP sessions open across batches
+        while True:
+            batch_started = time.perf_counter()
+            remaining = deadline - batch_started
+            if remaining <= 0 or (batches and remaining < slowest):
+                budget_exhausted = True
+                break
+            stats = process_pending_tasks(batch_size=batch_size, concurrency=concurrency,
+                                          deadline=deadline)
+            batches += 1
+            slowest = max(slowest, time.perf_counter() - batch_started)
+            for key in _DRAIN_COUNTERS:
+                totals[key] += stats[key]
+            concurrency = stats['concurrency']
+            if stats['deferred']:
+                budget_exhausted = True
+                break
+            if stats['processed'] < batch_size:
+                break  # queue has no more due tasks
+
+    elapsed = time.perf_counter() - started
+    result = {key: totals[key] for key in _DRAIN_COUNTERS}
+    result.update({
+        'batches': batches,
+        'concurrency': concurrency,
+        'budget_seconds': budget_seconds,
+        'budget_exhausted': budget_exhausted,
+        'elapsed_ms': round(elapsed * 1000, 1),
+        'tasks_per_sec': round(result['processed'] / elapsed, 2) if elapsed > 0 else 0.0,
+        'backlog': queue_backlog(),
+    })
+    return result
+
+
+def drain_after_response(response, budget_seconds=None):
+    """Run a bounded drain_pending_tasks() once *response* has been sent.
+
+    For requests that enqueue work the user is waiting on (async schedule
+    confirm), so it does not sit in the queue until the next cron run.
+    *budget_seconds* defaults to TASK_DRAIN_AFTER_RESPONSE_SECONDS; 0
+    disables the drain.  Returns *response*.
+    """
+    if budget_seconds is None:
+        budget_seconds = current_app.config.get('TASK_DRAIN_AFTER_RESPONSE_SECONDS', 0)
+    if budget_seconds <= 0:
+        return response
+    app = current_app._get_current_object()
+
+    def _drain():
+        with app.app_context():
+            try:
+                stats = drain_pending_tasks(budget_seconds=budget_seconds)
+                logger.info("Post-response drain: %s", stats)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Post-response drain failed")
+
+    response.call_on_close(_drain)
+    return response
+
+
 # ---------------------------------------------------------------------------
 # Task creation helpers
 # ---------------------------------------------------------------------------
@@ -163,6 +521,31 @@ def enqueue_email(to_email, subject, body_html, *, organization_id=None, created
     return task
 
 
+def enqueue_emails(messages, *, organization_id=None, created_by=None, priority=0):
+    """Bulk-enqueue ``{'to_email', 'subject', 'body_html'}`` dicts with one INSERT.
+
+    A message may carry its own ``organization_id`` (multi-tenant blasts).
+    Does not commit.  Returns the number of tasks enqueued.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            'task_type': 'send_email',
+            'payload': {key: m[key] for key in ('to_email', 'subject', 'body_html')},
+            'status': 'pending',
+            'priority': priority,
+            'next_run_at': now,
+            'created_at': now,
+            'organization_id': m.get('organization_id', organization_id),
+            'created_by': created_by,
+        }
+        for m in messages
+    ]
+    if rows:
+        db.session.execute(insert(AsyncTask).execution_options(render_nulls=True), rows)
+    return len(rows)
+
+
 def enqueue_calendar_sync(user_id, entry_id, summary, start_datetime, end_datetime, *,
                           calendar_id='primary', description=None,
                           organization_id=None, created_by=None):
@@ -185,3 +568,33 @@ def enqueue_calendar_sync(user_id, entry_id, summary, start_datetime, end_dateti
     db.session.add(task)
     db.session.flush()
     return task
+
+
+def find_schedule_sync_task(schedule_id):
+    """Most recent sync_schedule task for a schedule, or None."""
+    return (
+        AsyncTask.query
+        .filter(
+            AsyncTask.task_type == 'sync_schedule',
+            AsyncTask.payload['schedule_id'].as_integer() == schedule_id,
+        )
+        .order_by(AsyncTask.id.desc())
+        .first()
+    )
+
+
+def enqueue_schedule_sync(schedule_id, *, organization_id=None, created_by=None):
+    """Enqueue a whole-schedule calendar sync, reusing an unfinished one."""
+    existing = find_schedule_sync_task(schedule_id)
+    if existing and existing.status in ('pending', 'running'):
+        return existing
+    task = AsyncTask(
+        task_type='sync_schedule',
+        payload={'schedule_id': schedule_id},
+        organization_id=organization_id,
+        created_by=created_by,
+        priority=5,  # calendar sync is higher priority
+    )
+    db.session.add(task)
+    db.session.flush()
+    return task
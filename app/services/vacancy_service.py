@@ -6,9 +6,10 @@ and the first to accept fills the slot.
 """
 
 import secrets
-from datetime import datetime, date, timedelta
+from datetime import datetime, timedelta
 
 from flask import current_app
+from sqlalchemy import case, exists, func, insert
 
 from app.extensions import db
 from app.models.user import User
@@ -17,7 +18,7 @@ from app.models.shift import (
 )
 from app.models.vacancy import VacancyRequest, VacancyCandidate, ShiftChangeLog
 from app.services.notification_service import (
-    notify_vacancy_request, notify_vacancy_accepted,
+    notify_vacancy_request_many, notify_vacancy_accepted,
 )
 from app.services.audit_service import log_audit
 
@@ -29,80 +30,73 @@ def find_candidates(schedule_entry_id, organization_id):
     2. Find workers who submitted availability for that date
     3. Exclude: original worker, already-assigned workers, inactive users
     4. Sort by weekly hours (ascending) for fairness
-    """
-    entry = db.session.get(ShiftScheduleEntry, schedule_entry_id)
-    if not entry:
-        return []
 
-    schedule = db.session.get(ShiftSchedule, entry.schedule_id)
-    if not schedule:
+    Steps 2-4 run as one query (the weekly hours come from a grouped
+    aggregate joined in), so the query count does not grow with the
+    number of workers.
+    """
+    target = db.session.query(ShiftScheduleEntry, ShiftSchedule.shift_period_id).join(
+        ShiftSchedule, ShiftScheduleEntry.schedule_id == ShiftSchedule.id
+    ).filter(ShiftScheduleEntry.id == schedule_entry_id).first()
+    if not target:
         return []
+    entry, shift_period_id = target
 
     shift_date = entry.shift_date
+    week_start = shift_date - timedelta(days=shift_date.weekday())
+    week_end = week_start + timedelta(days=6)
 
-    available_slots = db.session.query(
-        ShiftSubmissionSlot, ShiftSubmission
-    ).join(
-        ShiftSubmission, ShiftSubmissionSlot.submission_id == ShiftSubmission.id
+    weekly = db.session.query(
+        ShiftScheduleEntry.user_id.label('user_id'),
+        func.sum(_entry_minutes()).label('minutes'),
     ).filter(
-        ShiftSubmission.shift_period_id == schedule.shift_period_id,
-        ShiftSubmissionSlot.slot_date == shift_date,
-        ShiftSubmissionSlot.is_available == True,
-    ).all()
+        ShiftScheduleEntry.schedule_id == entry.schedule_id,
+        ShiftScheduleEntry.shift_date >= week_start,
+        ShiftScheduleEntry.shift_date <= week_end,
+    ).group_by(ShiftScheduleEntry.user_id).subquery()
 
-    assigned_user_ids = set(
-        row[0] for row in db.session.query(ShiftScheduleEntry.user_id).filter(
-            ShiftScheduleEntry.schedule_id == schedule.id,
-            ShiftScheduleEntry.shift_date == shift_date,
-        ).all()
+    assigned = exists().where(
+        ShiftScheduleEntry.schedule_id == entry.schedule_id,
+        ShiftScheduleEntry.shift_date == shift_date,
+        ShiftScheduleEntry.user_id == User.id,
     )
 
-    candidates = []
-    for slot, submission in available_slots:
-        user = db.session.get(User, submission.user_id)
-        if not user or not user.is_active:
-            continue
-        if user.id == entry.user_id:
-            continue
-        if user.id in assigned_user_ids:
-            continue
-
-        candidates.append({
-            'user_id': user.id,
-            'user_name': user.display_name or user.email,
-            'user_email': user.email,
-            'start_time': slot.start_time,
-            'end_time': slot.end_time,
-            'weekly_hours': _calc_weekly_hours(user.id, schedule.id, shift_date),
-        })
+    rows = db.session.query(
+        User.id, User.display_name, User.email,
+        ShiftSubmissionSlot.start_time, ShiftSubmissionSlot.end_time,
+        func.coalesce(weekly.c.minutes, 0),
+    ).select_from(ShiftSubmissionSlot).join(
+        ShiftSubmission, ShiftSubmissionSlot.submission_id == ShiftSubmission.id
+    ).join(
+        User, User.id == ShiftSubmission.user_id
+    ).outerjoin(
+        weekly, weekly.c.user_id == User.id
+    ).filter(
+        ShiftSubmission.shift_period_id == shift_period_id,
+        ShiftSubmissionSlot.slot_date == shift_date,
+        ShiftSubmissionSlot.is_available == True,
+        User.is_active == True,
+        User.id != entry.user_id,
+        ~assigned,
+    ).order_by(ShiftSubmissionSlot.id).all()
+
+    candidates = [{
+        'user_id': user_id,
+        'user_name': display_name or email,
+        'user_email': email,
+        'start_time': start_time,
+        'end_time': end_time,
+        'weekly_hours': round(minutes / 60, 1),
+    } for user_id, display_name, email, start_time, end_time, minutes in rows]
 
     candidates.sort(key=lambda c: c['weekly_hours'])
     return candidates
 
 
-def _calc_weekly_hours(user_id, schedule_id, target_date):
-    """Calculate total assigned hours for a user in the same week as target_date."""
-    weekday = target_date.weekday()
-    monday = target_date.toordinal() - weekday
-    week_start = date.fromordinal(monday)
-    week_end = week_start + timedelta(days=6)
-
-    entries = ShiftScheduleEntry.query.filter(
-        ShiftScheduleEntry.schedule_id == schedule_id,
-        ShiftScheduleEntry.user_id == user_id,
-        ShiftScheduleEntry.shift_date >= week_start,
-        ShiftScheduleEntry.shift_date <= week_end,
-    ).all()
-
-    total_minutes = 0
-    for e in entries:
-        start_parts = e.start_time.split(':')
-        end_parts = e.end_time.split(':')
-        start_min = int(start_parts[0]) * 60 + int(start_parts[1])
-        end_min = int(end_parts[0]) * 60 + int(end_parts[1])
-        total_minutes += max(0, end_min - start_min)
-
-    return round(total_minutes / 60, 1)
+def _entry_minutes():
+    """SQL expression for a ShiftScheduleEntry's length in minutes (never negative)."""
+    diff = ShiftScheduleEntry.end_minutes - ShiftScheduleEntry.start_minutes
+    return case((diff > 0, diff), else_=0)
 
 
 def create_vacancy_request(schedule_entry_id, reason, admin_user):
@@ -154,6 +148,11 @@ def create_vacancy_request(schedule_entry_id, reason, admin_user):
 def send_vacancy_notifications(vacancy_request_id, candidate_user_ids, base_url):
     """Send notification emails to selected candidates.
 
+    Users and existing candidate rows are loaded up front, and the new
+    VacancyCandidate rows and email tasks are each inserted with one
+    statement and committed together, so notifying the whole roster costs
+    a fixed number of queries.
+
     Returns (result_dict, error_string).
     """
     vacancy = db.session.get(VacancyRequest, vacancy_request_id)
@@ -163,53 +162,61 @@ def send_vacancy_notifications(vacancy_request_id, candidate_user_ids, base_url)
         return None, f'現在のステータス ({vacancy.status}) では通知を送信できません'
 
     entry = vacancy.schedule_entry
-    notified_count = 0
-
-    for user_id in candidate_user_ids:
-        user = db.session.get(User, user_id)
-        if not user or not user.is_active:
-            continue
-
-        existing = VacancyCandidate.query.filter_by(
-            vacancy_request_id=vacancy_request_id,
-            user_id=user_id,
-        ).first()
-        if existing:
+    user_ids = list(dict.fromkeys(candidate_user_ids))
+
+    # 対象ユーザーと既存の候補者行はそれぞれ 1 クエリでまとめて取得する
+    users = {
+        u.id: u for u in User.query.filter(User.id.in_(user_ids), User.is_active == True)
+    } if user_ids else {}
+    already_notified = {
+        row[0] for row in db.session.query(VacancyCandidate.user_id).filter(
+            VacancyCandidate.vacancy_request_id == vacancy_request_id,
+            VacancyCandidate.user_id.in_(list(users)),
+        )
+    } if users else set()
+
+    now = datetime.utcnow()
+    candidate_rows = []
+    recipients = []
+    for user_id in user_ids:
+        user = users.get(user_id)
+        if not user or user_id in already_notified:
             continue
 
         token = secrets.token_urlsafe(32)
-        candidate = VacancyCandidate(
-            vacancy_request_id=vacancy_request_id,
-            user_id=user_id,
-            status='notified',
-            response_token=token,
-            notified_at=datetime.utcnow(),
-        )
-        db.session.add(candidate)
-
-        accept_url = f"{base_url}/vacancy/respond?token={token}&action=accept"
-        decline_url = f"{base_url}/vacancy/respond?token={token}&action=decline"
-        try:
-            notify_vacancy_request(
-                to_email=user.email,
-                user_name=user.display_name or user.email,
-                shift_date=entry.shift_date.isoformat(),
-                start_time=entry.start_time,
-                end_time=entry.end_time,
-                reason=vacancy.reason or '',
-                accept_url=accept_url,
-                decline_url=decline_url,
-                organization_id=vacancy.original_user.organization_id if vacancy.original_user else None,
-            )
-        except Exception as e:
-            current_app.logger.error(f"Failed to send vacancy notification to {user.email}: {e}")
-
-        notified_count += 1
+        candidate_rows.append({
+            'vacancy_request_id': vacancy_request_id,
+            'user_id': user_id,
+            'status': 'notified',
+            'response_token': token,
+            'notified_at': now,
+            'created_at': now,
+        })
+        recipients.append({
+            'to_email': user.email,
+            'user_name': user.display_name or user.email,
+            'accept_url': f"{base_url}/vacancy/respond?token={token}&action=accept",
+            'decline_url': f"{base_url}/vacancy/respond?token={token}&action=decline",
+        })
+    notified_count = len(candidate_rows)
 
     vacancy.status = 'notified'
     vacancy.updated_at = datetime.utcnow()
 
     try:
+        # 候補者行と通知タスクを同じコミットで確定する
+        if candidate_rows:
+            db.session.execute(insert(VacancyCandidate).execution_options(render_nulls=True),
+                               candidate_rows)
+        notify_vacancy_request_many(
+            recipients,
+            shift_date=entry.shift_date.isoformat(),
+            start_time=entry.start_time,
+            end_time=entry.end_time,
+            reason=vacancy.reason or '',
+            organization_id=vacancy.original_user.organization_id if vacancy.original_user else None,
+            commit=False,
+        )
         db.session.commit()
     except Exception:
         db.session.rollback()
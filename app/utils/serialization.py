@@ -0,0 +1,31 @@
+"""Eager loading for list endpoints that serialize rows with ``to_dict()``.
+
+Several ``to_dict()`` methods read many-to-one relationships (``user``,
+``acceptor``, ``performer``, ``schedule_entry`` ...).  Serializing a list of
+such rows lazily loads each relationship once per row.  List endpoints
+declare what their rows' ``to_dict()`` reads and load it up front::
+
+    logs = ShiftChangeLog.query.options(*eager(
+        ShiftChangeLog.original_user, ShiftChangeLog.new_user,
+        ShiftChangeLog.performer, ShiftChangeLog.schedule_entry,
+    )).all()
+"""
+
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def eager(*relationships):
+    """Loader options for *relationships* (instrumented relationship attributes).
+
+    Many-to-one relationships are joined into the main query, which keeps
+    ``LIMIT`` correct and costs no extra round trip.  Collections are loaded
+    with one additional ``SELECT ... IN`` per relationship.  Dynamic
+    relationships cannot be eager loaded; query their target model instead.
+    """
+    options = []
+    for attr in relationships:
+        if attr.property.uselist:
+            options.append(selectinload(attr))
+        else:
+            options.append(joinedload(attr))
+    return options
@@ -1,14 +1,75 @@
+"""'HH:MM' ⇔ minutes-since-midnight codec.
+
+Times are stored as 'HH:MM' strings; every such column also has a
+generated integer ``*_minutes`` column computed by the database from
+``hhmm_minutes_sql()`` (via ``HHMMMinutes`` in the models), so durations
+and overlaps can be summed in SQL.
+Python code should go through ``hhmm_to_minutes`` / ``time_to_minutes``
+instead of splitting strings by hand.
+"""
+
+import re
 from datetime import time
 
-from app.utils.validators import validate_time_str
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import Integer
+
+HHMM_RE = re.compile(r'^([01]\d|2[0-3]):([0-5]\d)$')
+
+
+def hhmm_to_minutes(value):
+    """Parse 'HH:MM' (00:00-23:59) to minutes since midnight, or None if invalid."""
+    match = HHMM_RE.match(value) if isinstance(value, str) else None
+    if not match:
+        return None
+    return int(match[1]) * 60 + int(match[2])
+
+
+# Same strings as HHMM_RE: only valid values reach the CAST (which raises on
+# PostgreSQL for non-digits), so the column agrees with hhmm_to_minutes().
+_HHMM_GUARDS = {
+    'postgresql': "{col} ~ '^([01][0-9]|2[0-3]):[0-5][0-9]$'",
+    'sqlite': "({col} GLOB '[01][0-9]:[0-5][0-9]' OR {col} GLOB '2[0-3]:[0-5][0-9]')",
+}
+
+
+def hhmm_minutes_sql(column, dialect='postgresql'):
+    """DDL expression deriving minutes since midnight from an 'HH:MM' *column*.
+
+    Used for the generated ``*_minutes`` columns; NULL, '' and malformed
+    values yield NULL.  *dialect* is 'postgresql' or 'sqlite'.
+    """
+    guard = _HHMM_GUARDS[dialect].format(col=column)
+    return (
+        f"CASE WHEN {guard} THEN "
+        f"CAST(substr({column}, 1, 2) AS INTEGER) * 60 + CAST(substr({column}, 4, 2) AS INTEGER) "
+        f"END"
+    )
+
+
+class HHMMMinutes(ColumnElement):
+    """``hhmm_minutes_sql(column)`` rendered for the dialect being compiled (for db.Computed)."""
+
+    inherit_cache = True
+    type = Integer()
+
+    def __init__(self, column):
+        self.column = column
+
+
+@compiles(HHMMMinutes)
+def _compile_hhmm_minutes(element, compiler, **kw):
+    return hhmm_minutes_sql(element.column, compiler.dialect.name)
 
 
 def time_to_minutes(t):
     """Convert a time object or 'HH:MM' string to minutes since midnight."""
     if isinstance(t, str):
-        validate_time_str(t, 'time')
-        parts = t.split(':')
-        return int(parts[0]) * 60 + int(parts[1])
+        minutes = hhmm_to_minutes(t)
+        if minutes is None:
+            raise ValueError("time must be in HH:MM format (00:00-23:59)")
+        return minutes
     if isinstance(t, time):
         return t.hour * 60 + t.minute
     return 0
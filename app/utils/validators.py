@@ -1,7 +1,6 @@
-import re
 from datetime import datetime, date, time
 
-_TIME_RE = re.compile(r'^([01]\d|2[0-3]):[0-5]\d$')
+from app.utils.time_utils import hhmm_to_minutes
 
 
 def parse_date(date_str):
@@ -28,7 +27,7 @@ def validate_time_str(value, field_name='time'):
 
     Raises ValueError with a message referencing *field_name* on failure.
     """
-    if not isinstance(value, str) or not _TIME_RE.match(value):
+    if hhmm_to_minutes(value) is None:
         raise ValueError(f"{field_name} must be in HH:MM format (00:00-23:59)")
 
 
@@ -0,0 +1,63 @@
+"""add generated *_minutes columns for HH:MM time columns
+
+Revision ID: a9b8c7d6e5f4
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-18 16:20:41.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9b8c7d6e5f4'
+down_revision = 'f2a3b4c5d6e7'
+branch_labels = None
+depends_on = None
+
+
+TABLES = (
+    'shift_schedule_entries',
+    'shift_submission_slots',
+    'opening_hours',
+    'opening_hours_exceptions',
+    'opening_hours_calendar_sync',
+    'staffing_requirements',
+)
+
+
+_HHMM_GUARDS = {
+    'postgresql': "{col} ~ '^([01][0-9]|2[0-3]):[0-5][0-9]$'",
+    'sqlite': "({col} GLOB '[01][0-9]:[0-5][0-9]' OR {col} GLOB '2[0-3]:[0-5][0-9]')",
+}
+
+
+def _minutes_sql(column, dialect):
+    # app.utils.time_utils.hhmm_minutes_sql() と同じ式（マイグレーションは app に依存させない）
+    guard = _HHMM_GUARDS[dialect].format(col=column)
+    return (
+        f"CASE WHEN {guard} THEN "
+        f"CAST(substr({column}, 1, 2) AS INTEGER) * 60 + CAST(substr({column}, 4, 2) AS INTEGER) "
+        f"END"
+    )
+
+
+def _minutes(column, dialect):
+    # PostgreSQL は STORED のみ対応（追加時に既存行も計算される）。
+    # SQLite は ALTER TABLE で STORED 列を追加できないため VIRTUAL にする。
+    return sa.Computed(_minutes_sql(column, dialect), persisted=dialect != 'sqlite')
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('start_minutes', sa.Integer(), _minutes('start_time', dialect), nullable=True))
+            batch_op.add_column(sa.Column('end_minutes', sa.Integer(), _minutes('end_time', dialect), nullable=True))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('end_minutes')
+            batch_op.drop_column('start_minutes')
@@ -0,0 +1,38 @@
+"""add calendar_sync_states table
+
+Revision ID: e1f2a3b4c5d6
+Revises: d4310c2b47c0
+Create Date: 2026-10-18 10:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f2a3b4c5d6'
+down_revision = 'd4310c2b47c0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'calendar_sync_states',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('calendar_id', sa.String(length=255), nullable=False),
+        sa.Column('sync_token', sa.Text(), nullable=True),
+        sa.Column('time_min', sa.DateTime(), nullable=False),
+        sa.Column('time_max', sa.DateTime(), nullable=False),
+        sa.Column('events', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'calendar_id', name='uq_calendar_sync_state_user_cal'),
+    )
+
+
+def downgrade():
+    op.drop_table('calendar_sync_states')
@@ -0,0 +1,28 @@
+"""add lease_expires_at to async_tasks
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-18 14:05:12.402817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a3b4c5d6e7'
+down_revision = 'e1f2a3b4c5d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('async_tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_async_tasks_status_lease', ['status', 'lease_expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('async_tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_async_tasks_status_lease')
+        batch_op.drop_column('lease_expires_at')
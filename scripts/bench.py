@@ -0,0 +1,734 @@
+"""シフリー性能ベンチマーク.
+
+インメモリ SQLite に合成データを投入し、ホットパスの SQL 発行数と実行時間を計測する。
+本番 DB・Google API には一切接続しない。
+
+サブコマンド:
+  opening-hours   - 期間の営業時間解決（7 / 31 / 90 日、日次ループとの比較）
+  google-client   - Google API サービス生成の 1 イベントあたりオーバーヘッド（build() 毎回 vs 共有ファクトリ）
+  smtp            - メール送信スループット（1 通ごとに接続 vs SmtpPool）。ローカルのスタブ SMTP に送る
+  reminders       - 前日リマインダー cron のコスト（組織ループ方式 vs 集合指向）
+  settings        - 組織設定の読み出し（毎回 json.loads vs パース済みキャッシュ）。設定系 API も計測
+  auto-schedule   - 自動シフト作成（合成組織。貪欲法のみ vs 局所探索つき、DB 読込込みの全体時間）
+  schedule-save   - 下書きシフトの 1 セル編集の保存（全件削除→再挿入 vs 差分保存）。エントリ数ごとに計測
+  submissions     - 締切直前の提出バースト（全員の初回提出 → 数日だけ修正 → 同内容の再送）。旧実装と比較
+
+使用例:
+  python scripts/bench.py opening-hours
+  python scripts/bench.py --repeat 50 opening-hours
+  python scripts/bench.py google-client --events 300
+  python scripts/bench.py smtp --messages 200 --handshake-ms 40
+  python scripts/bench.py reminders --orgs 100 --shifts 50
+  python scripts/bench.py --repeat 200 settings --tiers 20
+  python scripts/bench.py --repeat 5 auto-schedule --workers 10 30 50 --days 31
+  python scripts/bench.py schedule-save --entries 100 500 2000
+  python scripts/bench.py submissions --workers 200 --days 31
+
+拡張:
+  新しい計測を増やすときは bench_xxx(args) を追加し、main() でサブコマンド登録する。
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+# ---------------------------------------------------------------------------
+# 共通ヘルパ
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def _app_context():
+    """テスト設定（sqlite:///:memory:）でアプリを起動し、スキーマを作成する."""
+    import warnings
+    warnings.filterwarnings("ignore")
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+@contextmanager
+def _count_queries():
+    """ブロック内で発行された SQL 文の数を数える."""
+    from sqlalchemy import event
+    from app.extensions import db
+
+    counter = _QueryCounter()
+    event.listen(db.engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(db.engine, "before_cursor_execute", counter)
+
+
+def _measure(fn, repeat):
+    """fn を repeat 回実行し、(1 回あたりの SQL 数, 1 回あたりのミリ秒) を返す."""
+    with _count_queries() as counter:
+        fn()
+    queries = counter.count
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+    return queries, elapsed_ms
+
+
+def _print_table(headers, rows):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for r in rows:
+        print("  ".join(str(v).rjust(w) for v, w in zip(r, widths)))
+
+
+def _seed_org(name="Bench Org"):
+    from app.extensions import db
+    from app.models.organization import Organization
+    from app.models.opening_hours import OpeningHours
+
+    org = Organization(name=name, admin_email="admin@bench.local", owner_email="owner@bench.local")
+    db.session.add(org)
+    db.session.flush()
+    OpeningHours.create_defaults(org.id)
+    db.session.commit()
+    return org
+
+
+# ---------------------------------------------------------------------------
+# ベンチマーク
+# ---------------------------------------------------------------------------
+
+def bench_opening_hours(args):
+    """期間の営業時間解決: 日次ループ（旧実装相当）と期間一括解決の比較."""
+    from app.extensions import db
+    from app.models.opening_hours import OpeningHoursException
+    from app.services.shift_service import (
+        get_opening_hours_for_date, get_opening_hours_for_period,
+    )
+
+    with _app_context():
+        org = _seed_org()
+        start = date(2026, 1, 1)
+        # 週 1 日程度の例外（休業・短縮営業）を混ぜる
+        for i in range(0, 90, 7):
+            db.session.add(OpeningHoursException(
+                organization_id=org.id, exception_date=start + timedelta(days=i),
+                is_closed=(i % 14 == 0), start_time=None if i % 14 == 0 else "12:00",
+                end_time=None if i % 14 == 0 else "18:00",
+            ))
+        db.session.commit()
+
+        rows = []
+        for days in (7, 31, 90):
+            end = start + timedelta(days=days - 1)
+
+            def per_day():
+                current = start
+                while current <= end:
+                    get_opening_hours_for_date(org.id, current)
+                    current += timedelta(days=1)
+
+            def per_period():
+                get_opening_hours_for_period(org.id, start, end)
+
+            q_old, ms_old = _measure(per_day, args.repeat)
+            q_new, ms_new = _measure(per_period, args.repeat)
+            rows.append((days, q_old, f"{ms_old:.2f}", q_new, f"{ms_new:.2f}"))
+
+    print("\n=== opening-hours: 期間の営業時間解決 ===")
+    _print_table(["days", "per-day queries", "per-day ms", "period queries", "period ms"], rows)
+
+
+def bench_google_client(args):
+    """1 イベント書き込みごとのサービス生成 + リクエスト組み立てコスト.
+
+    ネットワークには接続しない（execute しない）。旧実装は毎回 build() で
+    discovery 文書を再解析し HTTP トランスポートを新規作成していた。
+    本番ではこれに加えて TLS ハンドシェイクの再利用可否の差が乗る。
+    """
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import build
+    from app.services.google_client import build_service
+
+    credentials = Credentials(token="bench")
+    body = {"summary": "bench", "start": {"dateTime": "2026-03-01T10:00:00+09:00"},
+            "end": {"dateTime": "2026-03-01T18:00:00+09:00"}}
+
+    def per_call_build():
+        for _ in range(args.events):
+            service = build("calendar", "v3", credentials=credentials)
+            service.events().insert(calendarId="primary", body=body)
+
+    def shared_factory():
+        for _ in range(args.events):
+            service = build_service("calendar", "v3", credentials)
+            service.events().insert(calendarId="primary", body=body)
+
+    shared_factory()  # discovery 文書の初回解析をウォームアップから除外
+    rows = []
+    for label, fn in (("build() per call", per_call_build), ("build_service()", shared_factory)):
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            fn()
+        total_ms = (time.perf_counter() - started) * 1000 / args.repeat
+        rows.append((label, args.events, f"{total_ms:.1f}", f"{total_ms / args.events:.3f}"))
+
+    print(f"\n=== google-client: {args.events} events ===")
+    _print_table(["factory", "events", "total ms", "ms/event"], rows)
+
+
+def _start_stub_smtp(handshake_ms):
+    """ローカルのスタブ SMTP サーバ。接続時と AUTH 時に handshake_ms の遅延を入れる
+    （本番の TCP + STARTTLS + 認証の往復を模擬）."""
+    import socketserver
+    import threading
+
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line):
+            self.wfile.write(f"{line}\r\n".encode())
+
+        def handle(self):
+            time.sleep(handshake_ms / 1000)
+            self.reply("220 bench ESMTP")
+            for raw in self.rfile:
+                verb = raw.decode().split(" ", 1)[0].strip().upper()
+                if verb == "EHLO":
+                    self.reply("250-bench")
+                    self.reply("250 AUTH PLAIN")
+                elif verb == "AUTH":
+                    time.sleep(handshake_ms / 1000)
+                    self.reply("235 OK")
+                elif verb == "DATA":
+                    self.reply("354 go ahead")
+                    while self.rfile.readline() not in (b".\r\n", b""):
+                        pass
+                    self.reply("250 OK")
+                elif verb == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                else:
+                    self.reply("250 OK")
+
+    class Server(socketserver.ThreadingTCPServer):
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_smtp(args):
+    """1 通ごとに接続・認証する旧方式と、セッションを使い回す SmtpPool の比較."""
+    from email.mime.text import MIMEText
+    from app.services.mail_transport import SmtpPool
+
+    server = _start_stub_smtp(args.handshake_ms)
+    settings = {"host": "127.0.0.1", "port": server.server_address[1], "user": "bench",
+                "password": "x", "from_email": "bench@example.com", "starttls": False}
+
+    def message(i):
+        msg = MIMEText(f"<p>{i}</p>", "html")
+        msg["Subject"], msg["From"], msg["To"] = f"bench {i}", "bench@example.com", f"{i}@example.com"
+        return msg
+
+    def per_message():
+        for i in range(args.messages):
+            pool = SmtpPool(settings)
+            pool.send(message(i))
+            pool.close()
+
+    def pooled():
+        pool = SmtpPool(settings)
+        for i in range(args.messages):
+            pool.send(message(i))
+        pool.close()
+
+    rows = []
+    for label, fn in (("connect per message", per_message), ("SmtpPool", pooled)):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        rows.append((label, args.messages, f"{elapsed * 1000:.0f}", f"{args.messages / elapsed:.1f}"))
+    server.shutdown()
+
+    print(f"\n=== smtp: {args.messages} messages, handshake {args.handshake_ms} ms ===")
+    _print_table(["transport", "messages", "total ms", "msgs/sec"], rows)
+
+
+def _legacy_preshift_reminders():
+    """旧実装の再現: 組織ごと → entry ごとに存在確認・User 取得・描画・enqueue・コミット."""
+    from datetime import datetime as _dt
+    from app.extensions import db
+    from app.models.organization import Organization
+    from app.models.reminder import Reminder
+    from app.models.shift import ShiftPeriod, ShiftSchedule, ShiftScheduleEntry
+    from app.models.user import User
+    from app.services.notification_service import _enqueue_or_send, render_template
+    from app.services.reminder_service import _get_reminder_trigger_dt
+
+    now = _dt.utcnow()
+    for org in Organization.query.filter_by(is_active=True).all():
+        days_before = org.get_setting("reminder_days_before_shift", 1)
+        time_str = org.get_setting("reminder_time_shift", "21:00")
+        schedule_ids = [s.id for s in db.session.query(ShiftSchedule.id).join(
+            ShiftPeriod, ShiftSchedule.shift_period_id == ShiftPeriod.id
+        ).filter(ShiftPeriod.organization_id == org.id, ShiftSchedule.status == "confirmed")]
+        if not schedule_ids:
+            continue
+        target_date = now.date() + timedelta(days=days_before)
+        entries = ShiftScheduleEntry.query.filter(
+            ShiftScheduleEntry.schedule_id.in_(schedule_ids),
+            ShiftScheduleEntry.shift_date == target_date,
+        ).all()
+        if now < _get_reminder_trigger_dt(target_date, days_before, time_str):
+            continue
+        for entry in entries:
+            if Reminder.query.filter_by(reminder_type="preshift", reference_id=entry.id,
+                                        user_id=entry.user_id).first():
+                continue
+            worker = db.session.get(User, entry.user_id)
+            shift_date_str = entry.shift_date.strftime("%Y年%m月%d日")
+            body = render_template("emails/preshift.html", worker_name=worker.display_name,
+                                   shift_date_str=shift_date_str, start_time=entry.start_time,
+                                   end_time=entry.end_time)
+            _enqueue_or_send(worker.email, f"[シフリー] シフトリマインド: {shift_date_str}", body,
+                             organization_id=org.id)
+            db.session.add(Reminder(organization_id=org.id, reminder_type="preshift",
+                                    reference_id=entry.id, user_id=entry.user_id))
+            db.session.commit()
+
+
+def bench_reminders(args):
+    """前日リマインダー: orgs 組織 × 各 shifts 件の明日のシフトを 1 回の cron で処理するコスト."""
+    from app.extensions import db
+    from app.models.async_task import AsyncTask
+    from app.models.reminder import Reminder
+    from app.models.shift import ShiftPeriod, ShiftSchedule, ShiftScheduleEntry
+    from app.models.user import User
+    from app.services.reminder_service import check_and_send_preshift_reminders
+
+    with _app_context() as app:
+        tomorrow = date.today() + timedelta(days=1)
+        for i in range(args.orgs):
+            org = _seed_org(f"Org {i}")
+            org.set_setting("reminder_days_before_shift", 1)
+            org.set_setting("reminder_time_shift", "00:00")
+            workers = [User(google_id=f"g{i}-{j}", email=f"w{j}@org{i}.local", display_name=f"W{j}",
+                            role="worker", organization_id=org.id) for j in range(args.shifts)]
+            db.session.add_all(workers)
+            db.session.flush()
+            period = ShiftPeriod(organization_id=org.id, name="P", start_date=tomorrow,
+                                 end_date=tomorrow, status="closed", created_by=workers[0].id)
+            db.session.add(period)
+            db.session.flush()
+            schedule = ShiftSchedule(shift_period_id=period.id, status="confirmed",
+                                     created_by=workers[0].id)
+            db.session.add(schedule)
+            db.session.flush()
+            db.session.add_all(ShiftScheduleEntry(schedule_id=schedule.id, user_id=w.id,
+                                                  shift_date=tomorrow, start_time="09:00",
+                                                  end_time="17:00") for w in workers)
+        db.session.commit()
+
+        rows = []
+        with app.test_request_context():
+            for label, fn in (("per-org loop", _legacy_preshift_reminders),
+                              ("set-based", check_and_send_preshift_reminders)):
+                Reminder.query.delete()
+                AsyncTask.query.delete()
+                db.session.commit()
+                with _count_queries() as counter:
+                    started = time.perf_counter()
+                    fn()
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                rows.append((label, Reminder.query.count(), counter.count, f"{elapsed_ms:.0f}"))
+
+    print(f"\n=== reminders: {args.orgs} orgs x {args.shifts} shifts/day ===")
+    _print_table(["engine", "reminders", "queries", "ms"], rows)
+
+
+def bench_settings(args):
+    """組織設定: 毎回 json.loads + defaults マージ（旧実装相当）と settings_for() キャッシュの比較."""
+    import json
+    from unittest.mock import patch
+    from app.extensions import db
+    from app.models.membership import OrganizationMember
+    from app.models.user import User
+    from app.services import organization_settings as org_settings
+
+    def uncached(org):
+        return org_settings.OrgSettings(json.loads(org.settings_json or "{}"))
+
+    def read_all(org):
+        # 設定系 API・リマインダーが 1 リクエストで触る程度の読み出し
+        org_settings.get_workflow(org)
+        org_settings.get_level_system(org)
+        org_settings.get_overlap_check(org)
+        org_settings.get_min_attendance(org)
+        view = org_settings.settings_for(org)
+        view.reminders
+        view.calendar_sync
+
+    with _app_context() as app:
+        org = _seed_org()
+        admin = User(google_id="g-admin", email="admin@bench.local", display_name="Admin",
+                     role="admin", organization_id=org.id)
+        db.session.add(admin)
+        db.session.flush()
+        db.session.add(OrganizationMember(user_id=admin.id, organization_id=org.id, role="admin"))
+        org_settings.set_level_system(org, {"enabled": True, "tiers": [
+            {"key": f"tier_{i}", "label": f"Tier {i}"} for i in range(args.tiers)]})
+        org_settings.set_workflow(org, {"approval_required": False})
+        org_settings.set_min_attendance(org, {"mode": "org_wide"})
+        for key, value in org_settings.DEFAULT_REMINDERS.items():
+            org.set_setting(key, value)
+        db.session.commit()
+        admin_id = admin.id
+        org.settings_json  # refresh
+
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = admin_id
+
+        paths = ("/api/admin/settings/workflow", "/api/admin/settings/levels")
+        engines = (("json.loads per call", uncached), ("settings_for cache", None))
+        # 1 周目は暖機（初回のルーティング・SQL コンパイル等）として捨て、2 周目を表示する
+        for _round in range(2):
+            rows = []
+            for label, patched in engines:
+                ctx = patch.object(org_settings, "settings_for", patched) if patched else nullcontext()
+                with ctx:
+                    _, read_ms = _measure(lambda: read_all(org), args.repeat)
+                    timings = [f"{_measure(lambda: client.get(path), args.repeat)[1]:.2f}"
+                               for path in paths]
+                rows.append((label, f"{read_ms * 1000:.1f}", *timings))
+
+    print(f"\n=== settings: {args.tiers} tiers, repeat={args.repeat} ===")
+    _print_table(["engine", "reads us", "GET workflow ms", "GET levels ms"], rows)
+
+
+def _synthetic_schedule_problem(workers, days, seed=0):
+    """合成組織: 平日 3 帯 / 週末 2 帯の需要、各ワーカーは 6 割の日に 4〜9 時間の勤務可能枠."""
+    import random
+    from app.services.auto_schedule_service import (
+        CELLS_PER_DAY, CELL_MINUTES, Problem, WorkerRules, make_candidate,
+    )
+
+    rng = random.Random(seed)
+    start = date(2026, 3, 1)
+    dates = [start + timedelta(days=i) for i in range(days)]
+    bands = {
+        "weekday": ((9, 13, 2), (13, 18, 3), (18, 22, 2)),
+        "weekend": ((10, 16, 4), (16, 21, 3)),
+    }
+    scale = max(1, workers // 15)
+    demand = []
+    for d in dates:
+        row = [0] * CELLS_PER_DAY
+        for h_from, h_to, need in bands["weekend" if d.weekday() >= 5 else "weekday"]:
+            for i in range(h_from * 60 // CELL_MINUTES, h_to * 60 // CELL_MINUTES):
+                row[i] = need * scale
+        demand.append(row)
+
+    candidates = []
+    for w in range(1, workers + 1):
+        for day in range(days):
+            if rng.random() < 0.6:
+                begin = rng.choice((9, 10, 12, 13, 15, 17)) * 60
+                end = min(begin + rng.choice((4, 5, 6, 8, 9)) * 60, 22 * 60)
+                cand = make_candidate(w, day, begin, end, demand[day])
+                if cand:
+                    candidates.append(cand)
+    rules = {
+        w: WorkerRules(level_key=f"tier_{w % 3}", min_count_per_week=2 if w % 4 == 0 else 0,
+                       min_minutes_per_week=0)
+        for w in range(1, workers + 1)
+    }
+    return Problem(dates, demand, candidates, rules, overlap_same_tier=True)
+
+
+def _seed_schedule_period(workers, days):
+    """DB 経由の計測用: 合成問題と同じ形の提出・必要人数を 1 組織に投入する."""
+    from sqlalchemy import insert
+    from app.extensions import db
+    from app.models.membership import OrganizationMember
+    from app.models.shift import ShiftPeriod, ShiftSubmission, ShiftSubmissionSlot
+    from app.models.staffing import StaffingRequirement
+    from app.models.user import User
+    from app.utils.time_utils import minutes_to_time_str
+
+    problem = _synthetic_schedule_problem(workers, days)
+    org = _seed_org("Auto Schedule Org")
+    users = [User(google_id=f"g-{org.id}-w{i}", email=f"w{i}@org{org.id}.bench.local", display_name=f"W{i}",
+                  role="worker", organization_id=org.id) for i in range(workers)]
+    db.session.add_all(users)
+    db.session.flush()
+    db.session.add_all([OrganizationMember(user_id=u.id, organization_id=org.id, role="worker")
+                        for u in users])
+    period = ShiftPeriod(organization_id=org.id, name="Bench", start_date=problem.days[0],
+                         end_date=problem.days[-1], status="closed", created_by=users[0].id)
+    db.session.add(period)
+    for dow in range(7):
+        weekend = dow in (0, 6)
+        for h_from, h_to, need in (((10, 16, 4), (16, 21, 3)) if weekend
+                                   else ((9, 13, 2), (13, 18, 3), (18, 22, 2))):
+            db.session.add(StaffingRequirement(
+                organization_id=org.id, day_of_week=dow, required_count=need * max(1, workers // 15),
+                start_time=f"{h_from:02d}:00", end_time=f"{h_to:02d}:00",
+            ))
+    db.session.flush()
+    submissions = {u.id: ShiftSubmission(shift_period_id=period.id, user_id=u.id, status="submitted")
+                   for u in users}
+    db.session.add_all(submissions.values())
+    db.session.flush()
+    db.session.execute(insert(ShiftSubmissionSlot), [{
+        "submission_id": submissions[users[c.worker - 1].id].id,
+        "slot_date": problem.days[c.day], "is_available": True,
+        "start_time": minutes_to_time_str(c.start), "end_time": minutes_to_time_str(c.end),
+    } for c in problem.candidates])
+    db.session.commit()
+    return org, period
+
+
+def bench_auto_schedule(args):
+    """自動シフト作成: 貪欲法のみと局所探索つきの比較、および DB 読込込みの全体時間."""
+    from app.services.auto_schedule_service import propose_schedule, solve
+
+    rows = []
+    for workers in args.workers:
+        problem = _synthetic_schedule_problem(workers, args.days)
+        for label, limit in (("greedy", 0), ("greedy+local", None)):
+            kwargs = {} if limit is None else {"time_limit": limit}
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                _, metrics = solve(problem, **kwargs)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+            rows.append((f"{workers}x{args.days}", label, len(problem.candidates),
+                         metrics["assigned_shifts"], metrics["coverage_rate"],
+                         metrics["hours_stddev"], metrics["same_tier_overlap_hours"],
+                         len(metrics["min_attendance_shortfall_workers"]), f"{elapsed_ms:.1f}"))
+    print(f"\n=== auto-schedule solver: repeat={args.repeat} ===")
+    _print_table(["org", "engine", "candidates", "shifts", "coverage", "hours sd",
+                  "overlap h", "min-att short", "ms"], rows)
+
+    rows = []
+    with _app_context():
+        for workers in args.workers:
+            org, period = _seed_schedule_period(workers, args.days)
+            queries, elapsed_ms = _measure(lambda: propose_schedule(period, org), args.repeat)
+            rows.append((f"{workers}x{args.days}", queries, f"{elapsed_ms:.1f}"))
+    print("\n=== auto-schedule propose_schedule() incl. DB load ===")
+    _print_table(["org", "queries", "ms"], rows)
+
+
+def _seed_draft_schedule(entries):
+    """entries 件の割当を持つ 31 日期間の下書きシフトを 1 組織に作り、(org, period, 全件リスト) を返す."""
+    from app.extensions import db
+    from app.models.membership import OrganizationMember
+    from app.models.shift import ShiftPeriod
+    from app.models.user import User
+    from app.services.shift_service import save_schedule
+
+    days = 31
+    workers = -(-entries // days)
+    org = _seed_org("Schedule Save Org")
+    users = [User(google_id=f"g-{org.id}-s{i}", email=f"s{i}@org{org.id}.bench.local", display_name=f"S{i}",
+                  role="worker", organization_id=org.id) for i in range(workers)]
+    db.session.add_all(users)
+    db.session.flush()
+    db.session.add_all([OrganizationMember(user_id=u.id, organization_id=org.id, role="worker")
+                        for u in users])
+    start = date(2026, 3, 1)
+    period = ShiftPeriod(organization_id=org.id, name="Bench", start_date=start,
+                         end_date=start + timedelta(days=days - 1), status="closed", created_by=users[0].id)
+    db.session.add(period)
+    db.session.commit()
+    data = [{"user_id": users[i // days].id, "shift_date": (start + timedelta(days=i % days)).isoformat(),
+             "start_time": "09:00", "end_time": "17:00"} for i in range(entries)]
+    save_schedule(period.id, users[0].id, data, organization_id=org.id)
+    return org, period, data
+
+
+def bench_schedule_save(args):
+    """1 セルだけ時刻を変えた保存: 全件置換（save_schedule）と差分保存（apply_schedule_changes）の比較."""
+    from itertools import count
+    from app.services.shift_service import apply_schedule_changes, save_schedule
+
+    rows = []
+    with _app_context():
+        for entries in args.entries:
+            org, period, data = _seed_draft_schedule(entries)
+            tick = count()
+
+            def edited():
+                # 呼ぶたびに先頭エントリの終了時刻を 17:00 / 18:00 で切り替える
+                return dict(data[0], end_time="18:00" if next(tick) % 2 else "17:00")
+
+            def full_save():
+                save_schedule(period.id, data[0]["user_id"], [edited()] + data[1:], organization_id=org.id)
+
+            def diff_save():
+                apply_schedule_changes(period.id, {"changed": [edited()]}, organization_id=org.id)
+
+            for label, fn, written in (("full", full_save, entries * 2), ("diff", diff_save, 1)):
+                queries, elapsed_ms = _measure(fn, args.repeat)
+                rows.append((entries, label, written, queries, f"{elapsed_ms:.2f}"))
+    print(f"\n=== schedule-save: one-cell edit, repeat={args.repeat} ===")
+    _print_table(["entries", "mode", "rows written", "queries", "ms"], rows)
+
+
+def _legacy_submission(period_id, user_id, slots_data, notes=None):
+    """旧実装の再現: スロットを全削除し、1 件ずつ検証して ORM オブジェクトで再挿入."""
+    from datetime import datetime as _dt
+    from app.extensions import db
+    from app.models.shift import ShiftPeriod, ShiftSubmission, ShiftSubmissionSlot
+    from app.utils.validators import validate_time_str
+
+    period = db.session.get(ShiftPeriod, period_id)
+    submission = ShiftSubmission.query.filter_by(shift_period_id=period_id, user_id=user_id).first()
+    if not submission:
+        submission = ShiftSubmission(shift_period_id=period_id, user_id=user_id, status="submitted",
+                                     submitted_at=_dt.utcnow(), notes=notes)
+        db.session.add(submission)
+        db.session.flush()
+    else:
+        submission.submitted_at = _dt.utcnow()
+        submission.notes = notes
+        ShiftSubmissionSlot.query.filter_by(submission_id=submission.id).delete()
+    for slot in slots_data:
+        slot_date = date.fromisoformat(slot["slot_date"])
+        if slot_date < period.start_date or slot_date > period.end_date:
+            raise ValueError(slot_date)
+        for field in ("start_time", "end_time", "auto_calculated_start", "auto_calculated_end"):
+            if slot.get(field):
+                validate_time_str(slot[field], field)
+        db.session.add(ShiftSubmissionSlot(
+            submission_id=submission.id, slot_date=slot_date,
+            is_available=slot.get("is_available", False),
+            start_time=slot.get("start_time"), end_time=slot.get("end_time"),
+            is_custom_time=slot.get("is_custom_time", False),
+            auto_calculated_start=slot.get("auto_calculated_start"),
+            auto_calculated_end=slot.get("auto_calculated_end"), notes=slot.get("notes"),
+        ))
+    db.session.commit()
+    return submission
+
+
+def bench_submissions(args):
+    """締切直前バースト: workers 名が days 日分を提出 → 3 日だけ修正して再提出 → 同内容を再送."""
+    from app.extensions import db
+    from app.models.membership import OrganizationMember
+    from app.models.shift import ShiftPeriod
+    from app.models.user import User
+    from app.services.shift_service import create_or_update_submission
+
+    start = date(2026, 3, 1)
+
+    def payload(user_index, edited):
+        slots = []
+        for d in range(args.days):
+            available = (user_index + d) % 3 != 0
+            late = edited and d < 3
+            slots.append({
+                "slot_date": (start + timedelta(days=d)).isoformat(), "is_available": available,
+                "start_time": ("13:00" if late else "09:00") if available else None,
+                "end_time": "18:00" if available else None,
+                "auto_calculated_start": "09:00", "auto_calculated_end": "22:00",
+            })
+        return slots
+
+    rows = []
+    with _app_context():
+        org = _seed_org("Submission Burst Org")
+        users = [User(google_id=f"g-sub-{i}", email=f"sub{i}@bench.local", display_name=f"S{i}",
+                      role="worker", organization_id=org.id) for i in range(args.workers)]
+        db.session.add_all(users)
+        db.session.flush()
+        db.session.add_all([OrganizationMember(user_id=u.id, organization_id=org.id, role="worker")
+                            for u in users])
+        db.session.commit()
+        for label, fn in (("legacy", _legacy_submission), ("bulk", create_or_update_submission)):
+            period = ShiftPeriod(organization_id=org.id, name=label, start_date=start,
+                                 end_date=start + timedelta(days=args.days - 1), status="open",
+                                 created_by=users[0].id)
+            db.session.add(period)
+            db.session.commit()
+            for phase, edited in (("first", False), ("edit 3 days", True), ("resend", True)):
+                bodies = [payload(i, edited) for i in range(args.workers)]
+                with _count_queries() as counter:
+                    started = time.perf_counter()
+                    for u, slots in zip(users, bodies):
+                        fn(period.id, u.id, slots)
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                rows.append((label, phase, counter.count, f"{elapsed_ms:.0f}",
+                             f"{elapsed_ms / args.workers:.2f}", f"{args.workers / elapsed_ms * 1000:.0f}"))
+    print(f"\n=== submissions: burst of {args.workers} workers x {args.days} days ===")
+    _print_table(["engine", "phase", "queries", "total ms", "ms/submit", "submits/sec"], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="計測の繰り返し回数")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_oh = sub.add_parser("opening-hours", help="期間の営業時間解決")
+    p_oh.set_defaults(func=bench_opening_hours)
+
+    p_gc = sub.add_parser("google-client", help="Google API サービス生成のオーバーヘッド")
+    p_gc.add_argument("--events", type=int, default=300, help="1 回の計測で書き込むイベント数")
+    p_gc.set_defaults(func=bench_google_client)
+
+    p_sm = sub.add_parser("smtp", help="メール送信スループット")
+    p_sm.add_argument("--messages", type=int, default=200, help="送信するメール数")
+    p_sm.add_argument("--handshake-ms", type=int, default=40,
+                      help="接続時・認証時に模擬する往復遅延 (ms)")
+    p_sm.set_defaults(func=bench_smtp)
+
+    p_rm = sub.add_parser("reminders", help="前日リマインダー cron のコスト")
+    p_rm.add_argument("--orgs", type=int, default=100, help="組織数")
+    p_rm.add_argument("--shifts", type=int, default=50, help="組織あたりの明日のシフト数")
+    p_rm.set_defaults(func=bench_reminders)
+
+    p_st = sub.add_parser("settings", help="組織設定の読み出しコスト")
+    p_st.add_argument("--tiers", type=int, default=20, help="レベル区分の数")
+    p_st.set_defaults(func=bench_settings)
+
+    p_as = sub.add_parser("auto-schedule", help="自動シフト作成のコスト")
+    p_as.add_argument("--workers", type=int, nargs="+", default=[10, 30, 50], help="ワーカー数（複数可）")
+    p_as.add_argument("--days", type=int, default=31, help="期間の日数")
+    p_as.set_defaults(func=bench_auto_schedule)
+
+    p_ss = sub.add_parser("schedule-save", help="下書きシフト保存のコスト（全件置換 vs 差分）")
+    p_ss.add_argument("--entries", type=int, nargs="+", default=[100, 500, 2000], help="シフトのエントリ数（複数可）")
+    p_ss.set_defaults(func=bench_schedule_save)
+
+    p_su = sub.add_parser("submissions", help="締切直前の提出バースト")
+    p_su.add_argument("--workers", type=int, default=200, help="提出するワーカー数")
+    p_su.add_argument("--days", type=int, default=31, help="期間の日数")
+    p_su.set_defaults(func=bench_submissions)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
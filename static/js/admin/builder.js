@@ -99,6 +99,7 @@ export async function loadBuilderData() {
         state.workersData = workers || [];
         state.scheduleEntries = schedule && schedule.entries ? schedule.entries : [];
         state.scheduleVersion = schedule && schedule.schedule_version ? schedule.schedule_version : null;
+        state.scheduleBaseline = schedule && schedule.status === 'draft' ? snapshotEntries(state.scheduleEntries) : null;
         state.openingHoursData = openingHours || {};
         state.adminCalendarEvents = calEvents || [];
 
@@ -635,7 +636,7 @@ function renderHoursSummary() {
     `).join('');
 }
 
-function renderSyncStatusSummary(schedule) {
+function renderSyncStatusSummary(schedule, { syncing = false } = {}) {
     const card = document.getElementById('sync-status-card');
     const container = document.getElementById('sync-status-summary');
     if (!card || !container) return;
@@ -654,9 +655,14 @@ function renderSyncStatusSummary(schedule) {
     if (s.pending > 0) rows.push(`<div class="flex-between mb-4"><span>未同期</span><span class="sync-count sync-count-neutral">${s.pending}</span></div>`);
 
     const allSynced = s.synced === s.total;
-    const statusMsg = allSynced
-        ? '<p class="help-text" style="color:var(--color-success-600);margin-top:8px;">全員のカレンダーに同期済みです</p>'
-        : `<p class="help-text" style="margin-top:8px;">${s.total - s.synced}件が未同期です。スタッフに再ログインを依頼してください。</p>`;
+    let statusMsg;
+    if (allSynced) {
+        statusMsg = '<p class="help-text" style="color:var(--color-success-600);margin-top:8px;">全員のカレンダーに同期済みです</p>';
+    } else if (syncing) {
+        statusMsg = `<p class="help-text" style="margin-top:8px;">カレンダーに同期中です… (${s.synced}/${s.total})</p>`;
+    } else {
+        statusMsg = `<p class="help-text" style="margin-top:8px;">${s.total - s.synced}件が未同期です。スタッフに再ログインを依頼してください。</p>`;
+    }
 
     container.innerHTML = rows.join('') + statusMsg;
 }
@@ -758,18 +764,54 @@ function updateScheduleButtons(schedule) {
 
 // ---- Persistence ----
 
+const entryKey = (e) => `${e.user_id}|${e.shift_date}`;
+
+function snapshotEntries(entries) {
+    const snapshot = {};
+    for (const e of entries) snapshot[entryKey(e)] = { start_time: e.start_time, end_time: e.end_time };
+    return snapshot;
+}
+
+/** 基準スナップショットとの差分を {added, changed, removed} で返す（(user_id, shift_date) がキー）. */
+function diffEntries(baseline, entries) {
+    const added = [];
+    const changed = [];
+    const seen = new Set();
+    for (const e of entries) {
+        const key = entryKey(e);
+        seen.add(key);
+        const base = baseline[key];
+        if (!base) added.push(e);
+        else if (base.start_time !== e.start_time || base.end_time !== e.end_time) changed.push(e);
+    }
+    const removed = Object.keys(baseline)
+        .filter(key => !seen.has(key))
+        .map(key => {
+            const [userId, shiftDate] = key.split('|');
+            return { user_id: Number(userId), shift_date: shiftDate };
+        });
+    return { added, changed, removed };
+}
+
 export async function saveSchedule() {
     const periodId = document.getElementById('builder-period-select').value;
     if (!periodId) return;
     try {
-        const result = await api.post(`/api/admin/periods/${periodId}/schedule`, {
-            entries: state.scheduleEntries,
-            expected_version: state.scheduleVersion,
-        });
+        // 下書きが既にあれば変更分だけ送る。未作成・差戻し後は全件保存で下書きを作る
+        const result = state.scheduleBaseline && state.scheduleVersion
+            ? await api.post(`/api/admin/periods/${periodId}/schedule/changes`, {
+                ...diffEntries(state.scheduleBaseline, state.scheduleEntries),
+                expected_version: state.scheduleVersion,
+            })
+            : await api.post(`/api/admin/periods/${periodId}/schedule`, {
+                entries: state.scheduleEntries,
+                expected_version: state.scheduleVersion,
+            });
         // Update version so subsequent saves stay in sync
         if (result && result.schedule_version) {
             state.scheduleVersion = result.schedule_version;
         }
+        state.scheduleBaseline = snapshotEntries(state.scheduleEntries);
         setClean('schedule');
         showToast('スケジュールを保存しました', 'success');
     } catch (e) {
@@ -816,6 +858,29 @@ export async function submitForApproval() {
     );
 }
 
+// 非同期確定後の同期進捗ポーリング
+const SYNC_POLL_INTERVAL_MS = 2000;
+const SYNC_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+/**
+ * GET .../schedule/sync-progress を done になるまでポーリングし, 同期状況カードを更新する.
+ * 完了時は最終レスポンス, タイムアウト / 期間切替時は null を返す.
+ */
+async function pollSyncProgress(periodId) {
+    const generation = state.builderLoadGeneration;
+    const deadline = Date.now() + SYNC_POLL_TIMEOUT_MS;
+    while (Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, SYNC_POLL_INTERVAL_MS));
+        // 別の期間に切り替えられたら表示を上書きしない
+        if (generation !== state.builderLoadGeneration) return null;
+        const data = await api.get(`/api/admin/periods/${periodId}/schedule/sync-progress`);
+        if (generation !== state.builderLoadGeneration) return null;
+        renderSyncStatusSummary({ status: data.status, sync_summary: data.progress }, { syncing: !data.done });
+        if (data.done) return data;
+    }
+    return null;
+}
+
 export async function confirmSchedule() {
     const periodId = document.getElementById('builder-period-select').value;
     if (!periodId) return;
@@ -826,29 +891,42 @@ export async function confirmSchedule() {
         'btn-primary',
         '確定・同期する',
         async () => {
+            let result;
             try {
-                const result = await api.post(`/api/admin/periods/${periodId}/schedule/confirm`);
-                const summary = result.sync_summary || {};
-                const syncResults = result.sync_results || [];
-                const success = summary.synced || syncResults.filter(r => r.success).length;
-                const needsAction = summary.needs_worker_action || 0;
-                const failed = summary.failed || 0;
-
-                let msg = `確定完了: ${success}件同期成功`;
-                if (needsAction > 0) msg += `, ${needsAction}件は本人によるカレンダー追加が必要`;
-                if (failed > 0) msg += `, ${failed}件失敗`;
-                showToast(msg, success > 0 ? 'success' : 'warning');
-
-                // Refresh schedule view to reflect new confirmed state
-                await loadBuilderData();
-
-                // 確定後にアーカイブ確認ダイアログを表示
-                if (result.period) {
-                    promptArchiveAfterConfirm(result.period);
-                }
+                // カレンダー同期はサーバー側のバックグラウンドタスクで行い (202), 進捗をポーリングする
+                result = await api.post(`/api/admin/periods/${periodId}/schedule/confirm`, { async: true });
             } catch (e) {
                 showToast(`確定に失敗しました: ${e.message}`, 'error');
+                return;
+            }
+            showToast('シフトを確定しました。カレンダーに同期しています…', 'success');
+
+            // Refresh schedule view to reflect new confirmed state
+            await loadBuilderData();
+            if (result.sync_progress) {
+                renderSyncStatusSummary({ status: result.status, sync_summary: result.sync_progress }, { syncing: true });
+            }
+
+            // 確定後にアーカイブ確認ダイアログを表示
+            if (result.period) {
+                promptArchiveAfterConfirm(result.period);
+            }
+
+            let final = null;
+            try {
+                final = await pollSyncProgress(periodId);
+            } catch (e) {
+                // ポーリング失敗は確定自体には影響しない
+            }
+            if (!final) {
+                showToast('カレンダー同期はバックグラウンドで続いています。進捗は後で確認できます', 'info');
+                return;
             }
+            const p = final.progress;
+            let msg = `カレンダー同期完了: ${p.synced}件同期成功`;
+            if (p.reauth_required > 0) msg += `, ${p.reauth_required}件は本人によるカレンダー追加が必要`;
+            if (p.failed > 0) msg += `, ${p.failed}件失敗`;
+            showToast(msg, p.synced > 0 ? 'success' : 'warning');
         }
     );
 }
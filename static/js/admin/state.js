@@ -19,6 +19,7 @@ export const state = {
     // === シフト構築 (builder タブ) ===
     scheduleEntries: [],          // 編集中のシフト割当
     scheduleVersion: null,        // 楽観ロック: 最後に取得した updated_at
+    scheduleBaseline: null,       // 差分保存の基準: 'user_id|shift_date' -> {start_time, end_time}（下書き以外は null）
     submissionsData: [],          // 期間内の提出
     currentPeriod: null,          // 選択中の期間 { id, name, start_date, end_date }
     dayAggregatedData: {},        // dateStr -> 日次集約データ
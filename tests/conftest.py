@@ -5,11 +5,12 @@ dialect-specific migration bugs surface in CI before reaching production.
 This mirrors how Vercel applies migrations on cold start.
 """
 
+from contextlib import contextmanager
 from datetime import date, datetime
 from unittest.mock import patch
 
 import pytest
-from sqlalchemy import text
+from sqlalchemy import event, text
 
 from app import create_app
 from app.extensions import db as _db
@@ -87,6 +88,89 @@ def db_session(app):
         yield _db.session
 
 
+@pytest.fixture()
+def threaded_app(tmp_path):
+    """App on a file-backed SQLite DB, for tests that touch the DB from several threads.
+
+    The shared in-memory DB uses a single connection for every thread, so
+    concurrent transactions would interleave on it.
+    """
+    from cachelib import SimpleCache
+    from app.config import TestConfig
+
+    # Flask-Session's table is already registered on db.metadata by the main app
+    with patch.object(TestConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'tasks.db'}"), \
+            patch.object(TestConfig, 'SESSION_TYPE', 'cachelib', create=True), \
+            patch.object(TestConfig, 'SESSION_CACHELIB', SimpleCache(), create=True):
+        application = create_app('testing')
+    with application.app_context():
+        _db.create_all()
+        yield application
+        _db.session.remove()
+        _db.engine.dispose()
+
+
+# ---------------------------------------------------------------------------
+# Query counting
+# ---------------------------------------------------------------------------
+
+class QueryCounter:
+    """Collects SQL statements executed on the engine while active."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@pytest.fixture()
+def count_queries(db_session):
+    """Context manager factory counting SQL statements issued inside the block.
+
+    Usage::
+
+        with count_queries() as counter:
+            do_work()
+        assert counter.count == 2
+    """
+    @contextmanager
+    def _count():
+        counter = QueryCounter()
+        engine = _db.engine
+        event.listen(engine, "before_cursor_execute", counter._on_execute)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, "before_cursor_execute", counter._on_execute)
+    return _count
+
+
+@pytest.fixture()
+def assert_max_queries(count_queries):
+    """Context manager factory failing when the block issues more than *limit* statements.
+
+    Guards list endpoints against per-row lazy loads; the failure message
+    lists every statement so the offending relationship is easy to spot::
+
+        with assert_max_queries(4):
+            client.get("/api/admin/change-log")
+    """
+    @contextmanager
+    def _assert(limit):
+        with count_queries() as counter:
+            yield counter
+        assert counter.count <= limit, (
+            f"expected at most {limit} queries, got {counter.count}:\n"
+            + "\n".join(counter.statements)
+        )
+    return _assert
+
+
 # ---------------------------------------------------------------------------
 # Seed helpers
 # ---------------------------------------------------------------------------
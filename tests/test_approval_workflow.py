@@ -104,7 +104,7 @@ class TestConfirmSchedule:
 
         # Mock calendar sync (requires Google credentials)
         from unittest.mock import patch
-        with patch("app.blueprints.api_admin.get_credentials_for_user", return_value=None):
+        with patch("app.services.schedule_sync_service.get_credentials_for_user", return_value=None):
             resp = client.post(
                 f"/api/admin/periods/{schedule.shift_period_id}/schedule/confirm"
             )
@@ -149,7 +149,7 @@ class TestCalendarSyncBehavior:
         auth.login_as(admin_user)
 
         from unittest.mock import patch
-        with patch("app.blueprints.api_admin.get_credentials_for_user", return_value=None):
+        with patch("app.services.schedule_sync_service.get_credentials_for_user", return_value=None):
             resp = client.post(f"/api/admin/periods/{schedule.shift_period_id}/schedule/confirm")
 
         assert resp.status_code == 200
@@ -206,8 +206,9 @@ class TestCalendarSyncBehavior:
             return None
 
         from unittest.mock import patch, MagicMock
-        with patch("app.blueprints.api_admin.get_credentials_for_user", side_effect=side_effect), \
-             patch("app.blueprints.api_admin.create_event", return_value="evt_123"):
+        with patch("app.services.schedule_sync_service.get_credentials_for_user", side_effect=side_effect), \
+             patch("app.services.schedule_sync_service.batch_event_operations",
+                   side_effect=lambda creds, cal, ops: {op["key"]: ("evt_123", None) for op in ops}):
             resp = client.post(f"/api/admin/periods/{schedule.shift_period_id}/schedule/confirm")
 
         assert resp.status_code == 200
@@ -225,7 +226,7 @@ class TestCalendarSyncBehavior:
 
         from unittest.mock import patch
         from app.services.auth_service import CredentialsExpiredError
-        with patch("app.blueprints.api_admin.get_credentials_for_user",
+        with patch("app.services.schedule_sync_service.get_credentials_for_user",
                     side_effect=CredentialsExpiredError("expired")):
             resp = client.post(f"/api/admin/periods/{schedule.shift_period_id}/schedule/confirm")
 
@@ -243,7 +244,7 @@ class TestCalendarSyncBehavior:
         auth.login_as(admin_user)
 
         from unittest.mock import patch
-        with patch("app.blueprints.api_admin.get_credentials_for_user", return_value=None):
+        with patch("app.services.schedule_sync_service.get_credentials_for_user", return_value=None):
             resp = client.post(f"/api/admin/periods/{schedule.shift_period_id}/schedule/confirm")
 
         assert resp.status_code == 200
@@ -265,9 +266,9 @@ class TestCalendarSyncBehavior:
         auth.login_as(admin_user)
 
         from unittest.mock import patch, MagicMock
-        mock_create = MagicMock()
-        with patch("app.blueprints.api_admin.get_credentials_for_user", return_value=object()), \
-             patch("app.blueprints.api_admin.create_event", mock_create):
+        mock_batch = MagicMock()
+        with patch("app.services.schedule_sync_service.get_credentials_for_user", return_value=object()), \
+             patch("app.services.schedule_sync_service.batch_event_operations", mock_batch):
             resp = client.post(f"/api/admin/periods/{schedule.shift_period_id}/schedule/confirm")
 
         # confirm itself fails because schedule is already confirmed after first call,
@@ -276,8 +277,8 @@ class TestCalendarSyncBehavior:
         assert resp.status_code == 200
         data = resp.get_json()
 
-        # create_event should NOT have been called — entry was already synced
-        mock_create.assert_not_called()
+        # No calendar write should have been made — entry was already synced
+        mock_batch.assert_not_called()
 
         # Result should show success with skipped flag
         sync_results = data["sync_results"]
@@ -311,7 +312,7 @@ class TestFullWorkflow:
         # 3. Admin confirms
         auth.login_as(admin_user)
         from unittest.mock import patch
-        with patch("app.blueprints.api_admin.get_credentials_for_user", return_value=None):
+        with patch("app.services.schedule_sync_service.get_credentials_for_user", return_value=None):
             resp = client.post(
                 f"/api/admin/periods/{schedule.shift_period_id}/schedule/confirm"
             )
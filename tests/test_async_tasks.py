@@ -1,11 +1,13 @@
 """Tests for the async task queue and cron endpoint."""
 
 import os
+from collections import Counter
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 
 import pytest
 
+from app.extensions import db
 from app.models.async_task import AsyncTask
 
 
@@ -184,6 +186,308 @@ class TestTaskRunner:
         assert stats['succeeded'] == 3
 
 
+class TestClaimAndLease:
+    """Atomic claiming, leases and the expired-lease reaper."""
+
+    def _add(self, db_session, count=1, **kwargs):
+        tasks = [AsyncTask(task_type='send_email', payload={'to_email': f'{i}@b.com', 'subject': 'T',
+                                                               'body_html': ''}, **kwargs)
+                 for i in range(count)]
+        db_session.add_all(tasks)
+        db_session.commit()
+        return tasks
+
+    def test_claim_leases_tasks(self, app, db_session):
+        from app.services.task_runner import LEASE_SECONDS, claim_tasks
+        self._add(db_session, 3)
+
+        claimed = claim_tasks(batch_size=2)
+
+        assert len(claimed) == 2
+        for task in claimed:
+            assert task.status == 'running'
+            assert task.started_at is None  # set when the task actually starts
+            remaining = (task.lease_expires_at - datetime.utcnow()).total_seconds()
+            assert LEASE_SECONDS - 5 < remaining <= LEASE_SECONDS
+        assert len(claim_tasks(batch_size=5)) == 1  # only the unclaimed one is left
+        assert claim_tasks() == []
+
+    def test_overlapping_runners_never_run_a_task_twice(self, threaded_app):
+        import threading
+        from app.services.task_runner import process_pending_tasks
+        self._add(db.session, 12)
+        sent = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(3)
+
+        def fake_send(to_email, subject, body_html):
+            with lock:
+                sent.append(to_email)
+            return True
+
+        results = []
+
+        def runner():
+            with threaded_app.app_context():
+                barrier.wait()
+                results.append(process_pending_tasks(batch_size=12))
+
+        with patch('app.services.notification_service.send_email', side_effect=fake_send):
+            threads = [threading.Thread(target=runner) for _ in range(3)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert sorted(sent) == sorted(f'{i}@b.com' for i in range(12))
+        assert sum(r['succeeded'] for r in results) == 12
+        assert AsyncTask.query.filter_by(status='completed').count() == 12
+
+    def test_reaper_requeues_expired_leases(self, app, db_session):
+        from app.services.task_runner import reap_expired_leases
+        past = datetime.utcnow() - timedelta(minutes=1)
+        expired, = self._add(db_session, status='running', started_at=past - timedelta(hours=1),
+                             lease_expires_at=past)
+        live, = self._add(db_session, status='running', started_at=past,
+                          lease_expires_at=datetime.utcnow() + timedelta(minutes=5))
+        legacy, = self._add(db_session, status='running', started_at=past - timedelta(hours=1))
+        exhausted, = self._add(db_session, status='running', started_at=past - timedelta(hours=1),
+                               lease_expires_at=past, retry_count=2, max_retries=3)
+
+        assert reap_expired_leases() == {'requeued': 2, 'dead': 1}
+
+        db_session.expire_all()
+        for task in (expired, legacy):
+            assert task.status == 'pending'
+            assert task.retry_count == 1
+            assert task.lease_expires_at is None
+            assert 'Lease expired' in task.error_message
+        assert live.status == 'running'
+        assert exhausted.status == 'dead'
+        assert exhausted.completed_at is not None
+
+    def test_reaper_does_not_charge_tasks_that_never_started(self, app, db_session):
+        from app.services.task_runner import reap_expired_leases
+        past = datetime.utcnow() - timedelta(minutes=1)
+        unstarted, = self._add(db_session, status='running', lease_expires_at=past,
+                               retry_count=2, max_retries=3)
+
+        assert reap_expired_leases() == {'requeued': 1, 'dead': 0}
+
+        db_session.expire_all()
+        assert unstarted.status == 'pending'
+        assert unstarted.retry_count == 2
+        assert unstarted.lease_expires_at is None
+
+    def test_running_a_task_stamps_started_at_and_renews_lease(self, app, db_session):
+        from app.services.task_runner import LEASE_SECONDS, claim_tasks, _run_task
+        self._add(db_session)
+        task, = claim_tasks()
+        seen = {}
+
+        def handler(payload):
+            db_session.expire_all()
+            fresh = db_session.get(AsyncTask, task.id)
+            seen['started_at'] = fresh.started_at
+            seen['lease'] = (fresh.lease_expires_at - fresh.started_at).total_seconds()
+
+        assert _run_task(task, handler) == 'succeeded'
+        assert seen['started_at'] is not None
+        assert seen['lease'] == LEASE_SECONDS
+
+    def test_runner_reaps_then_processes_reclaimed_task(self, app, db_session):
+        from app.services.task_runner import process_pending_tasks
+        past = datetime.utcnow() - timedelta(minutes=1)
+        task, = self._add(db_session, status='running', started_at=past, lease_expires_at=past)
+
+        with patch('app.services.notification_service.send_email', return_value=True):
+            stats = process_pending_tasks()
+
+        assert stats['reaped'] == 1
+        assert stats['succeeded'] == 1
+        db_session.expire_all()
+        assert task.status == 'completed'
+        assert task.retry_count == 1
+        assert task.lease_expires_at is None
+
+
+class TestConcurrentRunner:
+    """process_pending_tasks with a thread pool (concurrency > 1).
+
+    Runs on a file-backed SQLite DB (threaded_app) so worker threads get
+    their own connections, as they would on PostgreSQL.
+    """
+
+    @pytest.fixture()
+    def probe(self):
+        """Register a 'probe' task type that records overlap and sessions."""
+        import threading
+        import time as _time
+        from app.extensions import db
+        from app.services import task_runner
+
+        state = {'active': Counter(), 'peak': Counter(), 'sessions': [], 'lock': threading.Lock()}
+
+        def handler(payload):
+            key = payload.get('user_id')
+            with state['lock']:
+                state['active'][key] += 1
+                state['active']['*'] += 1
+                state['peak'][key] = max(state['peak'][key], state['active'][key])
+                state['peak']['*'] = max(state['peak']['*'], state['active']['*'])
+                state['sessions'].append(db.session())
+            _time.sleep(payload.get('sleep', 0.05))
+            with state['lock']:
+                state['active'][key] -= 1
+                state['active']['*'] -= 1
+            if payload.get('fail'):
+                raise RuntimeError('probe failure')
+
+        task_runner.register_handler(
+            'probe', concurrency_key=lambda p: ('google_user', p.get('user_id')),
+        )(handler)
+        yield state
+        task_runner._HANDLERS.pop('probe', None)
+        task_runner._CONCURRENCY_KEYS.pop('probe', None)
+
+    def _add(self, count, **payload):
+        for _ in range(count):
+            db.session.add(AsyncTask(task_type='probe', payload=dict(payload)))
+        db.session.commit()
+
+    def test_runs_tasks_in_parallel(self, threaded_app, probe):
+        from app.services.task_runner import process_pending_tasks
+        for user_id in range(8):
+            self._add(1, user_id=user_id, sleep=0.1)
+
+        stats = process_pending_tasks(concurrency=4)
+
+        assert stats['processed'] == 8
+        assert stats['succeeded'] == 8
+        assert stats['concurrency'] == 4
+        assert probe['peak']['*'] == 4
+        assert stats['elapsed_ms'] < 8 * 100  # faster than serial
+        assert stats['tasks_per_sec'] > 0
+        assert AsyncTask.query.filter_by(status='completed').count() == 8
+
+    def test_each_task_gets_its_own_session(self, threaded_app, probe):
+        from app.services.task_runner import process_pending_tasks
+        self._add(3, user_id=None)
+
+        process_pending_tasks(concurrency=3)
+
+        assert len({id(s) for s in probe['sessions']}) == 3
+        assert all(s is not db.session() for s in probe['sessions'])
+
+    def test_concurrency_key_limit(self, threaded_app, probe):
+        from app.services.task_runner import CONCURRENCY_LIMITS, process_pending_tasks
+        self._add(6, user_id=42)
+
+        stats = process_pending_tasks(concurrency=6)
+
+        assert stats['succeeded'] == 6
+        assert probe['peak'][42] == CONCURRENCY_LIMITS['google_user'] == 2
+
+    def test_failures_keep_retry_semantics(self, threaded_app, probe):
+        from app.services.task_runner import process_pending_tasks
+        db.session.add(AsyncTask(task_type='probe', payload={'fail': True}, max_retries=3))
+        db.session.add(AsyncTask(task_type='probe', payload={'fail': True}, max_retries=1))
+        db.session.add(AsyncTask(task_type='probe', payload={}))
+        db.session.commit()
+
+        stats = process_pending_tasks(concurrency=3)
+
+        assert (stats['succeeded'], stats['failed'], stats['dead']) == (1, 1, 1)
+        retrying = AsyncTask.query.filter_by(status='pending').one()
+        assert retrying.retry_count == 1
+        assert retrying.next_run_at > datetime.utcnow()
+        assert retrying.error_message == 'probe failure'
+
+    def test_default_comes_from_config(self, threaded_app, probe):
+        from app.services.task_runner import process_pending_tasks
+        self._add(2, user_id=None)
+        with patch.dict(threaded_app.config, {'TASK_RUNNER_CONCURRENCY': 2}):
+            stats = process_pending_tasks()
+        assert stats['concurrency'] == 2
+        assert probe['peak']['*'] == 2
+
+
+class TestDrain:
+    """drain_pending_tasks: batches until the queue is empty or the budget runs out."""
+
+    def _add(self, db_session, count, **kwargs):
+        for i in range(count):
+            db_session.add(AsyncTask(task_type='send_email', payload={
+                'to_email': f'{i}@b.com', 'subject': 'T', 'body_html': ''}, **kwargs))
+        db_session.commit()
+
+    def test_drains_beyond_one_batch(self, app, db_session):
+        from app.services.task_runner import drain_pending_tasks
+        self._add(db_session, 45)
+
+        with patch('app.services.notification_service.send_email', return_value=True):
+            stats = drain_pending_tasks(budget_seconds=30, batch_size=20)
+
+        assert stats['processed'] == stats['succeeded'] == 45
+        assert stats['batches'] == 3
+        assert stats['budget_exhausted'] is False
+        assert stats['backlog'] == {'pending': 0, 'due': 0, 'oldest_pending_age_seconds': None}
+
+    def test_stops_when_budget_runs_out(self, app, db_session):
+        from app.services import task_runner
+        self._add(db_session, 10)
+        clock = iter(range(0, 1000, 5))  # every perf_counter() call advances 5s
+
+        with patch('app.services.notification_service.send_email', return_value=True), \
+                patch.object(task_runner.time, 'perf_counter', side_effect=lambda: next(clock)):
+            stats = task_runner.drain_pending_tasks(budget_seconds=40, batch_size=2)
+
+        assert stats['budget_exhausted'] is True
+        assert 0 < stats['processed'] < 10
+        assert stats['backlog']['due'] == 10 - stats['processed']
+
+    def test_defers_claimed_tasks_not_started_by_deadline(self, app, db_session):
+        from app.services import task_runner
+        self._add(db_session, 6)
+        clock = iter(range(0, 1000, 5))
+
+        with patch('app.services.notification_service.send_email', return_value=True), \
+                patch.object(task_runner.time, 'perf_counter', side_effect=lambda: next(clock)):
+            stats = task_runner.process_pending_tasks(batch_size=6, concurrency=1, deadline=22)
+
+        assert stats['deferred'] > 0
+        assert stats['processed'] + stats['deferred'] == 6
+        deferred = AsyncTask.query.filter_by(status='pending').all()
+        assert len(deferred) == stats['deferred']
+        assert all(t.retry_count == 0 and t.started_at is None and t.lease_expires_at is None
+                   for t in deferred)
+
+    def test_past_deadline_claims_nothing(self, app, db_session):
+        import time
+        from app.services.task_runner import drain_pending_tasks
+        self._add(db_session, 3)
+
+        stats = drain_pending_tasks(budget_seconds=30, deadline=time.perf_counter())
+
+        assert stats['batches'] == 0
+        assert stats['budget_exhausted'] is True
+        assert stats['backlog']['due'] == 3
+
+    def test_backlog_reports_oldest_due_task(self, app, db_session):
+        from app.services.task_runner import queue_backlog
+        now = datetime.utcnow()
+        self._add(db_session, 1, created_at=now - timedelta(minutes=30))
+        self._add(db_session, 1, created_at=now - timedelta(hours=2),
+                  next_run_at=now + timedelta(hours=1))  # backing off, not due
+        self._add(db_session, 1, status='completed', created_at=now - timedelta(days=1))
+
+        backlog = queue_backlog()
+
+        assert backlog['pending'] == 2
+        assert backlog['due'] == 1
+        assert 1790 <= backlog['oldest_pending_age_seconds'] <= 1830
+
+
 class TestEnqueueHelpers:
     """Test task creation helpers."""
 
@@ -257,6 +561,39 @@ class TestCronEndpoint:
         assert resp.status_code == 200
         data = resp.get_json()
         assert 'processed' in data
+        assert data['backlog']['due'] == 0
+        assert data['budget_seconds'] == 50
+
+    def test_budget_query_param_can_only_lower_the_budget(self, client, db_session):
+        db_session.commit()
+        with patch.dict(os.environ, {'CRON_SECRET': 'test-secret'}):
+            headers = {'Authorization': 'Bearer test-secret'}
+            low = client.post('/api/cron/process-tasks?budget=5', headers=headers).get_json()
+            high = client.post('/api/cron/process-tasks?budget=500', headers=headers).get_json()
+        assert low['budget_seconds'] == 5
+        assert high['budget_seconds'] == 50
+
+    def test_reminder_phase_counts_against_budget(self, client, db_session):
+        import time
+        db_session.add(AsyncTask(task_type='send_email', payload={
+            'to_email': 'a@b.com', 'subject': 'T', 'body_html': ''}))
+        db_session.commit()
+
+        def slow_reminders():
+            time.sleep(0.3)
+            return {}
+
+        with patch.dict(os.environ, {'CRON_SECRET': 'test-secret'}), \
+                patch('app.services.reminder_service.check_and_send_submission_reminders',
+                      side_effect=slow_reminders), \
+                patch('app.services.reminder_service.check_and_send_preshift_reminders',
+                      return_value={}):
+            resp = client.post('/api/cron/process-tasks?budget=0.2',
+                               headers={'Authorization': 'Bearer test-secret'})
+        data = resp.get_json()
+        assert data['batches'] == 0
+        assert data['budget_exhausted'] is True
+        assert data['backlog']['due'] == 1
 
     def test_rejected_without_secret_in_non_debug(self, client, app, db_session):
         db_session.commit()
@@ -126,3 +126,178 @@ class TestOrgIsolation:
         auth.login_as(admin_b)
         resp = client.get(f"/api/admin/periods/{period.id}/submissions")
         assert resp.status_code == 404
+
+
+# ---------------------------------------------------------------------------
+# Request-scoped principal
+# ---------------------------------------------------------------------------
+
+class TestRequestPrincipal:
+    """User, membership and org are resolved once per request."""
+
+    @staticmethod
+    def _identity_queries(counter):
+        return [s for s in counter.statements
+                if 'FROM users' in s or 'FROM organization_members' in s
+                or 'FROM organizations' in s]
+
+    def test_one_identity_query_per_request(self, client, auth, admin_user, db_session,
+                                            count_queries):
+        db_session.commit()
+        auth.login_as(admin_user)
+        with count_queries() as counter:
+            resp = client.get("/api/admin/opening-hours")
+        assert resp.status_code == 200
+        identity = self._identity_queries(counter)
+        assert len(identity) == 1
+        assert 'organization_members' in identity[0] and 'organizations' in identity[0]
+
+    def test_membership_change_seen_by_next_request(self, client, auth, admin_user, db_session):
+        from app.models.membership import OrganizationMember
+        db_session.commit()
+        auth.login_as(admin_user)
+        assert client.get("/api/admin/periods").status_code == 200
+
+        OrganizationMember.query.filter_by(user_id=admin_user.id).update({'is_active': False})
+        db_session.commit()
+        resp = client.get("/api/admin/periods")
+        assert resp.status_code == 403
+        assert resp.get_json()['code'] == 'ORG_MEMBERSHIP_REQUIRED'
+
+    def test_principal_follows_session_user(self, app, admin_user, worker_user, db_session):
+        from flask import session
+        from app.middleware.auth_middleware import current_principal, get_current_user
+        db_session.commit()
+        with app.test_request_context():
+            assert current_principal() is None
+            session['user_id'] = admin_user.id
+            assert get_current_user() is admin_user
+            assert current_principal().organization.id == admin_user.organization_id
+            session['user_id'] = worker_user.id
+            assert get_current_user() is worker_user
+            assert current_principal().membership.user_id == worker_user.id
+
+
+# ---------------------------------------------------------------------------
+# Cross-request principal cache (PRINCIPAL_CACHE_TTL_SECONDS)
+# ---------------------------------------------------------------------------
+
+@pytest.fixture()
+def principal_cache(app, monkeypatch):
+    """Enable a 30 s principal cache with a controllable clock."""
+    from app.middleware import auth_middleware
+    clock = [1000.0]
+    monkeypatch.setitem(app.config, "PRINCIPAL_CACHE_TTL_SECONDS", 30)
+    monkeypatch.setattr(auth_middleware, "_clock", lambda: clock[0])
+    auth_middleware.invalidate_principal_cache()
+    yield clock
+    auth_middleware.invalidate_principal_cache()
+
+
+class TestPrincipalCache:
+
+    @staticmethod
+    def _identity_queries(counter):
+        return [s for s in counter.statements if "FROM users" in s
+                or "FROM organization_members" in s]
+
+    def test_warm_cache_skips_identity_query(self, client, auth, worker_user, db_session,
+                                             principal_cache, count_queries):
+        db_session.commit()
+        auth.login_as(worker_user)
+        assert client.get("/api/worker/periods").status_code == 200
+        with count_queries() as counter:
+            assert client.get("/api/worker/periods").status_code == 200
+        assert self._identity_queries(counter) == []
+
+    def test_disabled_by_default(self, app, client, auth, worker_user, db_session, count_queries):
+        assert not app.config["PRINCIPAL_CACHE_TTL_SECONDS"]
+        db_session.commit()
+        auth.login_as(worker_user)
+        client.get("/api/worker/periods")
+        with count_queries() as counter:
+            client.get("/api/worker/periods")
+        assert len(self._identity_queries(counter)) == 1
+
+    def test_remove_member_revokes_immediately(self, client, auth, admin_user, worker_user,
+                                               db_session, principal_cache):
+        from app.models.membership import OrganizationMember
+        db_session.commit()
+        member_id = OrganizationMember.query.filter_by(user_id=worker_user.id).one().id
+        auth.login_as(worker_user)
+        assert client.get("/api/worker/periods").status_code == 200
+
+        auth.login_as(admin_user)
+        assert client.delete(f"/api/admin/members/{member_id}").status_code == 204
+
+        auth.login_as(worker_user)
+        resp = client.get("/api/worker/periods")
+        assert resp.status_code == 403
+        assert resp.get_json()["code"] == "ORG_MEMBERSHIP_REQUIRED"
+
+    def test_org_created_for_admin_is_not_recreated(self, client, auth, admin_user,
+                                                     db_session, principal_cache):
+        from app.models.organization import Organization
+        admin_user.organization_id = None
+        db_session.commit()
+        auth.login_as(admin_user)
+        before = Organization.query.count()
+
+        assert client.get("/api/admin/opening-hours").status_code == 200
+        assert client.get("/api/admin/opening-hours").status_code == 200
+
+        assert Organization.query.count() == before + 1
+
+    def test_role_change_revokes_immediately(self, client, auth, admin_user, worker_user,
+                                             db_session, principal_cache):
+        from app.models.membership import OrganizationMember
+        db_session.commit()
+        member_id = OrganizationMember.query.filter_by(user_id=worker_user.id).one().id
+        auth.login_as(worker_user)
+        assert client.get("/api/worker/periods").status_code == 200
+
+        auth.login_as(admin_user)
+        resp = client.put(f"/api/admin/members/{member_id}/role", json={"role": "owner"})
+        assert resp.status_code == 200
+
+        auth.login_as(worker_user)
+        assert client.get("/api/worker/periods").status_code == 403
+        assert client.get("/api/owner/pending-approvals").status_code == 200
+
+    def test_master_deactivate_revokes_immediately(self, client, auth, admin_user, worker_user,
+                                                   db_session, principal_cache, monkeypatch):
+        monkeypatch.setenv("MASTER_EMAIL", admin_user.email)
+        db_session.commit()
+        worker_id = worker_user.id
+        auth.login_as(worker_user)
+        assert client.get("/api/worker/periods").status_code == 200
+
+        auth.login_as(admin_user)
+        assert client.delete(f"/api/master/users/{worker_id}").status_code == 200
+
+        auth.login_as(worker_user)
+        assert client.get("/api/worker/periods").status_code == 401
+
+    def test_change_elsewhere_applies_after_ttl(self, client, auth, worker_user, db_session,
+                                                principal_cache):
+        """Another instance's change (no local version bump) is bounded by the TTL."""
+        from app.models.membership import OrganizationMember
+        db_session.commit()
+        auth.login_as(worker_user)
+        assert client.get("/api/worker/periods").status_code == 200
+
+        OrganizationMember.query.filter_by(user_id=worker_user.id).update({"is_active": False})
+        db_session.commit()
+        principal_cache[0] += 29
+        assert client.get("/api/worker/periods").status_code == 200
+        principal_cache[0] += 2
+        assert client.get("/api/worker/periods").status_code == 403
+
+    def test_upsert_user_bumps_version(self, app, worker_user, db_session, principal_cache):
+        from app.middleware import auth_middleware
+        from app.services.auth_service import upsert_user
+        db_session.commit()
+        before = auth_middleware._cache_version(worker_user.id)
+        with app.test_request_context():
+            upsert_user(worker_user.google_id, worker_user.email, "Renamed")
+        assert auth_middleware._cache_version(worker_user.id) != before
@@ -0,0 +1,285 @@
+"""Tests for the auto-scheduler — solver, period loading and the admin API."""
+
+from datetime import date, timedelta
+
+from app.models.opening_hours import OpeningHours, OpeningHoursException
+from app.models.shift import ShiftSchedule, ShiftScheduleEntry, ShiftSubmission, ShiftSubmissionSlot
+from app.models.staffing import StaffingRequirement
+from app.services import organization_settings as org_settings
+from app.services.auto_schedule_service import (
+    CELLS_PER_DAY, CELL_MINUTES, Problem, WorkerRules,
+    build_problem, make_candidate, solve,
+)
+from tests.conftest import _make_org, _make_user
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _row(*bands):
+    """Demand row from (start_hour, end_hour, count) bands."""
+    row = [0] * CELLS_PER_DAY
+    for start, end, count in bands:
+        for i in range(start * 60 // CELL_MINUTES, end * 60 // CELL_MINUTES):
+            row[i] = count
+    return row
+
+
+# 月曜始まりの 1 週間。初日だけ 9-17 に 1 名必要
+FULL_WEEK = [_row((9, 17, 1))] + [_row()] * 6
+
+
+def _problem(demand, windows, **kwargs):
+    """windows: {(worker, day): (start_hour, end_hour)}"""
+    days = [date(2026, 3, 2) + timedelta(days=i) for i in range(len(demand))]
+    candidates = [make_candidate(w, d, s * 60, e * 60, demand[d]) for (w, d), (s, e) in windows.items()]
+    return Problem(days, demand, [c for c in candidates if c], **kwargs)
+
+
+def _submit(db_session, period, user, slots):
+    """slots: [(date, start, end)] — start/end None means 'the opening hours'."""
+    sub = ShiftSubmission(shift_period_id=period.id, user_id=user.id, status="submitted")
+    db_session.add(sub)
+    db_session.flush()
+    for slot_date, start, end in slots:
+        db_session.add(ShiftSubmissionSlot(
+            submission_id=sub.id, slot_date=slot_date, is_available=True,
+            start_time=start, end_time=end,
+        ))
+    db_session.flush()
+    return sub
+
+
+# ---------------------------------------------------------------------------
+# make_candidate
+# ---------------------------------------------------------------------------
+
+class TestMakeCandidate:
+
+    def test_clips_window_to_demand(self):
+        cand = make_candidate(1, 0, 8 * 60, 23 * 60, _row((10, 18, 1)))
+        assert (cand.start, cand.end) == (10 * 60, 18 * 60)
+        assert (cand.first_cell, cand.last_cell) == (40, 72)
+
+    def test_keeps_boundaries_inside_demand(self):
+        cand = make_candidate(1, 0, 11 * 60 + 30, 15 * 60 + 10, _row((10, 18, 1)))
+        assert (cand.start, cand.end) == (11 * 60 + 30, 15 * 60 + 10)
+        assert cand.last_cell == 61
+
+    def test_none_without_demand_or_for_empty_window(self):
+        assert make_candidate(1, 0, 6 * 60, 9 * 60, _row((10, 18, 1))) is None
+        assert make_candidate(1, 0, 12 * 60, 12 * 60, _row((10, 18, 1))) is None
+
+
+# ---------------------------------------------------------------------------
+# solve
+# ---------------------------------------------------------------------------
+
+class TestSolve:
+
+    def test_fills_demand_without_overstaffing(self):
+        problem = _problem([_row((9, 17, 2))], {(1, 0): (9, 17), (2, 0): (9, 17), (3, 0): (9, 17)})
+        assignments, metrics = solve(problem)
+        assert len(assignments) == 2
+        assert metrics['coverage_rate'] == 1.0
+
+    def test_combines_partial_windows(self):
+        problem = _problem([_row((9, 21, 1))], {
+            (1, 0): (9, 21), (2, 0): (9, 15), (3, 0): (15, 21),
+        })
+        assignments, metrics = solve(problem)
+        assert metrics['coverage_rate'] == 1.0
+        assert [a.worker for a in assignments] == [1]
+
+    def test_local_search_drops_redundant_shift(self):
+        # 貪欲法は最長の 10-20 を先に採り、両端を 9-16 / 14-21 で埋める（3 シフト）。
+        # 両端の 2 人で 9-21 が埋まるので、局所探索で 10-20 が外れる
+        problem = _problem([_row((9, 21, 1))], {(1, 0): (9, 16), (2, 0): (14, 21), (3, 0): (10, 20)})
+        greedy, _ = solve(problem, time_limit=0)
+        assert len(greedy) == 3
+        assignments, metrics = solve(problem)
+        assert sorted(a.worker for a in assignments) == [1, 2]
+        assert metrics['coverage_rate'] == 1.0
+
+    def test_spreads_hours_between_equal_workers(self):
+        demand = [_row((9, 17, 1))] * 4
+        windows = {(w, d): (9, 17) for w in (1, 2) for d in range(4)}
+        assignments, metrics = solve(_problem(demand, windows))
+        assert sorted(a.worker for a in assignments) == [1, 1, 2, 2]
+        assert metrics['hours_stddev'] == 0
+
+    def test_prefers_worker_below_min_attendance(self):
+        problem = _problem(FULL_WEEK, {(1, 0): (9, 17), (2, 0): (9, 17)}, rules={
+            2: WorkerRules(level_key=None, min_count_per_week=1, min_minutes_per_week=0),
+        })
+        assignments, metrics = solve(problem)
+        assert [a.worker for a in assignments] == [2]
+        assert metrics['min_attendance_shortfall_workers'] == []
+
+    def test_coverage_outranks_min_attendance(self):
+        problem = _problem(FULL_WEEK, {(1, 0): (9, 17), (2, 0): (9, 12)}, rules={
+            2: WorkerRules(level_key=None, min_count_per_week=1, min_minutes_per_week=0),
+        })
+        assignments, metrics = solve(problem)
+        assert [a.worker for a in assignments] == [1]
+        assert metrics['min_attendance_shortfall_workers'] == [2]
+
+    def test_avoids_same_tier_overlap_when_enabled(self):
+        rules = {1: WorkerRules('senior', 0, 0), 2: WorkerRules('senior', 0, 0),
+                 3: WorkerRules('junior', 0, 0)}
+        windows = {(w, 0): (9, 17) for w in (1, 2, 3)}
+        assignments, metrics = solve(_problem([_row((9, 17, 2))], windows, rules=rules,
+                                              overlap_same_tier=True))
+        assert sorted(a.worker for a in assignments) == [1, 3]
+        assert metrics['same_tier_overlap_hours'] == 0
+
+        assignments, _ = solve(_problem([_row((9, 17, 2))], windows, rules=rules))
+        assert sorted(a.worker for a in assignments) == [1, 2]
+
+    def test_min_attendance_prorated_for_partial_week(self):
+        # 期間が週の途中で終わる（1 日だけ）場合、週 7 回の条件は 1 回に按分される
+        problem = _problem([_row((9, 17, 1))], {(1, 0): (9, 17)}, rules={
+            1: WorkerRules(level_key=None, min_count_per_week=7, min_minutes_per_week=0),
+        })
+        _, metrics = solve(problem)
+        assert metrics['min_attendance_shortfall_workers'] == []
+
+    def test_greedy_only_when_no_time_for_local_search(self):
+        problem = _problem([_row((9, 17, 1))], {(1, 0): (9, 17)})
+        assignments, metrics = solve(problem, time_limit=0)
+        assert len(assignments) == 1
+        assert metrics['improvement_passes'] == 0
+
+    def test_reports_unfilled_demand(self):
+        problem = _problem([_row((9, 17, 2))], {(1, 0): (9, 17)})
+        _, metrics = solve(problem)
+        assert metrics['required_hours'] == 16
+        assert metrics['covered_hours'] == 8
+        assert metrics['coverage_rate'] == 0.5
+
+
+# ---------------------------------------------------------------------------
+# build_problem
+# ---------------------------------------------------------------------------
+
+class TestBuildProblem:
+
+    def test_demand_from_requirements_and_opening_hours(self, db_session, org, period, worker_user):
+        OpeningHours.create_defaults(org.id)
+        # 2026-03-02 は月曜 (day_of_week=1)
+        db_session.add(StaffingRequirement(organization_id=org.id, day_of_week=1,
+                                           start_time="10:00", end_time="14:00", required_count=3))
+        db_session.add(OpeningHoursException(organization_id=org.id, exception_date=date(2026, 3, 3),
+                                             is_closed=True))
+        db_session.flush()
+        problem = build_problem(period, org)
+        monday = problem.demand[1]
+        assert monday[10 * 4] == 3 and monday[14 * 4] == 0 and monday[9 * 4] == 0
+        assert set(problem.demand[2]) == {0}                     # 臨時休業
+        sunday = problem.demand[0]                              # 必要人数なし → 営業時間中 1 名
+        assert sunday[9 * 4] == 1 and sunday[21 * 4] == 0
+
+    def test_candidates_from_submitted_slots(self, db_session, org, period, worker_user):
+        OpeningHours.create_defaults(org.id)
+        _submit(db_session, period, worker_user, [
+            (date(2026, 3, 1), "12:00", "23:00"),
+            (date(2026, 3, 2), None, None),
+        ])
+        problem = build_problem(period, org)
+        cands = sorted(problem.candidates, key=lambda c: c.day)
+        assert [(c.day, c.start, c.end) for c in cands] == [
+            (0, 12 * 60, 21 * 60), (1, 9 * 60, 21 * 60),
+        ]
+
+    def test_skips_drafts_and_inactive_workers(self, db_session, org, period, worker_user):
+        OpeningHours.create_defaults(org.id)
+        _submit(db_session, period, worker_user, [(date(2026, 3, 2), "09:00", "17:00")])
+        other = _make_user(db_session, org, email="gone@test.com", role="worker")
+        _submit(db_session, period, other, [(date(2026, 3, 2), "09:00", "17:00")])
+        other.is_active = False
+        draft = _make_user(db_session, org, email="draft@test.com", role="worker")
+        _submit(db_session, period, draft, [(date(2026, 3, 2), "09:00", "17:00")]).status = "draft"
+        db_session.flush()
+        problem = build_problem(period, org)
+        assert {c.worker for c in problem.candidates} == {worker_user.id}
+
+    def test_worker_rules_from_settings(self, db_session, org, period, worker_user):
+        OpeningHours.create_defaults(org.id)
+        org_settings.set_level_system(org, {"enabled": True, "tiers": [{"key": "senior", "label": "S"}]})
+        org_settings.set_overlap_check(org, {"enabled": True, "scope": "same_tier"})
+        org_settings.set_min_attendance(org, {"mode": "per_member", "unit": "both",
+                                              "org_wide_count_per_week": 2,
+                                              "org_wide_hours_per_week": 6})
+        member = worker_user.memberships.first()
+        member.level_key = "senior"
+        member.min_attendance_hours_per_week = 10
+        _submit(db_session, period, worker_user, [(date(2026, 3, 2), "09:00", "17:00")])
+        problem = build_problem(period, org)
+        assert problem.overlap_same_tier is True
+        assert problem.rules[worker_user.id] == WorkerRules("senior", 2, 600)
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+
+class TestAutoScheduleAPI:
+
+    def _seed(self, db_session, org, period):
+        OpeningHours.create_defaults(org.id)
+        workers = [_make_user(db_session, org, email=f"w{i}@test.com", role="worker") for i in range(3)]
+        for w in workers:
+            _submit(db_session, period, w, [(date(2026, 3, day), "09:00", "21:00") for day in range(1, 8)])
+        db_session.commit()
+        return workers
+
+    def test_dry_run_does_not_save(self, client, auth, admin_user, org, period, db_session):
+        self._seed(db_session, org, period)
+        auth.login_as(admin_user)
+        resp = client.post(f"/api/admin/periods/{period.id}/schedule/auto", json={"dry_run": True})
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert len(data['entries']) == 7
+        assert data['metrics']['covered_hours'] == 7 * 12
+        assert ShiftSchedule.query.filter_by(shift_period_id=period.id).count() == 0
+
+    def test_saves_draft(self, client, auth, admin_user, org, period, db_session):
+        workers = self._seed(db_session, org, period)
+        auth.login_as(admin_user)
+        resp = client.post(f"/api/admin/periods/{period.id}/schedule/auto")
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['status'] == 'draft'
+        assert len(data['entries']) == 7
+        assert {e['user_id'] for e in data['entries']} == {w.id for w in workers}
+        assert data['metrics']['assigned_shifts'] == 7
+        assert ShiftScheduleEntry.query.filter_by(schedule_id=data['id']).count() == 7
+
+    def test_rejects_when_schedule_confirmed(self, client, auth, admin_user, org, period, db_session):
+        self._seed(db_session, org, period)
+        db_session.add(ShiftSchedule(shift_period_id=period.id, status="confirmed",
+                                     created_by=admin_user.id))
+        db_session.commit()
+        auth.login_as(admin_user)
+        resp = client.post(f"/api/admin/periods/{period.id}/schedule/auto")
+        assert resp.status_code == 400
+        assert resp.get_json()['code'] == 'VALIDATION_ERROR'
+
+    def test_other_org_period_not_found(self, client, auth, admin_user, db_session):
+        other = _make_org(db_session, name="Other")
+        other_admin = _make_user(db_session, other, email="other@test.com", role="admin")
+        from app.models.shift import ShiftPeriod
+        p = ShiftPeriod(organization_id=other.id, name="X", start_date=date(2026, 3, 1),
+                        end_date=date(2026, 3, 31), created_by=other_admin.id)
+        db_session.add(p)
+        db_session.commit()
+        auth.login_as(admin_user)
+        resp = client.post(f"/api/admin/periods/{p.id}/schedule/auto")
+        assert resp.status_code == 404
+
+    def test_worker_forbidden(self, client, auth, worker_user, period, db_session):
+        db_session.commit()
+        auth.login_as(worker_user)
+        resp = client.post(f"/api/admin/periods/{period.id}/schedule/auto")
+        assert resp.status_code == 403
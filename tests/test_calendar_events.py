@@ -0,0 +1,263 @@
+"""Tests for paginated and incremental Google Calendar event fetching.
+
+Runs calendar_service against a local fake of the Calendar v3 events
+endpoint (pagination via pageToken, incremental sync via syncToken).
+"""
+
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qs
+
+import httplib2
+import pytest
+from googleapiclient.discovery import build as real_build
+from googleapiclient.errors import HttpError
+
+from app.models.user import CalendarSyncState
+from app.services.calendar_service import (
+    fetch_events, fetch_events_incremental, iter_event_pages,
+)
+
+
+# ---------------------------------------------------------------------------
+# Fake Calendar server
+# ---------------------------------------------------------------------------
+
+class FakeCalendar:
+    """In-memory calendar with Google-style change tracking."""
+
+    def __init__(self, page_size=3):
+        self.page_size = page_size
+        self.events = {}      # id -> raw event (incl. cancelled)
+        self.changed_at = {}  # id -> change sequence number
+        self.seq = 0
+        self.requests = []
+        self.expired_tokens = set()
+
+    def put(self, event_id, start, end, summary='予定'):
+        self.seq += 1
+        self.events[event_id] = {
+            'id': event_id, 'status': 'confirmed', 'summary': summary,
+            'start': {'dateTime': start}, 'end': {'dateTime': end},
+        }
+        self.changed_at[event_id] = self.seq
+
+    def cancel(self, event_id):
+        self.seq += 1
+        self.events[event_id] = {'id': event_id, 'status': 'cancelled'}
+        self.changed_at[event_id] = self.seq
+
+    def list(self, params):
+        self.requests.append(params)
+        sync_token = params.get('syncToken')
+        if sync_token:
+            if sync_token in self.expired_tokens:
+                return 410, {'error': {'code': 410, 'message': 'Sync token is no longer valid'}}
+            since = int(sync_token.split('-')[1])
+            items = [e for i, e in self.events.items() if self.changed_at[i] > since]
+        else:
+            time_min = datetime.fromisoformat(params['timeMin'])
+            time_max = datetime.fromisoformat(params['timeMax'])
+            items = [
+                e for e in self.events.values()
+                if e['status'] != 'cancelled'
+                and datetime.fromisoformat(e['end']['dateTime']) > time_min
+                and datetime.fromisoformat(e['start']['dateTime']) < time_max
+            ]
+            items.sort(key=lambda e: e['start']['dateTime'])
+
+        offset = int(params.get('pageToken', '0'))
+        page = items[offset:offset + self.page_size]
+        body = {'items': page}
+        if offset + self.page_size < len(items):
+            body['nextPageToken'] = str(offset + self.page_size)
+        else:
+            body['nextSyncToken'] = f'sync-{self.seq}'
+        return 200, body
+
+
+def _handler_for(calendar):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            status, body = calendar.list(params)
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+    return Handler
+
+
+@pytest.fixture()
+def fake_calendar():
+    calendar = FakeCalendar()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _handler_for(calendar))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    endpoint = f'http://127.0.0.1:{server.server_address[1]}/'
+
+    def _build(*args, **kwargs):
+        return real_build('calendar', 'v3', http=httplib2.Http(), static_discovery=True,
+                          client_options={'api_endpoint': endpoint})
+
+    with patch('app.services.calendar_service.build_service', side_effect=_build):
+        yield calendar
+    server.shutdown()
+    server.server_close()
+
+
+def _seed(calendar, count, day=10):
+    for i in range(count):
+        calendar.put(f'e{i:02d}', f'2026-03-{day:02d}T{9 + i % 10:02d}:00:00+09:00',
+                     f'2026-03-{day:02d}T{10 + i % 10:02d}:00:00+09:00')
+
+
+# ---------------------------------------------------------------------------
+# Pagination
+# ---------------------------------------------------------------------------
+
+class TestPagination:
+
+    def test_iter_event_pages_follows_page_tokens(self, fake_calendar):
+        _seed(fake_calendar, 8)
+        pages = list(iter_event_pages(object(), '2026-03-01', '2026-03-31'))
+        assert [len(p) for p in pages] == [3, 3, 2]
+        assert len(fake_calendar.requests) == 3
+        assert fake_calendar.requests[1]['pageToken'] == '3'
+
+    def test_fetch_events_returns_every_page(self, fake_calendar):
+        _seed(fake_calendar, 7)
+        events = fetch_events(object(), '2026-03-01', '2026-03-31')
+        assert len(events) == 7
+        assert set(events[0]) == {'id', 'summary', 'start', 'end', 'location', 'description'}
+
+    def test_pages_are_lazy(self, fake_calendar):
+        _seed(fake_calendar, 9)
+        pages = iter_event_pages(object(), '2026-03-01', '2026-03-31')
+        next(pages)
+        assert len(fake_calendar.requests) == 1
+
+
+# ---------------------------------------------------------------------------
+# Incremental sync
+# ---------------------------------------------------------------------------
+
+class TestIncrementalSync:
+
+    def test_first_call_does_full_listing_and_stores_token(self, fake_calendar, worker_user, db_session):
+        _seed(fake_calendar, 5)
+        events = fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-04-01')
+
+        assert len(events) == 5
+        assert all('syncToken' not in r for r in fake_calendar.requests)
+        state = CalendarSyncState.query.filter_by(user_id=worker_user.id).one()
+        assert state.sync_token == f'sync-{fake_calendar.seq}'
+        assert len(state.events) == 5
+
+    def test_repeat_call_downloads_only_changes(self, fake_calendar, worker_user, db_session):
+        _seed(fake_calendar, 5)
+        fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-04-01')
+        fake_calendar.requests.clear()
+
+        fake_calendar.put('new', '2026-03-05T12:00:00+09:00', '2026-03-05T13:00:00+09:00')
+        fake_calendar.put('e01', '2026-03-11T09:00:00+09:00', '2026-03-11T11:00:00+09:00', summary='変更')
+        fake_calendar.cancel('e02')
+        events = fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-04-01')
+
+        assert len(fake_calendar.requests) == 1
+        assert fake_calendar.requests[0]['syncToken'].startswith('sync-')
+        ids = [e['id'] for e in events]
+        assert 'e02' not in ids
+        assert ids[0] == 'new'  # sorted by start
+        changed = next(e for e in events if e['id'] == 'e01')
+        assert changed['summary'] == '変更'
+        assert len(events) == 5
+
+    def test_changes_outside_window_are_not_stored(self, fake_calendar, worker_user, db_session):
+        _seed(fake_calendar, 2)
+        fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-04-01')
+
+        fake_calendar.put('later', '2026-06-01T09:00:00+09:00', '2026-06-01T10:00:00+09:00')
+        fake_calendar.put('e00', '2026-05-10T09:00:00+09:00', '2026-05-10T10:00:00+09:00')  # moved out
+        events = fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-04-01')
+
+        assert [e['id'] for e in events] == ['e01']
+        state = CalendarSyncState.query.filter_by(user_id=worker_user.id).one()
+        assert set(state.events) == {'e01'}
+
+    def test_narrower_window_is_served_from_snapshot(self, fake_calendar, worker_user, db_session):
+        fake_calendar.put('early', '2026-03-02T09:00:00+09:00', '2026-03-02T10:00:00+09:00')
+        fake_calendar.put('late', '2026-03-20T09:00:00+09:00', '2026-03-20T10:00:00+09:00')
+        fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-04-01')
+
+        events = fetch_events_incremental(worker_user.id, object(), '2026-03-15', '2026-03-31')
+        assert [e['id'] for e in events] == ['late']
+        assert 'syncToken' in fake_calendar.requests[-1]
+
+    def test_uncovered_window_triggers_full_listing(self, fake_calendar, worker_user, db_session):
+        _seed(fake_calendar, 2)
+        fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-03-15')
+        fake_calendar.requests.clear()
+
+        fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-04-01')
+        assert 'syncToken' not in fake_calendar.requests[0]
+        state = CalendarSyncState.query.filter_by(user_id=worker_user.id).one()
+        assert state.time_max == datetime(2026, 4, 1)
+
+    def test_expired_token_falls_back_to_full_listing(self, fake_calendar, worker_user, db_session):
+        _seed(fake_calendar, 4)
+        fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-04-01')
+        fake_calendar.expired_tokens.add(f'sync-{fake_calendar.seq}')
+        fake_calendar.requests.clear()
+
+        events = fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-04-01')
+        assert len(events) == 4
+        assert 'syncToken' in fake_calendar.requests[0]
+        assert 'syncToken' not in fake_calendar.requests[1]
+
+    def test_other_http_errors_propagate(self, fake_calendar, worker_user, db_session):
+        _seed(fake_calendar, 1)
+        fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-04-01')
+        with patch.object(FakeCalendar, 'list', return_value=(500, {'error': {'code': 500}})):
+            with pytest.raises(HttpError):
+                fetch_events_incremental(worker_user.id, object(), '2026-03-01', '2026-04-01')
+
+
+class TestWorkerCalendarEventsEndpoint:
+
+    def test_incremental_mode_uses_stored_token(self, app, client, auth, worker_user, db_session,
+                                                fake_calendar):
+        _seed(fake_calendar, 4)
+        db_session.commit()
+        auth.login_as(worker_user)
+        url = '/api/worker/calendar/events?startDate=2026-03-01&endDate=2026-04-01'
+        with patch('app.blueprints.api_worker.get_credentials_for_user', return_value=object()), \
+                patch.dict(app.config, {'CALENDAR_INCREMENTAL_SYNC': True}):
+            first = client.get(url)
+            second = client.get(url)
+
+        assert first.status_code == 200
+        assert len(first.get_json()) == 4
+        assert second.get_json() == first.get_json()
+        assert 'syncToken' in fake_calendar.requests[-1]
+
+    def test_default_mode_does_full_listing(self, client, auth, worker_user, db_session, fake_calendar):
+        _seed(fake_calendar, 4)
+        db_session.commit()
+        auth.login_as(worker_user)
+        url = '/api/worker/calendar/events?startDate=2026-03-01&endDate=2026-04-01'
+        with patch('app.blueprints.api_worker.get_credentials_for_user', return_value=object()):
+            resp = client.get(url)
+
+        assert len(resp.get_json()) == 4
+        assert all('syncToken' not in r for r in fake_calendar.requests)
+        assert CalendarSyncState.query.count() == 0
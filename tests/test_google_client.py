@@ -0,0 +1,101 @@
+"""Tests for the shared Google API service factory."""
+
+import threading
+from unittest.mock import patch
+
+import httplib2
+import pytest
+from google.oauth2.credentials import Credentials
+
+from app.services import google_client
+from app.services.google_client import build_service
+
+
+class _RecordingHttp:
+    """Minimal httplib2.Http stand-in that records outgoing requests."""
+
+    def __init__(self, content=b'{}', headers=None):
+        self.requests = []
+        self.content = content
+        self.headers = {'status': '200', **(headers or {})}
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        self.requests.append((method, uri, dict(headers or {})))
+        return httplib2.Response(self.headers), self.content
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool():
+    google_client.reset_pool()
+    yield
+    google_client.reset_pool()
+
+
+class TestBuildService:
+
+    def test_resource_tree_is_built_once(self):
+        google_client._shared_resource.cache_clear()
+        google_client._children.clear()
+        with patch('app.services.google_client.build', wraps=google_client.build) as mock_build:
+            services = [build_service('calendar', 'v3', Credentials(token=str(i))) for i in range(5)]
+            collections = [s.events()._resource for s in services]
+        assert mock_build.call_count == 1
+        assert all(c is collections[0] for c in collections)
+
+    def test_transport_is_reused_within_a_thread(self):
+        first = build_service('calendar', 'v3', Credentials(token='a'))
+        second = build_service('calendar', 'v3', Credentials(token='b'))
+        assert first._http.http is second._http.http
+        assert first._http.credentials is not second._http.credentials
+
+    def test_each_thread_gets_its_own_transport(self):
+        main = build_service('calendar', 'v3', Credentials(token='t'))._http.http
+        seen = []
+
+        def worker():
+            seen.append(build_service('calendar', 'v3', Credentials(token='t'))._http.http)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        assert seen[0] is not main
+
+    def test_requests_carry_the_bound_credentials(self):
+        transport = _RecordingHttp()
+        google_client._local.http = transport
+
+        alice = build_service('calendar', 'v3', Credentials(token='alice'))
+        bob = build_service('calendar', 'v3', Credentials(token='bob'))
+        alice_request = alice.events().list(calendarId='primary')
+        bob.events().list(calendarId='primary').execute()
+        alice_request.execute()
+
+        auth = [headers['authorization'] for _, _, headers in transport.requests]
+        assert auth == ['Bearer bob', 'Bearer alice']
+        assert transport.requests[0][1].startswith(
+            'https://www.googleapis.com/calendar/v3/calendars/primary/events')
+
+    def test_batch_uses_the_bound_credentials(self):
+        boundary = 'batch_boundary'
+        content = (
+            f'--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-test + 1>\r\n\r\n'
+            'HTTP/1.1 204 No Content\r\nContent-Type: application/json\r\n\r\n\r\n'
+            f'--{boundary}--'
+        ).encode()
+        transport = _RecordingHttp(
+            content, headers={'content-type': f'multipart/mixed; boundary={boundary}'})
+        google_client._local.http = transport
+
+        service = build_service('calendar', 'v3', Credentials(token='carol'))
+        batch = service.new_batch_http_request()
+        batch.add(service.events().delete(calendarId='primary', eventId='e1'), request_id='1')
+        batch.execute()
+
+        method, uri, headers = transport.requests[0]
+        assert uri.endswith('/batch/calendar/v3')
+        assert headers['authorization'] == 'Bearer carol'
+
+    def test_shared_resource_cannot_send_unbound_requests(self):
+        shared = google_client._shared_resource('calendar', 'v3')
+        with pytest.raises(RuntimeError):
+            shared.calendarList().list().execute()
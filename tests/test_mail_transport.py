@@ -0,0 +1,197 @@
+"""Tests for pooled SMTP delivery against a local SMTP stand-in."""
+
+import os
+import socketserver
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.models.async_task import AsyncTask
+from app.services import mail_transport
+from app.services.mail_transport import SmtpPool, pooled_delivery
+# Captured at import: the session-wide app fixture replaces it with a mock
+from app.services.notification_service import send_email as real_send_email
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """Just enough ESMTP for smtplib: EHLO, AUTH PLAIN, MAIL/RCPT/DATA, NOOP, QUIT."""
+
+    def _reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self._reply('220 stand-in ESMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb == 'EHLO':
+                self._reply('250-stand-in')
+                self._reply('250 AUTH PLAIN')
+            elif verb == 'AUTH':
+                with server.lock:
+                    server.logins += 1
+                self._reply('235 2.7.0 Authentication successful')
+            elif verb in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self._reply('250 OK')
+            elif verb == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                with server.lock:
+                    server.messages += 1
+                    drop = server.drop_after and server.messages % server.drop_after == 0
+                self._reply('250 OK queued')
+                if drop:
+                    return  # server hangs up without QUIT
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+
+class _SmtpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _SmtpHandler)
+        self.lock = threading.Lock()
+        self.connections = self.logins = self.messages = 0
+        self.drop_after = 0
+
+
+@pytest.fixture()
+def smtp_server():
+    server = _SmtpServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05},
+                              daemon=True)
+    thread.start()
+    env = {'SMTP_HOST': '127.0.0.1', 'SMTP_PORT': str(server.server_address[1]),
+           'SMTP_USER': 'bot@test.com', 'SMTP_PASS': 'pw', 'SMTP_STARTTLS': 'false'}
+    with patch.dict(os.environ, env):
+        yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _message(i):
+    from email.mime.text import MIMEText
+    msg = MIMEText(f'<p>{i}</p>', 'html')
+    msg['Subject'], msg['From'], msg['To'] = f'T{i}', 'bot@test.com', f'{i}@test.com'
+    return msg
+
+
+class TestSmtpPool:
+
+    def test_many_messages_share_one_session(self, smtp_server):
+        pool = SmtpPool(mail_transport.smtp_settings())
+        for i in range(20):
+            pool.send(_message(i))
+        pool.close()
+
+        assert smtp_server.messages == 20
+        assert smtp_server.connections == 1
+        assert smtp_server.logins == 1
+
+    def test_reconnects_when_server_drops_the_session(self, smtp_server):
+        smtp_server.drop_after = 3
+        pool = SmtpPool(mail_transport.smtp_settings())
+        for i in range(7):
+            pool.send(_message(i))
+        pool.close()
+
+        assert smtp_server.messages == 7
+        assert smtp_server.connections == 3
+
+    def test_rolls_over_after_max_messages(self, smtp_server):
+        pool = SmtpPool(mail_transport.smtp_settings(), max_messages=4)
+        for i in range(10):
+            pool.send(_message(i))
+        pool.close()
+
+        assert smtp_server.connections == pool.connects == 3
+
+    def test_concurrent_senders_never_share_a_session(self, smtp_server):
+        pool = SmtpPool(mail_transport.smtp_settings())
+        threads = [threading.Thread(target=lambda: [pool.send(_message(i)) for i in range(5)])
+                   for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        pool.close()
+
+        assert smtp_server.messages == 15
+        assert 1 <= smtp_server.connections <= 3
+
+    def test_sessions_outlive_the_threads_that_used_them(self, smtp_server):
+        pool = SmtpPool(mail_transport.smtp_settings())
+        for i in range(4):
+            t = threading.Thread(target=pool.send, args=(_message(i),))
+            t.start()
+            t.join()
+        pool.close()
+
+        assert smtp_server.messages == 4
+        assert smtp_server.connections == 1
+
+
+class TestSendEmail:
+
+    def test_one_shot_without_pool(self, smtp_server):
+        assert real_send_email('a@test.com', 'S', '<p>x</p>') is True
+        assert real_send_email('b@test.com', 'S', '<p>x</p>') is True
+        assert smtp_server.connections == 2
+
+    def test_pooled_delivery_reuses_the_session(self, smtp_server):
+        with pooled_delivery() as pool:
+            for i in range(5):
+                assert real_send_email(f'{i}@test.com', 'S', '<p>x</p>') is True
+            assert mail_transport.current_pool() is pool
+        assert mail_transport.current_pool() is None
+        assert smtp_server.connections == 1
+        assert smtp_server.messages == 5
+
+    def test_not_configured(self):
+        with patch.dict(os.environ, {'SMTP_HOST': ''}), pooled_delivery() as pool:
+            assert pool is None
+            assert real_send_email('a@test.com', 'S', '<p>x</p>') is False
+
+    def test_task_batch_uses_one_session(self, app, db_session, smtp_server):
+        from app.services.task_runner import process_pending_tasks
+        for i in range(12):
+            db_session.add(AsyncTask(task_type='send_email', payload={
+                'to_email': f'{i}@test.com', 'subject': 'S', 'body_html': '<p>x</p>'}))
+        db_session.commit()
+
+        with patch('app.services.notification_service.send_email', real_send_email):
+            stats = process_pending_tasks(batch_size=20)
+
+        assert stats['succeeded'] == 12
+        assert smtp_server.messages == 12
+        assert smtp_server.connections == 1
+        assert smtp_server.logins == 1
+
+    def test_concurrent_drain_logins_bounded_by_concurrency(self, threaded_app, smtp_server):
+        from app.extensions import db
+        from app.services.task_runner import drain_pending_tasks
+        for i in range(24):
+            db.session.add(AsyncTask(task_type='send_email', payload={
+                'to_email': f'{i}@test.com', 'subject': 'S', 'body_html': '<p>x</p>'}))
+        db.session.commit()
+
+        with patch('app.services.notification_service.send_email', real_send_email):
+            stats = drain_pending_tasks(budget_seconds=30, batch_size=4, concurrency=3)
+
+        assert stats['succeeded'] == 24
+        assert stats['batches'] >= 6
+        assert smtp_server.messages == 24
+        assert smtp_server.logins <= 3
@@ -0,0 +1,88 @@
+"""Tests for bulk notification fan-out (render once, one INSERT, one commit)."""
+
+from unittest.mock import patch
+
+from app.models.async_task import AsyncTask
+from app.services import notification_service
+from app.services.notification_service import fan_out, notify_period_open_many
+
+
+def _workers(count):
+    return [{'to_email': f'w{i}@test.com', 'worker_name': f'Worker {i}'} for i in range(count)]
+
+
+class TestFanOut:
+
+    def test_renders_once_and_inserts_in_one_statement(self, app, db_session, count_queries):
+        with patch.object(notification_service, 'render_template',
+                          wraps=notification_service.render_template) as render, \
+                count_queries() as counter:
+            sent = notify_period_open_many(
+                _workers(50), 'Org', 'May', '2026-05-01', '2026-05-31', None, 'https://x/worker',
+                organization_id=None,
+            )
+
+        assert sent == 50
+        assert render.call_count == 1
+        inserts = [s for s in counter.statements if s.lstrip().upper().startswith('INSERT')]
+        assert len(inserts) == 1
+        tasks = AsyncTask.query.order_by(AsyncTask.id).all()
+        assert [t.payload['to_email'] for t in tasks] == [f'w{i}@test.com' for i in range(50)]
+        assert all(t.status == 'pending' and t.task_type == 'send_email' for t in tasks)
+
+    def test_body_matches_single_render(self, app, db_session):
+        from app.services.notification_service import render_template
+        notify_period_open_many(
+            [{'to_email': 'a@test.com', 'worker_name': 'Tanaka <b>&</b>'}],
+            'Org', 'May', '2026-05-01', '2026-05-31', '2026/04/25 23:59', 'https://x/worker',
+            announcement_text='line1\nline2',
+        )
+        expected = render_template(
+            'emails/period_open.html', worker_name='Tanaka <b>&</b>', org_name='Org',
+            period_name='May', start_date='2026-05-01', end_date='2026-05-31',
+            deadline_str='2026/04/25 23:59', submit_url='https://x/worker',
+            announcement_text=notification_service._announcement_html('line1\nline2'),
+        )
+        task = AsyncTask.query.one()
+        assert task.payload['body_html'] == expected
+        assert 'Tanaka &lt;b&gt;&amp;&lt;/b&gt;' in task.payload['body_html']
+        assert 'line1<br>line2' in task.payload['body_html']
+
+    def test_values_cannot_expand_other_placeholders(self, app, db_session):
+        fan_out('emails/vacancy_request.html', 'S', [
+            {'to_email': 'a@test.com', 'user_name': '@@accept_url@@ @@decline_url@@',
+             'reason': '@@user_name@@', 'accept_url': 'https://x/accept/a',
+             'decline_url': 'https://x/decline/a'},
+        ], context=dict(shift_date='2026-05-01', start_time='09:00', end_time='17:00'))
+        body = AsyncTask.query.one().payload['body_html']
+        assert '@@accept_url@@ @@decline_url@@ さん' in body
+        assert '理由: @@user_name@@' in body
+        assert body.count('https://x/accept/a') == 1
+        assert body.count('https://x/decline/a') == 1
+
+    def test_per_recipient_subject(self, app, db_session):
+        fan_out('emails/preshift.html', lambda r: f"[シフリー] シフトリマインド: {r['shift_date_str']}", [
+            {'to_email': 'a@test.com', 'worker_name': 'A', 'shift_date_str': '2026年05月01日',
+             'start_time': '09:00', 'end_time': '17:00'},
+            {'to_email': 'b@test.com', 'worker_name': 'B', 'shift_date_str': '2026年05月02日',
+             'start_time': '12:00', 'end_time': '18:00'},
+        ])
+        tasks = AsyncTask.query.order_by(AsyncTask.id).all()
+        assert [t.payload['subject'] for t in tasks] == [
+            '[シフリー] シフトリマインド: 2026年05月01日',
+            '[シフリー] シフトリマインド: 2026年05月02日',
+        ]
+        assert '12:00' in tasks[1].payload['body_html']
+        assert '12:00' not in tasks[0].payload['body_html']
+
+    def test_empty_recipients(self, app, db_session):
+        assert fan_out('emails/preshift.html', 'S', []) == 0
+        assert AsyncTask.query.count() == 0
+
+    def test_falls_back_to_sync_send_when_enqueue_fails(self, app, db_session):
+        with patch('app.services.task_runner.enqueue_emails', side_effect=RuntimeError('db down')), \
+                patch.object(notification_service, 'send_email', return_value=True) as send:
+            sent = notify_period_open_many(_workers(3), 'Org', 'May', '2026-05-01',
+                                           '2026-05-31', None, 'https://x/worker')
+        assert sent == 3
+        assert [c.args[0] for c in send.call_args_list] == [f'w{i}@test.com' for i in range(3)]
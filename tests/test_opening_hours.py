@@ -0,0 +1,108 @@
+"""Tests for effective opening-hours resolution (weekly defaults + exceptions)."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.opening_hours import OpeningHours, OpeningHoursException
+from app.services.shift_service import (
+    get_opening_hours_for_date, get_opening_hours_for_period,
+)
+
+
+def _seed_hours(db_session, org):
+    OpeningHours.create_defaults(org.id, '10:00', '20:00')
+    db_session.flush()
+    # Sunday (schema dow 0) closed by default
+    sunday = OpeningHours.query.filter_by(organization_id=org.id, day_of_week=0).first()
+    sunday.is_closed = True
+    db_session.add_all([
+        # Monday 2026-03-02: shortened hours
+        OpeningHoursException(
+            organization_id=org.id, exception_date=date(2026, 3, 2),
+            start_time='12:00', end_time='18:00', source='manual',
+        ),
+        # Tuesday 2026-03-03: closed
+        OpeningHoursException(
+            organization_id=org.id, exception_date=date(2026, 3, 3),
+            is_closed=True, source='calendar',
+        ),
+        # Sunday 2026-03-08: opened by exception
+        OpeningHoursException(
+            organization_id=org.id, exception_date=date(2026, 3, 8),
+            start_time='09:00', end_time='15:00', source='manual',
+        ),
+    ])
+    db_session.flush()
+
+
+class TestGetOpeningHoursForPeriod:
+
+    def test_applies_weekly_defaults_and_exceptions(self, db_session, org):
+        _seed_hours(db_session, org)
+        hours = get_opening_hours_for_period(org.id, date(2026, 3, 1), date(2026, 3, 9))
+
+        assert hours['2026-03-01'] is None  # Sunday closed
+        assert hours['2026-03-02'] == {'start_time': '12:00', 'end_time': '18:00'}
+        assert hours['2026-03-03'] is None  # closed exception
+        assert hours['2026-03-04'] == {'start_time': '10:00', 'end_time': '20:00'}
+        assert hours['2026-03-08'] == {'start_time': '09:00', 'end_time': '15:00'}
+        assert len(hours) == 9
+
+    def test_matches_per_date_resolution(self, db_session, org):
+        _seed_hours(db_session, org)
+        start, end = date(2026, 2, 25), date(2026, 3, 15)
+        hours = get_opening_hours_for_period(org.id, start, end)
+
+        current = start
+        while current <= end:
+            assert hours[current.isoformat()] == get_opening_hours_for_date(org.id, current)
+            current += timedelta(days=1)
+
+    def test_no_weekly_rows_means_closed(self, db_session, org):
+        hours = get_opening_hours_for_period(org.id, date(2026, 3, 1), date(2026, 3, 3))
+        assert hours == {'2026-03-01': None, '2026-03-02': None, '2026-03-03': None}
+
+    def test_ignores_other_org_exceptions(self, db_session, org):
+        from tests.conftest import _make_org
+        _seed_hours(db_session, org)
+        other = _make_org(db_session, name="Other Org")
+        db_session.add(OpeningHoursException(
+            organization_id=other.id, exception_date=date(2026, 3, 4), is_closed=True,
+        ))
+        db_session.flush()
+
+        hours = get_opening_hours_for_period(org.id, date(2026, 3, 4), date(2026, 3, 4))
+        assert hours['2026-03-04'] == {'start_time': '10:00', 'end_time': '20:00'}
+
+    @pytest.mark.parametrize('days', [7, 31, 90])
+    def test_query_count_is_constant(self, db_session, org, count_queries, days):
+        _seed_hours(db_session, org)
+        start = date(2026, 3, 1)
+        with count_queries() as counter:
+            hours = get_opening_hours_for_period(org.id, start, start + timedelta(days=days - 1))
+        assert len(hours) == days
+        assert counter.count == 2
+
+
+class TestPeriodOpeningHoursEndpoints:
+
+    def test_admin_endpoint(self, client, auth, admin_user, period, db_session):
+        _seed_hours(db_session, period.organization)
+        db_session.commit()
+        auth.login_as(admin_user)
+        resp = client.get(f'/api/admin/periods/{period.id}/opening-hours')
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert len(data) == 31
+        assert data['2026-03-02'] == {'start_time': '12:00', 'end_time': '18:00'}
+
+    def test_worker_endpoint(self, client, auth, worker_user, period, db_session):
+        _seed_hours(db_session, period.organization)
+        db_session.commit()
+        auth.login_as(worker_user)
+        resp = client.get(f'/api/worker/periods/{period.id}/opening-hours')
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert len(data) == 31
+        assert data['2026-03-03'] is None
@@ -0,0 +1,358 @@
+"""Tests for opening-hours ⇄ Google Calendar sync and the Calendar batch helper."""
+
+import json
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from googleapiclient.discovery import build as real_build
+from googleapiclient.http import HttpMockSequence
+
+from app.models.opening_hours import (
+    OpeningHours, OpeningHoursException, OpeningHoursCalendarSync, SyncOperationLog,
+)
+from app.services.calendar_service import batch_event_operations
+from app.services.opening_hours_sync_service import (
+    export_opening_hours_to_calendar, import_opening_hours_from_calendar,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _batch_response(parts):
+    """Build a multipart/mixed batch response from (request_id, status, body) tuples."""
+    boundary = 'batch_test'
+    chunks = []
+    for request_id, status, body in parts:
+        payload = json.dumps(body) if body is not None else ''
+        chunks.append(
+            f'--{boundary}\r\n'
+            'Content-Type: application/http\r\n'
+            f'Content-ID: <response-test + {request_id}>\r\n\r\n'
+            f'HTTP/1.1 {status} OK\r\n'
+            'Content-Type: application/json\r\n\r\n'
+            f'{payload}\r\n'
+        )
+    chunks.append(f'--{boundary}--')
+    headers = {'status': '200', 'content-type': f'multipart/mixed; boundary={boundary}'}
+    return headers, ''.join(chunks)
+
+
+def _patched_build(responses):
+    """Patch calendar_service.build_service to use an HttpMockSequence transport."""
+    http = HttpMockSequence(responses)
+
+    def _build(*args, **kwargs):
+        return real_build('calendar', 'v3', http=http, static_discovery=True)
+
+    return patch('app.services.calendar_service.build_service', side_effect=_build), http
+
+
+def _fake_batch(calls, fail_keys=()):
+    """Stand-in for batch_event_operations that records every call."""
+    def _run(credentials, calendar_id, operations):
+        calls.append(list(operations))
+        results = {}
+        for op in operations:
+            if op['key'] in fail_keys:
+                results[op['key']] = (None, RuntimeError('boom'))
+            elif op['op'] == 'create':
+                results[op['key']] = (f"evt-{op['key'].isoformat()}", None)
+            else:
+                results[op['key']] = (op['event_id'], None)
+        return results
+    return _run
+
+
+def _seed_weekly(db_session, org):
+    OpeningHours.create_defaults(org.id, '10:00', '20:00')
+    db_session.flush()
+
+
+# ---------------------------------------------------------------------------
+# batch_event_operations
+# ---------------------------------------------------------------------------
+
+class TestBatchEventOperations:
+
+    def test_empty_operations_make_no_calls(self):
+        with patch('app.services.calendar_service.build_service') as mock_build:
+            assert batch_event_operations(object(), 'primary', []) == {}
+        mock_build.assert_not_called()
+
+    def test_maps_results_back_to_keys(self):
+        ops = [
+            {'key': 'a', 'op': 'create', 'summary': 's',
+             'start_datetime': '2026-03-01T10:00:00', 'end_datetime': '2026-03-01T20:00:00'},
+            {'key': 'b', 'op': 'update', 'event_id': 'evt-b', 'summary': 's',
+             'start_datetime': '2026-03-02T10:00:00', 'end_datetime': '2026-03-02T20:00:00'},
+            {'key': 'c', 'op': 'delete', 'event_id': 'evt-c'},
+            {'key': 'd', 'op': 'create', 'summary': 's',
+             'start_datetime': '2026-03-04T10:00:00', 'end_datetime': '2026-03-04T20:00:00'},
+        ]
+        build_patch, _ = _patched_build([_batch_response([
+            (0, 200, {'id': 'evt-a'}),
+            (1, 200, {'id': 'evt-b'}),
+            (2, 204, None),
+            (3, 403, {'error': {'code': 403, 'message': 'forbidden'}}),
+        ])])
+        with build_patch:
+            results = batch_event_operations(object(), 'primary', ops)
+
+        assert results['a'] == ('evt-a', None)
+        assert results['b'] == ('evt-b', None)
+        assert results['c'] == ('evt-c', None)
+        assert results['d'][0] is None
+        assert results['d'][1] is not None
+
+    def test_chunks_at_fifty_requests(self):
+        ops = [{'key': i, 'op': 'delete', 'event_id': f'evt-{i}'} for i in range(120)]
+        responses = [
+            _batch_response([(i, 204, None) for i in range(50)]),
+            _batch_response([(i, 204, None) for i in range(50)]),
+            _batch_response([(i, 204, None) for i in range(20)]),
+        ]
+        build_patch, http = _patched_build(responses)
+        with build_patch:
+            results = batch_event_operations(object(), 'primary', ops)
+
+        assert len(results) == 120
+        assert all(error is None for _, error in results.values())
+        # All three canned batch responses consumed: one HTTP call per chunk
+        assert http._iterable == []
+
+
+# ---------------------------------------------------------------------------
+# export_opening_hours_to_calendar
+# ---------------------------------------------------------------------------
+
+class TestExportOpeningHours:
+
+    def test_creates_events_for_open_days(self, db_session, org):
+        _seed_weekly(db_session, org)
+        calls = []
+        with patch('app.services.opening_hours_sync_service.batch_event_operations',
+                   side_effect=_fake_batch(calls)):
+            stats = export_opening_hours_to_calendar(
+                org.id, object(), date(2026, 3, 1), date(2026, 3, 7))
+
+        assert stats['created'] == 7
+        assert stats['errors'] == []
+        assert len(calls) == 1
+        assert {op['op'] for op in calls[0]} == {'create'}
+        assert calls[0][0]['summary'] == '営業時間'
+        assert calls[0][0]['description'] == '10:00〜20:00'
+        syncs = OpeningHoursCalendarSync.query.filter_by(organization_id=org.id).all()
+        assert len(syncs) == 7
+        assert syncs[0].calendar_event_id.startswith('evt-')
+        assert SyncOperationLog.query.filter_by(
+            organization_id=org.id, operation_type='export').count() == 1
+
+    def test_diffs_against_previous_sync(self, db_session, org):
+        _seed_weekly(db_session, org)
+        # 3/1 unchanged, 3/2 changed hours, 3/3 now closed, 3/4 calendar-sourced
+        db_session.add_all([
+            OpeningHoursCalendarSync(organization_id=org.id, sync_date=date(2026, 3, 1),
+                                     calendar_event_id='e1', start_time='10:00', end_time='20:00'),
+            OpeningHoursCalendarSync(organization_id=org.id, sync_date=date(2026, 3, 2),
+                                     calendar_event_id='e2', start_time='09:00', end_time='20:00'),
+            OpeningHoursCalendarSync(organization_id=org.id, sync_date=date(2026, 3, 3),
+                                     calendar_event_id='e3', start_time='10:00', end_time='20:00'),
+            OpeningHoursException(organization_id=org.id, exception_date=date(2026, 3, 3),
+                                  is_closed=True, source='manual'),
+            OpeningHoursException(organization_id=org.id, exception_date=date(2026, 3, 4),
+                                  start_time='11:00', end_time='15:00', source='calendar'),
+        ])
+        db_session.flush()
+
+        calls = []
+        with patch('app.services.opening_hours_sync_service.batch_event_operations',
+                   side_effect=_fake_batch(calls)):
+            stats = export_opening_hours_to_calendar(
+                org.id, object(), date(2026, 3, 1), date(2026, 3, 4))
+
+        assert stats == {'created': 0, 'updated': 1, 'deleted': 1, 'skipped': 2, 'errors': []}
+        ops = {op['key']: op for op in calls[0]}
+        assert set(ops) == {date(2026, 3, 2), date(2026, 3, 3)}
+        assert ops[date(2026, 3, 2)]['op'] == 'update'
+        assert ops[date(2026, 3, 2)]['event_id'] == 'e2'
+        assert ops[date(2026, 3, 3)]['op'] == 'delete'
+
+        remaining = {s.sync_date: s for s in OpeningHoursCalendarSync.query.filter_by(
+            organization_id=org.id).all()}
+        assert set(remaining) == {date(2026, 3, 1), date(2026, 3, 2)}
+        assert remaining[date(2026, 3, 2)].start_time == '10:00'
+
+    def test_nothing_to_do_makes_no_batch_request(self, db_session, org):
+        _seed_weekly(db_session, org)
+        for i in range(3):
+            db_session.add(OpeningHoursCalendarSync(
+                organization_id=org.id, sync_date=date(2026, 3, 1) + timedelta(days=i),
+                calendar_event_id=f'e{i}', start_time='10:00', end_time='20:00'))
+        db_session.flush()
+
+        with patch('app.services.calendar_service.build_service') as mock_build:
+            stats = export_opening_hours_to_calendar(
+                org.id, object(), date(2026, 3, 1), date(2026, 3, 3))
+
+        assert stats['skipped'] == 3
+        mock_build.assert_not_called()
+
+    def test_failed_operations_are_reported(self, db_session, org):
+        _seed_weekly(db_session, org)
+        calls = []
+        with patch('app.services.opening_hours_sync_service.batch_event_operations',
+                   side_effect=_fake_batch(calls, fail_keys={date(2026, 3, 2)})):
+            stats = export_opening_hours_to_calendar(
+                org.id, object(), date(2026, 3, 1), date(2026, 3, 3))
+
+        assert stats['created'] == 2
+        assert stats['errors'] == [{'date': '2026-03-02', 'error': '同期エラー'}]
+        assert OpeningHoursCalendarSync.query.filter_by(
+            organization_id=org.id, sync_date=date(2026, 3, 2)).first() is None
+
+    def test_failed_delete_still_removes_sync_record(self, db_session, org):
+        db_session.add(OpeningHoursCalendarSync(
+            organization_id=org.id, sync_date=date(2026, 3, 1),
+            calendar_event_id='gone', start_time='10:00', end_time='20:00'))
+        db_session.flush()
+
+        with patch('app.services.opening_hours_sync_service.batch_event_operations',
+                   side_effect=_fake_batch([], fail_keys={date(2026, 3, 1)})):
+            stats = export_opening_hours_to_calendar(
+                org.id, object(), date(2026, 3, 1), date(2026, 3, 1))
+
+        assert stats['deleted'] == 1
+        assert OpeningHoursCalendarSync.query.filter_by(organization_id=org.id).count() == 0
+
+    def test_ninety_days_uses_two_batch_requests(self, db_session, org, count_queries):
+        _seed_weekly(db_session, org)
+        org_id = org.id
+        db_session.commit()
+        db_session.expunge_all()  # start from a cold identity map, like a fresh request
+        start = date(2026, 1, 1)
+        end = start + timedelta(days=89)
+        responses = [
+            _batch_response([(i, 200, {'id': f'evt-{i}'}) for i in range(50)]),
+            _batch_response([(i, 200, {'id': f'evt-{50 + i}'}) for i in range(40)]),
+        ]
+        build_patch, http = _patched_build(responses)
+        with build_patch, count_queries() as counter:
+            stats = export_opening_hours_to_calendar(org_id, object(), start, end)
+
+        assert stats['created'] == 90
+        assert http._iterable == []
+        # org + syncs + calendar-sourced + weekly + exceptions, then the commit
+        selects = [s for s in counter.statements if s.lstrip().upper().startswith('SELECT')]
+        assert len(selects) == 5
+
+
+# ---------------------------------------------------------------------------
+# import_opening_hours_from_calendar
+# ---------------------------------------------------------------------------
+
+def _event(day, start='10:00', end='19:00', summary='営業時間', event_id=None):
+    return {
+        'id': event_id or f'evt-{day}',
+        'summary': summary,
+        'start': f'2026-03-{day:02d}T{start}:00+09:00',
+        'end': f'2026-03-{day:02d}T{end}:00+09:00',
+    }
+
+
+class TestImportOpeningHours:
+
+    def _import(self, org_id, events, start=date(2026, 3, 1), end=date(2026, 3, 5)):
+        with patch('app.services.opening_hours_sync_service.fetch_events', return_value=events):
+            return import_opening_hours_from_calendar(org_id, object(), start, end)
+
+    def test_imports_events_and_closes_other_days(self, db_session, org):
+        stats = self._import(org.id, [_event(1), _event(3, '12:00', '18:00')])
+
+        assert stats['imported'] == 2
+        assert stats['closed'] == 3
+        assert stats['updated'] == 0
+        assert stats['errors'] == []
+        excs = {e.exception_date: e for e in OpeningHoursException.query.filter_by(
+            organization_id=org.id).all()}
+        assert len(excs) == 5
+        assert excs[date(2026, 3, 3)].start_time == '12:00'
+        assert excs[date(2026, 3, 3)].source == 'calendar'
+        assert excs[date(2026, 3, 2)].is_closed is True
+        assert excs[date(2026, 3, 2)].reason == 'Googleカレンダーに予定なし'
+
+    def test_updates_closes_and_preserves_manual(self, db_session, org):
+        db_session.add_all([
+            # calendar-sourced, times changed → updated
+            OpeningHoursException(organization_id=org.id, exception_date=date(2026, 3, 1),
+                                  start_time='09:00', end_time='19:00', source='calendar'),
+            # calendar-sourced, unchanged → skipped
+            OpeningHoursException(organization_id=org.id, exception_date=date(2026, 3, 2),
+                                  start_time='10:00', end_time='19:00', source='calendar'),
+            # calendar-sourced, event removed → closed
+            OpeningHoursException(organization_id=org.id, exception_date=date(2026, 3, 3),
+                                  start_time='10:00', end_time='19:00', source='calendar'),
+            # manual with an event → untouched
+            OpeningHoursException(organization_id=org.id, exception_date=date(2026, 3, 4),
+                                  start_time='08:00', end_time='12:00', source='manual'),
+            # calendar-sourced, already closed → skipped
+            OpeningHoursException(organization_id=org.id, exception_date=date(2026, 3, 5),
+                                  is_closed=True, source='calendar'),
+        ])
+        db_session.commit()
+
+        stats = self._import(org.id, [_event(1), _event(2), _event(4)])
+
+        assert stats['imported'] == 0
+        assert stats['updated'] == 1
+        assert stats['closed'] == 1
+        assert stats['skipped'] == 3
+        db_session.expire_all()
+        excs = {e.exception_date: e for e in OpeningHoursException.query.filter_by(
+            organization_id=org.id).all()}
+        assert excs[date(2026, 3, 1)].start_time == '10:00'
+        assert excs[date(2026, 3, 3)].is_closed is True
+        assert excs[date(2026, 3, 3)].start_time is None
+        assert excs[date(2026, 3, 4)].start_time == '08:00'
+        assert excs[date(2026, 3, 4)].source == 'manual'
+
+    def test_ignores_other_titles_and_all_day_events(self, db_session, org):
+        events = [
+            _event(1, summary='歯医者'),
+            {'id': 'allday', 'summary': '営業時間', 'start': '2026-03-02', 'end': '2026-03-03'},
+        ]
+        stats = self._import(org.id, events, end=date(2026, 3, 2))
+        assert stats['imported'] == 0
+        assert stats['closed'] == 2
+
+    def test_records_log_and_phase_timings(self, db_session, org):
+        stats = self._import(org.id, [_event(1)])
+        assert set(stats['timings_ms']) == {'fetch', 'diff', 'apply'}
+        log = SyncOperationLog.query.filter_by(
+            organization_id=org.id, operation_type='import').one()
+        assert log.result_summary['imported'] == 1
+        assert 'timings_ms' in log.result_summary
+
+    def test_fetch_failure_is_logged(self, db_session, org):
+        with patch('app.services.opening_hours_sync_service.fetch_events',
+                   side_effect=RuntimeError('down')):
+            stats = import_opening_hours_from_calendar(
+                org.id, object(), date(2026, 3, 1), date(2026, 3, 5))
+        assert stats['errors'] == [{'error': 'カレンダーイベントの取得に失敗しました'}]
+        assert OpeningHoursException.query.filter_by(organization_id=org.id).count() == 0
+        assert SyncOperationLog.query.filter_by(organization_id=org.id).count() == 1
+
+    def test_query_count_independent_of_range(self, db_session, org, count_queries):
+        org_id = org.id
+        db_session.commit()
+        db_session.expunge_all()
+        events = [_event(day) for day in range(1, 29, 2)]
+        with count_queries() as counter:
+            stats = self._import(org_id, events, end=date(2026, 5, 31))
+        assert stats['imported'] == len(events)
+        # org, existing exceptions, bulk insert, log insert (+ transaction control)
+        selects = [s for s in counter.statements if s.lstrip().upper().startswith('SELECT')]
+        inserts = [s for s in counter.statements if s.lstrip().upper().startswith('INSERT')]
+        assert len(selects) == 2
+        assert len(inserts) == 2
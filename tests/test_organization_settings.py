@@ -3,6 +3,7 @@
 import pytest
 
 from app.models.membership import OrganizationMember
+from app.models.organization import Organization
 from app.services import organization_settings as org_settings
 from tests.conftest import _make_user
 
@@ -174,3 +175,59 @@ class TestMinAttendance:
                 'mode': 'org_wide', 'unit': 'count',
                 'lookback_periods': 10,
             })
+
+
+class TestSettingsCache:
+
+    def test_parsed_once_per_settings_json(self, org, db_session):
+        from unittest.mock import patch
+        from app.models import organization as organization_model
+        org.set_setting('reminder_time_shift', '20:00')
+        db_session.commit()
+        with patch.object(organization_model.json, 'loads',
+                          wraps=organization_model.json.loads) as loads:
+            for _ in range(5):
+                org_settings.get_workflow(org)
+                org_settings.get_level_system(org)
+                org.get_setting('reminder_time_shift')
+        # コミット後の再読込で 1 回だけ。get_workflow の初期化は set_setting がパース済み dict を残す
+        assert loads.call_count == 1
+
+    def test_view_is_reused_until_set_setting(self, org, db_session):
+        view = org_settings.settings_for(org)
+        assert org_settings.settings_for(org) is view
+        assert view.level_system is view.level_system
+
+        org_settings.set_overlap_check(org, {'enabled': True, 'scope': 'same_tier'})
+        fresh = org_settings.settings_for(org)
+        assert fresh is not view
+        assert fresh.overlap_check == {'enabled': True, 'scope': 'same_tier'}
+        assert view.overlap_check['enabled'] is False
+
+    def test_reload_from_db_is_seen(self, org, db_session):
+        org.set_setting('reminder_days_before_shift', 2)
+        db_session.commit()
+        assert org_settings.settings_for(org).reminders['reminder_days_before_shift'] == 2
+
+        db_session.execute(
+            Organization.__table__.update().where(Organization.id == org.id)
+            .values(settings_json='{"reminder_days_before_shift": 3}')
+        )
+        db_session.commit()
+        assert org_settings.settings_for(org).reminders['reminder_days_before_shift'] == 3
+
+    def test_helpers_return_copies(self, org, db_session):
+        cfg = org_settings.get_overlap_check(org)
+        cfg['enabled'] = True
+        assert org_settings.get_overlap_check(org)['enabled'] is False
+
+    def test_typed_defaults(self, org, db_session):
+        view = org_settings.settings_for(org)
+        assert view.reminders == org_settings.DEFAULT_REMINDERS
+        assert view.calendar_sync == org_settings.DEFAULT_CALENDAR_SYNC
+        assert view.workflow is None
+
+    def test_invalid_json_falls_back_to_defaults(self, org, db_session):
+        org.settings_json = '{broken'
+        assert org.get_setting('anything', 'd') == 'd'
+        assert org_settings.get_level_system(org) == {'enabled': False, 'tiers': []}
@@ -75,6 +75,14 @@ class TestAnnouncementText:
 # status 遷移時の Worker 全員への通知
 # ---------------------------------------------------------------------------
 
+def _count_recipients(recipients, *args, **kwargs):
+    return len(recipients)
+
+
+def _emails(mock_notify):
+    return {r["to_email"] for call in mock_notify.call_args_list for r in call.args[0]}
+
+
 class TestPeriodOpenNotification:
 
     def test_draft_to_open_notifies_active_workers(self, client, auth, admin_user, period, org, db_session):
@@ -84,14 +92,14 @@ class TestPeriodOpenNotification:
         db_session.commit()
         auth.login_as(admin_user)
 
-        with patch("app.blueprints.api_admin.notify_period_open") as mock_notify:
+        with patch("app.blueprints.api_admin.notify_period_open_many",
+                   side_effect=_count_recipients) as mock_notify:
             resp = client.put(f"/api/admin/periods/{period.id}", json={"status": "open"})
 
         assert resp.status_code == 200
         assert resp.get_json()["notified_count"] == 2
-        assert mock_notify.call_count == 2
-        emails = {call.args[0] for call in mock_notify.call_args_list}
-        assert emails == {"w1@test.com", "w2@test.com"}
+        assert mock_notify.call_count == 1  # one bulk call for all workers
+        assert _emails(mock_notify) == {"w1@test.com", "w2@test.com"}
 
     def test_open_to_open_does_not_notify(self, client, auth, admin_user, period, org, db_session):
         _make_user(db_session, org, email="w1@test.com", role="worker")
@@ -99,7 +107,8 @@ class TestPeriodOpenNotification:
         db_session.commit()
         auth.login_as(admin_user)
 
-        with patch("app.blueprints.api_admin.notify_period_open") as mock_notify:
+        with patch("app.blueprints.api_admin.notify_period_open_many",
+                   side_effect=_count_recipients) as mock_notify:
             resp = client.put(f"/api/admin/periods/{period.id}", json={"status": "open"})
 
         assert resp.status_code == 200
@@ -114,7 +123,8 @@ class TestPeriodOpenNotification:
         db_session.commit()
         auth.login_as(admin_user)
 
-        with patch("app.blueprints.api_admin.notify_period_open") as mock_notify:
+        with patch("app.blueprints.api_admin.notify_period_open_many",
+                   side_effect=_count_recipients) as mock_notify:
             resp = client.put(f"/api/admin/periods/{period.id}", json={"status": "open"})
 
         assert resp.status_code == 200
@@ -132,13 +142,13 @@ class TestPeriodOpenNotification:
         db_session.commit()
         auth.login_as(admin_user)
 
-        with patch("app.blueprints.api_admin.notify_period_open") as mock_notify:
+        with patch("app.blueprints.api_admin.notify_period_open_many",
+                   side_effect=_count_recipients) as mock_notify:
             resp = client.put(f"/api/admin/periods/{period.id}", json={"status": "open"})
 
         assert resp.status_code == 200
         assert resp.get_json()["notified_count"] == 1
-        emails = {call.args[0] for call in mock_notify.call_args_list}
-        assert emails == {"active@test.com"}
+        assert _emails(mock_notify) == {"active@test.com"}
 
     def test_open_skips_non_workers(self, client, auth, admin_user, owner_user, period, org, db_session):
         _make_user(db_session, org, email="w1@test.com", role="worker")
@@ -146,13 +156,13 @@ class TestPeriodOpenNotification:
         db_session.commit()
         auth.login_as(admin_user)
 
-        with patch("app.blueprints.api_admin.notify_period_open") as mock_notify:
+        with patch("app.blueprints.api_admin.notify_period_open_many",
+                   side_effect=_count_recipients) as mock_notify:
             resp = client.put(f"/api/admin/periods/{period.id}", json={"status": "open"})
 
         assert resp.status_code == 200
         assert resp.get_json()["notified_count"] == 1
-        emails = {call.args[0] for call in mock_notify.call_args_list}
-        assert emails == {"w1@test.com"}
+        assert _emails(mock_notify) == {"w1@test.com"}
 
     def test_open_passes_announcement_text_to_notify(self, client, auth, admin_user, period, org, db_session):
         _make_user(db_session, org, email="w1@test.com", role="worker")
@@ -160,14 +170,15 @@ class TestPeriodOpenNotification:
         db_session.commit()
         auth.login_as(admin_user)
 
-        with patch("app.blueprints.api_admin.notify_period_open") as mock_notify:
+        with patch("app.blueprints.api_admin.notify_period_open_many",
+                   side_effect=_count_recipients) as mock_notify:
             client.put(f"/api/admin/periods/{period.id}", json={"status": "open"})
 
         assert mock_notify.call_count == 1
         kwargs = mock_notify.call_args.kwargs
         assert kwargs["announcement_text"] == "今月もよろしく。"
 
-    def test_partial_notify_failure_does_not_break_status_change(
+    def test_notify_failure_does_not_break_status_change(
         self, client, auth, admin_user, period, org, db_session
     ):
         _make_user(db_session, org, email="w1@test.com", role="worker")
@@ -175,20 +186,15 @@ class TestPeriodOpenNotification:
         db_session.commit()
         auth.login_as(admin_user)
 
-        # 1 通目を失敗させる
-        def side_effect(email, *args, **kwargs):
-            if email == "w1@test.com":
-                raise RuntimeError("simulated SMTP failure")
-            return True
-
-        with patch("app.blueprints.api_admin.notify_period_open", side_effect=side_effect):
+        with patch("app.blueprints.api_admin.notify_period_open_many",
+                   side_effect=RuntimeError("simulated DB failure")):
             resp = client.put(f"/api/admin/periods/{period.id}", json={"status": "open"})
 
-        # status 変更は成功、通知は 1 件のみカウント
+        # status 変更は成功、通知は 0 件
         assert resp.status_code == 200
         body = resp.get_json()
         assert body["status"] == "open"
-        assert body["notified_count"] == 1
+        assert body["notified_count"] == 0
 
         # DB に反映されているか念のため確認
         refreshed = db.session.get(ShiftPeriod, period.id)
@@ -401,7 +401,7 @@ class TestConfirmResponse:
         db_session.commit()
         auth.login_as(admin_user)
         # Mock calendar sync to avoid actual API calls
-        with patch("app.blueprints.api_admin._sync_schedule_to_calendar", return_value=[]):
+        with patch("app.blueprints.api_admin.sync_schedule_to_calendar", return_value=[]):
             resp = client.post(f"/api/admin/periods/{period.id}/schedule/confirm")
         assert resp.status_code == 200
         data = resp.get_json()
@@ -202,6 +202,164 @@ class TestSubmissionReminders:
         assert result["sent"] == 1
 
 
+class TestSetBasedSubmissionReminders:
+    """Cron submission reminders resolved in SQL across all orgs."""
+
+    def _seed_org(self, db_session, name, workers=3, *, submitted=0, days_before=1, time_str="00:00",
+                  deadline_in=timedelta(hours=6)):
+        org = _make_org(db_session, name=name)
+        org.set_setting("reminder_days_before_deadline", days_before)
+        org.set_setting("reminder_time_deadline", time_str)
+        admin = _make_user(db_session, org, email=f"admin@{name}.test", role="admin")
+        period = ShiftPeriod(
+            organization_id=org.id, name=f"{name} May", start_date=date(2026, 5, 1),
+            end_date=date(2026, 5, 31), submission_deadline=datetime.utcnow() + deadline_in,
+            status="open", created_by=admin.id,
+        )
+        db_session.add(period)
+        db_session.flush()
+        users = [_make_user(db_session, org, email=f"w{i}@{name}.test", role="worker")
+                 for i in range(workers)]
+        for user in users[:submitted]:
+            db_session.add(ShiftSubmission(shift_period_id=period.id, user_id=user.id,
+                                           status="submitted", submitted_at=datetime.utcnow()))
+        db_session.commit()
+        return org, period, users
+
+    def _run(self):
+        from app.services.reminder_service import check_and_send_submission_reminders
+        return check_and_send_submission_reminders()
+
+    def test_reminds_unsubmitted_workers_and_enqueues_emails(self, app, db_session):
+        from app.models.async_task import AsyncTask
+        org, period, users = self._seed_org(db_session, "alpha", workers=3, submitted=1)
+
+        assert self._run() == {"sent": 2, "skipped": 1}
+
+        reminded = {r.user_id for r in Reminder.query.filter_by(reference_id=period.id)}
+        assert reminded == {users[1].id, users[2].id}
+        tasks = AsyncTask.query.order_by(AsyncTask.id).all()
+        assert [t.payload["to_email"] for t in tasks] == ["w1@alpha.test", "w2@alpha.test"]
+        assert all(t.organization_id == org.id for t in tasks)
+        assert tasks[0].payload["subject"] == "[シフリー] 提出期限リマインド: alpha May"
+
+    def test_second_run_is_a_no_op(self, app, db_session):
+        from app.models.async_task import AsyncTask
+        self._seed_org(db_session, "alpha", workers=2)
+        self._run()
+
+        assert self._run() == {"sent": 0, "skipped": 2}
+        assert AsyncTask.query.count() == 2
+
+    def test_existing_reminder_rows_are_not_duplicated(self, app, db_session):
+        from app.services.reminder_service import _insert_reminders
+        org, period, users = self._seed_org(db_session, "alpha", workers=2)
+        rows = [(org.id, period.id, u.id) for u in users]
+        assert _insert_reminders("submission_deadline", rows[:1]) == {(period.id, users[0].id)}
+        # a concurrent run inserting the same pair is ignored, not an IntegrityError
+        assert _insert_reminders("submission_deadline", rows) == {(period.id, users[1].id)}
+        db_session.commit()
+        assert Reminder.query.count() == 2
+
+    def test_per_org_trigger_settings(self, app, db_session):
+        _, due_period, _ = self._seed_org(db_session, "due", workers=1, days_before=1)
+        self._seed_org(db_session, "later", workers=1, days_before=1, deadline_in=timedelta(days=5))
+        self._seed_org(db_session, "off", workers=1, days_before=-1)
+
+        assert self._run()["sent"] == 1
+        assert {r.reference_id for r in Reminder.query} == {due_period.id}
+
+    def test_query_count_is_independent_of_tenants(self, app, db_session, count_queries):
+        self._seed_org(db_session, "a0", workers=2)
+        with count_queries() as small:
+            self._run()
+
+        for i in range(1, 8):
+            self._seed_org(db_session, f"a{i}", workers=4, submitted=1, days_before=1 + i % 3)
+        with count_queries() as large:
+            result = self._run()
+
+        assert result["sent"] == 7 * 3
+        assert large.count == small.count
+
+    def test_cutoff_matches_trigger_rule(self):
+        from app.services.reminder_service import _get_reminder_trigger_dt, _submission_cutoff
+        now = datetime(2026, 5, 10, 12, 30)
+        for days_before in (0, 1, 3):
+            for time_str in ("00:00", "12:30", "12:31", "23:59", "bogus"):
+                cutoff = _submission_cutoff(now, days_before, time_str)
+                for hours in range(-24, 24 * 6):
+                    deadline = now + timedelta(hours=hours, minutes=7)
+                    expected = now >= _get_reminder_trigger_dt(deadline, days_before, time_str)
+                    assert (deadline < cutoff) == expected, (days_before, time_str, deadline)
+
+
+class TestSetBasedPreshiftReminders:
+    """Cron pre-shift reminders resolved with one query across all orgs."""
+
+    def _seed_org(self, db_session, name, shifts=3, *, days_before=1, time_str="00:00",
+                  status="confirmed", offset_days=None):
+        org = _make_org(db_session, name=name)
+        org.set_setting("reminder_days_before_shift", days_before)
+        org.set_setting("reminder_time_shift", time_str)
+        admin = _make_user(db_session, org, email=f"admin@{name}.test", role="admin")
+        period = ShiftPeriod(organization_id=org.id, name=f"{name} P", start_date=date(2026, 4, 1),
+                             end_date=date(2026, 4, 30), status="closed", created_by=admin.id)
+        db_session.add(period)
+        db_session.flush()
+        schedule = ShiftSchedule(shift_period_id=period.id, status=status, created_by=admin.id)
+        db_session.add(schedule)
+        db_session.flush()
+        shift_date = datetime.utcnow().date() + timedelta(
+            days=days_before if offset_days is None else offset_days)
+        entries = []
+        for i in range(shifts):
+            worker = _make_user(db_session, org, email=f"w{i}@{name}.test", role="worker")
+            entries.append(ShiftScheduleEntry(schedule_id=schedule.id, user_id=worker.id,
+                                              shift_date=shift_date, start_time="09:00",
+                                              end_time="17:00"))
+        db_session.add_all(entries)
+        db_session.commit()
+        return org, entries
+
+    def _run(self):
+        from app.services.reminder_service import check_and_send_preshift_reminders
+        return check_and_send_preshift_reminders()
+
+    def test_only_due_orgs_and_confirmed_schedules(self, app, db_session):
+        from app.models.async_task import AsyncTask
+        org, due_entries = self._seed_org(db_session, "due", shifts=2)
+        self._seed_org(db_session, "twodays", shifts=1, days_before=2, offset_days=1)
+        self._seed_org(db_session, "draft", shifts=1, status="draft")
+        self._seed_org(db_session, "off", shifts=1, days_before=-1)
+
+        assert self._run() == {"sent": 2, "skipped": 0}
+
+        assert {r.reference_id for r in Reminder.query} == {e.id for e in due_entries}
+        tasks = AsyncTask.query.order_by(AsyncTask.id).all()
+        assert [t.payload["to_email"] for t in tasks] == ["w0@due.test", "w1@due.test"]
+        assert all(t.organization_id == org.id for t in tasks)
+        assert tasks[0].payload["subject"].startswith("[シフリー] シフトリマインド: ")
+
+    def test_second_run_is_a_no_op(self, app, db_session):
+        self._seed_org(db_session, "due", shifts=2)
+        self._run()
+        assert self._run() == {"sent": 0, "skipped": 2}
+
+    def test_query_count_is_independent_of_tenants(self, app, db_session, count_queries):
+        self._seed_org(db_session, "o0", shifts=1)
+        with count_queries() as small:
+            self._run()
+
+        for i in range(1, 6):
+            self._seed_org(db_session, f"o{i}", shifts=5, days_before=i % 3)
+        with count_queries() as large:
+            result = self._run()
+
+        assert result["sent"] == 25
+        assert large.count == small.count
+
+
 # ---------------------------------------------------------------------------
 # Reminder Stats
 # ---------------------------------------------------------------------------
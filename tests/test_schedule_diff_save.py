@@ -0,0 +1,234 @@
+"""Diff-based schedule save: apply_schedule_changes + POST /schedule/changes."""
+
+from datetime import date
+
+import pytest
+
+from app.models.shift import ShiftScheduleEntry
+from app.services.shift_service import (
+    apply_schedule_changes, save_schedule, ScheduleVersionConflict,
+)
+from tests.conftest import _make_user
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _seed_entries(db_session, org, schedule, count, start=0):
+    entries = []
+    for i in range(start, start + count):
+        w = _make_user(db_session, org, email=f"w{i}@test.com", role="worker")
+        e = ShiftScheduleEntry(
+            schedule_id=schedule.id, user_id=w.id,
+            shift_date=date(2026, 3, 1 + i % 31), start_time="09:00", end_time="17:00",
+        )
+        db_session.add(e)
+        entries.append(e)
+    db_session.flush()
+    return entries
+
+
+def _entry(e, start="09:00", end="17:00"):
+    return {
+        'user_id': e.user_id, 'shift_date': e.shift_date.isoformat(),
+        'start_time': start, 'end_time': end,
+    }
+
+
+def _version(schedule):
+    return schedule.updated_at.isoformat()
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class TestApplyScheduleChanges:
+
+    def test_applies_added_changed_removed(self, db_session, org, period, schedule, worker_user):
+        kept, edited, dropped = _seed_entries(db_session, org, schedule, 3)
+        kept.calendar_event_id = "evt_kept"
+        edited.calendar_event_id = "evt_edited"
+        db_session.commit()
+        ids = (kept.id, edited.id)
+
+        apply_schedule_changes(period.id, {
+            'added': [{'user_id': worker_user.id, 'shift_date': '2026-03-20',
+                       'start_time': '10:00', 'end_time': '14:00'}],
+            'changed': [_entry(edited, "12:00", "18:00")],
+            'removed': [{'user_id': dropped.user_id, 'shift_date': dropped.shift_date.isoformat()}],
+        }, organization_id=org.id)
+
+        rows = {e.user_id: e for e in ShiftScheduleEntry.query.filter_by(schedule_id=schedule.id)}
+        assert set(rows) == {kept.user_id, edited.user_id, worker_user.id}
+        assert (rows[kept.user_id].id, rows[edited.user_id].id) == ids
+        assert rows[kept.user_id].calendar_event_id == "evt_kept"
+        assert rows[edited.user_id].calendar_event_id == "evt_edited"
+        assert (rows[edited.user_id].start_time, rows[edited.user_id].end_time) == ("12:00", "18:00")
+        assert rows[worker_user.id].shift_date == date(2026, 3, 20)
+
+    def test_collapses_duplicate_rows_for_a_touched_key(self, db_session, org, period, schedule):
+        edited, dropped, untouched = _seed_entries(db_session, org, schedule, 3)
+        dupes = [
+            ShiftScheduleEntry(schedule_id=schedule.id, user_id=e.user_id, shift_date=e.shift_date,
+                               start_time="18:00", end_time="20:00")
+            for e in (edited, dropped, untouched)
+        ]
+        db_session.add_all(dupes)
+        dupes[0].calendar_event_id = "evt_dupe"
+        db_session.commit()
+        dupe_id = dupes[0].id
+
+        apply_schedule_changes(period.id, {
+            'changed': [_entry(edited, "12:00", "16:00")],
+            'removed': [{'user_id': dropped.user_id, 'shift_date': dropped.shift_date.isoformat()}],
+        })
+
+        def rows(e):
+            return ShiftScheduleEntry.query.filter_by(
+                schedule_id=schedule.id, user_id=e.user_id, shift_date=e.shift_date).all()
+        (kept,) = rows(edited)
+        assert kept.id == dupe_id  # the row with a calendar event survives
+        assert (kept.start_time, kept.end_time) == ("12:00", "16:00")
+        assert rows(dropped) == []
+        assert len(rows(untouched)) == 2  # untouched keys are left alone
+
+    def test_bumps_version(self, db_session, org, period, schedule):
+        (e,) = _seed_entries(db_session, org, schedule, 1)
+        db_session.commit()
+        before = _version(schedule)
+        apply_schedule_changes(period.id, {'changed': [_entry(e, "10:00")]}, expected_version=before)
+        assert _version(schedule) != before
+
+    def test_stale_version_conflicts_and_writes_nothing(self, db_session, org, period, schedule):
+        (e,) = _seed_entries(db_session, org, schedule, 1)
+        db_session.commit()
+        current = _version(schedule)
+        with pytest.raises(ScheduleVersionConflict) as exc:
+            apply_schedule_changes(
+                period.id, {'changed': [_entry(e, "10:00")]},
+                expected_version='1970-01-01T00:00:00',
+            )
+        assert exc.value.current_version == current
+        assert db_session.get(ShiftScheduleEntry, e.id).start_time == "09:00"
+
+    @pytest.mark.parametrize("changes, message", [
+        ({'changed': [{'user_id': 999, 'shift_date': '2026-03-05',
+                       'start_time': '09:00', 'end_time': '17:00'}]}, "not found"),
+        ({'removed': [{'user_id': 999, 'shift_date': '2026-03-05'}]}, "not found"),
+        ({'removed': [{'user_id': 1, 'shift_date': '2026-04-01'}]}, "outside period"),
+        ({'removed': [{'user_id': "1", 'shift_date': '2026-03-01'}]}, "Invalid user_id"),
+        ({'added': "nope"}, "must be a list"),
+    ])
+    def test_rejects_invalid_changes(self, db_session, org, period, schedule, changes, message):
+        db_session.commit()
+        with pytest.raises(ValueError, match=message):
+            apply_schedule_changes(period.id, changes, organization_id=org.id)
+
+    def test_rejects_existing_key_on_add(self, db_session, org, period, schedule):
+        (e,) = _seed_entries(db_session, org, schedule, 1)
+        db_session.commit()
+        with pytest.raises(ValueError, match="already exists"):
+            apply_schedule_changes(period.id, {'added': [_entry(e)]}, organization_id=org.id)
+
+    def test_rejects_duplicate_key_in_payload(self, db_session, org, period, schedule):
+        (e,) = _seed_entries(db_session, org, schedule, 1)
+        db_session.commit()
+        with pytest.raises(ValueError, match="Duplicate"):
+            apply_schedule_changes(period.id, {
+                'changed': [_entry(e, "10:00")],
+                'removed': [{'user_id': e.user_id, 'shift_date': e.shift_date.isoformat()}],
+            })
+
+    def test_rejects_bad_time_and_non_worker(self, db_session, org, period, schedule, admin_user):
+        (e,) = _seed_entries(db_session, org, schedule, 1)
+        db_session.commit()
+        with pytest.raises(ValueError, match="end_time"):
+            apply_schedule_changes(period.id, {'changed': [_entry(e, "09:00", "25:00")]})
+        with pytest.raises(ValueError, match="Invalid user_ids"):
+            apply_schedule_changes(period.id, {'added': [{
+                'user_id': admin_user.id, 'shift_date': '2026-03-10',
+                'start_time': '09:00', 'end_time': '17:00',
+            }]}, organization_id=org.id)
+
+    def test_requires_draft(self, db_session, period, schedule):
+        schedule.status = 'pending_approval'
+        db_session.commit()
+        with pytest.raises(ValueError, match="No draft"):
+            apply_schedule_changes(period.id, {})
+
+    def test_query_count_independent_of_schedule_size(
+        self, db_session, org, period, schedule, count_queries, assert_max_queries,
+    ):
+        def one_cell_edit(entries):
+            e = entries[0]
+            return {
+                'added': [_entry(entries[-1]) | {'shift_date': '2026-03-31'}],
+                'changed': [_entry(e, "11:00")],
+                'removed': [{'user_id': entries[1].user_id, 'shift_date': entries[1].shift_date.isoformat()}],
+            }
+
+        small = _seed_entries(db_session, org, schedule, 3)
+        db_session.commit()
+        with count_queries() as baseline:
+            apply_schedule_changes(period.id, one_cell_edit(small), organization_id=org.id)
+
+        large = _seed_entries(db_session, org, schedule, 60, start=3)
+        db_session.commit()
+        with assert_max_queries(baseline.count):
+            apply_schedule_changes(period.id, one_cell_edit(large), organization_id=org.id)
+        assert ShiftScheduleEntry.query.filter_by(schedule_id=schedule.id).count() == 63
+
+    def test_full_save_bumps_version(self, db_session, period, schedule, admin_user):
+        db_session.commit()
+        before = _version(schedule)
+        save_schedule(period.id, admin_user.id, [])
+        assert _version(schedule) != before
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+
+class TestScheduleChangesAPI:
+
+    def test_saves_and_returns_new_version(self, client, auth, db_session, org, admin_user, period, schedule):
+        (e,) = _seed_entries(db_session, org, schedule, 1)
+        db_session.commit()
+        auth.login_as(admin_user)
+        version = client.get(f"/api/admin/periods/{period.id}/schedule").get_json()['schedule_version']
+
+        resp = client.post(f"/api/admin/periods/{period.id}/schedule/changes", json={
+            'expected_version': version,
+            'changed': [_entry(e, "13:00", "17:00")],
+        })
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert body['applied'] == {'added': 0, 'changed': 1, 'removed': 0}
+        assert body['schedule_version'] != version
+        assert 'entries' not in body
+
+        # 古い version での再送は 409
+        resp = client.post(f"/api/admin/periods/{period.id}/schedule/changes", json={
+            'expected_version': version,
+            'changed': [_entry(e, "14:00", "17:00")],
+        })
+        assert resp.status_code == 409
+        assert resp.get_json()['code'] == 'SCHEDULE_VERSION_MISMATCH'
+        assert resp.get_json()['current_version'] == body['schedule_version']
+
+    def test_validation_error(self, client, auth, db_session, admin_user, period, schedule):
+        db_session.commit()
+        auth.login_as(admin_user)
+        resp = client.post(f"/api/admin/periods/{period.id}/schedule/changes", json={
+            'removed': [{'user_id': 999, 'shift_date': '2026-03-02'}],
+        })
+        assert resp.status_code == 400
+        assert resp.get_json()['code'] == 'VALIDATION_ERROR'
+
+    def test_worker_forbidden(self, client, auth, db_session, worker_user, period, schedule):
+        db_session.commit()
+        auth.login_as(worker_user)
+        resp = client.post(f"/api/admin/periods/{period.id}/schedule/changes", json={'added': []})
+        assert resp.status_code == 403
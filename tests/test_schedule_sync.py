@@ -0,0 +1,296 @@
+"""Tests for batched confirmed-schedule → Google Calendar sync."""
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from app.models.shift import ShiftSchedule, ShiftScheduleEntry
+from app.services.schedule_sync_service import sync_schedule_to_calendar
+from tests.conftest import _make_user
+from tests.test_opening_hours_sync import _batch_response, _patched_build
+
+
+def _add_entries(db_session, schedule, user, count, start=date(2026, 3, 1)):
+    entries = [
+        ShiftScheduleEntry(
+            schedule_id=schedule.id, user_id=user.id,
+            shift_date=start + timedelta(days=i), start_time='09:00', end_time='17:00',
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(entries)
+    db_session.flush()
+    return entries
+
+
+def _http_error(status):
+    return HttpError(httplib2.Response({'status': status}), b'{}', uri='https://example.test')
+
+
+def _fake_batch(calls, errors=None):
+    """Stand-in for batch_event_operations; `errors` maps entry id → exception."""
+    errors = errors or {}
+
+    def _run(credentials, calendar_id, operations):
+        calls.append((credentials, [op['key'] for op in operations]))
+        return {
+            op['key']: (None, errors[op['key']]) if op['key'] in errors else (f"evt_{op['key']}", None)
+            for op in operations
+        }
+    return _run
+
+
+class TestSyncScheduleToCalendar:
+
+    def test_one_batch_per_worker(self, db_session, org, schedule, worker_user):
+        worker2 = _make_user(db_session, org, email='w2@test.com', role='worker')
+        first = _add_entries(db_session, schedule, worker_user, 3)
+        second = _add_entries(db_session, schedule, worker2, 2)
+        creds = {worker_user.id: 'creds-1', worker2.id: 'creds-2'}
+        calls = []
+
+        with patch('app.services.schedule_sync_service.get_credentials_for_user',
+                   side_effect=lambda u: creds[u.id]), \
+                patch('app.services.schedule_sync_service.batch_event_operations',
+                      side_effect=_fake_batch(calls)):
+            results = sync_schedule_to_calendar(schedule.id)
+
+        assert calls == [
+            ('creds-1', [e.id for e in first]),
+            ('creds-2', [e.id for e in second]),
+        ]
+        assert [r['event_id'] for r in results] == [f'evt_{e.id}' for e in first + second]
+        for entry in first + second:
+            db_session.refresh(entry)
+            assert entry.calendar_event_id == f'evt_{entry.id}'
+            assert entry.synced_at is not None
+            assert entry.last_sync_attempt_at is not None
+            assert entry.sync_error is None
+
+    def test_per_item_errors_are_mapped_back(self, db_session, schedule, worker_user):
+        ok, denied, busy = _add_entries(db_session, schedule, worker_user, 3)
+        calls = []
+        errors = {denied.id: _http_error('403'), busy.id: _http_error('503')}
+
+        with patch('app.services.schedule_sync_service.get_credentials_for_user', return_value='c'), \
+                patch('app.services.schedule_sync_service.batch_event_operations',
+                      side_effect=_fake_batch(calls, errors)):
+            results = sync_schedule_to_calendar(schedule.id)
+
+        assert results[0] == {'user_id': worker_user.id, 'event_id': f'evt_{ok.id}', 'success': True}
+        assert results[1]['errorCode'] == 'CALENDAR_PERMISSION_DENIED'
+        assert results[1]['needs_worker_action'] is True
+        assert results[2]['errorCode'] == 'CALENDAR_TEMPORARY_FAILURE'
+        assert results[2]['needs_worker_action'] is False
+        db_session.refresh(denied)
+        assert denied.sync_error == 'CALENDAR_PERMISSION_DENIED'
+        assert denied.calendar_event_id is None
+        assert denied.last_sync_attempt_at is not None
+
+    def test_synced_entries_are_skipped(self, db_session, schedule, worker_user):
+        done, pending = _add_entries(db_session, schedule, worker_user, 2)
+        done.calendar_event_id = 'existing'
+        calls = []
+
+        with patch('app.services.schedule_sync_service.get_credentials_for_user', return_value='c'), \
+                patch('app.services.schedule_sync_service.batch_event_operations',
+                      side_effect=_fake_batch(calls)):
+            results = sync_schedule_to_calendar(schedule.id)
+
+        assert calls == [('c', [pending.id])]
+        assert results[0] == {'user_id': worker_user.id, 'event_id': 'existing',
+                              'success': True, 'skipped': True}
+
+    def test_missing_credentials_skip_the_worker(self, db_session, schedule, worker_user):
+        _add_entries(db_session, schedule, worker_user, 2)
+        with patch('app.services.schedule_sync_service.get_credentials_for_user', return_value=None), \
+                patch('app.services.schedule_sync_service.batch_event_operations') as mock_batch:
+            results = sync_schedule_to_calendar(schedule.id)
+
+        mock_batch.assert_not_called()
+        assert [r['errorCode'] for r in results] == ['NO_CREDENTIALS', 'NO_CREDENTIALS']
+
+    def test_query_count_does_not_grow_with_entries(self, db_session, org, period, admin_user,
+                                                    worker_user, count_queries):
+        worker2 = _make_user(db_session, org, email='w2@test.com', role='worker')
+        period_id, admin_id = period.id, admin_user.id
+        workers = [worker_user, worker2]
+        counts = []
+        for per_worker in (2, 25):
+            schedule = ShiftSchedule(shift_period_id=period_id, status='confirmed',
+                                     created_by=admin_id)
+            db_session.add(schedule)
+            db_session.flush()
+            for worker in workers:
+                _add_entries(db_session, schedule, worker, per_worker)
+            schedule_id = schedule.id
+            db_session.commit()
+            db_session.expunge_all()
+            workers = [db_session.merge(w, load=False) for w in workers]
+
+            with patch('app.services.schedule_sync_service.get_credentials_for_user', return_value='c'), \
+                    patch('app.services.schedule_sync_service.batch_event_operations',
+                          side_effect=_fake_batch([])), \
+                    count_queries() as counter:
+                results = sync_schedule_to_calendar(schedule_id)
+            assert all(r['success'] for r in results)
+            counts.append(counter.count)
+
+        assert counts[0] == counts[1]
+
+    def test_month_of_shifts_is_one_round_trip_per_50(self, db_session, schedule, worker_user):
+        entries = _add_entries(db_session, schedule, worker_user, 31)
+        response = _batch_response([(i, 200, {'id': f'g{i}'}) for i in range(len(entries))])
+        build_patch, http = _patched_build([response])
+
+        with patch('app.services.schedule_sync_service.get_credentials_for_user', return_value='c'), \
+                build_patch:
+            results = sync_schedule_to_calendar(schedule.id)
+
+        assert [(uri, method) for uri, method, _, _ in http.request_sequence] == [
+            ('https://www.googleapis.com/batch/calendar/v3', 'POST'),
+        ]
+        assert [r['event_id'] for r in results] == [f'g{i}' for i in range(31)]
+
+
+class TestConfirmEndpoint:
+
+    def test_summary_shape(self, client, auth, db_session, org, admin_user, schedule, worker_user):
+        schedule.status = 'approved'
+        entries = _add_entries(db_session, schedule, worker_user, 4)
+        db_session.commit()
+        auth.login_as(admin_user)
+
+        errors = {entries[-1].id: _http_error('500')}
+        with patch('app.services.schedule_sync_service.get_credentials_for_user', return_value='c'), \
+                patch('app.services.schedule_sync_service.batch_event_operations',
+                      side_effect=_fake_batch([], errors)):
+            resp = client.post(f'/api/admin/periods/{schedule.shift_period_id}/schedule/confirm')
+
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert len(data['sync_results']) == 4
+        assert data['sync_summary'] == {
+            'total': 4, 'synced': 3, 'needs_worker_action': 0, 'failed': 1,
+        }
+
+
+class TestAsyncConfirm:
+
+    def _confirm_async(self, client, auth, db_session, admin_user, schedule, worker_user, count=3):
+        schedule.status = 'approved'
+        entries = _add_entries(db_session, schedule, worker_user, count)
+        db_session.commit()
+        auth.login_as(admin_user)
+        with patch('app.services.schedule_sync_service.batch_event_operations') as mock_batch:
+            resp = client.post(f'/api/admin/periods/{schedule.shift_period_id}/schedule/confirm',
+                               json={'async': True})
+        mock_batch.assert_not_called()
+        return resp, entries
+
+    def _progress(self, client, schedule):
+        resp = client.get(f'/api/admin/periods/{schedule.shift_period_id}/schedule/sync-progress')
+        assert resp.status_code == 200
+        return resp.get_json()
+
+    def test_confirm_returns_immediately_with_task(self, client, auth, db_session, admin_user,
+                                                   schedule, worker_user):
+        resp, _ = self._confirm_async(client, auth, db_session, admin_user, schedule, worker_user)
+
+        assert resp.status_code == 202
+        data = resp.get_json()
+        assert data['status'] == 'confirmed'
+        assert data['sync_task']['task_type'] == 'sync_schedule'
+        assert data['sync_task']['status'] == 'pending'
+        assert data['sync_progress'] == {'synced': 0, 'reauth_required': 0, 'failed': 0,
+                                         'pending': 3, 'total': 3}
+        assert 'sync_results' not in data
+
+        progress = self._progress(client, schedule)
+        assert progress['done'] is False
+        assert progress['task']['status'] == 'pending'
+
+    def test_task_runs_the_sync_and_progress_completes(self, client, auth, db_session, admin_user,
+                                                       schedule, worker_user):
+        from app.services.task_runner import process_pending_tasks
+        self._confirm_async(client, auth, db_session, admin_user, schedule, worker_user)
+        calls = []
+
+        with patch('app.services.schedule_sync_service.get_credentials_for_user', return_value='c'), \
+                patch('app.services.schedule_sync_service.batch_event_operations',
+                      side_effect=_fake_batch(calls)):
+            stats = process_pending_tasks()
+
+        assert stats['succeeded'] == 1
+        assert len(calls) == 1
+        progress = self._progress(client, schedule)
+        assert progress['progress']['synced'] == 3
+        assert progress['progress']['pending'] == 0
+        assert progress['task']['status'] == 'completed'
+        assert progress['done'] is True
+
+    def test_temporary_failures_retry_the_task(self, client, auth, db_session, admin_user,
+                                               schedule, worker_user):
+        from app.services.task_runner import process_pending_tasks
+        _, entries = self._confirm_async(client, auth, db_session, admin_user, schedule, worker_user)
+        errors = {entries[0].id: _http_error('503')}
+
+        with patch('app.services.schedule_sync_service.get_credentials_for_user', return_value='c'), \
+                patch('app.services.schedule_sync_service.batch_event_operations',
+                      side_effect=_fake_batch([], errors)):
+            stats = process_pending_tasks()
+
+        assert stats['failed'] == 1
+        progress = self._progress(client, schedule)
+        assert progress['progress']['synced'] == 2
+        assert progress['progress']['failed'] == 1
+        assert progress['task']['status'] == 'pending'
+        assert progress['task']['retry_count'] == 1
+        assert progress['done'] is False
+
+    def test_sync_runs_after_the_response_is_sent(self, client, auth, db_session, admin_user,
+                                                  schedule, worker_user):
+        resp, _ = self._confirm_async(client, auth, db_session, admin_user, schedule, worker_user)
+        assert resp.get_json()['sync_task']['status'] == 'pending'
+        calls = []
+
+        with patch('app.services.schedule_sync_service.get_credentials_for_user', return_value='c'), \
+                patch('app.services.schedule_sync_service.batch_event_operations',
+                      side_effect=_fake_batch(calls)):
+            resp.close()  # the WSGI server closes the response once it is sent
+
+        assert len(calls) == 1
+        progress = self._progress(client, schedule)
+        assert progress['progress']['synced'] == 3
+        assert progress['done'] is True
+
+    def test_post_response_drain_can_be_disabled(self, app, client, auth, db_session, admin_user,
+                                                 schedule, worker_user, monkeypatch):
+        monkeypatch.setitem(app.config, 'TASK_DRAIN_AFTER_RESPONSE_SECONDS', 0)
+        resp, _ = self._confirm_async(client, auth, db_session, admin_user, schedule, worker_user)
+        with patch('app.services.task_runner.drain_pending_tasks') as drain:
+            resp.close()
+        drain.assert_not_called()
+        assert self._progress(client, schedule)['task']['status'] == 'pending'
+
+    def test_enqueue_reuses_unfinished_task(self, db_session, schedule):
+        from app.services.task_runner import enqueue_schedule_sync
+        first = enqueue_schedule_sync(schedule.id)
+        assert enqueue_schedule_sync(schedule.id) is first
+        first.mark_completed()
+        assert enqueue_schedule_sync(schedule.id) is not first
+
+    def test_progress_without_task_for_synchronous_confirm(self, client, auth, db_session,
+                                                           admin_user, schedule, worker_user):
+        schedule.status = 'confirmed'
+        entry, = _add_entries(db_session, schedule, worker_user, 1)
+        entry.calendar_event_id = 'evt'
+        db_session.commit()
+        auth.login_as(admin_user)
+
+        progress = self._progress(client, schedule)
+        assert progress['task'] is None
+        assert progress['progress']['synced'] == 1
+        assert progress['done'] is True
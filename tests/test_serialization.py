@@ -0,0 +1,239 @@
+"""List endpoints load what to_dict() reads up front — query count must not grow with rows."""
+
+from datetime import date
+
+from app.models.approval import ApprovalHistory
+from app.models.audit_log import AuditLog
+from app.models.shift import ShiftPeriod, ShiftSchedule, ShiftScheduleEntry, ShiftSubmission, ShiftSubmissionSlot
+from app.models.vacancy import VacancyRequest, ShiftChangeLog
+from app.utils.serialization import eager
+from tests.conftest import _make_user
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _add_workers(db_session, org, start, count):
+    return [
+        _make_user(db_session, org, email=f"w{i}@test.com", role="worker")
+        for i in range(start, start + count)
+    ]
+
+
+def _get(client, url):
+    resp = client.get(url)
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def _assert_constant(client, db_session, url, grow, count_queries, assert_max_queries):
+    """Measure *url*, let *grow* add rows, then require no more queries than before."""
+    # commit は計測外で行い、ロード済みオブジェクトを expire させて毎回読み直させる
+    db_session.commit()
+    with count_queries() as small:
+        before = _get(client, url)
+    grow()
+    db_session.commit()
+    with assert_max_queries(small.count):
+        after = _get(client, url)
+    assert len(after) > len(before)
+    return after
+
+
+# ---------------------------------------------------------------------------
+# eager()
+# ---------------------------------------------------------------------------
+
+class TestEager:
+
+    def test_many_to_one_is_joined(self):
+        (opt,) = eager(ShiftChangeLog.performer)
+        assert opt.context[0].strategy == (('lazy', 'joined'),)
+
+    def test_returns_one_option_per_relationship(self):
+        opts = eager(VacancyRequest.original_user, VacancyRequest.acceptor, VacancyRequest.schedule_entry)
+        assert [o.context[0].strategy for o in opts] == [(('lazy', 'joined'),)] * 3
+
+
+# ---------------------------------------------------------------------------
+# Admin list endpoints
+# ---------------------------------------------------------------------------
+
+class TestAdminListQueries:
+
+    def test_members(self, client, auth, admin_user, org, db_session,
+                     count_queries, assert_max_queries):
+        _add_workers(db_session, org, 0, 2)
+        auth.login_as(admin_user)
+        data = _assert_constant(
+            client, db_session, "/api/admin/members",
+            lambda: _add_workers(db_session, org, 2, 6),
+            count_queries, assert_max_queries,
+        )
+        assert {m['user_email'] for m in data} >= {"w7@test.com", "admin@test.com"}
+
+    def test_schedule(self, client, auth, admin_user, org, period, schedule, db_session,
+                      count_queries, assert_max_queries):
+        def add_entries(start, count):
+            for i, w in enumerate(_add_workers(db_session, org, start, count)):
+                db_session.add(ShiftScheduleEntry(
+                    schedule_id=schedule.id, user_id=w.id,
+                    shift_date=date(2026, 3, 1 + start + i), start_time="09:00", end_time="17:00",
+                ))
+                db_session.add(ApprovalHistory(
+                    schedule_id=schedule.id, action="submitted", performed_by=w.id,
+                ))
+
+        add_entries(0, 2)
+        auth.login_as(admin_user)
+        url = f"/api/admin/periods/{period.id}/schedule"
+        db_session.commit()
+        with count_queries() as small:
+            _get(client, url)
+        add_entries(2, 6)
+        db_session.commit()
+        with assert_max_queries(small.count):
+            data = _get(client, url)
+        assert len(data['entries']) == 8
+        assert all(e['user_name'] for e in data['entries'])
+        assert all(h['performer_name'] for h in data['history'])
+        assert len(data['hours_summary']) == 8
+
+    def test_submissions(self, client, auth, admin_user, org, period, db_session,
+                         count_queries, assert_max_queries):
+        def add_submissions(start, count):
+            for w in _add_workers(db_session, org, start, count):
+                sub = ShiftSubmission(shift_period_id=period.id, user_id=w.id, status="submitted")
+                db_session.add(sub)
+                db_session.flush()
+                for day in (2, 3):
+                    db_session.add(ShiftSubmissionSlot(
+                        submission_id=sub.id, slot_date=date(2026, 3, day), is_available=True,
+                    ))
+
+        add_submissions(0, 2)
+        auth.login_as(admin_user)
+        data = _assert_constant(
+            client, db_session, f"/api/admin/periods/{period.id}/submissions",
+            lambda: add_submissions(2, 6),
+            count_queries, assert_max_queries,
+        )
+        assert len(data) == 8
+        assert all(len(s['slots']) == 2 and s['user_email'] for s in data)
+
+    def _seed_vacancy_rows(self, db_session, org, schedule, admin_user, start, count):
+        for i, w in enumerate(_add_workers(db_session, org, start, count)):
+            entry = ShiftScheduleEntry(
+                schedule_id=schedule.id, user_id=w.id,
+                shift_date=date(2026, 3, 1 + start + i), start_time="09:00", end_time="17:00",
+            )
+            db_session.add(entry)
+            db_session.flush()
+            vr = VacancyRequest(
+                schedule_entry_id=entry.id, original_user_id=w.id, status="accepted",
+                created_by=admin_user.id, accepted_by=admin_user.id,
+            )
+            db_session.add(vr)
+            db_session.flush()
+            db_session.add(ShiftChangeLog(
+                schedule_entry_id=entry.id, vacancy_request_id=vr.id,
+                change_type="vacancy_fill", original_user_id=w.id,
+                new_user_id=admin_user.id, performed_by=admin_user.id,
+            ))
+
+    def test_vacancies(self, client, auth, admin_user, org, schedule, db_session,
+                       count_queries, assert_max_queries):
+        self._seed_vacancy_rows(db_session, org, schedule, admin_user, 0, 2)
+        auth.login_as(admin_user)
+        data = _assert_constant(
+            client, db_session, "/api/admin/vacancy",
+            lambda: self._seed_vacancy_rows(db_session, org, schedule, admin_user, 2, 6),
+            count_queries, assert_max_queries,
+        )
+        assert len(data) == 8
+        assert all(v['original_user_name'] and v['shift_date'] for v in data)
+
+    def test_change_log(self, client, auth, admin_user, org, schedule, db_session,
+                        count_queries, assert_max_queries):
+        self._seed_vacancy_rows(db_session, org, schedule, admin_user, 0, 2)
+        auth.login_as(admin_user)
+        data = _assert_constant(
+            client, db_session, "/api/admin/change-log",
+            lambda: self._seed_vacancy_rows(db_session, org, schedule, admin_user, 2, 6),
+            count_queries, assert_max_queries,
+        )
+        assert len(data) == 8
+        assert all(l['original_user_name'] and l['performed_by_name'] and l['shift_date'] for l in data)
+
+    def test_audit_logs(self, client, auth, admin_user, org, db_session,
+                        count_queries, assert_max_queries):
+        def add_logs(start, count):
+            for w in _add_workers(db_session, org, start, count):
+                db_session.add(AuditLog(
+                    organization_id=org.id, actor_id=w.id,
+                    action="ROLE_CHANGED", resource_type="OrganizationMember",
+                ))
+
+        add_logs(0, 2)
+        auth.login_as(admin_user)
+        data = _assert_constant(
+            client, db_session, "/api/admin/dashboard/audit-logs",
+            lambda: add_logs(2, 6),
+            count_queries, assert_max_queries,
+        )
+        assert all(log['actor_email'] for log in data)
+
+
+# ---------------------------------------------------------------------------
+# Owner endpoints
+# ---------------------------------------------------------------------------
+
+class TestOwnerListQueries:
+
+    def test_pending_approvals(self, client, auth, owner_user, org, db_session,
+                               count_queries, assert_max_queries):
+        def add_schedules(start, count):
+            for i, w in enumerate(_add_workers(db_session, org, start, count)):
+                p = ShiftPeriod(
+                    organization_id=org.id, name=f"P{start + i}",
+                    start_date=date(2026, 3, 1), end_date=date(2026, 3, 31),
+                    created_by=w.id,
+                )
+                db_session.add(p)
+                db_session.flush()
+                db_session.add(ShiftSchedule(
+                    shift_period_id=p.id, status="pending_approval", created_by=w.id,
+                ))
+
+        add_schedules(0, 2)
+        auth.login_as(owner_user)
+        data = _assert_constant(
+            client, db_session, "/api/owner/pending-approvals",
+            lambda: add_schedules(2, 6),
+            count_queries, assert_max_queries,
+        )
+        assert len(data) == 8
+        assert all(s['period'] and s['creator_name'] for s in data)
+
+    def test_schedule_detail(self, client, auth, owner_user, org, schedule, db_session,
+                             count_queries, assert_max_queries):
+        def add_entries(start, count):
+            for i, w in enumerate(_add_workers(db_session, org, start, count)):
+                db_session.add(ShiftScheduleEntry(
+                    schedule_id=schedule.id, user_id=w.id,
+                    shift_date=date(2026, 3, 1 + start + i), start_time="10:00", end_time="12:00",
+                ))
+
+        add_entries(0, 2)
+        auth.login_as(owner_user)
+        url = f"/api/owner/schedules/{schedule.id}"
+        db_session.commit()
+        with count_queries() as small:
+            _get(client, url)
+        add_entries(2, 6)
+        db_session.commit()
+        with assert_max_queries(small.count):
+            data = _get(client, url)
+        assert len(data['entries']) == 8
+        assert all(e['user_name'] for e in data['entries'])
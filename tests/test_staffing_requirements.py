@@ -329,3 +329,131 @@ class TestStaffingRequirementsAudit:
         log = AuditLog.query.filter_by(action='STAFFING_REQUIREMENTS_UPDATED').first()
         assert log is not None
         assert log.actor_id == admin_user.id
+
+
+# ---------------------------------------------------------------------------
+# 期間の過不足 (get_period_coverage)
+# ---------------------------------------------------------------------------
+
+def _seed_coverage(db_session, org, schedule, worker_user):
+    """月曜 (2026-03-02) に 09-13 で 2 名 / 13-17 で 1 名、割当は 09-15 の 1 名 + 12-17 の 1 名。"""
+    from datetime import date
+    from app.models.shift import ShiftScheduleEntry
+    from tests.conftest import _make_user
+
+    for start, end, count in (('09:00', '13:00', 2), ('13:00', '17:00', 1)):
+        db_session.add(StaffingRequirement(organization_id=org.id, day_of_week=1,
+                                           start_time=start, end_time=end, required_count=count))
+    other = _make_user(db_session, org, email='w2@test.com', role='worker')
+    for user, start, end in ((worker_user, '09:00', '15:00'), (other, '12:00', '17:00')):
+        db_session.add(ShiftScheduleEntry(schedule_id=schedule.id, user_id=user.id,
+                                          shift_date=date(2026, 3, 2), start_time=start, end_time=end))
+    db_session.commit()
+
+
+class TestPeriodCoverage:
+
+    def test_bands_report_shortage_and_overstaffing(self, db_session, org, period, schedule, worker_user):
+        from app.services.staffing_service import get_period_coverage
+        _seed_coverage(db_session, org, schedule, worker_user)
+        result = get_period_coverage(org, period, schedule)
+
+        monday = next(d for d in result['days'] if d['date'] == '2026-03-02')
+        morning, afternoon = monday['bands']
+        assert (morning['min_assigned'], morning['shortage'], morning['short_minutes']) == (1, 1, 180)
+        assert (afternoon['max_assigned'], afternoon['overstaffed'], afternoon['over_minutes']) == (2, 1, 120)
+        assert monday['shift_count'] == 2
+        # 延べ必要 12h (2×4 + 1×4) のうち充足 9h (09-12 は 1 名、12-17 は必要数以上)
+        assert monday['coverage_rate'] == 0.75
+        # 割当のない残りの月曜 (9, 16, 23, 30) は両方の帯が不足
+        assert result['summary']['short_days'] == ['2026-03-02', '2026-03-09', '2026-03-16',
+                                                   '2026-03-23', '2026-03-30']
+        assert (result['summary']['short_bands'], result['summary']['overstaffed_bands']) == (9, 1)
+
+    def test_slot_matrix(self, db_session, org, period, schedule, worker_user):
+        from app.services.staffing_service import get_period_coverage
+        _seed_coverage(db_session, org, schedule, worker_user)
+        result = get_period_coverage(org, period, schedule, resolution=60)
+
+        assert result['slot_starts'] == ['09:00', '10:00', '11:00', '12:00', '13:00', '14:00', '15:00', '16:00']
+        monday = next(d for d in result['days'] if d['date'] == '2026-03-02')
+        assert monday['required'] == [2, 2, 2, 2, 1, 1, 1, 1]
+        assert monday['assigned'] == [1, 1, 1, 2, 2, 2, 1, 1]
+        sunday = result['days'][0]
+        assert sunday['required'] == [0] * 8 and sunday['coverage_rate'] is None
+
+    def test_without_schedule_and_closed_days(self, db_session, org, period):
+        from datetime import date
+        from app.models.opening_hours import OpeningHours, OpeningHoursException
+        from app.services.staffing_service import get_period_coverage
+        OpeningHours.create_defaults(org.id)
+        db_session.add(StaffingRequirement(organization_id=org.id, day_of_week=1,
+                                           start_time='10:00', end_time='12:00', required_count=1))
+        db_session.add(OpeningHoursException(organization_id=org.id, exception_date=date(2026, 3, 9),
+                                             is_closed=True))
+        db_session.commit()
+        result = get_period_coverage(org, period)
+
+        by_date = {d['date']: d for d in result['days']}
+        assert by_date['2026-03-02']['bands'][0]['shortage'] == 1
+        assert by_date['2026-03-09']['closed'] is True and by_date['2026-03-09']['bands'] == []
+        # 3 月の月曜は 2, 9(休業), 16, 23, 30 → 4 日 × 2 時間
+        assert result['summary']['required_person_hours'] == 8
+        assert result['summary']['coverage_rate'] == 0
+
+    def test_query_count_independent_of_entries(self, db_session, org, period, schedule, worker_user,
+                                                assert_max_queries):
+        from datetime import date
+        from app.models.shift import ShiftScheduleEntry
+        from app.services.staffing_service import get_period_coverage
+        _seed_coverage(db_session, org, schedule, worker_user)
+        for day in range(3, 31):
+            db_session.add(ShiftScheduleEntry(schedule_id=schedule.id, user_id=worker_user.id,
+                                              shift_date=date(2026, 3, day), start_time='09:00', end_time='17:00'))
+        db_session.commit()
+        org_id, period_id, schedule_id = org.id, period.id, schedule.id
+        org, period, schedule = (db_session.get(type(org), org_id), db_session.get(type(period), period_id),
+                                 db_session.get(type(schedule), schedule_id))
+        with assert_max_queries(4):
+            get_period_coverage(org, period, schedule)
+
+
+class TestPeriodCoverageAPI:
+
+    def test_admin_coverage(self, client, auth, admin_user, org, period, schedule, worker_user, db_session):
+        _seed_coverage(db_session, org, schedule, worker_user)
+        auth.login_as(admin_user)
+        resp = client.get(f'/api/admin/periods/{period.id}/coverage?resolution=15')
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['schedule_id'] == schedule.id and data['resolution'] == 15
+        assert data['summary']['short_days'][0] == '2026-03-02'
+
+    def test_invalid_resolution(self, client, auth, admin_user, period, db_session):
+        db_session.commit()
+        auth.login_as(admin_user)
+        for value in ('7', 'abc'):
+            resp = client.get(f'/api/admin/periods/{period.id}/coverage?resolution={value}')
+            assert resp.status_code == 400
+            assert resp.get_json()['code'] == 'VALIDATION_ERROR'
+
+    def test_owner_coverage(self, client, auth, owner_user, org, period, schedule, worker_user, db_session):
+        _seed_coverage(db_session, org, schedule, worker_user)
+        auth.login_as(owner_user)
+        resp = client.get(f'/api/owner/schedules/{schedule.id}/coverage')
+        assert resp.status_code == 200
+        assert resp.get_json()['summary']['coverage_rate'] is not None
+
+    def test_owner_other_org_not_found(self, client, auth, org, period, schedule, db_session):
+        from tests.conftest import _make_org, _make_user
+        other = _make_org(db_session, name='Other')
+        other_owner = _make_user(db_session, other, email='o2@test.com', role='owner')
+        db_session.commit()
+        auth.login_as(other_owner)
+        resp = client.get(f'/api/owner/schedules/{schedule.id}/coverage')
+        assert resp.status_code == 404
+
+    def test_worker_forbidden(self, client, auth, worker_user, period, db_session):
+        db_session.commit()
+        auth.login_as(worker_user)
+        assert client.get(f'/api/admin/periods/{period.id}/coverage').status_code == 403
@@ -0,0 +1,142 @@
+"""Submission save: whole-payload validation and per-day diff writes."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.shift import ShiftSubmissionSlot
+from app.services.shift_service import create_or_update_submission
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _slot(day, start="09:00", end="17:00", available=True):
+    return {
+        'slot_date': date(2026, 3, day).isoformat(), 'is_available': available,
+        'start_time': start, 'end_time': end,
+    }
+
+
+def _slots_by_day(submission):
+    return {s.slot_date.day: s for s in ShiftSubmissionSlot.query.filter_by(submission_id=submission.id)}
+
+
+def _slot_writes(counter):
+    return [s for s in counter.statements
+            if s.split()[0] in ('INSERT', 'UPDATE', 'DELETE') and 'shift_submission_slots' in s]
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class TestCreateOrUpdateSubmission:
+
+    def test_first_submission_inserts_all_days(self, db_session, period, worker_user):
+        sub = create_or_update_submission(period.id, worker_user.id, [_slot(1), _slot(2, "10:00")], "memo")
+        rows = _slots_by_day(sub)
+        assert set(rows) == {1, 2}
+        assert rows[2].start_time == "10:00"
+        assert sub.status == 'submitted' and sub.notes == "memo"
+
+    def test_mixed_availability_is_one_insert(self, db_session, period, worker_user, count_queries):
+        payload = [_slot(d) if d % 2 else _slot(d, None, None, available=False) for d in range(1, 11)]
+        with count_queries() as counter:
+            sub = create_or_update_submission(period.id, worker_user.id, payload)
+        assert len(_slot_writes(counter)) == 1
+        assert len(_slots_by_day(sub)) == 10
+
+    def test_resubmission_touches_only_changed_days(self, db_session, period, worker_user):
+        sub = create_or_update_submission(period.id, worker_user.id, [_slot(1), _slot(2), _slot(3)])
+        before = {day: s.id for day, s in _slots_by_day(sub).items()}
+
+        create_or_update_submission(period.id, worker_user.id, [
+            _slot(1), _slot(2, "12:00", "18:00"), _slot(4),
+        ])
+        rows = _slots_by_day(sub)
+        assert set(rows) == {1, 2, 4}
+        assert rows[1].id == before[1]
+        assert rows[2].id == before[2]
+        assert (rows[2].start_time, rows[2].end_time) == ("12:00", "18:00")
+
+    def test_unchanged_resubmission_writes_no_slots(self, db_session, period, worker_user, count_queries):
+        payload = [_slot(d) for d in range(1, 8)]
+        create_or_update_submission(period.id, worker_user.id, payload)
+        with count_queries() as counter:
+            create_or_update_submission(period.id, worker_user.id, payload)
+        assert _slot_writes(counter) == []
+
+    def test_invalid_slot_leaves_existing_slots(self, db_session, period, worker_user):
+        sub = create_or_update_submission(period.id, worker_user.id, [_slot(1)])
+        with pytest.raises(ValueError, match="auto_calculated_end"):
+            create_or_update_submission(period.id, worker_user.id, [
+                _slot(2), dict(_slot(3), auto_calculated_end="24:00"),
+            ])
+        assert set(_slots_by_day(sub)) == {1}
+
+    @pytest.mark.parametrize("slots, message", [
+        ([{'slot_date': '2026-04-01'}], "outside period"),
+        ([{'slot_date': 'tomorrow'}], "Invalid slot_date"),
+    ])
+    def test_rejects_invalid_payload(self, db_session, period, worker_user, slots, message):
+        with pytest.raises(ValueError, match=message):
+            create_or_update_submission(period.id, worker_user.id, slots)
+
+    def test_repeated_day_keeps_last_entry(self, db_session, period, worker_user):
+        sub = create_or_update_submission(period.id, worker_user.id, [
+            _slot(1), _slot(1, "10:00", "15:00"),
+        ])
+        rows = _slots_by_day(sub)
+        assert ShiftSubmissionSlot.query.filter_by(submission_id=sub.id).count() == 1
+        assert (rows[1].start_time, rows[1].end_time) == ("10:00", "15:00")
+
+    def test_cleans_up_legacy_duplicate_rows(self, db_session, period, worker_user):
+        sub = create_or_update_submission(period.id, worker_user.id, [_slot(1)])
+        db_session.add(ShiftSubmissionSlot(submission_id=sub.id, slot_date=date(2026, 3, 1), is_available=False))
+        db_session.commit()
+        create_or_update_submission(period.id, worker_user.id, [_slot(1)])
+        assert ShiftSubmissionSlot.query.filter_by(submission_id=sub.id).count() == 1
+
+    def test_query_count_independent_of_days(self, db_session, period, worker_user, count_queries, assert_max_queries):
+        def resubmit(days):
+            payload = [_slot(d, "10:00" if d % 2 else "09:00") for d in range(1, days + 1)]
+            create_or_update_submission(period.id, worker_user.id, [_slot(d) for d in range(2, days + 2)])
+            return payload
+
+        payload = resubmit(3)
+        with count_queries() as small:
+            create_or_update_submission(period.id, worker_user.id, payload)
+        payload = resubmit(30)
+        with assert_max_queries(small.count):
+            create_or_update_submission(period.id, worker_user.id, payload)
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+
+class TestSubmitAvailabilityAPI:
+
+    def test_resubmit_returns_current_slots(self, client, auth, db_session, period, worker_user):
+        period.status = 'open'
+        db_session.commit()
+        auth.login_as(worker_user)
+        url = f"/api/worker/periods/{period.id}/availability"
+        assert client.post(url, json={'slots': [_slot(1), _slot(2)]}).status_code == 201
+
+        resp = client.post(url, json={'slots': [_slot(2, "13:00")]})
+        assert resp.status_code == 201
+        assert [(s['slot_date'], s['start_time']) for s in resp.get_json()['slots']] == [
+            ((period.start_date + timedelta(days=1)).isoformat(), "13:00"),
+        ]
+
+    def test_repeated_day_is_accepted_last_entry_wins(self, client, auth, db_session, period, worker_user):
+        period.status = 'open'
+        db_session.commit()
+        auth.login_as(worker_user)
+        resp = client.post(f"/api/worker/periods/{period.id}/availability",
+                           json={'slots': [_slot(1), _slot(1, "11:00")]})
+        assert resp.status_code == 201
+        assert [s['start_time'] for s in resp.get_json()['slots']] == ["11:00"]
@@ -0,0 +1,145 @@
+"""HH:MM ⇔ minutes codec and the generated *_minutes columns."""
+
+import importlib.util
+from datetime import date, time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert
+
+from app.middleware.schema_guard import EXPECTED_REVISION
+from app.models.opening_hours import OpeningHours, OpeningHoursException
+from app.models.shift import ShiftScheduleEntry, ShiftSubmission, ShiftSubmissionSlot
+from app.models.staffing import StaffingRequirement
+from app.services.shift_service import get_worker_hours_summary
+from app.utils.time_utils import (
+    hhmm_minutes_sql, hhmm_to_minutes, minutes_to_time_str, time_to_minutes,
+)
+from tests.conftest import _make_user
+
+
+# ---------------------------------------------------------------------------
+# Codec
+# ---------------------------------------------------------------------------
+
+class TestCodec:
+
+    @pytest.mark.parametrize("value, minutes", [
+        ("00:00", 0), ("09:30", 570), ("23:59", 1439),
+    ])
+    def test_hhmm_to_minutes(self, value, minutes):
+        assert hhmm_to_minutes(value) == minutes
+        assert minutes_to_time_str(minutes) == value
+
+    @pytest.mark.parametrize("value", ["24:00", "9:30", "09:60", "", None, 930])
+    def test_hhmm_to_minutes_invalid(self, value):
+        assert hhmm_to_minutes(value) is None
+
+    def test_time_to_minutes(self):
+        assert time_to_minutes("17:15") == 1035
+        assert time_to_minutes(time(8, 5)) == 485
+        with pytest.raises(ValueError, match="HH:MM"):
+            time_to_minutes("25:00")
+
+
+# ---------------------------------------------------------------------------
+# Generated columns
+# ---------------------------------------------------------------------------
+
+class TestGeneratedColumns:
+
+    def test_entry_minutes_follow_time_strings(self, db_session, schedule, worker_user):
+        e = ShiftScheduleEntry(schedule_id=schedule.id, user_id=worker_user.id,
+                               shift_date=date(2026, 3, 1), start_time="09:30", end_time="17:00")
+        db_session.add(e)
+        db_session.commit()
+        assert (e.start_minutes, e.end_minutes) == (570, 1020)
+
+        e.end_time = "18:15"
+        db_session.commit()
+        assert e.end_minutes == 1095
+
+    def test_bulk_insert_and_empty_times(self, db_session, period, worker_user):
+        sub = ShiftSubmission(shift_period_id=period.id, user_id=worker_user.id)
+        db_session.add(sub)
+        db_session.flush()
+        db_session.execute(insert(ShiftSubmissionSlot.__table__), [
+            {'submission_id': sub.id, 'slot_date': date(2026, 3, 1), 'is_available': True,
+             'start_time': "10:00", 'end_time': "14:00"},
+            {'submission_id': sub.id, 'slot_date': date(2026, 3, 2), 'is_available': False,
+             'start_time': None, 'end_time': ""},
+        ])
+        rows = db_session.query(
+            ShiftSubmissionSlot.start_minutes, ShiftSubmissionSlot.end_minutes,
+        ).order_by(ShiftSubmissionSlot.slot_date).all()
+        assert rows == [(600, 840), (None, None)]
+
+    @pytest.mark.parametrize("value", ["ab:cd", "9:30 ", "24:00", "12:60", "12-30"])
+    def test_malformed_times_yield_null(self, db_session, schedule, worker_user, value):
+        e = ShiftScheduleEntry(schedule_id=schedule.id, user_id=worker_user.id,
+                               shift_date=date(2026, 3, 1), start_time=value, end_time="17:00")
+        db_session.add(e)
+        db_session.commit()
+        assert (e.start_minutes, e.end_minutes) == (None, 1020)
+
+    def test_postgresql_ddl_guards_the_cast(self):
+        from sqlalchemy.dialects import postgresql
+        from sqlalchemy.schema import CreateTable
+        ddl = str(CreateTable(ShiftScheduleEntry.__table__).compile(dialect=postgresql.dialect()))
+        assert f"GENERATED ALWAYS AS ({hhmm_minutes_sql('start_time', 'postgresql')}) STORED" in ddl
+        assert "start_time ~ '^([01][0-9]|2[0-3]):[0-5][0-9]$'" in ddl
+
+    @pytest.mark.parametrize("dialect", ["postgresql", "sqlite"])
+    def test_migration_expression_matches_models(self, dialect):
+        path = next(Path(__file__).parent.parent.glob("migrations/versions/a9b8c7d6e5f4_*.py"))
+        spec = importlib.util.spec_from_file_location("minutes_migration", path)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        for column in ("start_time", "end_time"):
+            assert migration._minutes_sql(column, dialect) == hhmm_minutes_sql(column, dialect)
+
+    def test_other_time_tables(self, db_session, org):
+        OpeningHours.create_defaults(org.id, "08:00", "22:30")
+        db_session.add(OpeningHoursException(organization_id=org.id, exception_date=date(2026, 3, 3),
+                                             is_closed=True))
+        db_session.add(StaffingRequirement(organization_id=org.id, day_of_week=1,
+                                           start_time="11:00", end_time="13:45"))
+        db_session.commit()
+        assert {(h.start_minutes, h.end_minutes) for h in OpeningHours.query} == {(480, 1350)}
+        assert OpeningHoursException.query.one().start_minutes is None
+        assert StaffingRequirement.query.one().end_minutes == 825
+
+    def test_schema_guard_tracks_migration_head(self, app):
+        from alembic.script import ScriptDirectory
+        config = app.extensions['migrate'].migrate.get_config()
+        assert ScriptDirectory.from_config(config).get_current_head() == EXPECTED_REVISION
+
+
+# ---------------------------------------------------------------------------
+# SQL aggregation
+# ---------------------------------------------------------------------------
+
+class TestWorkerHoursSummary:
+
+    def test_sums_in_one_query(self, db_session, org, schedule, worker_user, count_queries):
+        other = _make_user(db_session, org, email="other@test.com", role="worker", display_name="Other")
+        for uid, day, start, end in (
+            (other.id, 1, "09:00", "12:30"),
+            (worker_user.id, 2, "10:00", "18:00"),
+            (other.id, 3, "13:00", "17:00"),
+        ):
+            db_session.add(ShiftScheduleEntry(schedule_id=schedule.id, user_id=uid,
+                                              shift_date=date(2026, 3, day), start_time=start, end_time=end))
+        db_session.commit()
+        schedule_id = schedule.id
+
+        with count_queries() as counter:
+            summary = get_worker_hours_summary(schedule_id)
+        assert counter.count == 1
+        assert summary == [
+            {'user_id': other.id, 'user_name': "Other", 'total_hours': 7.5, 'shift_count': 2},
+            {'user_id': worker_user.id, 'user_name': "worker", 'total_hours': 8.0, 'shift_count': 1},
+        ]
+
+    def test_empty_schedule(self, db_session, schedule):
+        assert get_worker_hours_summary(schedule.id) == []
@@ -142,6 +142,75 @@ class TestCandidateSearch:
         assert resp.get_json() == []
 
 
+class TestCandidateQuery:
+    """find_candidates() directly: fairness order and constant query count."""
+
+    def _add_candidates(self, db_session, org, period, schedule, count, prefix="c"):
+        workers = []
+        for i in range(count):
+            worker = _create_candidate_worker(db_session, org, period, email=f"{prefix}{i}@test.com")
+            # i 件目の候補者には同じ週（4/13 月 〜 4/19 日）に i % 4 回 4 時間勤務を入れる。
+            # 対象日 4/15 に入れると割当済みで除外されるので避ける
+            for day in (13, 14, 16)[:i % 4]:
+                db_session.add(ShiftScheduleEntry(
+                    schedule_id=schedule.id, user_id=worker.id,
+                    shift_date=date(2026, 4, day), start_time="10:00", end_time="14:00",
+                ))
+            workers.append(worker)
+        db_session.flush()
+        return workers
+
+    def test_sorted_by_weekly_hours(self, app, admin_user, org, worker_user, db_session):
+        from app.services.vacancy_service import find_candidates
+        period, schedule, entry = _setup_schedule(db_session, org, admin_user, worker_user)
+        workers = self._add_candidates(db_session, org, period, schedule, 4)
+        # 前週・翌週の勤務は集計対象外
+        db_session.add(ShiftScheduleEntry(schedule_id=schedule.id, user_id=workers[0].id,
+                                          shift_date=date(2026, 4, 12), start_time="09:00",
+                                          end_time="18:00"))
+        db_session.add(ShiftScheduleEntry(schedule_id=schedule.id, user_id=workers[0].id,
+                                          shift_date=date(2026, 4, 20), start_time="09:00",
+                                          end_time="18:00"))
+        db_session.commit()
+
+        result = find_candidates(entry.id, org.id)
+
+        assert [c["user_id"] for c in result] == [w.id for w in workers]
+        assert [c["weekly_hours"] for c in result] == [0, 4.0, 8.0, 12.0]
+        assert result[0]["start_time"] == "09:00"
+        assert result[0]["user_email"] == "c0@test.com"
+
+    def test_excludes_inactive_workers(self, app, admin_user, org, worker_user, db_session):
+        from app.services.vacancy_service import find_candidates
+        period, schedule, entry = _setup_schedule(db_session, org, admin_user, worker_user)
+        active, inactive = self._add_candidates(db_session, org, period, schedule, 2)
+        inactive.is_active = False
+        db_session.commit()
+
+        assert [c["user_id"] for c in find_candidates(entry.id, org.id)] == [active.id]
+
+    def test_missing_entry(self, app, org, db_session):
+        from app.services.vacancy_service import find_candidates
+        assert find_candidates(999999, org.id) == []
+
+    def test_query_count_independent_of_workers(self, app, admin_user, org, worker_user,
+                                                db_session, count_queries):
+        from app.services.vacancy_service import find_candidates
+        period, schedule, entry = _setup_schedule(db_session, org, admin_user, worker_user)
+        entry_id, org_id = entry.id, org.id
+        self._add_candidates(db_session, org, period, schedule, 3, prefix="a")
+        db_session.commit()
+        with count_queries() as small:
+            assert len(find_candidates(entry_id, org_id)) == 3
+
+        self._add_candidates(db_session, org, period, schedule, 30, prefix="b")
+        db_session.commit()
+        with count_queries() as large:
+            assert len(find_candidates(entry_id, org_id)) == 33
+
+        assert large.count == small.count <= 2
+
+
 # ---------------------------------------------------------------------------
 # Vacancy Request CRUD
 # ---------------------------------------------------------------------------
@@ -198,6 +267,88 @@ class TestVacancyRequest:
         assert len(resp.get_json()) == 1
 
 
+class TestBulkNotification:
+    """send_vacancy_notifications() batch path: preload, bulk insert, one commit."""
+
+    def _vacancy(self, db_session, admin_user, entry, worker_user):
+        vacancy = VacancyRequest(schedule_entry_id=entry.id, original_user_id=worker_user.id,
+                                 reason="急病", status="open", created_by=admin_user.id)
+        db_session.add(vacancy)
+        db_session.flush()
+        return vacancy
+
+    def _roster(self, db_session, org, count, prefix="r"):
+        return [_make_user(db_session, org, email=f"{prefix}{i}@test.com", role="worker",
+                           display_name=f"R{i}") for i in range(count)]
+
+    def test_inserts_candidates_and_tasks(self, app, admin_user, org, worker_user, db_session):
+        from app.models.async_task import AsyncTask
+        from app.services.vacancy_service import send_vacancy_notifications
+        period, schedule, entry = _setup_schedule(db_session, org, admin_user, worker_user)
+        vacancy = self._vacancy(db_session, admin_user, entry, worker_user)
+        roster = self._roster(db_session, org, 5)
+        roster[1].is_active = False
+        db_session.add(VacancyCandidate(vacancy_request_id=vacancy.id, user_id=roster[2].id,
+                                        status="notified", response_token="existing"))
+        db_session.commit()
+        ids = [u.id for u in roster]
+
+        result, error = send_vacancy_notifications(vacancy.id, ids + [ids[0], 999999],
+                                                   "https://x")
+
+        assert error is None
+        assert result == {"notified_count": 3}
+        candidates = VacancyCandidate.query.filter_by(vacancy_request_id=vacancy.id).all()
+        assert sorted(c.user_id for c in candidates) == sorted([ids[0], ids[2], ids[3], ids[4]])
+        new = [c for c in candidates if c.response_token != "existing"]
+        assert all(c.status == "notified" and c.notified_at for c in new)
+        assert len({c.response_token for c in new}) == 3
+
+        tasks = AsyncTask.query.order_by(AsyncTask.id).all()
+        assert [t.payload["to_email"] for t in tasks] == ["r0@test.com", "r3@test.com", "r4@test.com"]
+        token = next(c.response_token for c in new if c.user_id == ids[3])
+        assert f"token={token}&amp;action=accept" in tasks[1].payload["body_html"]
+        assert db.session.get(VacancyRequest, vacancy.id).status == "notified"
+
+    def test_rolls_back_everything_on_failure(self, app, admin_user, org, worker_user, db_session):
+        from app.models.async_task import AsyncTask
+        from app.services.vacancy_service import send_vacancy_notifications
+        period, schedule, entry = _setup_schedule(db_session, org, admin_user, worker_user)
+        vacancy = self._vacancy(db_session, admin_user, entry, worker_user)
+        roster = self._roster(db_session, org, 3)
+        db_session.commit()
+        vacancy_id, ids = vacancy.id, [u.id for u in roster]
+
+        with patch("app.services.task_runner.enqueue_emails", side_effect=RuntimeError("db down")):
+            result, error = send_vacancy_notifications(vacancy_id, ids, "https://x")
+
+        assert result is None and error == "データベースエラー"
+        assert VacancyCandidate.query.count() == 0
+        assert AsyncTask.query.count() == 0
+        assert db.session.get(VacancyRequest, vacancy_id).status == "open"
+
+    def test_query_count_independent_of_roster(self, app, admin_user, org, worker_user,
+                                               db_session, count_queries):
+        from app.services.vacancy_service import send_vacancy_notifications
+        period, schedule, entry = _setup_schedule(db_session, org, admin_user, worker_user)
+        small_vacancy = self._vacancy(db_session, admin_user, entry, worker_user)
+        large_vacancy = self._vacancy(db_session, admin_user, entry, worker_user)
+        small = [u.id for u in self._roster(db_session, org, 3, prefix="s")]
+        large = [u.id for u in self._roster(db_session, org, 40, prefix="l")]
+        db_session.commit()
+        small_id, large_id = small_vacancy.id, large_vacancy.id
+
+        db_session.expire_all()
+        with count_queries() as few:
+            send_vacancy_notifications(small_id, small, "https://x")
+        db_session.expire_all()
+        with count_queries() as many:
+            result, _ = send_vacancy_notifications(large_id, large, "https://x")
+
+        assert result == {"notified_count": 40}
+        assert many.count == few.count
+
+
 # ---------------------------------------------------------------------------
 # Notification & Response
 # ---------------------------------------------------------------------------